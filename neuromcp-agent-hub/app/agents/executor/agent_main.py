@@ -1,15 +1,42 @@
 from __future__ import annotations
+import time
 from typing import Any, Dict, List
 
-from app.services.mcp.mcp_client import MCPClient
-from app.services.tools.calendar_tool import create_calendar_event, list_calendar_events
-from app.services.tools.slack_tool import post_slack_message, list_slack_channels, read_slack_messages
-from app.services.ai.summarizer import summarize_slack_messages
+from app.services.mcp.federation import get_federation
+from app.services.observability.metrics import TOOL_SECONDS
+from app.services.observability.tracing import span
+from app.services.mcp.tool_handlers import get_handler
+from app.services.mcp.tool_registry import get_tool_spec
+from app.utils.deadline import DeadlineExceeded, deadline_exceeded, is_expired, TIMEOUT_STATUS
+from app.utils.run_log import RunLog, get_run_log
+from app.utils.tenant import tenant_of
+
+
+class _Blank(dict):
+    def __missing__(self, key):
+        return "?"
+
+
+def _fmt(template: str, values: Any, **extra: Any) -> str:
+    """Fill a registry log template; missing fields render as '?'"""
+    data = values if isinstance(values, dict) else {}
+    return template.format_map(_Blank({**data, **extra}))
+
+
+def _timing(step_id: str, tool: str, started: float, ok: bool) -> Dict[str, Any]:
+    elapsed = time.perf_counter() - started
+    TOOL_SECONDS.observe(elapsed, tool, "ok" if ok else "error")
+    return {"step_id": step_id, "tool": tool, "ms": round(elapsed * 1000, 1), "ok": ok}
 
 
 async def run_executor(state: Dict[str, Any]) -> Dict[str, Any]:
-    state.setdefault("logs", [])
-    logs: List[Dict[str, Any]] = state["logs"]
+    logs: RunLog = get_run_log(state)
+
+    if deadline_exceeded(state, "executor"):
+        return state
+
+    deadline_at = state.get("deadline_at")
+    tenant_id = tenant_of(state)
 
     plan = state.get("plan")
     if not plan:
@@ -22,6 +49,8 @@ async def run_executor(state: Dict[str, Any]) -> Dict[str, Any]:
     logs.append({"agent": "executor", "msg": "Executor started..."})
 
     results: Dict[str, Any] = {}
+    # Per-step wall time (run history / analytics)
+    step_timings: List[Dict[str, Any]] = state.setdefault("step_timings", [])
 
     for step in steps:
         step_id = step["id"]
@@ -32,99 +61,49 @@ async def run_executor(state: Dict[str, Any]) -> Dict[str, Any]:
             results[step_id] = {"skipped": True, "reason": "No tool"}
             continue
 
+        # Out of budget: stop here and hand back what already ran
+        if deadline_exceeded(state, "executor"):
+            state["execution_results"] = results
+            return state
+
+        started = time.perf_counter()
         try:
-            # Route to appropriate tool handler
-            if tool == "calendar.create_event":
-                # Use direct Google Calendar API
-                logs.append({"agent": "executor", "msg": f"Creating calendar event: {tool_input.get('title', 'Meeting')}"})
-                
-                result = await create_calendar_event(
-                    title=tool_input.get("title", "Meeting"),
-                    start_time=tool_input.get("start_time"),
-                    end_time=tool_input.get("end_time"),
-                    description=tool_input.get("description", ""),
-                    attendees=tool_input.get("attendees", []),
-                    timezone=tool_input.get("timezone", "Asia/Kolkata")
-                )
-                results[step_id] = result
-                logs.append({"agent": "executor", "msg": f"✅ Event created: {result.get('event_id')}"})
-                
-            elif tool == "calendar.list_events":
-                # List calendar events
-                result = await list_calendar_events(
-                    max_results=tool_input.get("max_results", 10),
-                    time_min=tool_input.get("time_min")
-                )
-                results[step_id] = result
-                logs.append({"agent": "executor", "msg": f"✅ Retrieved {result.get('count', 0)} events"})
-                
-            elif tool == "slack.post_message":
-                # Use direct Slack API
-                logs.append({"agent": "executor", "msg": f"Posting to Slack: {tool_input.get('channel', '#general')}"})
-                
-                result = await post_slack_message(
-                    channel=tool_input.get("channel", "#general"),
-                    text=tool_input.get("text", ""),
-                    thread_ts=tool_input.get("thread_ts")
-                )
-                results[step_id] = result
-                logs.append({"agent": "executor", "msg": f"✅ Message posted to Slack"})
-                
-            elif tool == "slack.list_channels":
-                # List Slack channels
-                result = await list_slack_channels()
-                results[step_id] = result
-                logs.append({"agent": "executor", "msg": f"✅ Retrieved {result.get('count', 0)} channels"})
-                
-            elif tool == "slack.read_messages":
-                # Read Slack messages
-                channel = tool_input.get("channel", "#general")
-                limit = tool_input.get("limit", 100)
-                logs.append({"agent": "executor", "msg": f"Reading messages from {channel}..."})
-                
-                result = await read_slack_messages(channel=channel, limit=limit)
-                results[step_id] = result
-                logs.append({"agent": "executor", "msg": f"✅ Retrieved {result.get('count', 0)} messages"})
-                
-            elif tool == "slack.summarize_messages":
-                # Summarize Slack messages (requires previous read_messages step)
-                # Get messages from previous step
-                messages = []
-                for prev_step_id, prev_result in results.items():
-                    if isinstance(prev_result, dict) and "messages" in prev_result:
-                        messages = prev_result["messages"]
-                        break
-                
-                if not messages:
-                    raise RuntimeError(
-                        "No messages found to summarize. "
-                        "The channel may only contain system messages (joins, leaves). "
-                        "Try asking to read more messages with a higher limit."
-                    )
-                
-                logs.append({"agent": "executor", "msg": f"Summarizing {len(messages)} messages with AI..."})
-                summary = summarize_slack_messages(messages)
-                
-                result = {
-                    "success": True,
-                    "summary": summary,
-                    "message_count": len(messages)
-                }
-                results[step_id] = result
-                logs.append({"agent": "executor", "msg": f"✅ Summary generated"})
-                
-            else:
-                # Fall back to MCP client for other tools
-                client = MCPClient()
-                out = await client.call_tool(name=tool, args=tool_input)
+            spec = get_tool_spec(tool)
+            if spec is None:
+                # Not a built-in: MCP ("server/tool" goes to that federated server)
+                with span("tool.mcp", tool=tool, step_id=step_id):
+                    out = await get_federation().call_tool(tool, tool_input, deadline_at=deadline_at)
                 results[step_id] = out
+                step_timings.append(_timing(step_id, tool, started, True))
                 logs.append({"agent": "executor", "msg": f"✅ Tool {tool} executed via MCP"})
-                
+                continue
+
+            if spec.log_start:
+                logs.append({"level": "DEBUG", "agent": "executor", "msg": _fmt(spec.log_start, {**spec.defaults, **tool_input})})
+
+            # O(1) registry dispatch; the handler module is imported on first use
+            with span("tool", tool=tool, step_id=step_id):
+                result = await get_handler(tool)(
+                    tool_input, deadline_at=deadline_at, results=results, validate=False, tenant_id=tenant_id
+                )
+            results[step_id] = result
+            step_timings.append(_timing(step_id, tool, started, True))
+            logs.append({"agent": "executor", "msg": _fmt(spec.log_done, result, tool=tool)})
+
         except Exception as e:
+            state["execution_results"] = results
+            step_timings.append(_timing(step_id, tool, started, False))
+
+            # A call cut short by the run budget is a timeout, not a tool failure
+            if isinstance(e, DeadlineExceeded) or is_expired(deadline_at):
+                logs.append({"level": "WARNING", "agent": "executor", "msg": f"⏱️ Run deadline exceeded at {step_id}"})
+                state["status"] = TIMEOUT_STATUS
+                state["error"] = f"Run deadline exceeded at {step_id}"
+                return state
+
             error_msg = str(e)
-            logs.append({"agent": "executor", "msg": f"❌ Execution failed at {step_id}: {error_msg}"})
+            logs.append({"level": "ERROR", "agent": "executor", "msg": f"❌ Execution failed at {step_id}: {error_msg}"})
             state["status"] = "FAILED"
-            state["execution_results"] = results
             state["error"] = error_msg
             return state
 
@@ -2,18 +2,19 @@ from __future__ import annotations
 
 import json
 import os
+import threading
+import time
 from datetime import datetime
 from zoneinfo import ZoneInfo
-from typing import Any, Dict, List, Set, Tuple
-
-from jsonschema import validate as jsonschema_validate
-from jsonschema.exceptions import ValidationError
-
-from langchain_groq import ChatGroq
-from langchain_core.messages import SystemMessage, HumanMessage
+from typing import Any, Dict, Optional
 
 from app.agents.planner.prompt import SYSTEM_PROMPT
 from app.agents.planner.schema import Plan
+from app.config.settings import ModelSettings
+from app.services.mcp.tool_catalog import ToolCatalog
+from app.services.observability.metrics import LLM_SECONDS
+from app.services.observability.tracing import span
+from app.utils.deadline import timeout_for
 
 
 # ===============================
@@ -58,16 +59,6 @@ def extract_json(text: str) -> Dict[str, Any]:
 # Tool Guardrails
 # ===============================
 
-def build_tool_maps(tools: List[Dict[str, Any]]) -> Tuple[Set[str], Dict[str, Dict[str, Any]]]:
-    allowed = set()
-    tool_map = {}
-    for t in tools:
-        name = t["name"]
-        allowed.add(name)
-        tool_map[name] = t
-    return allowed, tool_map
-
-
 def validate_dependencies(plan: Dict[str, Any]):
     steps = plan["steps"]
     ids = [s["id"] for s in steps]
@@ -81,50 +72,94 @@ def validate_dependencies(plan: Dict[str, Any]):
                 raise ValueError(f"{step['id']} depends on future step {dep}")
 
 
-def validate_tool_inputs(plan: Dict[str, Any], available_tools: List[Dict[str, Any]]):
-    allowed, tool_map = build_tool_maps(available_tools)
+def validate_tool_inputs(plan: Dict[str, Any], catalog: ToolCatalog):
+    from jsonschema.exceptions import best_match
 
     for step in plan["steps"]:
         tool = step.get("tool")
         if tool is None:
             continue
 
-        if tool not in allowed:
+        if tool not in catalog.names:
             raise ValueError(f"Hallucinated tool: {tool}")
 
         # Check if input_schema exists
-        if "input_schema" not in tool_map[tool]:
+        if "input_schema" not in catalog.by_name[tool]:
             raise ValueError(
                 f"Tool '{tool}' is missing 'input_schema' in tool registry. "
-                f"Available keys: {list(tool_map[tool].keys())}"
+                f"Available keys: {list(catalog.by_name[tool].keys())}"
             )
         
-        schema = tool_map[tool]["input_schema"]
+        validator = catalog.validator(tool)
         data = step.get("input", {})
 
-        try:
-            jsonschema_validate(instance=data, schema=schema)
-        except ValidationError as e:
-            raise ValueError(f"Tool '{tool}' input schema mismatch: {e.message}")
+        # Validator was compiled once per catalog version
+        error = best_match(validator.iter_errors(data)) if validator else None
+        if error is not None:
+            raise ValueError(f"Tool '{tool}' input schema mismatch: {error.message}")
 
 
 # ===============================
 # Groq LLM Loader
 # ===============================
 
-def get_groq_llm() -> ChatGroq:
+GROQ_API_BASE = "https://api.groq.com"  # groq's default; GROQ_API_BASE / GROQ_BASE_URL override it
+
+_groq_llm = None
+_groq_http = None
+_groq_config = None
+_groq_lock = threading.Lock()
+
+
+def get_groq_llm():
+    """
+    Shared ChatGroq client, built once per (key, model). It owns one httpx
+    pool, so the connection warm-up opens (and every run after the first)
+    is reused; per-call timeouts go to invoke(). langchain_groq is only
+    imported when the LLM path is taken.
+    """
+    global _groq_llm, _groq_http, _groq_config
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key:
         raise RuntimeError("GROQ_API_KEY missing in environment/.env")
+    config = (api_key, os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"))
+
+    with _groq_lock:
+        if _groq_llm is None or _groq_config != config:
+            import httpx
+            from langchain_groq import ChatGroq
+
+            if _groq_http is not None:
+                _groq_http.close()
+            _groq_http = httpx.Client(timeout=ModelSettings.timeout_s)
+            _groq_llm = ChatGroq(
+                api_key=api_key,
+                model=config[1],
+                temperature=0.2,
+                max_tokens=1024,
+                # NOTE: top_p warning is okay; it goes into model_kwargs
+                top_p=0.9,
+                timeout=ModelSettings.timeout_s,
+                http_client=_groq_http,
+            )
+            _groq_config = config
+        return _groq_llm
+
+
+def warm_groq_connection(timeout_s: float) -> int:
+    """Open the TLS connection in the shared ChatGroq client's own pool; returns the HTTP status"""
+    get_groq_llm()
+    base = (os.getenv("GROQ_API_BASE") or os.getenv("GROQ_BASE_URL") or GROQ_API_BASE).rstrip("/")
+    return _groq_http.head(f"{base}/openai/v1/models", timeout=timeout_s).status_code
 
-    return ChatGroq(
-        api_key=api_key,
-        model=os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
-        temperature=0.2,
-        max_tokens=1024,
-        # NOTE: top_p warning is okay; it goes into model_kwargs
-        top_p=0.9,
-    )
+
+def reset_groq_llm() -> None:
+    """Drop the shared client (tests, key rotation)"""
+    global _groq_llm, _groq_http, _groq_config
+    with _groq_lock:
+        if _groq_http is not None:
+            _groq_http.close()
+        _groq_llm = _groq_http = _groq_config = None
 
 
 # ===============================
@@ -133,16 +168,21 @@ def get_groq_llm() -> ChatGroq:
 
 def create_plan_with_groq(
     user_request: str,
-    available_tools: List[Dict[str, Any]],
+    catalog: ToolCatalog,
     retries: int = 2,
     tz: str = DEFAULT_TZ,
+    deadline_at: Optional[float] = None,
 ) -> Plan:
     """
     Generates a tool-valid plan using Groq LLM + strict guardrails.
     Anchors the model with today's date/time in the selected timezone.
+    Each attempt only gets what is left of the run budget (deadline_at).
     """
 
-    llm = get_groq_llm()
+    if not os.getenv("GROQ_API_KEY"):  # fail fast, before building prompts
+        raise RuntimeError("GROQ_API_KEY missing in environment/.env")
+    from langchain_core.messages import SystemMessage, HumanMessage
+
     error_msg = None
 
     ctx = today_context(tz)
@@ -158,7 +198,7 @@ User Request:
 {user_request}
 
 Available Tools (authoritative):
-{json.dumps(available_tools, indent=2)}
+{catalog.prompt_json}
 
 Rules:
 - Return ONLY JSON (no markdown).
@@ -169,20 +209,31 @@ Rules:
         if error_msg:
             prompt += f"\nPrevious output failed:\n{error_msg}\nFix it and return ONLY JSON."
 
-        response = llm.invoke([
-            SystemMessage(content=SYSTEM_PROMPT),
-            HumanMessage(content=prompt),
-        ])
+        # Raises DeadlineExceeded once the run budget is gone
+        timeout_s = timeout_for(deadline_at, ModelSettings.timeout_s)
+        llm = get_groq_llm()
+        started = time.perf_counter()
+        try:
+            with span("llm.planner", attempt=attempt + 1, model=ModelSettings.model):
+                response = llm.invoke([
+                    SystemMessage(content=SYSTEM_PROMPT),
+                    HumanMessage(content=prompt),
+                ], timeout=timeout_s)
+        except Exception:
+            LLM_SECONDS.observe(time.perf_counter() - started, "planner", "error")
+            raise
+        LLM_SECONDS.observe(time.perf_counter() - started, "planner", "ok")
 
         try:
-            plan_dict = extract_json(response.content)
+            with span("planner.validate_plan", attempt=attempt + 1):
+                plan_dict = extract_json(response.content)
 
-            # ✅ Pydantic structure validation
-            plan_obj = Plan.model_validate(plan_dict)
+                # ✅ Pydantic structure validation
+                plan_obj = Plan.model_validate(plan_dict)
 
-            # ✅ Dependency + Tool schema validation
-            validate_dependencies(plan_dict)
-            validate_tool_inputs(plan_dict, available_tools)
+                # ✅ Dependency + Tool schema validation
+                validate_dependencies(plan_dict)
+                validate_tool_inputs(plan_dict, catalog)
 
             return plan_obj
 
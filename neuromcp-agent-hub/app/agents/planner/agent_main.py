@@ -2,47 +2,65 @@
 import os
 from app.agents.planner.agent import create_plan_with_groq
 from app.agents.planner.offline_planner import build_plan
+from app.services.mcp.tool_catalog import resolve_catalog
+from app.services.observability.metrics import FALLBACKS
+from app.utils.deadline import DeadlineExceeded, deadline_exceeded
+from app.utils.run_log import get_run_log
 
 def run_planner(state: dict) -> dict:
+    if deadline_exceeded(state, "planner"):
+        return state
+
     user_request = state["user_request"]
-    tools = state["available_tools"]
+    catalog = resolve_catalog(state.get("tool_catalog_version"))
+    tools = catalog.tools
     tz = state.get("timezone", "Asia/Kolkata")
 
-    logs = state.get("logs", [])
+    logs = get_run_log(state)
     try:
         if os.getenv("OFFLINE_PLANNER", "false").lower() == "true":
             logs.append({"agent": "planner", "msg": "OFFLINE_PLANNER enabled → using rule-based planner."})
             plan_obj = build_plan(user_request, tools, tz=tz)
+            state["planner_mode"] = "offline"
         else:
-            plan_obj = create_plan_with_groq(user_request, tools, retries=2)
+            plan_obj = create_plan_with_groq(
+                user_request, catalog, retries=2, deadline_at=state.get("deadline_at")
+            )
             # Convert Pydantic model to dict for validator
             if hasattr(plan_obj, 'model_dump'):
                 plan_obj = plan_obj.model_dump()
+            state["planner_mode"] = "llm"
 
         state["plan"] = plan_obj
         
-        # Debug: Log the plan for troubleshooting
-        import json
-        if hasattr(plan_obj, 'model_dump'):
-            plan_dict = plan_obj.model_dump()
-        else:
-            plan_dict = plan_obj
-        logs.append({"agent": "planner", "msg": f"Generated plan: {json.dumps(plan_dict, indent=2)}"})
+        # Debug: keep the plan as a payload (only recorded at DEBUG verbosity,
+        # and the response already carries it under "plan")
+        logs.append({"level": "DEBUG", "agent": "planner", "msg": "Generated plan", "data": plan_obj})
         
         logs.append({"agent": "planner", "msg": "Plan created successfully."})
-        state["logs"] = logs
+        return state
+
+    except DeadlineExceeded:
+        # The run budget ran out before (or between) LLM attempts: that is a
+        # TIMEOUT for the whole run, not a planner fallback
+        deadline_exceeded(state, "planner")
         return state
 
     except Exception as e:
+        if deadline_exceeded(state, "planner"):
+            return state  # the LLM call was cut short by the run deadline
+
         # Provide helpful error message
         error_msg = str(e)
         if "GROQ_API_KEY" in error_msg:
             logs.append({
+                "level": "WARNING",
                 "agent": "planner", 
                 "msg": f"❌ GROQ_API_KEY missing or invalid. Falling back to offline pattern-based planner."
             })
         else:
             logs.append({
+                "level": "WARNING",
                 "agent": "planner", 
                 "msg": f"Groq LLM failed: {error_msg}. Falling back to offline planner."
             })
@@ -50,6 +68,7 @@ def run_planner(state: dict) -> dict:
         # Fallback to pattern-based planner
         plan_obj = build_plan(user_request, tools, tz=tz)
         state["plan"] = plan_obj
-        state["logs"] = logs
+        state["planner_mode"] = "fallback"  # LLM planner failed / unavailable
+        FALLBACKS.inc("planner")
         return state
 
@@ -2,6 +2,8 @@ from __future__ import annotations
 from typing import Any, Dict
 from datetime import datetime
 
+from app.utils.run_log import get_run_log
+
 
 def format_slack_messages(messages: list) -> str:
     """Format Slack messages in a user-friendly way"""
@@ -34,8 +36,8 @@ def format_slack_messages(messages: list) -> str:
 
 
 def run_report(state: Dict[str, Any]) -> Dict[str, Any]:
-    logs = state.get("logs", [])
-    logs.append({"agent": "report", "msg": "Generating final report..."})
+    logs = get_run_log(state)
+    logs.append({"level": "DEBUG", "agent": "report", "msg": "Generating final report..."})
 
     plan = state.get("plan", {})
     results = state.get("execution_results", {}) or {}
@@ -90,5 +92,4 @@ def run_report(state: Dict[str, Any]) -> Dict[str, Any]:
     state["final_report"] = "\n".join(lines)
     state["execution_results"] = results  # Update with formatted results (Slack only)
     logs.append({"agent": "report", "msg": "Final report generated."})
-    state["logs"] = logs
     return state
@@ -1,25 +1,27 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
-from app.agents.tool_discovery.agent import discover_tools
+from typing import Any, Dict
+from app.services.mcp.tool_catalog import get_catalog
+from app.utils.deadline import deadline_exceeded
+from app.utils.run_log import RunLog, get_run_log
 
 
 def _normalize_state(state: Dict[str, Any]) -> Dict[str, Any]:
-    state.setdefault("logs", [])
+    get_run_log(state)
     return state
 
 
 async def run_tool_discovery(state: Dict[str, Any]) -> Dict[str, Any]:
     state = _normalize_state(state)
-    logs: List[Dict[str, Any]] = state["logs"]
+    logs: RunLog = state["logs"]
 
-    tools = await discover_tools()
+    if deadline_exceeded(state, "tool_discovery"):
+        return state
 
-    # ✅ single source of truth for planner
-    state["available_tools"] = tools
+    # ✅ single source of truth for planner/validator: the cached catalog.
+    # State only carries its version, not the tool list itself.
+    catalog = await get_catalog()
+    state["tool_catalog_version"] = catalog.version
 
-    # (optional) keep old key so other code doesn't break
-    state["tools"] = tools
-
-    logs.append({"agent": "tool_discovery", "msg": f"Discovered {len(tools)} tools."})
+    logs.append({"agent": "tool_discovery", "msg": f"Discovered {len(catalog.tools)} tools (catalog {catalog.version})."})
     return state
@@ -1,29 +1,22 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple, Set
-from jsonschema import validate as jsonschema_validate
-from jsonschema.exceptions import ValidationError as JSONSchemaValidationError
+from typing import Any, Dict, List, Tuple
 
 from app.agents.validator.schema import ValidationResult, ApprovalRequest
-
-
-def _tool_maps(available_tools: List[Dict[str, Any]]) -> Tuple[Set[str], Dict[str, Dict[str, Any]]]:
-    allowed = set()
-    tool_map: Dict[str, Dict[str, Any]] = {}
-    for t in available_tools:
-        name = t.get("name")
-        if isinstance(name, str) and name:
-            allowed.add(name)
-            tool_map[name] = t
-    return allowed, tool_map
+from app.services.mcp.tool_catalog import ToolCatalog
+from app.utils.tenant import DEFAULT_TENANT, DEFAULT_USER
 
 
 def validate_plan_neurosymbolic(
     plan: Dict[str, Any],
-    available_tools: List[Dict[str, Any]],
+    catalog: ToolCatalog,
     default_timezone: str = "Asia/Kolkata",
+    tenant_id: str = DEFAULT_TENANT,
+    user_id: str = DEFAULT_USER,
 ) -> Tuple[ValidationResult, List[ApprovalRequest], Dict[str, Any]]:
     """
+    Rate limits are checked against tenant_id's / user_id's quota.
+
     Returns:
     - validation_result (valid/errors/warnings)
     - pending_approvals (list of steps requiring user approval)
@@ -39,7 +32,7 @@ def validate_plan_neurosymbolic(
     if not isinstance(steps, list) or len(steps) == 0:
         return ValidationResult(valid=False, errors=["Plan has no steps"]), [], plan
 
-    allowed, tool_map = _tool_maps(available_tools)
+    allowed, tool_map = catalog.names, catalog.by_name
 
     # Copy plan so we can patch safely
     patched_plan = {"goal": plan.get("goal", ""), "steps": []}
@@ -86,25 +79,39 @@ def validate_plan_neurosymbolic(
             from app.agents.validator.rate_limiter import check_rate_limit
             
             # Check rate limit for this tool
-            is_allowed, rate_error = check_rate_limit(tool)
-            if not is_allowed:
+            decision = check_rate_limit(tool, tenant_id=tenant_id, user_id=user_id)
+            if not decision.allowed:
                 result.valid = False
-                result.errors.append(f"{sid}: {rate_error}")
+                result.errors.append(f"{sid}: {decision.error}")
+                result.rate_limited.append({"reason": decision.reason, "error": result.errors[-1]})
+
+        # 2.6) Provider availability: an open circuit breaker fails the plan now
+        # instead of letting the executor wait out the HTTP timeout
+        if tool is not None and isinstance(tool, str):
+            from app.services.mcp.tool_registry import get_tool_spec
+            from app.services.http.circuit_breaker import provider_unavailable
+
+            spec = get_tool_spec(tool)
+            reason = provider_unavailable(spec.provider) if spec and spec.provider else None
+            if reason:
+                result.valid = False
+                result.errors.append(f"{sid}: {reason}")
 
         # 3) Input schema rule (symbolic)
         if tool is not None and isinstance(tool, str) and tool in allowed:
-            tool_spec = tool_map[tool]
-            schema = tool_spec.get("input_schema", {})
             if not isinstance(step_input, dict):
                 result.valid = False
                 result.errors.append(f"{sid}: input must be an object for tool '{tool}'")
             else:
-                try:
-                    if isinstance(schema, dict) and schema:
-                        jsonschema_validate(instance=step_input, schema=schema)
-                except JSONSchemaValidationError as e:
-                    result.valid = False
-                    result.errors.append(f"{sid}: input schema mismatch for '{tool}': {e.message}")
+                # Validator was compiled once per catalog version
+                validator = catalog.validator(tool)
+                if validator is not None:
+                    from jsonschema.exceptions import best_match
+
+                    error = best_match(validator.iter_errors(step_input))
+                    if error is not None:
+                        result.valid = False
+                        result.errors.append(f"{sid}: input schema mismatch for '{tool}': {error.message}")
 
             # 4) Data Validation Rules (universal checks)
             from app.agents.validator.validation_rules import (
@@ -127,7 +134,7 @@ def validate_plan_neurosymbolic(
                         result.errors.append(f"{sid}: {err}")
 
             # 5) Approval rule (high-risk tools)
-            if tool_spec.get("requires_approval", False):
+            if catalog.requires_approval.get(tool, False):
                 pending.append(
                     ApprovalRequest(
                         step_id=sid,
@@ -2,18 +2,28 @@ from __future__ import annotations
 from typing import Any, Dict
 
 from app.agents.validator.agent import validate_plan_neurosymbolic
+from app.services.mcp.tool_catalog import resolve_catalog
+from app.services.observability.metrics import VALIDATION_ERRORS
+from app.utils.deadline import deadline_exceeded
+from app.utils.run_log import get_run_log
+from app.utils.tenant import tenant_of, user_of
 
 def run_validator(state: Dict[str, Any]) -> Dict[str, Any]:
+    if deadline_exceeded(state, "validator"):
+        return state
+
     plan = state.get("plan")
-    tools = state.get("available_tools", [])
+    catalog = resolve_catalog(state.get("tool_catalog_version"))
 
-    logs = state.get("logs", [])
+    logs = get_run_log(state)
     logs.append({"agent": "validator", "msg": "Running neurosymbolic validation rules..."})
 
     validation, pending, patched_plan = validate_plan_neurosymbolic(
         plan=plan,
-        available_tools=tools,
+        catalog=catalog,
         default_timezone="Asia/Kolkata",
+        tenant_id=tenant_of(state),
+        user_id=user_of(state),
     )
 
     state["validation"] = validation.model_dump()
@@ -22,7 +32,8 @@ def run_validator(state: Dict[str, Any]) -> Dict[str, Any]:
 
     if not validation.valid:
         state["status"] = "ERROR"
-        logs.append({"agent": "validator", "msg": f"Validation failed: {validation.errors}"})
+        VALIDATION_ERRORS.inc("plan")
+        logs.append({"level": "ERROR", "agent": "validator", "msg": f"Validation failed: {validation.errors}"})
     elif len(pending) > 0:
         state["status"] = "WAITING_FOR_APPROVAL"
         logs.append({"agent": "validator", "msg": f"Waiting for approval for steps: {[p.step_id for p in pending]}"})
@@ -30,7 +41,6 @@ def run_validator(state: Dict[str, Any]) -> Dict[str, Any]:
         state["status"] = "READY_TO_EXECUTE"
         logs.append({"agent": "validator", "msg": "Validation passed. No approvals needed."})
 
-    state["logs"] = logs
     return state
 
    
\ No newline at end of file
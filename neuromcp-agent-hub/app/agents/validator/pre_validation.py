@@ -25,30 +25,66 @@ def extract_emails_from_text(text: str) -> List[str]:
     return list(matches)
 
 
-def validate_user_request(user_request: str) -> Tuple[bool, Optional[str]]:
+# Whole words (or a #channel reference) that tie a request to a provider, for
+# the circuit-breaker check. Only unambiguous ones: "events" or "schedule" alone
+# could be either, and the validator checks the planned tools' providers anyway.
+# provider: (substrings one of which must appear, pattern that confirms it)
+PROVIDER_PATTERNS = {
+    "slack": (("slack", "channel", "#"), re.compile(r"\b(?:slack|channels?)\b|(?<![\w#])#[a-z0-9][\w-]*")),
+    "google": (("calendar", "google"), re.compile(r"\b(?:calendar|google)\b")),
+}
+
+
+def detect_providers(text: str) -> List[str]:
+    lowered = text.lower()
+    # The substring check skips the regex scan for (long) text that cannot match
+    return [p for p, (hints, pattern) in PROVIDER_PATTERNS.items()
+            if any(h in lowered for h in hints) and pattern.search(lowered)]
+
+
+def validate_user_request(
+    user_request: str,
+    tenant_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Tuple[bool, Optional[str], Optional[str]]:
     """
     Quick validation of user's raw input before sending to planner.
+    Rate limits count against the tenant's (and user's) quota.
     
     Returns:
-        (is_valid, error_message)
+        (is_valid, error_message, rate_limit_reason); the reason code is set
+        only when the rate limiter refused the request
     """
     from app.agents.validator.validation_rules import validate_email
     from app.agents.validator.rate_limiter import check_rate_limit
+    from app.utils.tenant import DEFAULT_TENANT, DEFAULT_USER
     
     if not user_request or not user_request.strip():
-        return False, "Request cannot be empty"
+        return False, "Request cannot be empty", None
     
+    # Fail fast when a provider the request needs is tripped (no planner call).
+    # Checked before the rate limit so a refused request costs no quota and
+    # can be retried verbatim once the provider recovers.
+    from app.services.http.circuit_breaker import provider_unavailable
+
+    for provider in detect_providers(user_request):
+        reason = provider_unavailable(provider)
+        if reason:
+            return False, reason, None
+
     # Check overall rate limit (before specific tool checks)
-    is_allowed, rate_error = check_rate_limit("overall", user_request)
-    if not is_allowed:
-        return False, rate_error
-    
+    decision = check_rate_limit(
+        "overall", user_request, tenant_id or DEFAULT_TENANT, user_id or DEFAULT_USER
+    )
+    if not decision.allowed:
+        return False, decision.error, decision.reason
+
     # Extract and validate any emails in the request
     emails = extract_emails_from_text(user_request)
     
     for email in emails:
         is_valid, error = validate_email(email)
         if not is_valid:
-            return False, f"Invalid email in your request: {error}"
+            return False, f"Invalid email in your request: {error}", None
     
-    return True, None
+    return True, None, None
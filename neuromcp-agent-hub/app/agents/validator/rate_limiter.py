@@ -1,143 +1,198 @@
 """
 Rate Limiting Guardrails
-Prevents spam, abuse, and accidental overuse of tools
+Prevents spam, abuse, and accidental overuse of tools.
+Every window is scoped to a tenant (and optionally a user inside it), so
+one busy team cannot use up another team's quota.
 """
 
 import time
 import hashlib
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, NamedTuple, Tuple, Optional
 from collections import defaultdict, deque
 
+from app.services.mcp.tool_registry import get_tool_spec
+from app.services.observability.metrics import RATE_LIMIT_DECISIONS
+from app.utils.tenant import DEFAULT_TENANT, DEFAULT_USER, quota_for
+
+QUOTA_WINDOW_S = 3600  # tenant / user quotas are per hour
+DUPLICATE_WINDOW_S = 30  # same request again within this -> duplicate
+SWEEP_INTERVAL_S = 60  # how often idle keys are dropped from every table
+
+# Reason codes for refused requests (metrics labels, history rollups)
+DUPLICATE = "duplicate"
+TENANT_QUOTA = "tenant_quota"
+USER_QUOTA = "user_quota"
+TOOL_QUOTA = "tool_quota"
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    error: Optional[str] = None  # user-facing message when refused
+    reason: Optional[str] = None  # DUPLICATE / TENANT_QUOTA / USER_QUOTA / TOOL_QUOTA
+
+
+ALLOWED = RateLimitDecision(True)
+
 
 class RateLimiter:
     """
     Simple in-memory rate limiter for agent actions.
-    Tracks requests per tool and enforces limits.
+    Tracks requests per tenant, per user and per tool, and enforces limits.
     """
-    
+
     def __init__(self):
         # Store timestamps of requests per tool
-        # Format: {tool_name: deque([timestamp1, timestamp2, ...])}
-        self.tool_requests: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
-        
+        # Format: {(tenant_id, tool_name): deque([timestamp1, timestamp2, ...])}
+        self.tool_requests: Dict[Tuple[str, str], deque] = defaultdict(deque)
+
         # Store recent request hashes for duplicate detection
         # Format: {request_hash: timestamp}
         self.recent_requests: Dict[str, float] = {}
-        
-        # Overall request tracking
-        self.all_requests: deque = deque(maxlen=100)
-    
-    def _cleanup_old_entries(self, current_time: float, window_seconds: int):
-        """Remove entries older than the time window"""
-        cutoff = current_time - window_seconds
-        
-        # Clean tool requests
-        for tool_name in list(self.tool_requests.keys()):
-            timestamps = self.tool_requests[tool_name]
-            # Remove old timestamps
-            while timestamps and timestamps[0] < cutoff:
-                timestamps.popleft()
-        
-        # Clean recent requests (for duplicate detection)
-        expired_keys = [
-            key for key, ts in self.recent_requests.items()
-            if ts < cutoff
-        ]
+
+        # Overall request tracking per tenant and per (tenant, user)
+        self.tenant_requests: Dict[str, deque] = defaultdict(deque)
+        self.user_requests: Dict[Tuple[str, str], deque] = defaultdict(deque)
+        self._next_sweep = 0.0
+
+    @staticmethod
+    def _trim(table: Dict, key, cutoff: float):
+        """Drop one window's timestamps older than cutoff (and the key once empty)"""
+        timestamps = table.get(key)
+        if timestamps is None:
+            return ()
+        while timestamps and timestamps[0] < cutoff:
+            timestamps.popleft()
+        if not timestamps:
+            del table[key]
+            return ()
+        return timestamps
+
+    def _cleanup_old_entries(self, current_time: float):
+        """Full sweep: trim every window and drop idle keys and stale duplicate hashes"""
+        cutoff = current_time - QUOTA_WINDOW_S
+        for table in (self.tool_requests, self.tenant_requests, self.user_requests):
+            for key in list(table.keys()):
+                self._trim(table, key, cutoff)
+
+        duplicate_cutoff = current_time - DUPLICATE_WINDOW_S
+        expired_keys = [key for key, ts in self.recent_requests.items() if ts < duplicate_cutoff]
         for key in expired_keys:
             del self.recent_requests[key]
-        
-        # Clean overall requests
-        while self.all_requests and self.all_requests[0] < cutoff:
-            self.all_requests.popleft()
-    
-    def _hash_request(self, user_request: str, tool: str) -> str:
+        self._next_sweep = current_time + SWEEP_INTERVAL_S
+
+    def _hash_request(self, user_request: str, tool: str, tenant_id: str, user_id: str) -> str:
         """Create a hash of the request for duplicate detection"""
-        content = f"{user_request.lower().strip()}:{tool}"
+        content = f"{tenant_id}:{user_id}:{user_request.lower().strip()}:{tool}"
         return hashlib.md5(content.encode()).hexdigest()
-    
+
+    @staticmethod
+    def _reset_in(window: int, oldest: float, current_time: float) -> str:
+        time_until_reset = int(window - (current_time - oldest))
+        minutes = time_until_reset // 60
+        seconds = time_until_reset % 60
+        return f"{minutes} minutes" if minutes > 0 else f"{seconds} seconds"
+
     def check_rate_limit(
         self,
         tool_name: str,
-        user_request: str = ""
-    ) -> Tuple[bool, Optional[str]]:
+        user_request: str = "",
+        tenant_id: str = DEFAULT_TENANT,
+        user_id: str = DEFAULT_USER,
+    ) -> RateLimitDecision:
         """
         Check if the request exceeds rate limits.
-        
+
         Args:
             tool_name: Name of the tool being called
             user_request: Original user request text (for duplicate detection)
-            
+            tenant_id: Tenant whose quota the request counts against
+            user_id: User inside the tenant (per-user quota, duplicate detection)
+
         Returns:
-            (is_allowed, error_message)
+            RateLimitDecision(allowed, error message, reason code)
         """
         current_time = time.time()
-        
-        # Define rate limits (requests per time window)
+        quota = quota_for(tenant_id)
+
+        # Define rate limits (requests per time window); per-tool limits
+        # live on the tool's registry entry and apply per tenant
         LIMITS = {
-            "slack.post_message": (50, 3600),      # 50 per hour
-            "calendar.create_event": (50, 3600),   # 50 per hour
-            "overall": (100, 3600),                # 100 total per hour
+            "overall": (quota.requests_per_hour, QUOTA_WINDOW_S),
         }
-        
-        # Duplicate detection window (30 seconds)
-        DUPLICATE_WINDOW = 30
-        
-        # Cleanup old entries
-        self._cleanup_old_entries(current_time, 3600)  # 1 hour window
-        
+        spec = get_tool_spec(tool_name)
+        if spec is not None and spec.rate_limit:
+            LIMITS[tool_name] = spec.rate_limit
+
+        # Only the windows this request touches are trimmed here; idle keys
+        # of other tenants are swept every SWEEP_INTERVAL_S
+        if current_time >= self._next_sweep:
+            self._cleanup_old_entries(current_time)
+        cutoff = current_time - QUOTA_WINDOW_S
+
         # 1. Check for duplicate request (same request within 30 seconds)
         if user_request:
-            request_hash = self._hash_request(user_request, tool_name)
+            request_hash = self._hash_request(user_request, tool_name, tenant_id, user_id)
             if request_hash in self.recent_requests:
                 time_since = current_time - self.recent_requests[request_hash]
-                if time_since < DUPLICATE_WINDOW:
-                    wait_time = int(DUPLICATE_WINDOW - time_since)
-                    return False, f"Duplicate request detected. Please wait {wait_time} seconds before retrying."
-            
+                if time_since < DUPLICATE_WINDOW_S:
+                    wait_time = int(DUPLICATE_WINDOW_S - time_since)
+                    return RateLimitDecision(
+                        False, f"Duplicate request detected. Please wait {wait_time} seconds before retrying.", DUPLICATE)
+
             # Record this request
             self.recent_requests[request_hash] = current_time
-        
-        # 2. Check overall rate limit
+
+        # 2. Check the tenant's overall rate limit
         overall_limit, overall_window = LIMITS["overall"]
-        if len(self.all_requests) >= overall_limit:
-            oldest = self.all_requests[0]
+        tenant_timestamps = self._trim(self.tenant_requests, tenant_id, cutoff)
+        if len(tenant_timestamps) >= overall_limit:
+            oldest = tenant_timestamps[0]
             time_until_reset = int(overall_window - (current_time - oldest))
-            return False, f"Too many requests. Global limit: {overall_limit} per hour. Try again in {time_until_reset // 60} minutes."
-        
-        # 3. Check tool-specific rate limit
+            return RateLimitDecision(
+                False, f"Too many requests. Limit for your workspace: {overall_limit} per hour. Try again in {time_until_reset // 60} minutes.",
+                TENANT_QUOTA)
+
+        # 3. Check the user's share of it
+        user_timestamps = self._trim(self.user_requests, (tenant_id, user_id), cutoff)
+        if quota.user_requests_per_hour and len(user_timestamps) >= quota.user_requests_per_hour:
+            time_str = self._reset_in(QUOTA_WINDOW_S, user_timestamps[0], current_time)
+            return RateLimitDecision(
+                False, f"Too many requests from you. Limit: {quota.user_requests_per_hour} per hour. Try again in {time_str}.",
+                USER_QUOTA)
+
+        # 4. Check tool-specific rate limit
         if tool_name in LIMITS:
             limit, window = LIMITS[tool_name]
-            tool_timestamps = self.tool_requests[tool_name]
-            
+            tool_timestamps = self._trim(self.tool_requests, (tenant_id, tool_name), current_time - window)
+
             if len(tool_timestamps) >= limit:
-                oldest = tool_timestamps[0]
-                time_until_reset = int(window - (current_time - oldest))
-                minutes = time_until_reset // 60
-                seconds = time_until_reset % 60
-                
-                time_str = f"{minutes} minutes" if minutes > 0 else f"{seconds} seconds"
-                
-                return False, f"Rate limit exceeded for {tool_name}. Limit: {limit} per hour. Try again in {time_str}."
-        
+                time_str = self._reset_in(window, tool_timestamps[0], current_time)
+                return RateLimitDecision(
+                    False, f"Rate limit exceeded for {tool_name}. Limit: {limit} per hour. Try again in {time_str}.",
+                    TOOL_QUOTA)
+
         # All checks passed - record the request and allow it
-        self.tool_requests[tool_name].append(current_time)
-        self.all_requests.append(current_time)
-        
-        return True, None
-    
-    def get_stats(self) -> Dict[str, any]:
-        """Get current rate limit statistics"""
-        current_time = time.time()
-        self._cleanup_old_entries(current_time, 3600)
-        
+        self.tool_requests[(tenant_id, tool_name)].append(current_time)
+        self.tenant_requests[tenant_id].append(current_time)
+        self.user_requests[(tenant_id, user_id)].append(current_time)
+
+        return ALLOWED
+
+    def get_stats(self, tenant_id: Optional[str] = None) -> Dict[str, any]:
+        """Current rate limit statistics for one tenant (or summed over all)"""
+        self._cleanup_old_entries(time.time())
+
+        tenants = [tenant_id] if tenant_id is not None else list(self.tenant_requests)
         stats = {
-            "overall_requests_last_hour": len(self.all_requests),
-            "tool_usage": {}
+            "overall_requests_last_hour": sum(len(self.tenant_requests.get(t, ())) for t in tenants),
+            "tool_usage": {},
+            "tenants": {t: len(self.tenant_requests.get(t, ())) for t in tenants},
         }
-        
-        for tool_name, timestamps in self.tool_requests.items():
-            stats["tool_usage"][tool_name] = len(timestamps)
-        
+
+        for (tenant, tool_name), timestamps in self.tool_requests.items():
+            if tenant in tenants:
+                stats["tool_usage"][tool_name] = stats["tool_usage"].get(tool_name, 0) + len(timestamps)
+
         return stats
 
 
@@ -145,20 +200,30 @@ class RateLimiter:
 _rate_limiter = RateLimiter()
 
 
-def check_rate_limit(tool_name: str, user_request: str = "") -> Tuple[bool, Optional[str]]:
+def check_rate_limit(
+    tool_name: str,
+    user_request: str = "",
+    tenant_id: str = DEFAULT_TENANT,
+    user_id: str = DEFAULT_USER,
+) -> RateLimitDecision:
     """
     Check if a tool request is within rate limits.
-    
+
     Args:
         tool_name: Name of the tool to check
         user_request: Original user request (for duplicate detection)
-        
+        tenant_id: Tenant whose quota the request counts against
+        user_id: User inside the tenant
+
     Returns:
-        (is_allowed, error_message)
+        RateLimitDecision(allowed, error message, reason code)
     """
-    return _rate_limiter.check_rate_limit(tool_name, user_request)
+    decision = _rate_limiter.check_rate_limit(tool_name, user_request, tenant_id, user_id)
+    RATE_LIMIT_DECISIONS.inc("overall" if tool_name == "overall" else "tool",
+                             "allowed" if decision.allowed else decision.reason)
+    return decision
 
 
-def get_rate_limit_stats() -> Dict[str, any]:
+def get_rate_limit_stats(tenant_id: Optional[str] = None) -> Dict[str, any]:
     """Get current rate limiting statistics"""
-    return _rate_limiter.get_stats()
+    return _rate_limiter.get_stats(tenant_id)
@@ -6,6 +6,8 @@ class ValidationResult(BaseModel):
     valid: bool = True
     errors: List[str] = Field(default_factory=list)
     warnings: List[str] = Field(default_factory=list)
+    # errors that came from the rate limiter: {"reason": code, "error": message}
+    rate_limited: List[Dict[str, str]] = Field(default_factory=list)
 
 class ApprovalRequest(BaseModel):
     step_id: str
@@ -1,8 +1,14 @@
 from __future__ import annotations
-from typing import Any, Dict
+import asyncio
+import functools
+import time
+from typing import Any, Callable, Dict
 
 from langgraph.graph import StateGraph, END
 
+from app.services.observability.metrics import NODE_SECONDS
+from app.services.observability.tracing import span
+
 from app.agents.tool_discovery.agent_main import run_tool_discovery
 from app.agents.planner.agent_main import run_planner
 from app.agents.validator.agent_main import run_validator
@@ -10,10 +16,43 @@ from app.agents.executor.agent_main import run_executor
 from app.agents.report.agent_main import run_report
 
 
+def _record_timing(result: Any, state: Dict[str, Any], name: str, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    NODE_SECONDS.observe(elapsed, name)
+    if isinstance(result, dict):
+        timings = dict(result.get("timings") or state.get("timings") or {})
+        timings[name] = round(elapsed * 1000, 1)
+        result["timings"] = timings
+
+
+def timed(name: str, node: Callable) -> Callable:
+    """Wrap a node in a span and record its wall time in state["timings"][name] (ms)"""
+    if asyncio.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def run_async(state: Dict[str, Any]) -> Any:
+            started = time.perf_counter()
+            with span(f"node.{name}"):
+                result = await node(state)
+            _record_timing(result, state, name, started)
+            return result
+        return run_async
+
+    @functools.wraps(node)
+    def run_sync(state: Dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        with span(f"node.{name}"):
+            result = node(state)
+        _record_timing(result, state, name, started)
+        return result
+    return run_sync
+
+
 def route_entry(state: Dict[str, Any]) -> str:
     status = state.get("status")
     if status == "READY_TO_EXECUTE":
         return "executor"
+    if status == "WARMUP":
+        return END  # startup warm-up run (app.services.warmup)
     return "tool_discovery"
 
 
@@ -36,11 +75,11 @@ def route_after_executor(state: Dict[str, Any]) -> str:
 def build_graph():
     sg = StateGraph(dict)
 
-    sg.add_node("tool_discovery", run_tool_discovery)
-    sg.add_node("planner", run_planner)
-    sg.add_node("validator", run_validator)
-    sg.add_node("executor", run_executor)
-    sg.add_node("report", run_report)
+    sg.add_node("tool_discovery", timed("tool_discovery", run_tool_discovery))
+    sg.add_node("planner", timed("planner", run_planner))
+    sg.add_node("validator", timed("validator", run_validator))
+    sg.add_node("executor", timed("executor", run_executor))
+    sg.add_node("report", timed("report", run_report))
 
     sg.set_conditional_entry_point(route_entry)
 
@@ -3,9 +3,13 @@ from typing import Any, Dict, List, TypedDict
 
 class GraphState(TypedDict, total=False):
     user_request: str
-    available_tools: List[Dict[str, Any]]
+    tenant_id: str  # workspace whose tokens / quotas / run slots are used (app.utils.tenant)
+    user_id: str
+    tool_catalog_version: str  # see app.services.mcp.tool_catalog
     plan: Dict[str, Any]
     validation: Dict[str, Any]
     pending_approvals: List[Dict[str, Any]]
     status: str
-    logs: List[Dict[str, str]]
+    logs: List[Dict[str, Any]]  # RunLog ring buffer (app.utils.run_log)
+    deadline_at: float  # absolute epoch seconds, set once per API call
+    error: str
@@ -1,31 +1,94 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.config.env import load_dotenv  # noqa: F401
 
-
+# NOTE: keep this import graph light. LangGraph, the LLM clients, jsonschema
+# and httpx are loaded on first use (see `python -m app.utils.startup_profile`)
 from app.routes.oauth_slack import router as slack_router
 from app.routes.oauth_google import router as google_router
+from app.routes.auth_status import router as auth_status_router
 from app.routes.agent_api import router as agent_router
 from app.routes.mcp_api import router as mcp_router
+from app.routes.health import router as health_router
+from app.services.warmup import warm_up, warmup_enabled, mark_ready
+from app.utils.compression import CompressionMiddleware
 
-import os
-from fastapi import FastAPI
-from app.routes.mcp_api import router as mcp_router
 
+print("MOCK_TOOLS =", os.getenv("MOCK_TOOLS"))
+print("USE_MONGO_TOKENS =", os.getenv("USE_MONGO_TOKENS"))
 
 
 
 
-print("MOCK_TOOLS =", os.getenv("MOCK_TOOLS"))
-print("USE_MONGO_TOKENS =", os.getenv("USE_MONGO_TOKENS"))
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background: /healthz answers right away,
+    # /readyz only turns 200 once warm-up has finished
+    warmup_task = asyncio.create_task(warm_up()) if warmup_enabled() else None
+    if warmup_task is None:
+        mark_ready()
+
+    # Keep federated MCP tool lists fresh so discovery never waits on them
+    from app.services.mcp.federation import get_federation
+    federation = get_federation()
+    federation.start_background_refresh()
+
+    from app.services.oauth.token_store import TOKEN_STORE
+    print(f"🔐 Token store: {TOKEN_STORE}")
+    if TOKEN_STORE == "mongo":
+        from app.services.db.mongo import mongo_disabled_reason
+        reason = mongo_disabled_reason()
+        if reason:
+            print(f"⚠️ TOKEN_STORE=mongo, but {reason}: token reads will fail")
+
+    # Refresh Google tokens before they expire (no 401 round trip in runs),
+    # for every tenant whose manager gets used
+    from app.services.oauth.google_token_manager import start_google_token_managers
+    start_google_token_managers()
+
+    # Measure event-loop lag (and sample blocking stacks in debug mode)
+    from app.services.observability.loop_monitor import start_loop_monitor, stop_loop_monitor
+    await start_loop_monitor()
+
+    yield
+
+    await stop_loop_monitor()
+
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    await federation.stop()
+    from app.services.oauth.google_token_manager import stop_google_token_managers
+    await stop_google_token_managers()
+
+    from app.services.oauth.token_store import close_token_store
+    await close_token_store()
+
+    from app.services.history.recorder import close_history
+    await asyncio.to_thread(close_history)  # drains queued history records
+    from app.services.observability.tracing import close_tracing
+    await asyncio.to_thread(close_tracing)  # exports finished traces still queued
+
+    from app.services.http.client import close_http_client
+    from app.services.mcp.stdio_transport import close_stdio_transports
+    await close_http_client()
+    await close_stdio_transports()
 
 
+app = FastAPI(lifespan=lifespan)
 
+# gzip/br for large JSON responses (negotiated via Accept-Encoding)
+if os.getenv("COMPRESS_RESPONSES", "true").lower() == "true":
+    app.add_middleware(CompressionMiddleware)
 
-app = FastAPI()
+# Liveness / readiness probes
+app.include_router(health_router)
 
 # OAuth Routers
 app.include_router(slack_router)
 app.include_router(google_router)
+app.include_router(auth_status_router)
 
 # Agent Execution Router
 app.include_router(agent_router)
@@ -1,10 +1,31 @@
-from fastapi import APIRouter
+import asyncio
+import time
+import uuid
+from contextlib import contextmanager
+
+from fastapi import APIRouter, Header, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import Annotated, List, Dict, Any, Iterator, Optional
+
+from app.services.history.recorder import get_history_store, record_run
+from app.services.observability.metrics import RUNS, RUNS_IN_FLIGHT, VALIDATION_ERRORS
+from app.services.observability.tracing import span, start_trace
+from app.utils.deadline import DeadlineExceeded, TIMEOUT_STATUS, new_deadline
+from app.utils.json_codec import respond
+from app.utils.run_log import RunLog, get_run_log
+from app.utils.tenant import DEFAULT_TENANT, DEFAULT_USER, normalize_id
+
+_graph = None
+
 
-from app.langgraph.graph import build_graph
+def get_graph():
+    """Compile the LangGraph pipeline on first use (keeps app import cheap)"""
+    global _graph
+    if _graph is None:
+        from app.langgraph.graph import build_graph
+        _graph = build_graph()
+    return _graph
 
-graph = build_graph()
 
 router = APIRouter(prefix="/agent", tags=["Agent Execution"])
 
@@ -17,11 +38,64 @@ router = APIRouter(prefix="/agent", tags=["Agent Execution"])
 
 class RunRequest(BaseModel):
     user_request: str
+    timeout_s: Optional[float] = None  # total budget for this run (default RUN_BUDGET_S)
+    log_levels: Optional[List[str]] = None  # e.g. ["ERROR"]; default INFO/WARNING/ERROR
+    tenant_id: Optional[str] = None  # workspace: tokens, quotas, run slots (default DEFAULT_TENANT_ID)
+    user_id: Optional[str] = None  # who asked (per-user quota)
 
 
 class ApproveRequest(BaseModel):
     state: Dict[str, Any]
     approved_step_ids: List[str]
+    timeout_s: Optional[float] = None
+    log_levels: Optional[List[str]] = None
+    tenant_id: Optional[str] = None  # must match the tenant recorded in state (403 otherwise)
+    user_id: Optional[str] = None
+
+
+async def _invoke(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the graph in one of the tenant's run slots (queued fairly when busy)"""
+    from app.services.run_scheduler import RunQueueFull, get_run_scheduler
+
+    logs = get_run_log(state)
+    try:
+        async with get_run_scheduler().slot(state["tenant_id"], state.get("deadline_at")):
+            RUNS_IN_FLIGHT.inc()
+            try:
+                return await get_graph().ainvoke(state)
+            finally:
+                RUNS_IN_FLIGHT.dec()
+    except RunQueueFull as e:
+        logs.append({"level": "ERROR", "agent": "scheduler", "msg": f"🚦 {e}"})
+        return {**state, "status": "ERROR", "error": str(e)}
+    except DeadlineExceeded as e:
+        logs.append({"level": "WARNING", "agent": "scheduler", "msg": f"⏱️ {e}"})
+        return {**state, "status": TIMEOUT_STATUS, "error": str(e)}
+
+
+@contextmanager
+def _profiled(enabled: bool, fmt: str, token: Optional[str], name: str) -> Iterator[Any]:
+    """Sampling profile of one round trip when asked for (?profile=1 or X-Profile: 1)"""
+    if not enabled:
+        yield None
+        return
+    from app.services.observability.profiler import (
+        PROFILE_FORMATS, ProfileBusy, ProfileDenied, authorize, profile_run,
+    )
+    if fmt not in PROFILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"profile_format must be one of {list(PROFILE_FORMATS)}")
+    try:
+        authorize(token)
+        with profile_run(name) as profile:
+            yield profile
+    except ProfileDenied as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ProfileBusy as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
+def _wants_profile(profile: bool, x_profile: Optional[str]) -> bool:
+    return profile or (x_profile or "").lower() in ("1", "true")
 
 
 # -----------------------------
@@ -29,41 +103,93 @@ class ApproveRequest(BaseModel):
 # -----------------------------
 
 @router.post("/run")
-async def run_agent(req: RunRequest):
+async def run_agent(
+    req: RunRequest,
+    profile: bool = False,
+    profile_format: str = "collapsed",
+    x_profile: Annotated[Optional[str], Header()] = None,
+    x_profile_token: Annotated[Optional[str], Header()] = None,
+):
+    run_id = uuid.uuid4().hex
+    with _profiled(_wants_profile(profile, x_profile), profile_format, x_profile_token,
+                   f"agent.run {run_id}") as profiler:
+        # run_id doubles as the trace id (spans, log records, history)
+        with start_trace(run_id, "agent.run") as root:
+            response = await _run(req, run_id)
+            root.set(status=response["status"])
+    if profiler is not None:
+        response["profile"] = profiler.report(profile_format)
+    return respond(response)
+
+
+async def _run(req: RunRequest, run_id: str) -> Dict[str, Any]:
     # Pre-validation: Check for obvious errors before wasting LLM tokens
     from app.agents.validator.pre_validation import validate_user_request
-    
-    is_valid, error_msg = validate_user_request(req.user_request)
+
+    started = time.time()
+    tenant_id, user_id = DEFAULT_TENANT, DEFAULT_USER
+    rate_limited = None
+    try:
+        tenant_id = normalize_id(req.tenant_id, DEFAULT_TENANT)
+        user_id = normalize_id(req.user_id, DEFAULT_USER, "user_id")
+        with span("pre_validation", tenant_id=tenant_id):
+            is_valid, error_msg, rate_limited = validate_user_request(req.user_request, tenant_id, user_id)
+    except ValueError as e:
+        is_valid, error_msg = False, str(e)
     if not is_valid:
         # Return validation error immediately
+        logs = RunLog([
+            {"level": "DEBUG", "agent": "pre_validator", "msg": "Running pre-validation checks..."},
+            {"level": "ERROR", "agent": "pre_validator", "msg": f"❌ Validation failed: {error_msg}"}
+        ])
+        VALIDATION_ERRORS.inc("pre_validation")
+        RUNS.inc("run", "ERROR")
+        record_run({
+            "run_id": run_id,
+            "user_request": req.user_request,
+            "tenant_id": tenant_id,
+            "user_id": user_id,
+            "status": "ERROR",
+            "error": error_msg,
+            "validation": {
+                "valid": False, "stage": "pre_validation", "errors": [error_msg],
+                "rate_limited": [{"reason": rate_limited, "error": error_msg}] if rate_limited else [],
+            },
+        }, "run", started)
         return {
+            "run_id": run_id,
             "status": "ERROR",
             "plan": None,
             "pending_approvals": [],
             "execution_results": {},
             "final_report": None,
-            "logs": [
-                {"agent": "pre_validator", "msg": "Running pre-validation checks..."},
-                {"agent": "pre_validator", "msg": f"❌ Validation failed: {error_msg}"}
-            ],
+            "logs": logs.to_list(req.log_levels),
             "error": error_msg
         }
     
     # Validation passed, proceed with planning
     state = {
+        "run_id": run_id,
         "user_request": req.user_request,
-        "logs": [{"agent": "pre_validator", "msg": "✅ Pre-validation passed"}]
+        "tenant_id": tenant_id,
+        "user_id": user_id,
+        "deadline_at": new_deadline(req.timeout_s),
+        "logs": RunLog([{"agent": "pre_validator", "msg": "✅ Pre-validation passed"}])
     }
 
-    result = await graph.ainvoke(state)
+    result = await _invoke(state)
+    record_run(result, "run", started)
+    RUNS.inc("run", str(result.get("status")))
 
     return {
+        "run_id": run_id,
         "status": result.get("status"),
         "plan": result.get("plan"),
         "pending_approvals": result.get("pending_approvals"),
         "execution_results": result.get("execution_results"),
         "final_report": result.get("final_report"),  # Add formatted report
-        "logs": result.get("logs")
+        "logs": get_run_log(result).to_list(req.log_levels),
+        "error": result.get("error")
     }
 
 
@@ -72,15 +198,99 @@ async def run_agent(req: RunRequest):
 # -----------------------------
 
 @router.post("/approve")
-async def approve_agent(req: ApproveRequest):
+async def approve_agent(
+    req: ApproveRequest,
+    profile: bool = False,
+    profile_format: str = "collapsed",
+    x_profile: Annotated[Optional[str], Header()] = None,
+    x_profile_token: Annotated[Optional[str], Header()] = None,
+):
+    run_id = req.state.setdefault("run_id", uuid.uuid4().hex)  # older clients don't echo it
+    with _profiled(_wants_profile(profile, x_profile), profile_format, x_profile_token,
+                   f"agent.approve {run_id}") as profiler:
+        with start_trace(run_id, "agent.approve") as root:
+            response = await _approve(req)
+            root.set(status=response["status"])
+    if profiler is not None:
+        response["profile"] = profiler.report(profile_format)
+    return respond(response)
 
+
+async def _approve(req: ApproveRequest) -> Dict[str, Any]:
+    started = time.time()
     updated_state = req.state
+    try:
+        # The run belongs to the tenant recorded when it was created; an
+        # approval may name it but never move the run to another tenant
+        tenant_id = normalize_id(updated_state.get("tenant_id"), DEFAULT_TENANT)
+        requested = normalize_id(req.tenant_id, tenant_id)
+        updated_state["user_id"] = normalize_id(req.user_id or updated_state.get("user_id"), DEFAULT_USER, "user_id")
+    except ValueError as e:
+        return {"status": "ERROR", "execution_results": {}, "logs": [], "error": str(e)}
+    if requested != tenant_id:
+        raise HTTPException(status_code=403, detail=f"Run belongs to tenant '{tenant_id}', not '{requested}'")
+    updated_state["tenant_id"] = tenant_id
     updated_state["approved_step_ids"] = req.approved_step_ids
+    # Every round trip gets a fresh budget
+    updated_state["deadline_at"] = new_deadline(req.timeout_s)
+    get_run_log(updated_state)  # client sends a plain list back; re-bound it
 
-    result = await graph.ainvoke(updated_state)
+    result = await _invoke(updated_state)
+    record_run(result, "approve", started)
+    RUNS.inc("approve", str(result.get("status")))
 
     return {
+        "run_id": result.get("run_id"),
         "status": result.get("status"),
         "execution_results": result.get("execution_results"),
-        "logs": result.get("logs")
+        "logs": get_run_log(result).to_list(req.log_levels),
+        "error": result.get("error")
     }
+
+
+# -----------------------------
+# HISTORY Endpoints
+# -----------------------------
+
+@router.get("/history")
+async def run_history(
+    limit: int = 50,
+    cursor: Optional[int] = None,
+    status: Optional[str] = None,
+    tool: Optional[str] = None,
+    tenant_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+):
+    """Past round trips, newest first; follow `next_cursor` for older pages"""
+    page = await asyncio.to_thread(
+        get_history_store().page,
+        limit=limit, cursor=cursor, status=status, tool=tool,
+        tenant_id=tenant_id, user_id=user_id, since=since, until=until,
+    )
+    return respond(page)
+
+
+@router.get("/history/{run_id}")
+async def run_history_detail(run_id: str):
+    """Every recorded phase of one run with plan, validation and results"""
+    phases = await asyncio.to_thread(get_history_store().get_run, run_id)
+    if not phases:
+        raise HTTPException(status_code=404, detail=f"Unknown run_id: {run_id}")
+    return respond({"run_id": run_id, "phases": phases})
+
+
+@router.get("/stats")
+async def run_stats(window_s: float = 3600, tenant_id: Optional[str] = None):
+    """
+    Latency quantiles per node and tool, fallback/error rates, validation
+    failure reasons and rate-limit rejections over the last `window_s`,
+    merged from precomputed rollup buckets, plus the live rate-limit counters
+    """
+    from app.agents.validator.rate_limiter import get_rate_limit_stats
+    from app.services.history.rollups import window_stats
+
+    stats = await asyncio.to_thread(window_stats, get_history_store(), window_s, tenant_id)
+    stats["rate_limits"] = get_rate_limit_stats(tenant_id)
+    return respond(stats)
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+import time
+
+from app.services.oauth.token_store import get_token, get_token_store
+from app.utils.tenant import DEFAULT_TENANT, normalize_id
+
+router = APIRouter(prefix="/auth", tags=["Auth"])
+
+PROVIDERS = ("google", "slack")
+
+
+@router.get("/status")
+async def auth_status(tenant_id: Optional[str] = None):
+    """Which providers the tenant has connected (never returns the tokens themselves)"""
+    try:
+        tenant_id = normalize_id(tenant_id, DEFAULT_TENANT)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    store = get_token_store()
+    providers = {}
+    for provider in PROVIDERS:
+        doc = await get_token(provider, tenant_id)
+        status = {"connected": bool(doc and doc.get("access_token"))}
+        if doc and doc.get("expires_at") is not None:
+            status["expires_in_s"] = round(doc["expires_at"] - time.time())
+        providers[provider] = status
+    return {"store": store.kind, "tenant_id": tenant_id, "providers": providers, "cache": store.stats()}
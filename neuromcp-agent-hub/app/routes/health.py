@@ -0,0 +1,87 @@
+from fastapi import APIRouter
+from typing import Optional
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.services.warmup import get_warmup_report, is_ready
+
+router = APIRouter(tags=["Health"])
+
+
+@router.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving"""
+    return {"status": "ok"}
+
+
+@router.get("/readyz")
+async def readyz():
+    """Readiness: 503 until the startup warm-up has finished"""
+    report = get_warmup_report()
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"ready": False, "warmup": report})
+    return {"ready": True, "warmup": report}
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition: node/tool/LLM latency histograms, counters, gauges"""
+    from app.services.observability.metrics import CONTENT_TYPE, render_metrics
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+
+@router.get("/breakers")
+async def breakers():
+    """Circuit breaker state per provider and per endpoint (does not affect readiness)"""
+    from app.services.http.circuit_breaker import breaker_states
+    return {"breakers": breaker_states()}
+
+
+@router.get("/retries")
+async def retries():
+    """Retry counters per provider endpoint: requests, attempts, retries, gave_up"""
+    from app.services.http.retry import retry_stats
+    return {"retries": retry_stats()}
+
+
+@router.get("/slack/scheduler")
+async def slack_scheduler():
+    """Slack token buckets (per method / per channel): queue depth, waits, pauses"""
+    from app.services.http.slack_scheduler import get_slack_scheduler
+    return {"buckets": get_slack_scheduler().stats()}
+
+
+@router.get("/runs/scheduler")
+async def run_scheduler():
+    """Run slots per tenant: active, queued, cap; rejected / timed-out totals"""
+    from app.services.run_scheduler import get_run_scheduler
+    return get_run_scheduler().stats()
+
+
+@router.get("/rate_limits")
+async def rate_limits(tenant_id: Optional[str] = None):
+    """Requests counted against quotas in the last hour (one tenant or all)"""
+    from app.agents.validator.rate_limiter import get_rate_limit_stats
+    return get_rate_limit_stats(tenant_id)
+
+
+
+@router.get("/history/writer")
+async def history_writer():
+    """Background history writer: queued, written, dropped (queue full or failed writes), errors"""
+    from app.services.history.recorder import get_history_writer
+    return get_history_writer().stats()
+
+
+@router.get("/traces/exporter")
+async def trace_exporter():
+    """Span export: sample rate, queued/exported traces, drops, export errors"""
+    from app.services.observability.tracing import get_span_processor
+    return get_span_processor().stats()
+
+
+@router.get("/loop")
+async def event_loop():
+    """Event-loop lag (p50/p95/p99/max ms), blocks, and sampled blocking stacks in debug mode"""
+    from app.services.observability.loop_monitor import get_loop_monitor
+    monitor = get_loop_monitor()
+    return monitor.stats() if monitor is not None else {"running": False}
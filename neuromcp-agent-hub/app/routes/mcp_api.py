@@ -1,46 +1,94 @@
 # app/routes/mcp_api.py
+import asyncio
+import math
 import os
-from datetime import datetime
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Any, Dict
+from pydantic import AliasChoices, BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+from app.utils.json_codec import respond
 
 router = APIRouter()
 
+# Batch guardrails: calls per request, and how many run at once
+MCP_BATCH_MAX_CALLS = int(os.getenv("MCP_BATCH_MAX_CALLS", "100"))
+MCP_BATCH_CONCURRENCY = int(os.getenv("MCP_BATCH_CONCURRENCY", "16"))
+
 class MCPCallRequest(BaseModel):
     name: str
-    args: Dict[str, Any] = {}
+    # MCP clients send "arguments"; older callers send "args"
+    args: Dict[str, Any] = Field(default_factory=dict, validation_alias=AliasChoices("args", "arguments"))
+    tenant_id: Optional[str] = None  # whose tokens provider tools use (default DEFAULT_TENANT_ID)
 
-def _is_mock() -> bool:
-    return os.getenv("MOCK_TOOLS", "false").lower() == "true"
+class MCPBatchRequest(BaseModel):
+    calls: List[MCPCallRequest]
+    max_concurrency: Optional[int] = None
+
+@router.get("/mcp/tools")
+async def list_tools():
+    """Tools this server exposes (lets other hubs federate it)"""
+    from app.services.mcp.tool_registry import list_tool_specs
+    return respond({"tools": list_tool_specs()})
+
+@router.get("/mcp/servers")
+async def list_servers():
+    """Federated MCP servers: cache freshness, tool counts, last errors"""
+    from app.services.mcp.federation import get_federation
+    return respond({"servers": get_federation().status()})
+
+async def _dispatch(name: str, args: Dict[str, Any], tenant_id: Optional[str] = None) -> Any:
+    # MOCK_TOOLS=true swaps in the fake backend inside get_handler
+    # (no Mongo, no token_store, no real tool modules)
+    from app.services.mcp.tool_handlers import ToolInputError, UnknownToolError, get_handler
+    from app.services.mock_backend.backend import MockAPIError
+    from app.utils.tenant import DEFAULT_TENANT, normalize_id
+
+    try:
+        tenant_id = normalize_id(tenant_id, DEFAULT_TENANT)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
 
-@router.post("/mcp/call")
-async def call_tool(req: MCPCallRequest):
-    # ✅ HARD BYPASS (no Mongo, no token_store, no tool modules)
-    if _is_mock():
-        if req.name == "calendar.create_event":
-            return {
-                "ok": True,
-                "mock": True,
-                "event_id": f"mock-event-{datetime.utcnow().isoformat()}",
-                "input": req.args,
-            }
-        if req.name == "slack.post_message":
-            return {
-                "ok": True,
-                "mock": True,
-                "message_id": f"mock-msg-{datetime.utcnow().isoformat()}",
-                "input": req.args,
-            }
-        raise HTTPException(status_code=404, detail=f"Unknown tool: {req.name}")
-
-    # 🔻 normal flow (real tools)
     try:
-        # your existing handler lookup
-        handler = TOOL_REGISTRY[req.name]  # whatever you use
-        out = await handler(req.args)
-        return out
-    except KeyError:
-        raise HTTPException(status_code=404, detail=f"Unknown tool: {req.name}")
+        handler = get_handler(name)
+    except UnknownToolError:
+        raise HTTPException(status_code=404, detail=f"Unknown tool: {name}")
+
+    try:
+        return await handler(args, tenant_id=tenant_id)
+    except ToolInputError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except MockAPIError as e:
+        headers = {"Retry-After": str(max(1, math.ceil(e.retry_after_s)))} if e.retry_after_s is not None else None
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/mcp/call")
+async def call_tool(req: MCPCallRequest):
+    return respond(await _dispatch(req.name, req.args, req.tenant_id))
+
+@router.post("/mcp/call_batch")
+async def call_tool_batch(req: MCPBatchRequest):
+    """
+    Run many tool calls concurrently. Results come back in request order;
+    one failing call does not fail the batch.
+    """
+    if len(req.calls) > MCP_BATCH_MAX_CALLS:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MCP_BATCH_MAX_CALLS} calls)")
+
+    limit = max(1, min(req.max_concurrency or MCP_BATCH_CONCURRENCY, MCP_BATCH_CONCURRENCY))
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _one(call: MCPCallRequest) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return {"name": call.name, "ok": True, "result": await _dispatch(call.name, call.args, call.tenant_id)}
+            except HTTPException as e:
+                return {"name": call.name, "ok": False, "status_code": e.status_code, "error": e.detail}
+
+    results = await asyncio.gather(*(_one(c) for c in req.calls))
+    return respond({
+        "results": results,
+        "succeeded": sum(1 for r in results if r["ok"]),
+        "failed": sum(1 for r in results if not r["ok"]),
+    })
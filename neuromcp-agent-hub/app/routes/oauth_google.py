@@ -2,10 +2,13 @@ from fastapi import APIRouter, Query
 from fastapi.responses import RedirectResponse, JSONResponse
 from typing import Optional
 import os
+import time
 
 from app.services.oauth.google_oauth import build_google_login_url, exchange_google_code
+from app.services.oauth.google_token_manager import get_google_token_manager
 from app.services.oauth.token_store import upsert_token
 from app.utils.session import sign_state, unsign_state
+from app.utils.tenant import DEFAULT_TENANT, normalize_id
 
 router = APIRouter(prefix="/auth/google")
 
@@ -28,10 +31,16 @@ async def debug_config():
         }
     }
 
+@router.get("/token_status")
+async def token_status(tenant_id: Optional[str] = Query(None)):
+    """In-memory Google token: expiry, refresh count, last refresh error"""
+    return get_google_token_manager(normalize_id(tenant_id, DEFAULT_TENANT)).status()
+
 @router.get("/login")
-async def google_login():
+async def google_login(tenant_id: Optional[str] = Query(None)):
     redirect_uri = os.getenv("APP_BASE_URL") + "/auth/google/callback"
-    state = sign_state({"provider": "google"})
+    # The signed state carries the tenant so the callback stores its token
+    state = sign_state({"provider": "google", "tenant_id": normalize_id(tenant_id, DEFAULT_TENANT)})
 
     url = build_google_login_url(os.getenv("GOOGLE_CLIENT_ID"), redirect_uri, state)
     return RedirectResponse(url)
@@ -61,7 +70,7 @@ async def google_callback(
         )
 
     try:
-        unsign_state(state)
+        tenant_id = unsign_state(state).get("tenant_id") or DEFAULT_TENANT
     except Exception as e:
         return JSONResponse(
             status_code=400,
@@ -71,17 +80,21 @@ async def google_callback(
     redirect_uri = os.getenv("APP_BASE_URL") + "/auth/google/callback"
 
     try:
-        access_token, refresh_token = await exchange_google_code(
+        access_token, refresh_token, expires_in = await exchange_google_code(
             code,
             os.getenv("GOOGLE_CLIENT_ID"),
             os.getenv("GOOGLE_CLIENT_SECRET"),
             redirect_uri
         )
 
-        await upsert_token("google", {
+        token_doc = {
             "access_token": access_token,
             "refresh_token": refresh_token
-        })
+        }
+        if expires_in:
+            token_doc["expires_at"] = time.time() + float(expires_in)
+        await upsert_token("google", token_doc, tenant_id)
+        get_google_token_manager(tenant_id).set_token(token_doc)
 
         return {"ok": True, "message": "Google Calendar connected ✅"}
     
@@ -1,24 +1,27 @@
 from fastapi import APIRouter
 from fastapi.responses import RedirectResponse
 import os
+from typing import Optional
 
 from app.services.oauth.slack_oauth import build_slack_login_url, exchange_slack_code
 from app.services.oauth.token_store import upsert_token
 from app.utils.session import sign_state, unsign_state
+from app.utils.tenant import DEFAULT_TENANT, normalize_id
 
 router = APIRouter(prefix="/auth/slack")
 
 @router.get("/login")
-async def slack_login():
+async def slack_login(tenant_id: Optional[str] = None):
     redirect_uri = os.getenv("APP_BASE_URL") + "/auth/slack/callback"
-    state = sign_state({"provider": "slack"})
+    # The signed state carries the tenant so the callback stores its token
+    state = sign_state({"provider": "slack", "tenant_id": normalize_id(tenant_id, DEFAULT_TENANT)})
 
     url = build_slack_login_url(os.getenv("SLACK_CLIENT_ID"), redirect_uri, state)
     return RedirectResponse(url)
 
 @router.get("/callback")
 async def slack_callback(code: str, state: str):
-    unsign_state(state)
+    tenant_id = unsign_state(state).get("tenant_id") or DEFAULT_TENANT
 
     redirect_uri = os.getenv("APP_BASE_URL") + "/auth/slack/callback"
 
@@ -29,6 +32,6 @@ async def slack_callback(code: str, state: str):
         redirect_uri
     )
 
-    await upsert_token("slack", token)
+    await upsert_token("slack", token, tenant_id)
 
     return {"ok": True, "message": "Slack connected ✅"}
@@ -4,8 +4,15 @@ from typing import Any, Dict, List, Optional, TypedDict
 class AgentState(TypedDict, total=False):
     user_request: str
 
-    # tool discovery
-    available_tools: List[Dict[str, Any]]
+    # identity (app.utils.tenant): whose tokens, quotas and run slots
+    tenant_id: str
+    user_id: str
+
+    # run budget (absolute epoch seconds)
+    deadline_at: float
+
+    # tool discovery (catalog version only; tools live in the process-wide cache)
+    tool_catalog_version: str
 
     # planner
     plan: Dict[str, Any]
@@ -22,5 +29,8 @@ class AgentState(TypedDict, total=False):
     # report
     final_report: str
 
+    # failure / timeout details
+    error: str
+
     # logs
-    logs: List[Dict[str, Any]]
+    logs: List[Dict[str, Any]]  # RunLog ring buffer (app.utils.run_log)
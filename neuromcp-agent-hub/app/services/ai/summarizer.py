@@ -1,19 +1,31 @@
 """
 AI Summarization service using Groq
 """
+import asyncio
 import os
-from groq import Groq
+import time
+from typing import Any, Dict, Optional
 
+from app.config.settings import ModelSettings
+from app.services.observability.metrics import FALLBACKS, LLM_SECONDS
+from app.services.observability.tracing import span
+from app.utils.deadline import DeadlineExceeded, is_expired, timeout_for
 
-def summarize_slack_messages(messages: list[dict]) -> str:
+
+def summarize_slack_messages(messages: list[dict], deadline_at: Optional[float] = None) -> str:
     """
     Summarize Slack messages using Groq AI
     
     Args:
         messages: List of message dicts with 'text', 'user', 'timestamp'
+        deadline_at: Run deadline (epoch seconds) bounding the LLM call
     
     Returns:
         Summary text
+
+    Raises:
+        DeadlineExceeded: the run budget ran out before or during the call
+        (the executor reports the run as TIMEOUT, not as a summary fallback)
     """
     if not messages:
         return "No messages found to summarize."
@@ -28,10 +40,16 @@ def summarize_slack_messages(messages: list[dict]) -> str:
     api_key = os.getenv("GROQ_API_KEY")
     if not api_key:
         # Return simple summary without AI
+        FALLBACKS.inc("summarizer")
         return f"Found {len(messages)} messages. AI summarization unavailable (no GROQ_API_KEY set)."
     
+    # Raises DeadlineExceeded once the run budget is gone
+    timeout_s = timeout_for(deadline_at, ModelSettings.timeout_s)
+    started = time.perf_counter()
     try:
-        client = Groq(api_key=api_key)
+        from groq import Groq  # heavy; only needed when summarizing
+
+        client = Groq(api_key=api_key, timeout=timeout_s)
         
         prompt = f"""Summarize the following Slack messages into a concise summary (2-3 sentences max):
 
@@ -39,19 +57,57 @@ def summarize_slack_messages(messages: list[dict]) -> str:
 
 Summary:"""
         
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that summarizes Slack conversations concisely."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=200
-        )
+        with span("llm.summarizer", model="llama-3.3-70b-versatile", messages=len(messages)):
+            completion = client.chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant that summarizes Slack conversations concisely."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=200
+            )
         
         summary = completion.choices[0].message.content.strip()
+        LLM_SECONDS.observe(time.perf_counter() - started, "summarizer", "ok")
         return summary
         
     except Exception as e:
+        LLM_SECONDS.observe(time.perf_counter() - started, "summarizer", "error")
+        if is_expired(deadline_at):
+            # The call was cut short by the run deadline
+            raise DeadlineExceeded("Run deadline exceeded") from e
+
         # Fallback if AI fails
+        FALLBACKS.inc("summarizer")
         return f"Found {len(messages)} messages. Error summarizing: {str(e)}"
+
+
+async def summarize_messages_tool(
+    results: Optional[Dict[str, Any]] = None,
+    deadline_at: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    slack.summarize_messages handler: summarizes the messages returned by an
+    earlier slack.read_messages step in the same run
+    """
+    messages = []
+    for prev_result in (results or {}).values():
+        if isinstance(prev_result, dict) and "messages" in prev_result:
+            messages = prev_result["messages"]
+            break
+
+    if not messages:
+        raise RuntimeError(
+            "No messages found to summarize. "
+            "The channel may only contain system messages (joins, leaves). "
+            "Try asking to read more messages with a higher limit."
+        )
+
+    # The Groq SDK call is synchronous; keep it off the event loop
+    summary = await asyncio.to_thread(summarize_slack_messages, messages, deadline_at=deadline_at)
+    return {
+        "success": True,
+        "summary": summary,
+        "message_count": len(messages)
+    }
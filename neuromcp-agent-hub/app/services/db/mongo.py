@@ -1,36 +1,85 @@
 # app/services/db/mongo.py
+"""
+Shared async MongoDB client (motor)
+One pooled client per process, created on first use. The pool is sized for
+short token lookups: a few warm connections, a hard cap, and bounded waits
+so a saturated pool fails fast instead of stalling runs.
+"""
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
+
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "20"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "2"))
+MONGO_MAX_IDLE_MS = int(os.getenv("MONGO_MAX_IDLE_MS", "60000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "3000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
 
 _client = None
-_tokens_collection = None
 
-def _mongo_enabled() -> bool:
+
+def mongo_disabled_reason() -> Optional[str]:
+    """Why Mongo is switched off (None = enabled)"""
     # If you want: disable mongo completely when mock tools enabled
     if os.getenv("MOCK_TOOLS", "false").lower() == "true":
-        return False
-    return os.getenv("USE_MONGO_TOKENS", "true").lower() == "true"
+        return "MOCK_TOOLS=true disables Mongo"
+    if os.getenv("USE_MONGO_TOKENS", "true").lower() != "true":
+        return "USE_MONGO_TOKENS=false disables Mongo"
+    return None
+
+
+def _mongo_enabled() -> bool:
+    return mongo_disabled_reason() is None
+
 
-def get_tokens_collection():
+def client_options() -> Dict[str, Any]:
+    return {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "retryWrites": True,
+        "appname": "neuromcp-agent-hub",
+    }
+
+
+def get_mongo_client():
     """
-    Lazy init. This function is the ONLY place allowed to create MongoClient.
-    Nothing should create a client at import time.
+    Lazy init. This function is the ONLY place allowed to create a Mongo client.
+    Nothing should create a client at import time. Creating the motor client
+    does no I/O; it connects in the background on first use.
     """
-    global _client, _tokens_collection
+    global _client
 
-    if not _mongo_enabled():
-        raise RuntimeError("Mongo disabled (MOCK_TOOLS=true or USE_MONGO_TOKENS=false)")
+    reason = mongo_disabled_reason()
+    if reason:
+        raise RuntimeError(f"Mongo disabled ({reason})")
 
-    if _tokens_collection is not None:
-        return _tokens_collection
+    if _client is not None:
+        return _client
 
-    from pymongo import MongoClient  # import inside = safe
+    try:
+        from motor.motor_asyncio import AsyncIOMotorClient  # import inside = safe
+    except ImportError as e:
+        raise RuntimeError("Mongo needs the motor package: pip install motor") from e
     mongo_uri = os.getenv("MONGO_URI")
 
     if not mongo_uri:
         raise RuntimeError("MONGO_URI is missing but Mongo is enabled")
 
-    _client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
-    db_name = os.getenv("MONGO_DB", "neuro")
-    _tokens_collection = _client[db_name]["tokens"]
-    return _tokens_collection
+    _client = AsyncIOMotorClient(mongo_uri, **client_options())
+    return _client
+
+
+def get_tokens_collection(db_name: Optional[str] = None):
+    db_name = db_name or os.getenv("MONGO_DB", "neuro")
+    return get_mongo_client()[db_name]["tokens"]
+
+
+def close_mongo_client() -> None:
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -0,0 +1,215 @@
+"""
+Run history recorder
+Requests hand a finished run to `record_run()`, which only builds a small
+dict and puts it on a bounded queue. A background thread drains the queue
+in batches, writing each batch and its analytics rollups
+(app.services.history.rollups) in one transaction, and runs
+retention/compaction every HISTORY_COMPACT_INTERVAL_S. When the queue is
+full, records are dropped and counted; a slow disk never slows down
+/agent/run. A batch whose write keeps failing (HISTORY_WRITE_RETRIES
+retries) is dropped and counted too, never as written.
+
+Config (env): HISTORY_ENABLED, HISTORY_QUEUE_MAX, HISTORY_BATCH,
+HISTORY_WRITE_RETRIES, HISTORY_COMPACT_INTERVAL_S (store settings:
+app.services.history.store)
+"""
+from __future__ import annotations
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.history.rollups import rollup_records
+from app.services.history.store import HistoryStore
+from app.utils.tenant import tenant_of, user_of
+
+HISTORY_QUEUE_MAX = int(os.getenv("HISTORY_QUEUE_MAX", "10000"))
+HISTORY_BATCH = int(os.getenv("HISTORY_BATCH", "200"))
+HISTORY_COMPACT_INTERVAL_S = float(os.getenv("HISTORY_COMPACT_INTERVAL_S", "3600"))
+HISTORY_WRITE_RETRIES = int(os.getenv("HISTORY_WRITE_RETRIES", "2"))
+RETRY_BACKOFF_S = 0.1
+
+_IDLE = object()  # queue.get timed out
+
+
+def history_enabled() -> bool:
+    return os.getenv("HISTORY_ENABLED", "true").lower() == "true"
+
+
+def build_record(state: Dict[str, Any], phase: str, started_at: float) -> Dict[str, Any]:
+    """Snapshot of a finished round trip (cheap: references, no serialization)"""
+    steps = state.get("step_timings") or []
+    planner = state.get("planner_mode")
+    return {
+        "run_id": state.get("run_id") or "",
+        "phase": phase,
+        "created_at": started_at,
+        "tenant_id": tenant_of(state),
+        "user_id": user_of(state),
+        "status": state.get("status"),
+        "request": state.get("user_request"),
+        "planner": planner,
+        "duration_ms": round((time.time() - started_at) * 1000, 1),
+        "error": state.get("error"),
+        "steps": steps,
+        "timings": state.get("timings"),
+        "cost": {"llm_planner_calls": int(planner == "llm"), "tool_calls": len(steps)},
+        "validation": state.get("validation"),
+        "plan": state.get("plan"),
+        "results": state.get("execution_results"),
+    }
+
+
+class HistoryWriter:
+    def __init__(
+        self,
+        store: HistoryStore,
+        queue_max: int = HISTORY_QUEUE_MAX,
+        batch: int = HISTORY_BATCH,
+        compact_interval_s: float = HISTORY_COMPACT_INTERVAL_S,
+        write_retries: int = HISTORY_WRITE_RETRIES,
+    ):
+        self.store = store
+        self.batch = batch
+        self.compact_interval_s = compact_interval_s
+        self.write_retries = write_retries
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_max)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._done = threading.Condition()
+        self.submitted = 0
+        self.written = 0
+        self.handled = 0  # written + dropped after failed writes (flush waits on it)
+        self.dropped = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._last_compact = time.monotonic()
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                    self._thread.start()
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Never blocks; False = queue full, record dropped"""
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[Dict[str, Any]] = []
+            try:
+                item = self._queue.get(timeout=min(5.0, self.compact_interval_s))
+            except queue.Empty:
+                item = _IDLE
+            while item is not _IDLE:
+                if item is None:  # close()
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = _IDLE
+            if batch:
+                written = self._write(batch)
+                with self._done:
+                    if written:
+                        self.written += len(batch)
+                    else:
+                        self.dropped += len(batch)
+                    self.handled += len(batch)
+                    self._done.notify_all()
+            if time.monotonic() - self._last_compact >= self.compact_interval_s:
+                self._last_compact = time.monotonic()
+                try:
+                    self.store.compact()
+                except Exception as e:
+                    self.errors += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+
+    def _write(self, batch: List[Dict[str, Any]]) -> bool:
+        """Runs + rollups in one transaction, retried with backoff; False = batch lost"""
+        deltas = rollup_records(batch)
+        for attempt in range(self.write_retries + 1):
+            try:
+                self.store.write_batch(batch, deltas)
+                return True
+            except Exception as e:
+                self.errors += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                if attempt < self.write_retries:
+                    time.sleep(RETRY_BACKOFF_S * 2 ** attempt)
+        return False
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything submitted so far has been handled"""
+        target = self.submitted
+        deadline = time.monotonic() + timeout
+        with self._done:
+            while self.handled < target:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._done.wait(left)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+        self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "submitted": self.submitted,
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+_writer: Optional[HistoryWriter] = None
+
+
+def get_history_writer() -> HistoryWriter:
+    global _writer
+    if _writer is None:
+        _writer = HistoryWriter(HistoryStore())
+    return _writer
+
+
+def get_history_store() -> HistoryStore:
+    return get_history_writer().store
+
+
+def reset_history_writer(writer: Optional[HistoryWriter] = None) -> None:
+    global _writer
+    _writer = writer
+
+
+def record_run(state: Dict[str, Any], phase: str, started_at: float) -> None:
+    if history_enabled():
+        get_history_writer().submit(build_record(state, phase, started_at))
+
+
+def close_history() -> None:
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
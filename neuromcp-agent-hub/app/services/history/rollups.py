@@ -0,0 +1,188 @@
+"""
+Run analytics rollups
+The history writer folds every batch of records into per-minute and
+per-hour buckets (per tenant) as it writes them: run/status/planner
+counters, latency sketches per graph node and per tool, validation failure
+reasons and rate-limit rejections. Buckets merge by addition, so a window
+of any size is answered by reading a handful of rows and merging them;
+/agent/stats never scans raw runs.
+
+Config (env): ROLLUP_MINUTE_RETENTION_H, ROLLUP_HOUR_RETENTION_DAYS
+"""
+from __future__ import annotations
+import os
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.utils.sketch import QuantileSketch
+
+MINUTE = 60
+HOUR = 3600
+RESOLUTIONS = (MINUTE, HOUR)
+MINUTE_WINDOW_MAX_S = 6 * HOUR  # longer windows read hour buckets
+ROLLUP_MINUTE_RETENTION_H = float(os.getenv("ROLLUP_MINUTE_RETENTION_H", "48"))
+ROLLUP_HOUR_RETENTION_DAYS = float(os.getenv("ROLLUP_HOUR_RETENTION_DAYS", "90"))
+TOP_REASONS = 20
+
+_VARIABLE = re.compile(r"'[^']*'|\"[^\"]*\"|\d+(\.\d+)?")
+
+RollupKey = Tuple[int, int, str]  # (resolution, bucket start, tenant)
+
+
+def failure_reason(message: str) -> str:
+    """Validation error with its values blanked, so equal failures group together"""
+    return _VARIABLE.sub("…", message)[:120]
+
+
+class Rollup:
+    """Counters and latency sketches for one bucket"""
+
+    def __init__(self):
+        self.runs = 0
+        self.status: Counter = Counter()
+        self.planner: Counter = Counter()
+        self.run_ms = QuantileSketch()
+        self.nodes: Dict[str, QuantileSketch] = defaultdict(QuantileSketch)
+        self.tools: Dict[str, QuantileSketch] = defaultdict(QuantileSketch)
+        self.tool_errors: Counter = Counter()
+        self.validation_failures: Counter = Counter()
+        self.rate_limited: Counter = Counter()
+
+    def add(self, record: Dict[str, Any]) -> None:
+        self.runs += 1
+        self.status[record.get("status") or "UNKNOWN"] += 1
+        if record.get("planner"):
+            self.planner[record["planner"]] += 1
+        if record.get("duration_ms") is not None:
+            self.run_ms.add(record["duration_ms"])
+        for node, ms in (record.get("timings") or {}).items():
+            self.nodes[node].add(ms)
+        for step in record.get("steps") or ():
+            self.tools[step["tool"]].add(step["ms"])
+            if not step.get("ok", True):
+                self.tool_errors[step["tool"]] += 1
+        validation = record.get("validation") or {}
+        if validation.get("valid") is False:
+            # Rate-limiter refusals carry their reason code (counted apart
+            # from other validation failures)
+            limited = validation.get("rate_limited") or ()
+            for item in limited:
+                self.rate_limited[item["reason"]] += 1
+            skip = {item["error"] for item in limited}
+            for error in validation.get("errors") or ():
+                if error not in skip:
+                    self.validation_failures[failure_reason(str(error))] += 1
+
+    def merge(self, other: "Rollup") -> "Rollup":
+        self.runs += other.runs
+        for name in ("status", "planner", "tool_errors", "validation_failures", "rate_limited"):
+            getattr(self, name).update(getattr(other, name))
+        self.run_ms.merge(other.run_ms)
+        for name in ("nodes", "tools"):
+            mine = getattr(self, name)
+            for key, sketch in getattr(other, name).items():
+                mine[key].merge(sketch)
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "status": dict(self.status),
+            "planner": dict(self.planner),
+            "run_ms": self.run_ms.to_dict(),
+            "nodes": {k: s.to_dict() for k, s in self.nodes.items()},
+            "tools": {k: s.to_dict() for k, s in self.tools.items()},
+            "tool_errors": dict(self.tool_errors),
+            "validation_failures": dict(self.validation_failures),
+            "rate_limited": dict(self.rate_limited),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Rollup":
+        rollup = cls()
+        rollup.runs = data.get("runs", 0)
+        for name in ("status", "planner", "tool_errors", "validation_failures", "rate_limited"):
+            getattr(rollup, name).update(data.get(name) or {})
+        rollup.run_ms = QuantileSketch.from_dict(data.get("run_ms") or {})
+        for name in ("nodes", "tools"):
+            mine = getattr(rollup, name)
+            for key, sketch in (data.get(name) or {}).items():
+                mine[key] = QuantileSketch.from_dict(sketch)
+        return rollup
+
+    def report(self) -> Dict[str, Any]:
+        llm_runs = self.planner.get("llm", 0) + self.planner.get("fallback", 0)
+        errors = sum(n for s, n in self.status.items() if s in ("ERROR", "FAILED", "TIMEOUT"))
+        return {
+            "runs": self.runs,
+            "status": dict(self.status),
+            "error_rate": round(errors / self.runs, 4) if self.runs else None,
+            "planner": dict(self.planner),
+            # Share of LLM-planned runs that fell back to the offline planner
+            "llm_fallback_rate": round(self.planner.get("fallback", 0) / llm_runs, 4) if llm_runs else None,
+            "run_ms": self.run_ms.summary(),
+            "nodes": {k: s.summary() for k, s in sorted(self.nodes.items())},
+            "tools": {
+                k: {**s.summary(), "errors": self.tool_errors.get(k, 0)} for k, s in sorted(self.tools.items())
+            },
+            "validation_failures": dict(self.validation_failures.most_common(TOP_REASONS)),
+            "rate_limit_rejections": {"total": sum(self.rate_limited.values()), **self.rate_limited},
+        }
+
+
+def bucket_start(ts: float, resolution: int) -> int:
+    return int(ts // resolution) * resolution
+
+
+def rollup_records(records: Iterable[Dict[str, Any]]) -> Dict[RollupKey, Rollup]:
+    """Deltas for one writer batch, keyed by (resolution, bucket, tenant)"""
+    deltas: Dict[RollupKey, Rollup] = {}
+    for record in records:
+        for resolution in RESOLUTIONS:
+            key = (resolution, bucket_start(record["created_at"], resolution), record["tenant_id"])
+            rollup = deltas.get(key)
+            if rollup is None:
+                rollup = deltas[key] = Rollup()
+            rollup.add(record)
+    return deltas
+
+
+def window_stats(
+    store: Any,
+    window_s: float = HOUR,
+    tenant_id: Optional[str] = None,
+    now: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Merge the buckets covering the last `window_s` seconds (plus a time series)"""
+    now = time.time() if now is None else now
+    resolution = MINUTE if window_s <= MINUTE_WINDOW_MAX_S else HOUR
+    start = bucket_start(now - window_s, resolution)
+    total = Rollup()
+    per_bucket: Dict[int, Rollup] = {}
+    for bucket, _tenant, data in store.rollup_rows(resolution, start, now, tenant_id):
+        rollup = Rollup.from_dict(data)
+        total.merge(rollup)
+        if bucket in per_bucket:
+            per_bucket[bucket].merge(rollup)
+        else:
+            per_bucket[bucket] = rollup
+
+    series: List[Dict[str, Any]] = []
+    for bucket in sorted(per_bucket):
+        rollup = per_bucket[bucket]
+        series.append({
+            "t": bucket,
+            "runs": rollup.runs,
+            "errors": sum(n for s, n in rollup.status.items() if s in ("ERROR", "FAILED", "TIMEOUT")),
+            "p95_ms": rollup.run_ms.summary().get("p95"),
+            "rate_limited": sum(rollup.rate_limited.values()),
+        })
+    return {
+        "window_s": window_s,
+        "resolution_s": resolution,
+        "tenant_id": tenant_id,
+        **total.report(),
+        "series": series,
+    }
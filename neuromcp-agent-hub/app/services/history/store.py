@@ -0,0 +1,311 @@
+"""
+Run history store (SQLite, append-only)
+One row per API round trip (/agent/run, /agent/approve) with the request,
+plan, validation, status, per-step results, node/step timings and cost.
+
+Queries use keyset pagination on the row id (monotonic with time), so a
+page costs the same at row 100 and at row 10 million: `WHERE id < cursor
+ORDER BY id DESC LIMIT n` walks an index and stops. Filters each have an
+index ending in id (status, tenant/user, tool via run_tools).
+
+Rows older than HISTORY_COMPACT_AFTER_DAYS lose their bulky payloads (plan,
+results); rows older than HISTORY_RETENTION_DAYS are deleted. Freed pages
+are returned with incremental vacuum.
+
+The same file holds the analytics rollups (app.services.history.rollups):
+one row per (resolution, bucket, tenant), merged in place as runs land.
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.services.history.rollups import (
+    HOUR, MINUTE, ROLLUP_HOUR_RETENTION_DAYS, ROLLUP_MINUTE_RETENTION_H, Rollup, RollupKey,
+)
+from app.utils.json_codec import dumps, loads
+
+HISTORY_DB_PATH = Path(os.getenv("HISTORY_DB_PATH", ".history.db"))
+HISTORY_RETENTION_DAYS = float(os.getenv("HISTORY_RETENTION_DAYS", "30"))
+HISTORY_COMPACT_AFTER_DAYS = float(os.getenv("HISTORY_COMPACT_AFTER_DAYS", "7"))
+HISTORY_PAGE_MAX = 200
+DELETE_BATCH = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id      TEXT NOT NULL,
+    phase       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    tenant_id   TEXT NOT NULL,
+    user_id     TEXT NOT NULL,
+    status      TEXT,
+    request     TEXT,
+    planner     TEXT,
+    duration_ms REAL,
+    error       TEXT,
+    steps       TEXT,
+    timings     TEXT,
+    cost        TEXT,
+    validation  TEXT,
+    plan        TEXT,
+    results     TEXT,
+    compacted   INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created_at);
+CREATE INDEX IF NOT EXISTS runs_run_id ON runs (run_id);
+CREATE INDEX IF NOT EXISTS runs_status ON runs (status, id);
+CREATE INDEX IF NOT EXISTS runs_tenant ON runs (tenant_id, id);
+CREATE INDEX IF NOT EXISTS runs_user ON runs (tenant_id, user_id, id);
+CREATE TABLE IF NOT EXISTS run_tools (
+    tool   TEXT NOT NULL,
+    run_pk INTEGER NOT NULL,
+    PRIMARY KEY (tool, run_pk)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS run_tools_run ON run_tools (run_pk);
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution INTEGER NOT NULL,
+    bucket     INTEGER NOT NULL,
+    tenant_id  TEXT NOT NULL,
+    data       TEXT NOT NULL,
+    PRIMARY KEY (resolution, bucket, tenant_id)
+) WITHOUT ROWID;
+"""
+
+JSON_COLUMNS = ("steps", "timings", "cost", "validation", "plan", "results")
+SUMMARY_COLUMNS = (
+    "id", "run_id", "phase", "created_at", "tenant_id", "user_id", "status",
+    "request", "planner", "duration_ms", "error", "steps", "cost",
+)
+
+
+class HistoryStore:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or HISTORY_DB_PATH)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()  # writer thread + request handlers share one connection
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")  # only takes effect on a new file
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ----------------------------
+    # Writes (background writer thread)
+    # ----------------------------
+
+    @staticmethod
+    def _insert_runs(conn: sqlite3.Connection, records: Iterable[Dict[str, Any]]) -> int:
+        n = 0
+        for rec in records:
+            row = {k: rec.get(k) for k in SUMMARY_COLUMNS if k != "id"}
+            for col in JSON_COLUMNS:
+                row[col] = dumps(rec[col]).decode() if rec.get(col) is not None else None
+            cols = ", ".join(row)
+            cur = conn.execute(
+                f"INSERT INTO runs ({cols}) VALUES ({', '.join('?' for _ in row)})", tuple(row.values())
+            )
+            tools = sorted({s["tool"] for s in rec.get("steps") or () if s.get("tool")})
+            conn.executemany(
+                "INSERT OR IGNORE INTO run_tools (tool, run_pk) VALUES (?, ?)",
+                [(tool, cur.lastrowid) for tool in tools],
+            )
+            n += 1
+        return n
+
+    @staticmethod
+    def _merge_rollups(conn: sqlite3.Connection, deltas: Dict[RollupKey, Rollup]) -> None:
+        for (resolution, bucket, tenant), delta in deltas.items():
+            row = conn.execute(
+                "SELECT data FROM rollups WHERE resolution = ? AND bucket = ? AND tenant_id = ?",
+                (resolution, bucket, tenant),
+            ).fetchone()
+            merged = Rollup.from_dict(loads(row[0])).merge(delta) if row else delta
+            conn.execute(
+                "INSERT OR REPLACE INTO rollups (resolution, bucket, tenant_id, data) VALUES (?, ?, ?, ?)",
+                (resolution, bucket, tenant, dumps(merged.to_dict()).decode()),
+            )
+
+    def _transaction(self, begin: str, work: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(begin)
+            try:
+                result = work(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert a batch in one transaction"""
+        return self._transaction("BEGIN", lambda conn: self._insert_runs(conn, records))
+
+    def merge_rollups(self, deltas: Dict[RollupKey, Rollup]) -> None:
+        """Add a batch's rollup deltas into the stored buckets (one transaction)"""
+        if deltas:
+            # read-merge-write must not interleave with another process
+            self._transaction("BEGIN IMMEDIATE", lambda conn: self._merge_rollups(conn, deltas))
+
+    def write_batch(self, records: List[Dict[str, Any]], deltas: Dict[RollupKey, Rollup]) -> int:
+        """Insert a batch and merge its rollups in ONE transaction: both land or neither does"""
+        def work(conn: sqlite3.Connection) -> int:
+            n = self._insert_runs(conn, records)
+            self._merge_rollups(conn, deltas)
+            return n
+        return self._transaction("BEGIN IMMEDIATE", work)
+
+    # ----------------------------
+    # Queries
+    # ----------------------------
+
+    def rollup_rows(
+        self, resolution: int, start: float, end: float, tenant_id: Optional[str] = None
+    ) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """(bucket, tenant, data) for buckets starting in [start, end]"""
+        sql = "SELECT bucket, tenant_id, data FROM rollups WHERE resolution = ? AND bucket >= ? AND bucket <= ?"
+        args: List[Any] = [resolution, int(start), int(end)]
+        if tenant_id:
+            sql += " AND tenant_id = ?"
+            args.append(tenant_id)
+        with self._lock:
+            rows = self._connect().execute(sql + " ORDER BY bucket", args).fetchall()
+        return [(r[0], r[1], loads(r[2])) for r in rows]
+
+    @staticmethod
+    def _decode(row: sqlite3.Row) -> Dict[str, Any]:
+        out = dict(row)
+        for col in JSON_COLUMNS:
+            if out.get(col) is not None:
+                out[col] = loads(out[col])
+        return out
+
+    def page(
+        self,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+        status: Optional[str] = None,
+        tool: Optional[str] = None,
+        tenant_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Newest first; pass the returned next_cursor to get the following page"""
+        limit = max(1, min(int(limit), HISTORY_PAGE_MAX))
+        where, args = [], []
+        if cursor is not None:
+            where.append("r.id < ?")
+            args.append(int(cursor))
+        if status:
+            where.append("r.status = ?")
+            args.append(status)
+        if tenant_id:
+            where.append("r.tenant_id = ?")
+            args.append(tenant_id)
+        if user_id:
+            where.append("r.user_id = ?")
+            args.append(user_id)
+        # Time bounds become id bounds (created_at index), so the id-ordered
+        # walk starts and stops at the right place
+        if since is not None:
+            where.append("r.id >= (SELECT COALESCE(MIN(id), 9e18) FROM runs WHERE created_at >= ?)")
+            args.append(since)
+        if until is not None:
+            where.append("r.id <= (SELECT COALESCE(MAX(id), -1) FROM runs WHERE created_at <= ?)")
+            args.append(until)
+        join = ""
+        if tool:
+            join = "JOIN run_tools t ON t.run_pk = r.id AND t.tool = ?"
+            args.insert(0, tool)
+
+        cols = ", ".join(f"r.{c}" for c in SUMMARY_COLUMNS)
+        sql = f"SELECT {cols} FROM runs r {join}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY r.id DESC LIMIT ?"
+        args.append(limit + 1)
+
+        with self._lock:
+            rows = self._connect().execute(sql, args).fetchall()
+        items = [self._decode(r) for r in rows[:limit]]
+        next_cursor = str(items[-1]["id"]) if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+    def get_run(self, run_id: str) -> List[Dict[str, Any]]:
+        """Every phase recorded for a run (run, then approve), full payloads"""
+        with self._lock:
+            rows = self._connect().execute("SELECT * FROM runs WHERE run_id = ? ORDER BY id", (run_id,)).fetchall()
+        return [self._decode(r) for r in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    # ----------------------------
+    # Retention / compaction
+    # ----------------------------
+
+    def compact(
+        self,
+        now: Optional[float] = None,
+        retention_days: float = HISTORY_RETENTION_DAYS,
+        compact_after_days: float = HISTORY_COMPACT_AFTER_DAYS,
+    ) -> Dict[str, int]:
+        """Delete expired rows and strip payloads from old ones, in small batches"""
+        now = time.time() if now is None else now
+        deleted = compacted = 0
+        while True:
+            with self._lock:
+                conn = self._connect()
+                ids = [r[0] for r in conn.execute(
+                    "SELECT id FROM runs WHERE created_at < ? LIMIT ?", (now - retention_days * 86400, DELETE_BATCH)
+                )]
+                if not ids:
+                    break
+                marks = ", ".join("?" for _ in ids)
+                conn.execute("BEGIN")
+                conn.execute(f"DELETE FROM run_tools WHERE run_pk IN ({marks})", ids)
+                conn.execute(f"DELETE FROM runs WHERE id IN ({marks})", ids)
+                conn.execute("COMMIT")
+            deleted += len(ids)
+        while True:
+            with self._lock:
+                cur = self._connect().execute(
+                    "UPDATE runs SET plan = NULL, results = NULL, compacted = 1 WHERE id IN "
+                    "(SELECT id FROM runs WHERE compacted = 0 AND created_at < ? LIMIT ?)",
+                    (now - compact_after_days * 86400, DELETE_BATCH),
+                )
+            if cur.rowcount <= 0:
+                break
+            compacted += cur.rowcount
+        with self._lock:
+            conn = self._connect()
+            for resolution, max_age_s in (
+                (MINUTE, ROLLUP_MINUTE_RETENTION_H * 3600),
+                (HOUR, ROLLUP_HOUR_RETENTION_DAYS * 86400),
+            ):
+                conn.execute("DELETE FROM rollups WHERE resolution = ? AND bucket < ?", (resolution, now - max_age_s))
+        if deleted or compacted:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("PRAGMA incremental_vacuum")
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return {"deleted": deleted, "compacted": compacted}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
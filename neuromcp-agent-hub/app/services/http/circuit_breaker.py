@@ -0,0 +1,259 @@
+"""
+Per-provider / per-endpoint circuit breakers
+Every outbound Slack / Google call goes through two breakers: one for the
+provider ("slack") and one for the endpoint ("slack:chat.postMessage").
+A breaker trips (OPEN) when, over a rolling window, too many calls failed
+(5xx, connection errors, timeouts) or were too slow. While OPEN, calls fail
+immediately with CircuitOpenError instead of waiting out the HTTP timeout.
+After a cooldown it goes HALF_OPEN and lets a few probe calls through:
+success closes it, failure re-opens it.
+
+Config (env): BREAKER_WINDOW_S, BREAKER_MIN_CALLS, BREAKER_ERROR_RATE,
+BREAKER_SLOW_CALL_S, BREAKER_SLOW_RATE, BREAKER_OPEN_S, BREAKER_HALF_OPEN_PROBES
+"""
+from __future__ import annotations
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+CLOSED, OPEN, HALF_OPEN = "CLOSED", "OPEN", "HALF_OPEN"
+
+# Human-readable names for user-facing "unavailable" messages
+PROVIDER_NAMES = {"slack": "Slack", "google": "Google Calendar"}
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    window_s: float = float(os.getenv("BREAKER_WINDOW_S", "30"))
+    min_calls: int = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+    error_rate: float = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+    slow_call_s: float = float(os.getenv("BREAKER_SLOW_CALL_S", "5"))
+    slow_rate: float = float(os.getenv("BREAKER_SLOW_RATE", "0.5"))
+    open_s: float = float(os.getenv("BREAKER_OPEN_S", "15"))
+    half_open_probes: int = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose breaker is open"""
+
+    def __init__(self, name: str, retry_in_s: float):
+        provider = name.split(":", 1)[0]
+        super().__init__(
+            f"{PROVIDER_NAMES.get(provider, provider)} is temporarily unavailable "
+            f"(circuit open for {name}; retry in ~{max(1, round(retry_in_s))}s)"
+        )
+        self.name = name
+        self.retry_in_s = retry_in_s
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, config: Optional[BreakerConfig] = None):
+        self.name = name
+        self.config = config or BreakerConfig()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._calls: Deque[Tuple[float, bool, bool]] = deque()  # (ts, failed, slow)
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.trips = 0
+        self.rejected = 0
+        self.last_failure: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.config.open_s:
+            self._state, self._probes_in_flight, self._probe_successes = HALF_OPEN, 0, 0
+        return self._state
+
+    def retry_in_s(self) -> float:
+        return max(0.0, self.config.open_s - (time.monotonic() - self._opened_at))
+
+    # ----------------------------
+    # Call lifecycle
+    # ----------------------------
+
+    def before_call(self) -> bool:
+        """
+        Admit a call or raise CircuitOpenError.
+        Returns True when the call is a half-open probe.
+        """
+        state = self.state
+        if state == CLOSED:
+            return False
+        if state == HALF_OPEN and self._probes_in_flight < self.config.half_open_probes:
+            self._probes_in_flight += 1
+            return True
+        self.rejected += 1
+        raise CircuitOpenError(self.name, self.retry_in_s() if state == OPEN else self.config.open_s)
+
+    def release(self, probe: bool) -> None:
+        """Call ended without a verdict (cancelled, or cut short by our own deadline)"""
+        if probe:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def record(self, failed: bool, latency_s: float, probe: bool = False, detail: Optional[str] = None) -> None:
+        slow = latency_s >= self.config.slow_call_s
+        if failed or slow:
+            self.last_failure = detail or ("slow call" if not failed else "failure")
+
+        if probe:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if self._state != HALF_OPEN:
+                return
+            if failed or slow:
+                self._trip()
+            else:
+                self._probe_successes += 1
+                if self._probe_successes >= self.config.half_open_probes:
+                    self._state = CLOSED
+                    self._calls.clear()
+            return
+
+        if self._state != CLOSED:
+            return  # late result from before the trip
+
+        now = time.monotonic()
+        self._calls.append((now, failed, slow))
+        cutoff = now - self.config.window_s
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+        total = len(self._calls)
+        if total < self.config.min_calls:
+            return
+        failures = sum(1 for _, f, _ in self._calls if f)
+        slow_calls = sum(1 for _, _, s in self._calls if s)
+        if failures / total >= self.config.error_rate or slow_calls / total >= self.config.slow_rate:
+            self._trip()
+
+    def _trip(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._calls.clear()
+        self._probes_in_flight = self._probe_successes = 0
+        self.trips += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        total = len(self._calls)
+        return {
+            "state": state,
+            "calls_in_window": total,
+            "error_rate": round(sum(1 for _, f, _ in self._calls if f) / total, 3) if total else 0.0,
+            "slow_rate": round(sum(1 for _, _, s in self._calls if s) / total, 3) if total else 0.0,
+            "retry_in_s": round(self.retry_in_s(), 1) if state == OPEN else None,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "last_failure": self.last_failure,
+        }
+
+
+# ============================
+# Registry
+# ============================
+
+_config = BreakerConfig()
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = _breakers[name] = CircuitBreaker(name, _config)
+    return breaker
+
+
+def breakers_for(provider: str, endpoint: str) -> List[CircuitBreaker]:
+    return [get_breaker(provider), get_breaker(f"{provider}:{endpoint}")]
+
+
+def provider_unavailable(provider: str) -> Optional[str]:
+    """User-facing reason if the provider's breaker is open, else None"""
+    breaker = _breakers.get(provider)
+    if breaker is None or breaker.state != OPEN:
+        return None
+    return str(CircuitOpenError(provider, breaker.retry_in_s()))
+
+
+def raise_if_open(provider: str, endpoint: str) -> None:
+    """Fail fast before queueing (rate-limit pacing) for a call that cannot be admitted"""
+    for name in (provider, f"{provider}:{endpoint}"):
+        breaker = _breakers.get(name)
+        if breaker is not None and breaker.state == OPEN:
+            breaker.rejected += 1
+            raise CircuitOpenError(name, breaker.retry_in_s())
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    return {name: b.snapshot() for name, b in sorted(_breakers.items())}
+
+
+def reset_breakers(config: Optional[BreakerConfig] = None) -> None:
+    global _config
+    _config = config or BreakerConfig()
+    _breakers.clear()
+
+
+# ============================
+# Guarded HTTP call
+# ============================
+
+def _is_failure(response: Any) -> bool:
+    # 429 is pacing, not an outage: the retry layer / scheduler handle it
+    return response.status_code >= 500
+
+
+async def guarded_request(provider: str, endpoint: str, method: str, url: str, **kwargs: Any):
+    """
+    One HTTP call through the shared client, admitted and scored by the
+    provider + endpoint breakers. Raises CircuitOpenError without touching
+    the network while either breaker is open.
+    """
+    import httpx
+
+    from app.services.http.client import get_http_client
+    from app.services.observability.tracing import span, traceparent
+
+    breakers = breakers_for(provider, endpoint)
+    admitted: List[Tuple[CircuitBreaker, bool]] = []
+    try:
+        for breaker in breakers:
+            admitted.append((breaker, breaker.before_call()))
+    except CircuitOpenError:
+        for breaker, probe in admitted:
+            breaker.release(probe)
+        raise
+
+    started = time.monotonic()
+    try:
+        with span(f"http {provider}:{endpoint}", method=method, provider=provider) as http_span:
+            header = traceparent()
+            if header:
+                kwargs["headers"] = {**(kwargs.get("headers") or {}), "traceparent": header}
+            response = await get_http_client().request(method, url, **kwargs)
+            http_span.set(status_code=response.status_code)
+    except httpx.TimeoutException as e:
+        elapsed = time.monotonic() - started
+        for breaker, probe in admitted:
+            if elapsed >= breaker.config.slow_call_s:
+                breaker.record(True, elapsed, probe, detail=f"timeout after {elapsed:.1f}s")
+            else:
+                breaker.release(probe)  # our own (deadline-shortened) timeout, not the provider's
+        raise
+    except httpx.TransportError as e:
+        elapsed = time.monotonic() - started
+        for breaker, probe in admitted:
+            breaker.record(True, elapsed, probe, detail=type(e).__name__)
+        raise
+    except BaseException:
+        for breaker, probe in admitted:
+            breaker.release(probe)
+        raise
+
+    elapsed = time.monotonic() - started
+    failed = _is_failure(response)
+    for breaker, probe in admitted:
+        breaker.record(failed, elapsed, probe, detail=f"HTTP {response.status_code}" if failed else None)
+    return response
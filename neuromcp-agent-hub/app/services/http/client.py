@@ -0,0 +1,42 @@
+"""
+Shared outbound HTTP client
+One pooled httpx.AsyncClient per event loop, so Slack/Google/Groq calls reuse
+warm keep-alive (TLS) connections instead of handshaking on every tool call.
+"""
+from __future__ import annotations
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0)
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Pooled client bound to the running loop.
+    A new loop (e.g. a script calling asyncio.run twice) gets a new client.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(limits=POOL_LIMITS)
+        _client_loop = loop
+    return _client
+
+
+@asynccontextmanager
+async def shared_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Drop-in for `async with httpx.AsyncClient() as client:` that keeps the pool open"""
+    yield get_http_client()
+
+
+async def close_http_client() -> None:
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client, _client_loop = None, None
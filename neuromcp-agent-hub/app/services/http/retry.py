@@ -0,0 +1,180 @@
+"""
+Shared retry policy for Slack / Google calls
+Exponential backoff with full jitter, Retry-After (and Slack's
+`ratelimited` error) honored, every attempt's timeout and every wait
+carved out of the run deadline. Writes are only retried when that cannot
+duplicate them: the request never reached the provider (connect failure),
+the provider refused it (429), or the caller made it idempotent (e.g. a
+client-supplied Calendar event id).
+
+Each attempt goes through the circuit breakers (guarded_request); an open
+breaker is never retried. An optional pacer (e.g. the Slack scheduler)
+queues every attempt for a rate-limit token and absorbs Retry-After.
+
+Config (env): RETRY_MAX_ATTEMPTS, RETRY_BASE_S, RETRY_MAX_BACKOFF_S,
+RETRY_MAX_WAIT_S, RETRY_MIN_ATTEMPT_S
+"""
+from __future__ import annotations
+import asyncio
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.services.http.circuit_breaker import guarded_request, raise_if_open
+from app.utils.deadline import remaining, timeout_for
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+    base_s: float = float(os.getenv("RETRY_BASE_S", "0.5"))
+    max_backoff_s: float = float(os.getenv("RETRY_MAX_BACKOFF_S", "8"))
+    # Give up instead of waiting longer than this on a Retry-After
+    max_wait_s: float = float(os.getenv("RETRY_MAX_WAIT_S", "30"))
+    # An attempt needs at least this much run budget left to be worth making
+    min_attempt_s: float = float(os.getenv("RETRY_MIN_ATTEMPT_S", "0.5"))
+    retry_statuses: frozenset = frozenset({429, 500, 502, 503, 504})
+
+    def backoff_s(self, attempt: int, rng: random.Random = random) -> float:
+        """Full jitter: uniform(0, min(cap, base * 2^(attempt-1)))"""
+        return rng.uniform(0, min(self.max_backoff_s, self.base_s * 2 ** (attempt - 1)))
+
+
+DEFAULT_POLICY = RetryPolicy()
+
+# "provider:endpoint" -> requests / attempts / retries / retry_after_waits / gave_up
+_stats: Dict[str, Counter] = defaultdict(Counter)
+
+
+def retry_stats() -> Dict[str, Dict[str, int]]:
+    return {name: dict(c) for name, c in sorted(_stats.items())}
+
+
+def reset_retry_stats() -> None:
+    _stats.clear()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_rate_limited(provider: str, response: Any) -> bool:
+    if response.status_code == 429:
+        return True
+    # Slack can also answer 200 {"ok": false, "error": "ratelimited"}
+    # (error bodies are tiny; don't parse real payloads)
+    if provider != "slack" or len(response.content) > 512:
+        return False
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and body.get("ok") is False and body.get("error") == "ratelimited"
+
+
+async def request_with_retry(
+    provider: str,
+    endpoint: str,
+    method: str,
+    url: str,
+    *,
+    deadline_at: Optional[float] = None,
+    timeout_s: float = 30.0,
+    idempotent: Optional[bool] = None,
+    policy: Optional[RetryPolicy] = None,
+    pacer: Optional[Any] = None,
+    **kwargs: Any,
+):
+    """
+    guarded_request with retries. Returns the last response once retries
+    are exhausted (callers keep their own status handling); re-raises the
+    last transport error if no response was ever received.
+
+    idempotent: defaults to True for GET/HEAD/OPTIONS/PUT/DELETE.
+    pacer: object with `async acquire(deadline_at)` (awaited before every
+        attempt) and `pause(seconds)` (called with Retry-After instead of
+        sleeping here, so queued callers wait too).
+    """
+    import httpx
+
+    policy = policy or DEFAULT_POLICY
+    if idempotent is None:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+    stats = _stats[f"{provider}:{endpoint}"]
+    stats["requests"] += 1
+
+    attempt = 0
+    while True:
+        attempt += 1
+        stats["attempts"] += 1
+        wait: Optional[float] = None
+        response = error = None
+        try:
+            if pacer is not None:
+                raise_if_open(provider, endpoint)
+                await pacer.acquire(deadline_at)
+            response = await guarded_request(
+                provider, endpoint, method, url,
+                timeout=timeout_for(deadline_at, timeout_s), **kwargs
+            )
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            # Never reached the provider: safe to retry even for writes
+            error = e
+            if attempt >= policy.max_attempts:
+                stats["gave_up"] += 1
+                raise
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            # The provider may have acted on it: only idempotent calls retry
+            error = e
+            if not idempotent or attempt >= policy.max_attempts:
+                stats["gave_up"] += 1
+                raise
+
+        if response is not None:
+            rate_limited = is_rate_limited(provider, response)
+            retryable = rate_limited or (idempotent and response.status_code in policy.retry_statuses)
+            if not retryable:
+                return response
+            if attempt >= policy.max_attempts:
+                stats["gave_up"] += 1
+                return response
+            wait = parse_retry_after(response.headers.get("retry-after"))
+            if wait is not None:
+                if wait > policy.max_wait_s:
+                    stats["gave_up"] += 1
+                    return response
+                stats["retry_after_waits"] += 1
+
+        if wait is None:
+            wait = policy.backoff_s(attempt)
+
+        left = remaining(deadline_at)
+        if left is not None and left - wait < policy.min_attempt_s:
+            # Not enough run budget for the wait plus another attempt
+            stats["gave_up"] += 1
+            if error is not None:
+                raise error
+            return response
+
+        stats["retries"] += 1
+        if pacer is not None and response is not None and rate_limited:
+            pacer.pause(wait)  # the next acquire() waits it out
+        else:
+            await asyncio.sleep(wait)
@@ -0,0 +1,204 @@
+"""
+Slack outbound scheduler
+Token buckets matching Slack's published limits: one per Web API method
+(by tier) and, for chat.postMessage, one per channel (~1 message/second).
+Callers queue for a token instead of being rejected, so bursts and
+parallel plans are smoothed to Slack's ceiling rather than answered with
+`ratelimited`. A Retry-After from Slack pauses the method's bucket.
+Slack's limits are per workspace, so every tenant gets its own buckets
+(keys are prefixed "<tenant>/" outside the default tenant).
+
+Config (env):
+  SLACK_TIER_OVERRIDES   JSON {"method": tier}, e.g. {"conversations.history": 1}
+  SLACK_CHANNEL_RATE     chat.postMessage per channel, per second (default 1)
+  SLACK_CHANNEL_BURST    per-channel burst (default 1)
+  SLACK_RATE_HEADROOM    fraction of each limit actually used (default 0.95);
+                         the margin absorbs network jitter bunching arrivals
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.deadline import DeadlineExceeded, remaining
+from app.utils.tenant import DEFAULT_TENANT
+
+# Tier -> (requests per minute, burst). Slack tolerates short bursts above
+# the per-minute figure; bursts here stay small to keep clear of 429s
+TIER_LIMITS: Dict[int, Tuple[float, int]] = {
+    1: (1, 1),
+    2: (20, 3),
+    3: (50, 5),
+    4: (100, 10),
+}
+
+# chat.postMessage is "special": ~1/s per channel plus a workspace-wide
+# ceiling, modelled here as a Tier 4 method bucket
+METHOD_TIERS: Dict[str, int] = {
+    "chat.postMessage": 4,
+    "conversations.history": 3,
+    "conversations.list": 3,
+}
+METHOD_TIERS.update({k: int(v) for k, v in json.loads(os.getenv("SLACK_TIER_OVERRIDES", "{}")).items()})
+DEFAULT_TIER = 3
+
+CHANNEL_RATE_PER_S = float(os.getenv("SLACK_CHANNEL_RATE", "1"))
+CHANNEL_BURST = int(os.getenv("SLACK_CHANNEL_BURST", "1"))
+RATE_HEADROOM = float(os.getenv("SLACK_RATE_HEADROOM", "0.95"))
+
+
+class TokenBucket:
+    """
+    Reservation-style bucket: a caller takes a token immediately (tokens may
+    go negative) and sleeps until it is covered, so waiters are served in
+    arrival order without a wake-up loop.
+    """
+
+    def __init__(self, name: str, rate_per_s: float, burst: int):
+        self.name = name
+        self.rate = rate_per_s
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        # Queue metrics
+        self.waiting = 0
+        self.max_waiting = 0
+        self.acquired = 0
+        self.waited_s = 0.0
+        self.max_wait_s = 0.0
+        self.pauses = 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token; returns how long the caller must wait for it"""
+        self._refill(time.monotonic())
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self) -> None:
+        self.tokens = min(self.burst, self.tokens + 1)
+
+    def pause(self, seconds: float) -> None:
+        """Push the next free token at least `seconds` out (Retry-After)"""
+        self._refill(time.monotonic())
+        self.tokens = min(self.tokens, 1 - seconds * self.rate)
+        self.pauses += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill(time.monotonic())
+        return {
+            "rate_per_s": round(self.rate, 4),
+            "burst": self.burst,
+            "tokens": round(self.tokens, 2),
+            "queued": self.waiting,
+            "max_queued": self.max_waiting,
+            "acquired": self.acquired,
+            "avg_wait_s": round(self.waited_s / self.acquired, 4) if self.acquired else 0.0,
+            "max_wait_s": round(self.max_wait_s, 4),
+            "pauses": self.pauses,
+        }
+
+
+class SlackPacer:
+    """The buckets one Slack call must pass; handed to request_with_retry"""
+
+    def __init__(self, buckets: List[TokenBucket], method: str):
+        self.buckets = buckets
+        self.method = method
+
+    async def acquire(self, deadline_at: Optional[float] = None) -> float:
+        waits = [b.reserve() for b in self.buckets]
+        wait = max(waits)
+        left = remaining(deadline_at)
+        if left is not None and wait >= left:
+            for b in self.buckets:
+                b.refund()
+            raise DeadlineExceeded(f"Slack {self.method} queue wait {wait:.1f}s exceeds the run deadline")
+
+        if wait > 0:
+            for b in self.buckets:
+                b.waiting += 1
+                b.max_waiting = max(b.max_waiting, b.waiting)
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                for b in self.buckets:
+                    b.refund()
+                raise
+            finally:
+                for b in self.buckets:
+                    b.waiting -= 1
+
+        for b in self.buckets:
+            b.acquired += 1
+            b.waited_s += wait
+            b.max_wait_s = max(b.max_wait_s, wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        # Slack's Retry-After is per method; the channel buckets keep their pace
+        self.buckets[0].pause(seconds)
+
+
+class SlackScheduler:
+    def __init__(
+        self,
+        tiers: Optional[Dict[str, int]] = None,
+        tier_limits: Optional[Dict[int, Tuple[float, int]]] = None,
+        channel_rate_per_s: float = CHANNEL_RATE_PER_S,
+        channel_burst: int = CHANNEL_BURST,
+        headroom: float = RATE_HEADROOM,
+    ):
+        self.tiers = {**METHOD_TIERS, **(tiers or {})}
+        self.tier_limits = tier_limits or TIER_LIMITS
+        self.channel_rate_per_s = channel_rate_per_s
+        self.channel_burst = channel_burst
+        self.headroom = headroom
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, key: str, rate_per_s: float, burst: int) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(key, rate_per_s * self.headroom, burst)
+        return bucket
+
+    def pacer(self, method: str, channel: Optional[str] = None, tenant_id: str = DEFAULT_TENANT) -> SlackPacer:
+        per_minute, burst = self.tier_limits[self.tiers.get(method, DEFAULT_TIER)]
+        prefix = "" if tenant_id == DEFAULT_TENANT else f"{tenant_id}/"
+        buckets = [self._bucket(f"{prefix}method:{method}", per_minute / 60.0, burst)]
+        if method == "chat.postMessage" and channel:
+            key = f"{prefix}channel:{channel.lstrip('#').lower()}"
+            buckets.append(self._bucket(key, self.channel_rate_per_s, self.channel_burst))
+        return SlackPacer(buckets, method)
+
+    async def acquire(
+        self,
+        method: str,
+        channel: Optional[str] = None,
+        deadline_at: Optional[float] = None,
+        tenant_id: str = DEFAULT_TENANT,
+    ) -> float:
+        return await self.pacer(method, channel, tenant_id).acquire(deadline_at)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: b.snapshot() for key, b in sorted(self._buckets.items())}
+
+
+_scheduler: Optional[SlackScheduler] = None
+
+
+def get_slack_scheduler() -> SlackScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SlackScheduler()
+    return _scheduler
+
+
+def reset_slack_scheduler(scheduler: Optional[SlackScheduler] = None) -> None:
+    global _scheduler
+    _scheduler = scheduler
@@ -0,0 +1,220 @@
+"""
+Multi-server MCP tool federation
+Discovery fans out concurrently to every configured MCP server. Each server
+has its own timeout and a stale-while-revalidate tool cache, so a slow or
+dead server never delays planning: it just contributes no (or stale) tools
+while a background refresh keeps trying.
+
+Configure with MCP_SERVERS (JSON list), e.g.
+    MCP_SERVERS='[{"name": "jira", "url": "http://jira-mcp:9000", "timeout_s": 1.5, "call_timeout_s": 60},
+                  {"name": "fs", "transport": "stdio", "command": ["mcp-server-fs", "/data"]}]'
+timeout_s bounds discovery only; tool calls are capped by call_timeout_s
+and the run deadline. Federated tools are namespaced as "<server>/<tool>".
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.mcp.mcp_client import MCPClient
+
+NAMESPACE_SEP = "/"
+
+
+@dataclass(frozen=True)
+class MCPServerConfig:
+    name: str
+    url: str = ""
+    prefix: str = "/mcp/mcp"
+    timeout_s: float = 2.0    # per-request budget for tools/list
+    call_timeout_s: float = 30.0  # cap per tools/call; the run deadline may cut it shorter
+    ttl_s: float = 60.0       # tool list considered fresh for this long
+    transport: str = "http"   # or "stdio" (persistent subprocess running `command`)
+    command: Optional[Tuple[str, ...]] = None
+
+
+@dataclass
+class _ServerState:
+    config: MCPServerConfig
+    client: MCPClient
+    tools: Optional[List[Dict[str, Any]]] = None
+    fetched_at: float = 0.0
+    last_attempt: float = 0.0
+    last_error: Optional[str] = None
+    failures: int = 0
+    refresh_task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def is_fresh(self, now: float) -> bool:
+        return self.tools is not None and now - self.fetched_at < self.config.ttl_s
+
+    def recently_failed(self, now: float) -> bool:
+        return self.last_error is not None and now - self.last_attempt < self.config.ttl_s
+
+
+def load_server_configs() -> List[MCPServerConfig]:
+    raw = os.getenv("MCP_SERVERS", "").strip()
+    if not raw:
+        return []
+    try:
+        entries = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"MCP_SERVERS is not valid JSON: {e}")
+
+    configs = []
+    for entry in entries:
+        if NAMESPACE_SEP in entry["name"]:
+            raise RuntimeError(f"MCP server name may not contain '{NAMESPACE_SEP}': {entry['name']}")
+        if entry.get("command"):
+            entry["command"] = tuple(entry["command"])
+        configs.append(MCPServerConfig(**entry))
+    return configs
+
+
+def _namespace(server: str, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    out = []
+    for tool in tools:
+        if not isinstance(tool, dict) or not tool.get("name"):
+            continue
+        tool = dict(tool)
+        # Normalize schema keys: convert inputSchema to input_schema
+        if "inputSchema" in tool and "input_schema" not in tool:
+            tool["input_schema"] = tool.pop("inputSchema")
+        tool["name"] = f"{server}{NAMESPACE_SEP}{tool['name']}"
+        tool["server"] = server
+        out.append(tool)
+    return out
+
+
+class MCPFederation:
+    """Concurrent, cached tool discovery and call routing across MCP servers"""
+
+    def __init__(self, configs: List[MCPServerConfig]):
+        self.servers: Dict[str, _ServerState] = {
+            c.name: _ServerState(config=c, client=MCPClient(
+                c.url or None, c.prefix, timeout_s=c.timeout_s, transport=c.transport,
+                command=list(c.command) if c.command else None, call_timeout_s=c.call_timeout_s,
+                # Without its own url a stdio server has no HTTP endpoint; the
+                # default base URL is this hub, which does not own its tools
+                http_fallback=bool(c.url),
+            ))
+            for c in configs
+        }
+        self._refresher: Optional[asyncio.Task] = None
+
+    # ----------------------------
+    # Discovery
+    # ----------------------------
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """Namespaced tools from every server. Never raises; bounded by per-server timeouts."""
+        if not self.servers:
+            return []
+        results = await asyncio.gather(*(self._tools_for(s) for s in self.servers.values()))
+        return [tool for tools in results for tool in tools]
+
+    async def _tools_for(self, server: _ServerState) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        if server.is_fresh(now):
+            return server.tools
+
+        if server.tools is not None or server.recently_failed(now):
+            # Stale (or known-bad): answer immediately, revalidate in background
+            self._schedule_refresh(server)
+            return server.tools or []
+
+        # Never fetched: wait, but only up to this server's own timeout
+        await self._refresh(server)
+        return server.tools or []
+
+    def _schedule_refresh(self, server: _ServerState) -> None:
+        if server.refresh_task is None or server.refresh_task.done():
+            server.refresh_task = asyncio.create_task(self._refresh(server))
+
+    async def _refresh(self, server: _ServerState) -> bool:
+        """Fetch one server's tools. Returns True if its tool list changed."""
+        server.last_attempt = time.monotonic()
+        try:
+            data = await asyncio.wait_for(server.client.list_tools(), timeout=server.config.timeout_s)
+        except Exception as e:
+            # Keep serving the stale list (if any)
+            server.last_error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            server.failures += 1
+            return False
+
+        tools = _namespace(server.config.name, data.get("tools", []))
+        changed = tools != server.tools
+        server.tools = tools
+        server.fetched_at = time.monotonic()
+        server.last_error = None
+        server.failures = 0
+
+        if changed:
+            from app.services.mcp.tool_catalog import invalidate_catalog
+            invalidate_catalog()
+        return changed
+
+    # ----------------------------
+    # Background refresh
+    # ----------------------------
+
+    def start_background_refresh(self, interval_s: Optional[float] = None) -> None:
+        if not self.servers or (self._refresher and not self._refresher.done()):
+            return
+        interval = interval_s or min(s.config.ttl_s for s in self.servers.values()) / 2
+        self._refresher = asyncio.create_task(self._refresh_loop(interval))
+
+    async def _refresh_loop(self, interval_s: float) -> None:
+        while True:
+            await asyncio.gather(*(self._refresh(s) for s in self.servers.values()))
+            await asyncio.sleep(interval_s)
+
+    async def stop(self) -> None:
+        tasks = [t for t in [self._refresher] + [s.refresh_task for s in self.servers.values()] if t]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refresher = None
+
+    # ----------------------------
+    # Calls
+    # ----------------------------
+
+    def route(self, tool_name: str) -> Tuple[Optional[MCPClient], str]:
+        """(client, server-local tool name); client is None for non-federated tools"""
+        server_name, sep, local_name = tool_name.partition(NAMESPACE_SEP)
+        if sep and server_name in self.servers:
+            return self.servers[server_name].client, local_name
+        return None, tool_name
+
+    async def call_tool(self, tool_name: str, args: dict, deadline_at: Optional[float] = None):
+        client, local_name = self.route(tool_name)
+        if client is None:
+            client = MCPClient()  # default (local) MCP endpoint
+        return await client.call_tool(local_name, args, deadline_at=deadline_at)
+
+    def status(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            name: {
+                "url": s.config.url,
+                "tools": len(s.tools) if s.tools is not None else None,
+                "fresh": s.is_fresh(now),
+                "age_s": round(now - s.fetched_at, 1) if s.tools is not None else None,
+                "failures": s.failures,
+                "last_error": s.last_error,
+            }
+            for name, s in self.servers.items()
+        }
+
+
+_federation: Optional[MCPFederation] = None
+
+
+def get_federation() -> MCPFederation:
+    global _federation
+    if _federation is None:
+        _federation = MCPFederation(load_server_configs())
+    return _federation
@@ -1,12 +1,41 @@
 import os
-import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+from app.utils.deadline import timeout_for
+
+HTTP_TIMEOUT_S = 30.0  # per-call cap; the run deadline may cut it shorter
+
+# "http": one request per call (default)
+# "stdio": JSON-RPC over a persistent subprocess (MCP_STDIO_COMMAND); falls
+#          back to HTTP when the subprocess cannot start, unless http_fallback
+#          is off (a federated stdio-only server has no HTTP endpoint)
+TRANSPORTS = ("http", "stdio")
 
 
 class MCPClient:
-    def __init__(self, base_url: str | None = None, prefix: str | None = None):
+    def __init__(
+        self,
+        base_url: str | None = None,
+        prefix: str | None = None,
+        timeout_s: float = HTTP_TIMEOUT_S,
+        transport: str | None = None,
+        command: List[str] | None = None,
+        call_timeout_s: float = HTTP_TIMEOUT_S,
+        http_fallback: bool = True,
+    ):
         self.base_url = (base_url or os.getenv("MCP_BASE_URL", "http://127.0.0.1:8000")).rstrip("/")
         self.prefix = (prefix or os.getenv("MCP_PREFIX", "/mcp/mcp")).rstrip("/")
+        self.timeout_s = timeout_s  # list_tools only
+        self.call_timeout_s = call_timeout_s  # call_tool cap; the run deadline may cut it shorter
+        self.transport = (transport or os.getenv("MCP_TRANSPORT", "http")).lower()
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f"Unknown MCP transport {self.transport!r} (expected one of {TRANSPORTS})")
+        self.command = command
+        self.http_fallback = http_fallback
+
+    def _stdio(self):
+        from app.services.mcp.stdio_transport import get_stdio_transport
+        return get_stdio_transport(self.command)
 
     def _url(self, path: str) -> str:
         if not path.startswith("/"):
@@ -14,52 +43,40 @@ class MCPClient:
         return f"{self.base_url}{self.prefix}{path}"
 
     async def list_tools(self) -> Dict[str, List[Dict[str, Any]]]:
-        """List all available MCP tools"""
-        # The endpoint doesn't support listing, so use hardcoded tools
-        print(f"Using hardcoded tool list (MCP server doesn't provide tools/list)")
-        return {"tools": get_default_tools()}
+        """List the server's tools (tools/list, or GET {prefix}/tools over HTTP)"""
+        from app.services.http.client import get_http_client
+
+        if self.transport == "stdio":
+            from app.services.mcp.stdio_transport import TransportUnavailable
+            try:
+                return {"tools": await self._stdio().list_tools(timeout=self.timeout_s)}
+            except TransportUnavailable:
+                if not self.http_fallback:
+                    raise
+                # server could not start: fall back to HTTP
+
+        r = await get_http_client().get(self._url("/tools"), timeout=self.timeout_s)
+        r.raise_for_status()
+        data = r.json()
+        return {"tools": data.get("tools", []) if isinstance(data, dict) else []}
+
+    async def call_tool(self, name: str, args: dict, deadline_at: Optional[float] = None):
+        """Call an MCP tool (bounded by the run deadline, if any)"""
+        from app.services.http.client import get_http_client
+
+        if self.transport == "stdio":
+            from app.services.mcp.stdio_transport import TransportUnavailable
+            try:
+                return await self._stdio().call_tool(name, args, timeout=timeout_for(deadline_at, self.call_timeout_s))
+            except TransportUnavailable:
+                if not self.http_fallback:
+                    raise
+                # Nothing was sent, so HTTP can't double-execute the call
 
-    async def call_tool(self, name: str, args: dict):
-        """Call an MCP tool"""
         payload = {"name": name, "arguments": args}
-        r = requests.post(self._url("/call"), json=payload, timeout=30)
+        r = await get_http_client().post(
+            self._url("/call"), json=payload, timeout=timeout_for(deadline_at, self.call_timeout_s)
+        )
         r.raise_for_status()
         return r.json()
 
-
-def get_default_tools() -> List[Dict[str, Any]]:
-    """Default tools available in the system"""
-    return [
-        {
-            "name": "calendar.create_event",
-            "description": "Create a calendar event. Attendees should be provided as an array of email address strings.",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "title": {"type": "string", "description": "Event title"},
-                    "start_time": {"type": "string", "description": "ISO format datetime (e.g., 2026-01-30T16:00:00+05:30)"},
-                    "end_time": {"type": "string", "description": "ISO format datetime"},
-                    "description": {"type": "string", "description": "Event description (optional)"},
-                    "attendees": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of attendee email addresses (e.g., ['user@example.com'])"
-                    },
-                    "timezone": {"type": "string", "description": "Timezone (default: Asia/Kolkata)"}
-                },
-                "required": ["title", "start_time", "end_time"]
-            }
-        },
-        {
-            "name": "slack.post_message",
-            "description": "Post a message to Slack",
-            "input_schema": {
-                "type": "object",
-                "properties": {
-                    "channel": {"type": "string"},
-                    "text": {"type": "string"}
-                },
-                "required": ["channel", "text"]
-            }
-        }
-    ]
\ No newline at end of file
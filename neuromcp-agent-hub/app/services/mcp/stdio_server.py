@@ -0,0 +1,133 @@
+"""
+Local stand-in MCP server (JSON-RPC 2.0 over stdio)
+Serves every tool in TOOL_REGISTRY. By default calls are answered with mock
+results after an optional injected latency, so transport latency and
+throughput can be measured offline; --real dispatches to the real handlers.
+Requests are handled concurrently, so responses can come back out of order.
+
+Usage:
+    python -m app.services.mcp.stdio_server                  # mock, no latency
+    python -m app.services.mcp.stdio_server --latency-ms 20
+    python -m app.services.mcp.stdio_server --real
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import sys
+from typing import Any, Dict, Optional
+
+from app.services.mcp.stdio_transport import PROTOCOL_VERSION, STREAM_LIMIT
+from app.services.mcp.tool_registry import TOOL_REGISTRY, list_tool_specs
+from app.utils.json_codec import dumps, loads
+
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+PARSE_ERROR = -32700
+
+
+class StdioMCPServer:
+    def __init__(self, latency_s: float = 0.0, real: bool = False):
+        self.latency_s = latency_s
+        self.real = real
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    def _tools(self):
+        # MCP spells the schema key "inputSchema"
+        return [
+            {"name": t["name"], "description": t.get("description", ""), "inputSchema": t.get("input_schema", {})}
+            for t in list_tool_specs()
+        ]
+
+    async def _call_tool(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        name = params.get("name")
+        args = params.get("arguments") or {}
+        if name not in TOOL_REGISTRY:
+            raise _RPCFailure(INVALID_PARAMS, f"Unknown tool: {name}")
+
+        try:
+            if self.latency_s:
+                await asyncio.sleep(self.latency_s)
+            if self.real:
+                from app.services.mcp.tool_handlers import get_handler
+                result = await get_handler(name)(args)
+            else:
+                result = {"ok": True, "mock": True, "tool": name, "input": args}
+        except Exception as e:
+            return {"content": [{"type": "text", "text": str(e)}], "isError": True}
+
+        return {
+            "content": [{"type": "text", "text": dumps(result).decode("utf-8")}],
+            "structuredContent": result,
+            "isError": False,
+        }
+
+    async def _handle(self, msg: Dict[str, Any]) -> None:
+        method, request_id = msg.get("method"), msg.get("id")
+        if request_id is None:
+            return  # notification (e.g. notifications/initialized)
+
+        try:
+            if method == "initialize":
+                result = {
+                    "protocolVersion": PROTOCOL_VERSION,
+                    "capabilities": {"tools": {}},
+                    "serverInfo": {"name": "neuromcp-stdio-standin", "version": "1.0"},
+                }
+            elif method == "ping":
+                result = {}
+            elif method == "tools/list":
+                result = {"tools": self._tools()}
+            elif method == "tools/call":
+                result = await self._call_tool(msg.get("params") or {})
+            else:
+                raise _RPCFailure(METHOD_NOT_FOUND, f"Method not found: {method}")
+            await self._send({"jsonrpc": "2.0", "id": request_id, "result": result})
+        except _RPCFailure as e:
+            await self._send({"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": str(e)}})
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        self._writer.write(dumps(message) + b"\n")
+        await self._writer.drain()
+
+    async def serve(self) -> None:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=STREAM_LIMIT)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+        self._writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+
+        tasks = set()
+        while True:
+            line = await reader.readline()
+            if not line:
+                break  # client closed stdin
+            try:
+                msg = loads(line)
+            except ValueError:
+                await self._send({"jsonrpc": "2.0", "id": None, "error": {"code": PARSE_ERROR, "message": "Parse error"}})
+                continue
+            task = asyncio.create_task(self._handle(msg))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class _RPCFailure(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in MCP server over stdio")
+    parser.add_argument("--latency-ms", type=float, default=float(os.getenv("MCP_STUB_LATENCY_MS", "0")))
+    parser.add_argument("--real", action="store_true", help="call the real tool handlers")
+    args = parser.parse_args()
+    asyncio.run(StdioMCPServer(latency_s=args.latency_ms / 1000, real=args.real).serve())
+
+
+if __name__ == "__main__":
+    main()
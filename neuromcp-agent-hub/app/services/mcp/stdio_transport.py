@@ -0,0 +1,243 @@
+"""
+Persistent MCP transport: JSON-RPC 2.0 over a long-lived stdio subprocess
+One process per command (and event loop) carries every call. Requests are
+multiplexed by id and pipelined: many calls can be in flight at once and
+responses may come back in any order. If the process dies, in-flight calls
+fail with TransportClosed and the next call restarts it.
+
+Messages are newline-delimited JSON, as in the MCP stdio transport, so any
+MCP stdio server works (MCP_STDIO_COMMAND); the default is the local
+stand-in, `python -m app.services.mcp.stdio_server`.
+"""
+from __future__ import annotations
+import asyncio
+import itertools
+import os
+import shlex
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.json_codec import dumps, loads
+
+PROTOCOL_VERSION = "2024-11-05"
+STREAM_LIMIT = 16 * 1024 * 1024  # max size of one JSON-RPC line
+RESTART_BACKOFF_S = (0.0, 0.5, 1.0, 2.0, 5.0)  # per consecutive failed start
+
+
+class TransportError(RuntimeError):
+    pass
+
+
+class TransportUnavailable(TransportError):
+    """The server process could not be started (nothing was sent)"""
+
+
+class TransportClosed(TransportError):
+    """The server went away while a request was in flight"""
+
+
+class RPCError(TransportError):
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"MCP error {code}: {message}")
+        self.code, self.data = code, data
+
+
+def default_command() -> List[str]:
+    raw = os.getenv("MCP_STDIO_COMMAND", "").strip()
+    if raw:
+        return shlex.split(raw)
+    return [sys.executable, "-m", "app.services.mcp.stdio_server"]
+
+
+class StdioTransport:
+    def __init__(self, command: Optional[List[str]] = None):
+        self.command = command or default_command()
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._start_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._failed_starts = 0
+        self._next_start_at = 0.0
+        self.server_info: Dict[str, Any] = {}
+        self.restarts = 0
+        self._started_once = False
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._proc is not None and self._proc.returncode is None and self._reader is not None \
+            and not self._reader.done()
+
+    # ----------------------------
+    # Connection lifecycle
+    # ----------------------------
+
+    async def _ensure_started(self) -> None:
+        if self.connected:
+            return
+        async with self._start_lock:
+            if self.connected:
+                return
+            if time.monotonic() < self._next_start_at:
+                raise TransportUnavailable(f"MCP server restart backing off: {self.command[0]}")
+            try:
+                await self._start()
+                self._failed_starts = 0
+            except Exception as e:
+                backoff = RESTART_BACKOFF_S[min(self._failed_starts, len(RESTART_BACKOFF_S) - 1)]
+                self._failed_starts += 1
+                self._next_start_at = time.monotonic() + backoff
+                await self._kill()
+                raise TransportUnavailable(f"Could not start MCP server {self.command}: {e}") from e
+
+    async def _start(self) -> None:
+        if self._started_once:
+            self.restarts += 1
+        self._started_once = True
+        self._proc = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT,
+        )
+        self._reader = asyncio.create_task(self._read_loop(self._proc))
+
+        result = await asyncio.wait_for(
+            self._send("initialize", {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "neuromcp-agent-hub", "version": "1.0"},
+            }),
+            timeout=10.0,
+        )
+        self.server_info = result.get("serverInfo", {}) if isinstance(result, dict) else {}
+        await self._notify("notifications/initialized")
+
+    async def _read_loop(self, proc: asyncio.subprocess.Process) -> None:
+        try:
+            while True:
+                line = await proc.stdout.readline()
+                if not line:
+                    break
+                try:
+                    msg = loads(line)
+                except ValueError:
+                    continue  # stray non-protocol output
+                future = self._pending.pop(msg.get("id"), None) if isinstance(msg, dict) else None
+                if future is None or future.done():
+                    continue  # notification, or a caller that already gave up
+                if "error" in msg:
+                    err = msg["error"] or {}
+                    future.set_exception(RPCError(err.get("code", -32000), err.get("message", ""), err.get("data")))
+                else:
+                    future.set_result(msg.get("result"))
+        finally:
+            self._fail_pending(TransportClosed("MCP server process exited"))
+
+    def _fail_pending(self, exc: Exception) -> None:
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+    async def _kill(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+
+    async def close(self) -> None:
+        if self._proc is not None and self._proc.returncode is None:
+            self._proc.stdin.close()
+            try:
+                await asyncio.wait_for(self._proc.wait(), timeout=2.0)
+            except asyncio.TimeoutError:
+                pass
+        await self._kill()
+
+    # ----------------------------
+    # JSON-RPC
+    # ----------------------------
+
+    async def _write(self, message: Dict[str, Any]) -> None:
+        data = dumps(message) + b"\n"
+        async with self._write_lock:
+            try:
+                self._proc.stdin.write(data)
+                await self._proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError, AttributeError) as e:
+                raise TransportClosed(f"MCP server pipe closed: {e}") from e
+
+    async def _notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        await self._write({"jsonrpc": "2.0", "method": method, "params": params or {}})
+
+    async def _send(self, method: str, params: Dict[str, Any]) -> Any:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._write({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def request(self, method: str, params: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """Send one request; other requests keep flowing while this one waits"""
+        await self._ensure_started()
+        return await asyncio.wait_for(self._send(method, params), timeout=timeout)
+
+    async def list_tools(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        result = await self.request("tools/list", {}, timeout=timeout)
+        return (result or {}).get("tools", [])
+
+    async def call_tool(self, name: str, args: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        result = await self.request("tools/call", {"name": name, "arguments": args}, timeout=timeout)
+        return unwrap_tool_result(name, result)
+
+
+def unwrap_tool_result(name: str, result: Any) -> Any:
+    """MCP `tools/call` result -> the plain value the HTTP path returns"""
+    if not isinstance(result, dict):
+        return result
+    if result.get("isError"):
+        texts = [c.get("text", "") for c in result.get("content", []) if isinstance(c, dict)]
+        raise RuntimeError(f"{name} failed: {' '.join(texts) or 'tool error'}")
+    if "structuredContent" in result:
+        return result["structuredContent"]
+    content = result.get("content", [])
+    if len(content) == 1 and content[0].get("type") == "text":
+        try:
+            return loads(content[0]["text"])
+        except ValueError:
+            return content[0]["text"]
+    return content
+
+
+# One transport per (command, event loop): pipes belong to the loop that made them
+_transports: Dict[Tuple[Tuple[str, ...], int], StdioTransport] = {}
+
+
+def get_stdio_transport(command: Optional[List[str]] = None) -> StdioTransport:
+    command = command or default_command()
+    loop = asyncio.get_running_loop()
+    key = (tuple(command), id(loop))
+    transport = _transports.get(key)
+    if transport is None:
+        # Drop transports of loops that are gone
+        for stale in [k for k, t in _transports.items() if t.loop.is_closed()]:
+            _transports.pop(stale, None)
+        transport = _transports[key] = StdioTransport(command)
+        transport.loop = loop
+    return transport
+
+
+async def close_stdio_transports() -> None:
+    loop = asyncio.get_running_loop()
+    for key in [k for k in _transports if k[1] == id(loop)]:
+        await _transports.pop(key).close()
@@ -0,0 +1,149 @@
+"""
+Versioned tool catalog cache
+The tool list is built once per process and identified by a content hash.
+Each version carries precomputed artifacts (compiled JSON-schema validators,
+compact prompt serialization, name→tool map, approval flags) so runs only
+pass the version around instead of the full tool list.
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Awaitable, Dict, FrozenSet, List, Optional
+
+# How often the sources are re-read; the catalog is only rebuilt when
+# their content hash actually changes
+CATALOG_TTL_S = float(os.getenv("TOOL_CATALOG_TTL_S", "300"))
+
+# Old versions kept so in-flight runs (and /agent/approve round trips)
+# still resolve the version they were planned against
+MAX_VERSIONS = 8
+
+
+@dataclass(frozen=True)
+class ToolCatalog:
+    version: str
+    tools: List[Dict[str, Any]]
+    by_name: Dict[str, Dict[str, Any]]
+    names: FrozenSet[str]
+    prompt_json: str
+    requires_approval: Dict[str, bool]
+    validators: Dict[str, Any] = field(repr=False)
+
+    def validator(self, tool_name: str) -> Optional[Any]:
+        """Compiled jsonschema validator for the tool's input (None = no schema)"""
+        return self.validators.get(tool_name)
+
+
+def content_version(tools: List[Dict[str, Any]]) -> str:
+    canonical = json.dumps(tools, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:12]
+
+
+def build_catalog(tools: List[Dict[str, Any]], version: Optional[str] = None) -> ToolCatalog:
+    from jsonschema.validators import validator_for
+
+    by_name: Dict[str, Dict[str, Any]] = {}
+    validators: Dict[str, Any] = {}
+    for tool in tools:
+        name = tool.get("name")
+        if not isinstance(name, str) or not name:
+            continue
+        by_name[name] = tool
+
+        schema = tool.get("input_schema")
+        if isinstance(schema, dict) and schema:
+            cls = validator_for(schema)
+            cls.check_schema(schema)  # once per version, not once per step
+            validators[name] = cls(schema)
+
+    return ToolCatalog(
+        version=version or content_version(tools),
+        tools=tools,
+        by_name=by_name,
+        names=frozenset(by_name),
+        prompt_json=json.dumps(tools, separators=(",", ":"), ensure_ascii=False),
+        requires_approval={n: bool(t.get("requires_approval", False)) for n, t in by_name.items()},
+        validators=validators,
+    )
+
+
+# ============================
+# Process-wide cache
+# ============================
+
+_versions: "OrderedDict[str, ToolCatalog]" = OrderedDict()
+_current: Optional[ToolCatalog] = None
+_checked_at = 0.0
+_lock: Optional[asyncio.Lock] = None
+_lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_lock() -> asyncio.Lock:
+    global _lock, _lock_loop
+    loop = asyncio.get_running_loop()
+    if _lock is None or _lock_loop is not loop:
+        _lock, _lock_loop = asyncio.Lock(), loop
+    return _lock
+
+
+def _remember(catalog: ToolCatalog) -> None:
+    _versions[catalog.version] = catalog
+    _versions.move_to_end(catalog.version)
+    while len(_versions) > MAX_VERSIONS:
+        _versions.popitem(last=False)
+
+
+async def _load_sources() -> List[Dict[str, Any]]:
+    from app.agents.tool_discovery.agent import discover_tools
+    return await discover_tools()
+
+
+async def get_catalog(
+    force_refresh: bool = False,
+    loader: Callable[[], Awaitable[List[Dict[str, Any]]]] = _load_sources,
+) -> ToolCatalog:
+    """
+    Current catalog. Sources are re-read at most every CATALOG_TTL_S (or when
+    forced); artifacts are rebuilt only if the content hash changed.
+    """
+    global _current, _checked_at
+
+    if _current is not None and not force_refresh and time.monotonic() - _checked_at < CATALOG_TTL_S:
+        return _current
+
+    async with _get_lock():
+        # Another request may have refreshed while we waited
+        if _current is not None and not force_refresh and time.monotonic() - _checked_at < CATALOG_TTL_S:
+            return _current
+
+        tools = await loader()
+        version = content_version(tools)
+        if _current is None or _current.version != version:
+            catalog = _versions.get(version) or await asyncio.to_thread(build_catalog, tools, version)
+            _remember(catalog)
+            _current = catalog
+        _checked_at = time.monotonic()
+        return _current
+
+
+def invalidate_catalog() -> None:
+    """Force the next get_catalog() to re-read its sources"""
+    global _checked_at
+    _checked_at = 0.0
+
+
+def resolve_catalog(version: Optional[str]) -> ToolCatalog:
+    """
+    Catalog a run was planned against (sync; used inside graph nodes).
+    Falls back to the current catalog if that version was evicted.
+    """
+    if version and version in _versions:
+        return _versions[version]
+    if _current is None:
+        raise RuntimeError("Tool catalog not loaded yet (tool_discovery has not run)")
+    return _current
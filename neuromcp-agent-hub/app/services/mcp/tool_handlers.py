@@ -1,11 +1,94 @@
 from __future__ import annotations
-from typing import Any, Awaitable, Callable, Dict
+import importlib
+import os
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
 
-# Import handlers ONLY when calling /mcp/call, not when listing tools
-from app.services.tools.slack_tool import slack_post_message
-from app.services.tools.calendar_tool import calendar_create_event
+from app.services.mcp.tool_registry import TOOL_REGISTRY, ToolSpec
+from app.utils.tenant import DEFAULT_TENANT
 
-TOOL_HANDLERS: Dict[str, Callable[[Dict[str, Any]], Awaitable[Any]]] = {
-    "slack.post_message": slack_post_message,
-    "calendar.create_event": calendar_create_event,
-}
+
+class UnknownToolError(KeyError):
+    pass
+
+
+class ToolInputError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ToolHandler:
+    spec: ToolSpec
+    func: Callable[..., Awaitable[Any]]
+    validator: Optional[Any]
+
+    async def __call__(
+        self,
+        args: Dict[str, Any],
+        deadline_at: Optional[float] = None,
+        results: Optional[Dict[str, Any]] = None,
+        validate: bool = True,
+        tenant_id: str = DEFAULT_TENANT,
+    ) -> Any:
+        """
+        Run the tool. `validate=False` skips the schema check for callers whose
+        input was already validated (the executor runs validated plans).
+        Provider tools get `tenant_id` so they use that tenant's tokens.
+        """
+        if validate and self.validator is not None:
+            from jsonschema.exceptions import best_match
+
+            error = best_match(self.validator.iter_errors(args))
+            if error is not None:
+                where = ".".join(str(p) for p in error.absolute_path) or "input"
+                raise ToolInputError(f"{self.spec.name}: {where}: {error.message}")
+
+        kwargs = self.spec.build_kwargs(args)
+        if self.spec.uses_results:
+            kwargs["results"] = results or {}
+        if self.spec.provider:
+            kwargs["tenant_id"] = tenant_id
+        return await self.func(**kwargs, deadline_at=deadline_at)
+
+
+def mock_tools_enabled() -> bool:
+    # true = every tool runs against the in-process fake backend (app/services/mock_backend)
+    return os.getenv("MOCK_TOOLS", "false").lower() == "true"
+
+
+# Dispatch tables, filled lazily: a handler's module (and its schema validator)
+# is only loaded the first time that tool is called
+_HANDLERS: Dict[str, ToolHandler] = {}
+_MOCK_HANDLERS: Dict[str, ToolHandler] = {}
+
+
+def _load(name: str, mock: bool = False) -> ToolHandler:
+    spec = TOOL_REGISTRY.get(name)
+    if spec is None:
+        raise UnknownToolError(name)
+
+    if mock:
+        from app.services.mock_backend.tools import mock_handler_for
+        func = mock_handler_for(name)
+    else:
+        module_path, _, func_name = spec.handler.partition(":")
+        func = getattr(importlib.import_module(module_path), func_name)
+
+    validator = None
+    if spec.input_schema.get("properties") or spec.input_schema.get("required"):
+        from jsonschema.validators import validator_for
+
+        cls = validator_for(spec.input_schema)
+        cls.check_schema(spec.input_schema)
+        validator = cls(spec.input_schema)
+    return ToolHandler(spec=spec, func=func, validator=validator)
+
+
+def get_handler(name: str) -> ToolHandler:
+    """O(1) handler lookup; raises UnknownToolError for unregistered names"""
+    mock = mock_tools_enabled()
+    table = _MOCK_HANDLERS if mock else _HANDLERS
+    handler = table.get(name)
+    if handler is None:
+        handler = table[name] = _load(name, mock)
+    return handler
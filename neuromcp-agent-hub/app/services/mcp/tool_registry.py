@@ -1,33 +1,176 @@
+"""
+Unified tool registry
+The single place a built-in tool is defined. Each entry declares its schema
+(what the planner sees and the validator checks), its handler as a
+"module:function" path (imported on first call), risk / read-only /
+approval flags, how step input maps onto handler arguments, and per-tool
+behavior such as rate limits. Discovery, the validator, the executor and
+the MCP endpoint all read from here.
+
+Adding a tool = one register_tool(ToolSpec(...)) call.
+"""
 from __future__ import annotations
-from typing import Any, Dict, List
-
-TOOL_REGISTRY: List[Dict[str, Any]] = [
-    {
-        "name": "slack.post_message",
-        "description": "Post a message to a Slack channel.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "channel": {"type": "string"},
-                "text": {"type": "string"},
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    name: str
+    description: str
+    handler: str                      # "module:function", imported lazily
+    input_schema: Dict[str, Any] = field(default_factory=lambda: {"type": "object", "properties": {}})
+    risk: str = "low"                 # low | medium | high
+    read_only: bool = False
+    requires_approval: bool = False
+    # step input key -> handler kwarg (keys not listed pass through unchanged)
+    arg_map: Dict[str, str] = field(default_factory=dict)
+    # values used when the step input omits a key
+    defaults: Dict[str, Any] = field(default_factory=dict)
+    # handler also receives `results` (earlier step outputs in the run)
+    uses_results: bool = False
+    rate_limit: Optional[Tuple[int, int]] = None   # (max calls, window seconds)
+    provider: Optional[str] = None    # upstream API whose circuit breaker gates this tool
+    log_start: Optional[str] = None   # DEBUG line before the call, formatted with the input
+    log_done: str = "✅ Tool {tool} executed"  # INFO line after, formatted with the result
+
+    def describe(self) -> Dict[str, Any]:
+        """What discovery / GET /mcp/tools / the planner prompt see"""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "input_schema": self.input_schema,
+            "risk": self.risk,
+            "read_only": self.read_only,
+            "requires_approval": self.requires_approval,
+        }
+
+    def build_kwargs(self, step_input: Dict[str, Any]) -> Dict[str, Any]:
+        """Step input -> handler kwargs: defaults filled, keys renamed, unknown keys dropped"""
+        known = self.input_schema.get("properties", {})
+        merged = {**self.defaults, **{k: v for k, v in step_input.items() if k in known}}
+        return {self.arg_map.get(k, k): v for k, v in merged.items()}
+
+
+TOOL_REGISTRY: Dict[str, ToolSpec] = {}
+
+
+def register_tool(spec: ToolSpec) -> ToolSpec:
+    TOOL_REGISTRY[spec.name] = spec
+    return spec
+
+
+def get_tool_spec(name: str) -> Optional[ToolSpec]:
+    return TOOL_REGISTRY.get(name)
+
+
+def list_tool_specs() -> List[Dict[str, Any]]:
+    """Public descriptions of every registered tool (no handler paths)"""
+    return [spec.describe() for spec in TOOL_REGISTRY.values()]
+
+
+# ============================
+# Built-in tools
+# ============================
+
+register_tool(ToolSpec(
+    name="calendar.create_event",
+    description="Create a calendar event. Attendees should be provided as an array of email address strings.",
+    handler="app.services.tools.calendar_tool:create_calendar_event",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "title": {"type": "string", "description": "Event title"},
+            "start_time": {"type": "string", "description": "ISO format datetime (e.g., 2026-01-30T16:00:00+05:30)"},
+            "end_time": {"type": "string", "description": "ISO format datetime"},
+            "description": {"type": "string", "description": "Event description (optional)"},
+            "attendees": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "List of attendee email addresses (e.g., ['user@example.com'])"
             },
-            "required": ["channel", "text"],
-            "additionalProperties": False,
+            "timezone": {"type": "string", "description": "Timezone (default: Asia/Kolkata)"}
         },
+        "required": ["title", "start_time", "end_time"]
     },
-    {
-        "name": "calendar.create_event",
-        "description": "Create an event in Google Calendar.",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "title": {"type": "string"},
-                "start_time": {"type": "string"},
-                "end_time": {"type": "string"},
-                "timezone": {"type": "string"},
-            },
-            "required": ["title", "start_time", "end_time", "timezone"],
-            "additionalProperties": False,
+    risk="medium",
+    defaults={"title": "Meeting", "description": "", "attendees": [], "timezone": "Asia/Kolkata"},
+    rate_limit=(50, 3600),
+    log_start="Creating calendar event: {title}",
+    provider="google",
+    log_done="✅ Event created: {event_id}",
+))
+
+register_tool(ToolSpec(
+    name="calendar.list_events",
+    description="List upcoming Google Calendar events",
+    handler="app.services.tools.calendar_tool:list_calendar_events",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "max_results": {"type": "integer", "description": "Maximum number of events (default 10)"},
+            "time_min": {"type": "string", "description": "Only events after this ISO datetime"}
+        }
+    },
+    read_only=True,
+    defaults={"max_results": 10},
+    provider="google",
+    log_done="✅ Retrieved {count} events",
+))
+
+register_tool(ToolSpec(
+    name="slack.post_message",
+    description="Post a message to a Slack channel",
+    handler="app.services.tools.slack_tool:post_slack_message",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "channel": {"type": "string"},
+            "text": {"type": "string"},
+            "thread_ts": {"type": "string", "description": "Reply in this thread (optional)"}
         },
+        "required": ["channel", "text"]
+    },
+    risk="medium",
+    defaults={"channel": "#general", "text": ""},
+    rate_limit=(50, 3600),
+    log_start="Posting to Slack: {channel}",
+    provider="slack",
+    log_done="✅ Message posted to Slack",
+))
+
+register_tool(ToolSpec(
+    name="slack.read_messages",
+    description="Read messages from a Slack channel",
+    handler="app.services.tools.slack_tool:read_slack_messages",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "channel": {"type": "string"},
+            "limit": {"type": "integer"}
+        }
     },
-]
+    read_only=True,
+    defaults={"channel": "#general", "limit": 100},
+    log_start="Reading messages from {channel}...",
+    provider="slack",
+    log_done="✅ Retrieved {count} messages",
+))
+
+register_tool(ToolSpec(
+    name="slack.summarize_messages",
+    description="Summarize Slack messages using AI",
+    handler="app.services.ai.summarizer:summarize_messages_tool",
+    read_only=True,
+    uses_results=True,
+    log_done="✅ Summary generated",
+))
+
+register_tool(ToolSpec(
+    name="slack.list_channels",
+    description="List Slack channels",
+    handler="app.services.tools.slack_tool:list_slack_channels",
+    read_only=True,
+    provider="slack",
+    log_done="✅ Retrieved {count} channels",
+))
@@ -0,0 +1,214 @@
+"""
+Fake Slack / Google Calendar backend
+In-memory workspace (channels, message histories, calendar events) whose
+calls take a sampled latency and fail at the profile's error / 429 rates.
+Shared by the in-process mock tools (MOCK_TOOLS=true) and the HTTP
+stand-in server, so both behave the same way.
+"""
+from __future__ import annotations
+import asyncio
+import itertools
+import random
+import string
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.services.mock_backend.profile import MockProfile, load_profile
+from app.utils.deadline import DeadlineExceeded, timeout_for
+
+BASE_CHANNELS = ["general", "random", "engineering", "design", "standup", "releases"]
+
+
+class MockAPIError(RuntimeError):
+    """An injected HTTP failure (5xx, or 429 with Retry-After)"""
+
+    def __init__(self, endpoint: str, status_code: int, retry_after_s: Optional[float] = None):
+        detail = "rate limited" if status_code == 429 else "server error"
+        suffix = f" (retry after {retry_after_s:g}s)" if retry_after_s is not None else ""
+        super().__init__(f"{endpoint}: HTTP {status_code} {detail}{suffix}")
+        self.endpoint = endpoint
+        self.status_code = status_code
+        self.retry_after_s = retry_after_s
+
+
+class MockBackend:
+    def __init__(self, profile: Optional[MockProfile] = None):
+        self.profile = profile or load_profile()
+        self.rng = random.Random(self.profile.seed)
+        self._ids = itertools.count(1)
+        self.channels = self._make_channels()
+        self._by_name = {c["name"]: c for c in self.channels}
+        self._by_id = {c["id"]: c for c in self.channels}
+        self._history: Dict[str, List[Dict[str, Any]]] = {}
+        self.events: List[Dict[str, Any]] = self._make_events()
+        self.calls: Dict[str, Counter] = defaultdict(Counter)
+
+    # ----------------------------
+    # Fault / latency injection
+    # ----------------------------
+
+    async def hit(self, endpoint: str, deadline_at: Optional[float] = None) -> None:
+        """Wait the sampled latency, then raise the sampled fault (if any)"""
+        outcome = self.profile.decide(endpoint, self.rng)
+        wait = timeout_for(deadline_at, outcome.delay_s) if deadline_at else outcome.delay_s
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if wait < outcome.delay_s:
+            self.calls[endpoint]["timeout"] += 1
+            raise DeadlineExceeded("Run deadline exceeded")
+
+        self.calls[endpoint][outcome.status] += 1
+        if not outcome.ok:
+            raise MockAPIError(endpoint, outcome.status, outcome.retry_after_s)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "profile": self.profile.name,
+            "calls": {ep: {str(k): v for k, v in c.items()} for ep, c in self.calls.items()},
+            "messages_posted": sum(1 for h in self._history.values() for m in h if m.get("mock_posted")),
+            "events": len(self.events),
+        }
+
+    # ----------------------------
+    # Generated data
+    # ----------------------------
+
+    def _words(self, n: int) -> str:
+        return " ".join(
+            "".join(self.rng.choices(string.ascii_lowercase, k=self.rng.randint(2, 9))) for _ in range(n)
+        )
+
+    def _make_channels(self) -> List[Dict[str, Any]]:
+        names = BASE_CHANNELS[: self.profile.channel_count]
+        names += [f"channel-{i}" for i in range(len(names), self.profile.channel_count)]
+        return [
+            {"id": f"C{10000000 + i}", "name": name, "is_private": False, "is_member": True}
+            for i, name in enumerate(names)
+        ]
+
+    def _make_history(self, channel_id: str) -> List[Dict[str, Any]]:
+        lo, hi = self.profile.message_words
+        now = time.time()
+        n = self.profile.history_length
+        return [
+            {
+                "type": "message",
+                "user": f"U{self.rng.randint(10**7, 10**8 - 1)}",
+                "text": self._words(self.rng.randint(lo, hi)),
+                "ts": f"{now - (n - i) * 60:.6f}",
+            }
+            for i in range(n)
+        ]
+
+    def _make_events(self) -> List[Dict[str, Any]]:
+        start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        return [
+            self._event_resource(
+                f"Mock event {i + 1}",
+                (start + timedelta(hours=6 * (i + 1))).isoformat(),
+                (start + timedelta(hours=6 * (i + 1), minutes=30)).isoformat(),
+            )
+            for i in range(self.profile.event_count)
+        ]
+
+    def _event_resource(self, summary: str, start: str, end: str, event_id: Optional[str] = None, **extra: Any) -> Dict[str, Any]:
+        event_id = event_id or f"mockevt{next(self._ids):06d}"
+        return {
+            "id": event_id,
+            "status": "confirmed",
+            "htmlLink": f"https://calendar.example.invalid/event?eid={event_id}",
+            "summary": summary,
+            "start": {"dateTime": start},
+            "end": {"dateTime": end},
+            "created": datetime.now(timezone.utc).isoformat(),
+            **extra,
+        }
+
+    # ----------------------------
+    # Slack Web API (response bodies as Slack returns them)
+    # ----------------------------
+
+    def resolve_channel(self, channel: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(channel) or self._by_name.get(channel.lstrip("#"))
+
+    def history(self, channel_id: str) -> List[Dict[str, Any]]:
+        if channel_id not in self._history:
+            self._history[channel_id] = self._make_history(channel_id)
+        return self._history[channel_id]
+
+    def slack_post_message(self, channel: str, text: str, thread_ts: Optional[str] = None) -> Dict[str, Any]:
+        ch = self.resolve_channel(channel or "")
+        if ch is None:
+            return {"ok": False, "error": "channel_not_found"}
+        ts = f"{time.time():.6f}"
+        message = {"type": "message", "user": "UMOCKBOT", "text": text, "ts": ts, "mock_posted": True}
+        if thread_ts:
+            message["thread_ts"] = thread_ts
+        self.history(ch["id"]).append(message)
+        return {"ok": True, "channel": ch["id"], "ts": ts, "message": {k: v for k, v in message.items() if k != "mock_posted"}}
+
+    def slack_list_channels(self) -> Dict[str, Any]:
+        return {"ok": True, "channels": self.channels}
+
+    def slack_history(self, channel: str, limit: int = 100) -> Dict[str, Any]:
+        ch = self.resolve_channel(channel or "")
+        if ch is None:
+            return {"ok": False, "error": "channel_not_found"}
+        newest_first = list(reversed(self.history(ch["id"])))[: max(1, int(limit))]
+        return {"ok": True, "messages": [{k: v for k, v in m.items() if k != "mock_posted"} for m in newest_first]}
+
+    # ----------------------------
+    # Google Calendar / OAuth
+    # ----------------------------
+
+    def calendar_insert(self, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """New event; None when a client-supplied id already exists (Google answers 409)"""
+        if body.get("id") and self.calendar_get(body["id"]) is not None:
+            return None
+        extra = {k: body[k] for k in ("description", "attendees") if k in body}
+        event = self._event_resource(
+            body.get("summary", ""),
+            (body.get("start") or {}).get("dateTime", ""),
+            (body.get("end") or {}).get("dateTime", ""),
+            event_id=body.get("id"),
+            **extra,
+        )
+        self.events.append(event)
+        return event
+
+    def calendar_get(self, event_id: str) -> Optional[Dict[str, Any]]:
+        return next((e for e in self.events if e["id"] == event_id), None)
+
+    def calendar_list(self, max_results: int = 10, time_min: Optional[str] = None) -> Dict[str, Any]:
+        items = self.events
+        if time_min:
+            items = [e for e in items if e["start"]["dateTime"] >= time_min]
+        items = sorted(items, key=lambda e: e["start"]["dateTime"])[: max(1, int(max_results))]
+        return {"kind": "calendar#events", "items": items}
+
+    def oauth_token(self) -> Dict[str, Any]:
+        return {
+            "access_token": f"mock-access-{next(self._ids)}",
+            "expires_in": 3600,
+            "token_type": "Bearer",
+            "scope": "https://www.googleapis.com/auth/calendar.events",
+        }
+
+
+_backend: Optional[MockBackend] = None
+
+
+def get_backend() -> MockBackend:
+    global _backend
+    if _backend is None:
+        _backend = MockBackend()
+    return _backend
+
+
+def reset_backend(profile: Optional[MockProfile] = None) -> MockBackend:
+    """Fresh workspace and counters (optionally with a different profile)"""
+    global _backend
+    _backend = MockBackend(profile)
+    return _backend
@@ -0,0 +1,172 @@
+"""
+Mock backend profiles
+Describe how the fake Slack / Google backends behave: latency distribution,
+error and 429 rates (with Retry-After) per endpoint, and payload sizes.
+
+MOCK_PROFILE selects one:
+    MOCK_PROFILE=realistic                     # a preset (see PRESETS)
+    MOCK_PROFILE='{"default": {...}, ...}'     # inline JSON
+    MOCK_PROFILE=@profiles/peak.json           # JSON file
+
+Profile JSON:
+    {
+      "seed": 7,
+      "history_length": 500, "channel_count": 40, "event_count": 25,
+      "message_words": [5, 40],
+      "default": {"latency_ms": {"dist": "lognormal", "median": 120, "sigma": 0.5},
+                  "error_rate": 0.01, "rate_limit_rate": 0.02, "retry_after_s": 2},
+      "endpoints": {"chat.postMessage": {"latency_ms": {"dist": "uniform", "min": 80, "max": 300}}}
+    }
+Endpoint names: chat.postMessage, conversations.list, conversations.history,
+calendar.events.insert, calendar.events.list, oauth.token, llm.summarize.
+"""
+from __future__ import annotations
+import json
+import math
+import os
+import random
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+LATENCY_DISTS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+
+@dataclass(frozen=True)
+class LatencySpec:
+    dist: str = "fixed"
+    ms: float = 0.0          # fixed
+    min: float = 0.0         # uniform
+    max: float = 0.0
+    mean: float = 0.0        # normal / exponential
+    std: float = 0.0         # normal
+    median: float = 0.0      # lognormal
+    sigma: float = 0.5
+    cap_ms: Optional[float] = None  # clip long tails
+
+    def __post_init__(self):
+        if self.dist not in LATENCY_DISTS:
+            raise ValueError(f"Unknown latency distribution {self.dist!r} (expected one of {LATENCY_DISTS})")
+
+    def sample_s(self, rng: random.Random) -> float:
+        if self.dist == "fixed":
+            ms = self.ms
+        elif self.dist == "uniform":
+            ms = rng.uniform(self.min, self.max)
+        elif self.dist == "normal":
+            ms = rng.gauss(self.mean, self.std)
+        elif self.dist == "lognormal":
+            ms = rng.lognormvariate(math.log(max(self.median, 1e-6)), self.sigma)
+        else:
+            ms = rng.expovariate(1.0 / self.mean) if self.mean > 0 else 0.0
+        if self.cap_ms is not None:
+            ms = min(ms, self.cap_ms)
+        return max(ms, 0.0) / 1000.0
+
+
+@dataclass(frozen=True)
+class EndpointProfile:
+    latency: LatencySpec = field(default_factory=LatencySpec)
+    error_rate: float = 0.0        # -> HTTP 5xx
+    rate_limit_rate: float = 0.0   # -> HTTP 429 + Retry-After
+    retry_after_s: float = 1.0
+    error_status: int = 503
+
+
+@dataclass(frozen=True)
+class Outcome:
+    delay_s: float
+    status: int = 200
+    retry_after_s: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200
+
+
+@dataclass(frozen=True)
+class MockProfile:
+    name: str = "custom"
+    seed: Optional[int] = None
+    history_length: int = 50
+    channel_count: int = 8
+    event_count: int = 10
+    message_words: Tuple[int, int] = (5, 40)
+    default: EndpointProfile = field(default_factory=EndpointProfile)
+    endpoints: Dict[str, EndpointProfile] = field(default_factory=dict)
+
+    def for_endpoint(self, endpoint: str) -> EndpointProfile:
+        return self.endpoints.get(endpoint, self.default)
+
+    def decide(self, endpoint: str, rng: random.Random) -> Outcome:
+        """Draw latency and fault for one call"""
+        ep = self.for_endpoint(endpoint)
+        delay = ep.latency.sample_s(rng)
+        roll = rng.random()
+        if roll < ep.rate_limit_rate:
+            return Outcome(delay, 429, ep.retry_after_s)
+        if roll < ep.rate_limit_rate + ep.error_rate:
+            return Outcome(delay, ep.error_status)
+        return Outcome(delay)
+
+
+def _endpoint_from_dict(data: Dict[str, Any], base: Optional[EndpointProfile] = None) -> EndpointProfile:
+    base = base or EndpointProfile()
+    data = dict(data)
+    latency = data.pop("latency_ms", None)
+    if latency is not None:
+        data["latency"] = LatencySpec(**latency)
+    return replace(base, **data)
+
+
+def profile_from_dict(data: Dict[str, Any], name: str = "custom") -> MockProfile:
+    data = dict(data)
+    default = _endpoint_from_dict(data.pop("default", {}))
+    endpoints = {k: _endpoint_from_dict(v, default) for k, v in data.pop("endpoints", {}).items()}
+    if "message_words" in data:
+        data["message_words"] = tuple(data["message_words"])
+    return MockProfile(name=data.pop("name", name), default=default, endpoints=endpoints, **data)
+
+
+PRESETS: Dict[str, Dict[str, Any]] = {
+    # No latency, no faults: functional tests
+    "instant": {},
+    # Typical production latencies, rare faults
+    "realistic": {
+        "history_length": 200,
+        "channel_count": 25,
+        "event_count": 20,
+        "default": {"latency_ms": {"dist": "lognormal", "median": 150, "sigma": 0.4, "cap_ms": 3000},
+                    "error_rate": 0.005, "rate_limit_rate": 0.005, "retry_after_s": 1},
+        "endpoints": {
+            "chat.postMessage": {"latency_ms": {"dist": "lognormal", "median": 220, "sigma": 0.35, "cap_ms": 3000}},
+            "conversations.history": {"latency_ms": {"dist": "lognormal", "median": 300, "sigma": 0.5, "cap_ms": 5000}},
+            "calendar.events.insert": {"latency_ms": {"dist": "lognormal", "median": 350, "sigma": 0.4, "cap_ms": 5000}},
+            "llm.summarize": {"latency_ms": {"dist": "lognormal", "median": 900, "sigma": 0.3, "cap_ms": 8000}},
+        },
+    },
+    # Retries and breakers: frequent 5xx and 429s
+    "flaky": {
+        "default": {"latency_ms": {"dist": "uniform", "min": 20, "max": 200},
+                    "error_rate": 0.15, "rate_limit_rate": 0.15, "retry_after_s": 1},
+    },
+    # Provider under load: slow long tail, heavy throttling, big histories
+    "overloaded": {
+        "history_length": 1000,
+        "default": {"latency_ms": {"dist": "exponential", "mean": 800, "cap_ms": 15000},
+                    "error_rate": 0.05, "rate_limit_rate": 0.3, "retry_after_s": 5},
+    },
+}
+
+
+def load_profile(spec: Optional[str] = None) -> MockProfile:
+    """Preset name, inline JSON or @path (default: MOCK_PROFILE env, else "instant")"""
+    spec = (spec if spec is not None else os.getenv("MOCK_PROFILE", "instant")).strip() or "instant"
+    if spec in PRESETS:
+        return profile_from_dict(PRESETS[spec], name=spec)
+    if spec.startswith("@"):
+        path = Path(spec[1:])
+        return profile_from_dict(json.loads(path.read_text(encoding="utf-8")), name=path.stem)
+    if spec.startswith("{"):
+        return profile_from_dict(json.loads(spec))
+    raise ValueError(f"Unknown MOCK_PROFILE {spec!r}: use one of {sorted(PRESETS)}, inline JSON or @file.json")
@@ -0,0 +1,226 @@
+"""
+Local HTTP stand-in for the Slack Web API and Google Calendar / OAuth
+Serves the endpoints the real tool modules call, with the active profile's
+latency and faults (5xx, 429 + Retry-After). Point the app at it with:
+
+    SLACK_API_BASE=http://127.0.0.1:8765/api
+    GOOGLE_CALENDAR_API=http://127.0.0.1:8765/calendar/v3
+    GOOGLE_TOKEN_URL=http://127.0.0.1:8765/token
+
+Usage:
+    python -m app.services.mock_backend.server --port 8765 --profile realistic
+
+Any non-empty bearer token is accepted; the token "expired" gets a 401 from
+Calendar (exercises the refresh path). GET /_mock/stats shows per-endpoint
+counts, POST /_mock/profile swaps the profile (preset name or JSON body).
+
+It also stands in for an OTLP collector: point TRACE_EXPORTER=otlp and
+TRACE_OTLP_ENDPOINT at it; POST /v1/traces (OTLP/HTTP JSON) keeps the last
+spans in memory, GET /_mock/traces?trace_id=... returns them.
+"""
+from __future__ import annotations
+import argparse
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.services.mock_backend.backend import MockAPIError, get_backend, reset_backend
+from app.services.mock_backend.profile import load_profile, profile_from_dict
+
+app = FastAPI(title="NeuroMCP mock Slack/Google backend")
+
+COLLECTED_SPANS_MAX = 10000
+_spans: Deque[Dict[str, Any]] = deque(maxlen=COLLECTED_SPANS_MAX)
+
+
+def _bearer(request: Request) -> Optional[str]:
+    auth = request.headers.get("authorization", "")
+    return auth[7:].strip() or None if auth.lower().startswith("bearer ") else None
+
+
+def _fault_response(e: MockAPIError, slack: bool) -> JSONResponse:
+    headers = {}
+    if e.retry_after_s is not None:
+        headers["Retry-After"] = str(max(1, math.ceil(e.retry_after_s)))
+    if slack:
+        body = {"ok": False, "error": "ratelimited" if e.status_code == 429 else "internal_error"}
+    else:
+        reason = "rateLimitExceeded" if e.status_code == 429 else "backendError"
+        body = {"error": {"code": e.status_code, "message": str(e), "errors": [{"reason": reason}]}}
+    return JSONResponse(status_code=e.status_code, content=body, headers=headers)
+
+
+async def _params(request: Request) -> Dict[str, Any]:
+    """Slack accepts query string, form or JSON bodies"""
+    params: Dict[str, Any] = dict(request.query_params)
+    if request.method == "POST":
+        ctype = request.headers.get("content-type", "")
+        if "json" in ctype:
+            params.update(await request.json())
+        elif ctype:
+            params.update(dict(await request.form()))
+    return params
+
+
+# ============================
+# Slack Web API
+# ============================
+
+@app.api_route("/api/{method}", methods=["GET", "POST", "HEAD"])
+async def slack_method(method: str, request: Request):
+    backend = get_backend()
+    if method == "api.test":
+        return {"ok": True}
+
+    try:
+        await backend.hit(method)
+    except MockAPIError as e:
+        return _fault_response(e, slack=True)
+
+    params = await _params(request)
+    if method == "oauth.v2.access":
+        return {"ok": True, "access_token": backend.oauth_token()["access_token"], "token_type": "bot"}
+    if not _bearer(request):
+        return {"ok": False, "error": "not_authed"}
+
+    if method == "chat.postMessage":
+        return backend.slack_post_message(params.get("channel", ""), params.get("text", ""), params.get("thread_ts"))
+    if method == "conversations.list":
+        return backend.slack_list_channels()
+    if method == "conversations.history":
+        return backend.slack_history(params.get("channel", ""), int(params.get("limit", 100)))
+    return {"ok": False, "error": "unknown_method"}
+
+
+# ============================
+# Google Calendar + OAuth
+# ============================
+
+def _google_auth_error(request: Request) -> Optional[JSONResponse]:
+    token = _bearer(request)
+    if not token or token == "expired":
+        return JSONResponse(status_code=401, content={"error": {"code": 401, "message": "Invalid Credentials"}})
+    return None
+
+
+@app.post("/calendar/v3/calendars/{calendar_id}/events")
+async def calendar_insert(calendar_id: str, request: Request):
+    backend = get_backend()
+    try:
+        await backend.hit("calendar.events.insert")
+    except MockAPIError as e:
+        return _fault_response(e, slack=False)
+    auth_error = _google_auth_error(request)
+    if auth_error:
+        return auth_error
+    event = backend.calendar_insert(await request.json())
+    if event is None:
+        return JSONResponse(status_code=409, content={"error": {
+            "code": 409, "message": "The requested identifier already exists.", "errors": [{"reason": "duplicate"}]}})
+    return event
+
+
+@app.get("/calendar/v3/calendars/{calendar_id}/events")
+async def calendar_list(calendar_id: str, request: Request, maxResults: int = 10, timeMin: Optional[str] = None):
+    backend = get_backend()
+    try:
+        await backend.hit("calendar.events.list")
+    except MockAPIError as e:
+        return _fault_response(e, slack=False)
+    return _google_auth_error(request) or backend.calendar_list(maxResults, timeMin)
+
+
+@app.get("/calendar/v3/calendars/{calendar_id}/events/{event_id}")
+async def calendar_get(calendar_id: str, event_id: str, request: Request):
+    backend = get_backend()
+    try:
+        await backend.hit("calendar.events.get")
+    except MockAPIError as e:
+        return _fault_response(e, slack=False)
+    auth_error = _google_auth_error(request)
+    if auth_error:
+        return auth_error
+    event = backend.calendar_get(event_id)
+    if event is None:
+        return JSONResponse(status_code=404, content={"error": {"code": 404, "message": "Not Found"}})
+    return event
+
+
+@app.head("/calendar/v3")
+async def calendar_root():
+    return JSONResponse(content={})
+
+
+@app.post("/token")
+async def oauth_token():
+    backend = get_backend()
+    try:
+        await backend.hit("oauth.token")
+    except MockAPIError as e:
+        return _fault_response(e, slack=False)
+    return backend.oauth_token()
+
+
+# ============================
+# OTLP collector stand-in
+# ============================
+
+@app.post("/v1/traces")
+async def otlp_traces(request: Request):
+    body = await request.json()
+    accepted = 0
+    for resource_spans in body.get("resourceSpans", []):
+        attrs = resource_spans.get("resource", {}).get("attributes", [])
+        service = next((a["value"].get("stringValue") for a in attrs if a.get("key") == "service.name"), None)
+        for scope_spans in resource_spans.get("scopeSpans", []):
+            for span in scope_spans.get("spans", []):
+                _spans.append({"service": service, **span})
+                accepted += 1
+    return {"partialSuccess": {}, "accepted": accepted}
+
+
+@app.get("/_mock/traces")
+async def mock_traces(trace_id: Optional[str] = None):
+    spans = [s for s in _spans if trace_id is None or s.get("traceId") == trace_id]
+    return {"count": len(spans), "spans": spans}
+
+
+# ============================
+# Control
+# ============================
+
+@app.get("/_mock/stats")
+async def mock_stats():
+    return get_backend().stats()
+
+
+@app.post("/_mock/profile")
+async def mock_profile(request: Request):
+    body = await request.json()
+    profile = load_profile(body) if isinstance(body, str) else profile_from_dict(body)
+    reset_backend(profile)
+    return {"ok": True, "profile": profile.name}
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local Slack/Google stand-in with latency and fault injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profile", default=None, help="preset name, inline JSON or @file.json (default: MOCK_PROFILE)")
+    args = parser.parse_args()
+
+    reset_backend(load_profile(args.profile))
+    print(f"Mock backend ({get_backend().profile.name}) on http://{args.host}:{args.port}")
+    print(f"  SLACK_API_BASE=http://{args.host}:{args.port}/api")
+    print(f"  GOOGLE_CALENDAR_API=http://{args.host}:{args.port}/calendar/v3")
+    print(f"  GOOGLE_TOKEN_URL=http://{args.host}:{args.port}/token")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+In-process mock tool handlers (MOCK_TOOLS=true)
+Same signatures and return shapes as the real handlers in
+app/services/tools, backed by the fake workspace in backend.py. No tokens,
+no network: latency and faults come from the active MockProfile. Every
+tenant shares the one fake workspace (tenant_id is accepted and ignored).
+"""
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.mock_backend.backend import get_backend
+from app.utils.tenant import DEFAULT_TENANT
+
+
+def _check_slack(result: Dict[str, Any], channel: str) -> Dict[str, Any]:
+    if not result.get("ok"):
+        error = result.get("error", "unknown_error")
+        if error == "channel_not_found":
+            raise RuntimeError(f"Channel '{channel}' not found")
+        raise RuntimeError(f"Slack error: {error}")
+    return result
+
+
+async def post_slack_message(
+    channel: str,
+    text: str,
+    thread_ts: str = None,
+    tenant_id: str = DEFAULT_TENANT,
+    deadline_at: Optional[float] = None
+) -> Dict[str, Any]:
+    backend = get_backend()
+    await backend.hit("chat.postMessage", deadline_at)
+    result = _check_slack(backend.slack_post_message(channel, text, thread_ts), channel)
+    return {
+        "success": True,
+        "mock": True,
+        "channel": result["channel"],
+        "ts": result["ts"],
+        "message": {"text": text, "timestamp": result["ts"]},
+    }
+
+
+async def list_slack_channels(
+    deadline_at: Optional[float] = None,
+    tenant_id: str = DEFAULT_TENANT
+) -> Dict[str, Any]:
+    backend = get_backend()
+    await backend.hit("conversations.list", deadline_at)
+    channels = backend.slack_list_channels()["channels"]
+    return {
+        "success": True,
+        "mock": True,
+        "count": len(channels),
+        "channels": [
+            {"id": ch["id"], "name": ch["name"], "is_private": ch["is_private"], "is_member": ch["is_member"]}
+            for ch in channels
+        ],
+    }
+
+
+async def read_slack_messages(
+    channel: str,
+    limit: int = 100,
+    tenant_id: str = DEFAULT_TENANT,
+    deadline_at: Optional[float] = None
+) -> Dict[str, Any]:
+    backend = get_backend()
+    await backend.hit("conversations.history", deadline_at)
+    result = _check_slack(backend.slack_history(channel, limit), channel)
+    messages: List[Dict[str, Any]] = [
+        {"text": m.get("text", ""), "user": m.get("user", "unknown"), "timestamp": m.get("ts", ""), "type": "message"}
+        for m in result["messages"]
+        if m.get("type") == "message" and m.get("text") and not m.get("subtype")
+    ]
+    return {"success": True, "mock": True, "channel": channel, "count": len(messages), "messages": messages}
+
+
+async def create_calendar_event(
+    title: str,
+    start_time: str,
+    end_time: str,
+    description: str = "",
+    attendees: list = None,
+    timezone: str = "Asia/Kolkata",
+    tenant_id: str = DEFAULT_TENANT,
+    deadline_at: Optional[float] = None
+) -> Dict[str, Any]:
+    backend = get_backend()
+    await backend.hit("calendar.events.insert", deadline_at)
+    body = {
+        "summary": title,
+        "description": description or f"Event: {title}",
+        "start": {"dateTime": start_time, "timeZone": timezone},
+        "end": {"dateTime": end_time, "timeZone": timezone},
+    }
+    if attendees:
+        body["attendees"] = [{"email": email} for email in attendees]
+    event = backend.calendar_insert(body)
+    return {
+        "success": True,
+        "mock": True,
+        "event_id": event["id"],
+        "html_link": event["htmlLink"],
+        "summary": event["summary"],
+        "start": event["start"]["dateTime"],
+        "end": event["end"]["dateTime"],
+        "created": event["created"],
+    }
+
+
+async def list_calendar_events(
+    max_results: int = 10,
+    time_min: str = None,
+    tenant_id: str = DEFAULT_TENANT,
+    deadline_at: Optional[float] = None
+) -> Dict[str, Any]:
+    backend = get_backend()
+    await backend.hit("calendar.events.list", deadline_at)
+    events = backend.calendar_list(max_results, time_min)["items"]
+    return {
+        "success": True,
+        "mock": True,
+        "count": len(events),
+        "events": [
+            {
+                "id": e["id"],
+                "summary": e["summary"],
+                "start": e["start"]["dateTime"],
+                "end": e["end"]["dateTime"],
+                "html_link": e["htmlLink"],
+            }
+            for e in events
+        ],
+    }
+
+
+async def summarize_messages_tool(
+    results: Optional[Dict[str, Any]] = None,
+    deadline_at: Optional[float] = None
+) -> Dict[str, Any]:
+    messages = next(
+        (r["messages"] for r in (results or {}).values() if isinstance(r, dict) and "messages" in r),
+        [],
+    )
+    if not messages:
+        raise RuntimeError("No messages found to summarize.")
+    await get_backend().hit("llm.summarize", deadline_at)
+    return {
+        "success": True,
+        "mock": True,
+        "summary": f"Mock summary of {len(messages)} messages.",
+        "message_count": len(messages),
+    }
+
+
+MOCK_HANDLERS: Dict[str, Callable[..., Any]] = {
+    "slack.post_message": post_slack_message,
+    "slack.list_channels": list_slack_channels,
+    "slack.read_messages": read_slack_messages,
+    "slack.summarize_messages": summarize_messages_tool,
+    "calendar.create_event": create_calendar_event,
+    "calendar.list_events": list_calendar_events,
+}
+
+
+def mock_handler_for(tool_name: str) -> Callable[..., Any]:
+    """Mock for a registered tool; tools without one get a generic echo"""
+    if tool_name in MOCK_HANDLERS:
+        return MOCK_HANDLERS[tool_name]
+
+    async def echo(deadline_at: Optional[float] = None, results: Any = None, **kwargs: Any) -> Dict[str, Any]:
+        await get_backend().hit(tool_name, deadline_at)
+        return {"ok": True, "mock": True, "tool": tool_name, "input": kwargs}
+
+    return echo
@@ -1,9 +1,9 @@
 # app/services/oauth/google_oauth.py
+import os
 import urllib.parse
-import httpx
 
 GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
-GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+GOOGLE_TOKEN_URL = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
 
 
 def build_google_login_url(client_id: str, redirect_uri: str, state: str):
@@ -20,7 +20,9 @@ def build_google_login_url(client_id: str, redirect_uri: str, state: str):
 
 
 async def exchange_google_code(code: str, client_id: str, client_secret: str, redirect_uri: str):
-    async with httpx.AsyncClient() as client:
+    from app.services.http.client import shared_client  # httpx loads on first use
+
+    async with shared_client() as client:
         resp = await client.post(
             GOOGLE_TOKEN_URL,
             data={
@@ -36,7 +38,15 @@ async def exchange_google_code(code: str, client_id: str, client_secret: str, re
         if "error" in data:
             raise RuntimeError(data)
 
-        return data["access_token"], data.get("refresh_token", "")
+        return data["access_token"], data.get("refresh_token", ""), data.get("expires_in")
+
+
+class TokenRefreshError(RuntimeError):
+    """Google refused a refresh grant; `error` is its OAuth error code (e.g. invalid_grant)"""
+
+    def __init__(self, error: str, description: str = ""):
+        super().__init__(f"Token refresh failed: {description or error}")
+        self.error = error
 
 
 async def refresh_google_token(refresh_token: str, client_id: str, client_secret: str):
@@ -49,21 +59,26 @@ async def refresh_google_token(refresh_token: str, client_id: str, client_secret
         client_secret: Google OAuth client secret
     
     Returns:
-        New access token (refresh token remains the same)
+        (new access token, expires_in seconds or None); the refresh token
+        remains the same
     """
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            GOOGLE_TOKEN_URL,
-            data={
-                "refresh_token": refresh_token,
-                "client_id": client_id,
-                "client_secret": client_secret,
-                "grant_type": "refresh_token"
-            }
-        )
-        data = resp.json()
+    from app.services.http.retry import request_with_retry  # httpx loads on first use
 
-        if "error" in data:
-            raise RuntimeError(f"Token refresh failed: {data.get('error_description', data.get('error'))}")
+    # A refresh grant can be replayed safely
+    resp = await request_with_retry(
+        "google", "oauth.token", "POST",
+        GOOGLE_TOKEN_URL,
+        idempotent=True,
+        data={
+            "refresh_token": refresh_token,
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "grant_type": "refresh_token"
+        }
+    )
+    data = resp.json()
+
+    if "error" in data:
+        raise TokenRefreshError(data.get("error"), data.get("error_description", ""))
 
-        return data["access_token"]
\ No newline at end of file
+    return data["access_token"], data.get("expires_in")
\ No newline at end of file
@@ -0,0 +1,245 @@
+"""
+Google access-token manager
+Keeps the current Google token (with its expiry) in memory, refreshes it
+before it expires instead of waiting for a 401, and collapses concurrent
+refreshes into ONE in-flight request so N runs hitting an expired token
+cause one refresh and one token_store write.
+
+Tokens stored before expiry tracking (no "expires_at") are used until
+Google rejects them; the 401 path then refreshes once for everybody.
+
+The in-memory token is re-read from the store (past the cache) before every
+refresh, so a token another worker already refreshed is adopted instead of
+refreshed again; a revoked grant (invalid_grant) drops it so the next call
+picks up a new login.
+
+One manager per tenant (each tenant connects its own Google account). Once
+start_google_token_managers() has run (app startup), every manager refreshes
+in the background: the default tenant's right away, others from first use.
+
+Config (env): GOOGLE_TOKEN_REFRESH_MARGIN_S (refresh this long before expiry)
+"""
+from __future__ import annotations
+import asyncio
+import os
+import time
+from typing import Any, Dict, Optional
+
+from app.utils.tenant import DEFAULT_TENANT
+
+REFRESH_MARGIN_S = float(os.getenv("GOOGLE_TOKEN_REFRESH_MARGIN_S", "300"))
+# Background loop re-checks at least this often (picks up new OAuth logins)
+MAX_SLEEP_S = 300.0
+
+
+class GoogleNotConnected(RuntimeError):
+    pass
+
+
+class GoogleTokenManager:
+    def __init__(self, margin_s: float = REFRESH_MARGIN_S, tenant_id: str = DEFAULT_TENANT):
+        self.margin_s = margin_s
+        self.tenant_id = tenant_id
+        self._doc: Optional[Dict[str, Any]] = None
+        self._inflight: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.last_error: Optional[str] = None
+
+    # ----------------------------
+    # Token access
+    # ----------------------------
+
+    async def _load(self, fresh: bool = False) -> Dict[str, Any]:
+        from app.services.oauth.token_store import get_token
+
+        doc = await get_token("google", self.tenant_id, fresh=fresh)
+        if not doc or not doc.get("access_token"):
+            self._doc = None
+            raise GoogleNotConnected("Google Calendar not connected. Please authenticate first.")
+        self._doc = dict(doc)
+        return self._doc
+
+    async def _current(self) -> Dict[str, Any]:
+        return self._doc if self._doc is not None else await self._load()
+
+    def _expiring(self, doc: Dict[str, Any]) -> bool:
+        expires_at = doc.get("expires_at")
+        return expires_at is not None and expires_at - time.time() <= self.margin_s
+
+    def set_token(self, doc: Dict[str, Any]) -> None:
+        """A new token arrived from outside (OAuth callback)"""
+        self._doc = dict(doc)
+
+    def expires_in(self) -> Optional[float]:
+        expires_at = (self._doc or {}).get("expires_at")
+        return None if expires_at is None else expires_at - time.time()
+
+    async def get_access_token(self) -> str:
+        """
+        Current token from memory. Expired -> wait for the (shared) refresh;
+        expiring within the margin -> refresh in the background, return the
+        still-valid token now.
+        """
+        doc = await self._current()
+        left = self.expires_in()
+        if left is not None and doc.get("refresh_token"):
+            if left <= 0:
+                return await self.refresh(doc["access_token"])
+            if left <= self.margin_s:
+                self._start_refresh()
+        return doc["access_token"]
+
+    async def refresh_after_401(self, rejected_token: str) -> str:
+        """Google rejected `rejected_token`: refresh once (unless someone already did)"""
+        doc = await self._current()
+        if doc.get("access_token") != rejected_token:
+            return doc["access_token"]
+        if not doc.get("refresh_token"):
+            raise GoogleNotConnected(
+                "Access token expired and no refresh token available. Please re-authenticate with Google.")
+        return await self.refresh(rejected_token)
+
+    # ----------------------------
+    # Single-flight refresh
+    # ----------------------------
+
+    def _start_refresh(self, stale: Optional[str] = None) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight
+        if inflight is None or inflight.done() or inflight.get_loop() is not loop:
+            if stale is None and self._doc is not None:
+                stale = self._doc.get("access_token")
+            inflight = self._inflight = loop.create_task(self._do_refresh(stale))
+            # background refreshes may have no awaiter: don't warn about their errors
+            inflight.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return inflight
+
+    async def refresh(self, stale: Optional[str] = None) -> str:
+        """Replace `stale` (default: the token in memory) with a fresh one"""
+        # shield: one caller timing out must not cancel everybody's refresh
+        return await asyncio.shield(self._start_refresh(stale))
+
+    async def _do_refresh(self, stale: Optional[str]) -> str:
+        from app.services.oauth.google_oauth import refresh_google_token
+        from app.services.oauth.token_store import upsert_token
+
+        doc = await self._load(fresh=True)
+        if doc["access_token"] != stale and not self._expiring(doc):
+            return doc["access_token"]  # another worker (or a new login) already replaced it
+        if not doc.get("refresh_token"):
+            raise GoogleNotConnected(
+                "Access token expired and no refresh token available. Please re-authenticate with Google.")
+        try:
+            access_token, expires_in = await refresh_google_token(
+                doc["refresh_token"],
+                os.getenv("GOOGLE_CLIENT_ID"),
+                os.getenv("GOOGLE_CLIENT_SECRET"),
+            )
+        except Exception as e:
+            self.last_error = str(e)
+            if getattr(e, "error", None) == "invalid_grant":
+                self._doc = None  # revoked: the next call re-reads the store
+            raise
+
+        new_doc = {**doc, "access_token": access_token}
+        if expires_in:
+            new_doc["expires_at"] = time.time() + float(expires_in)
+        self._doc = new_doc
+        self.refreshes += 1
+        self.last_error = None
+        await upsert_token("google", new_doc, self.tenant_id)
+        return access_token
+
+    # ----------------------------
+    # Proactive background refresh
+    # ----------------------------
+
+    def start_background_refresh(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            delay = MAX_SLEEP_S
+            try:
+                doc = await self._current()
+                left = self.expires_in()
+                if left is not None and doc.get("refresh_token"):
+                    if left <= self.margin_s:
+                        await self.refresh(doc["access_token"])
+                        left = self.expires_in()
+                    if left is not None:
+                        delay = min(MAX_SLEEP_S, max(1.0, left - self.margin_s))
+            except GoogleNotConnected:
+                self._doc = None  # re-read after the next login
+            except Exception:
+                delay = 5.0  # last_error is kept for status(); try again soon
+            await asyncio.sleep(delay)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def status(self) -> Dict[str, Any]:
+        left = self.expires_in()
+        return {
+            "loaded": self._doc is not None,
+            "expires_in_s": None if left is None else round(left),
+            "refreshes": self.refreshes,
+            "refresh_in_flight": self._inflight is not None and not self._inflight.done(),
+            "last_error": self.last_error,
+        }
+
+
+_managers: Dict[str, GoogleTokenManager] = {}
+# Loop running the background refreshes (None = proactive refresh is off)
+_refresh_loop_owner: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _start_refresh_on(loop: asyncio.AbstractEventLoop, manager: GoogleTokenManager) -> None:
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None  # called from a worker thread
+    if running is loop:
+        manager.start_background_refresh()
+    elif not loop.is_closed():
+        loop.call_soon_threadsafe(manager.start_background_refresh)
+
+
+def get_google_token_manager(tenant_id: str = DEFAULT_TENANT) -> GoogleTokenManager:
+    manager = _managers.get(tenant_id)
+    if manager is None:
+        manager = _managers[tenant_id] = GoogleTokenManager(tenant_id=tenant_id)
+        if _refresh_loop_owner is not None:
+            _start_refresh_on(_refresh_loop_owner, manager)
+    return manager
+
+
+def reset_google_token_manager(manager: Optional[GoogleTokenManager] = None) -> None:
+    """Drop every tenant's manager (tests), optionally installing `manager`"""
+    _managers.clear()
+    if manager is not None:
+        _managers[manager.tenant_id] = manager
+
+
+def start_google_token_managers() -> None:
+    """Refresh tokens before expiry: the default tenant's now, every other tenant's from first use"""
+    global _refresh_loop_owner
+    _refresh_loop_owner = asyncio.get_running_loop()
+    get_google_token_manager()
+    for manager in list(_managers.values()):
+        manager.start_background_refresh()
+
+
+async def stop_google_token_managers() -> None:
+    global _refresh_loop_owner
+    _refresh_loop_owner = None
+    for manager in list(_managers.values()):
+        await manager.stop()
@@ -0,0 +1,56 @@
+# app/services/oauth/mongo_token_store.py
+"""
+MongoDB token backend (async motor driver, shared pooled client)
+One document per (tenant_id, provider), backed by a unique compound index.
+Every call awaits the driver, so lookups never block the event loop.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from app.services.oauth.token_store import DEFAULT_TENANT, TokenStore
+
+
+class MongoTokenStore(TokenStore):
+    kind = "mongo"
+
+    def __init__(self, collection=None):
+        # collection: any motor-compatible collection (tests pass a fake)
+        self._collection = collection
+        self._indexed: Optional[asyncio.Future] = None
+
+    def namespace(self) -> str:
+        return f"mongo:{id(self)}"
+
+    async def _coll(self):
+        if self._collection is None:
+            from app.services.db.mongo import get_tokens_collection
+            self._collection = get_tokens_collection()
+        # Ensure the index once per store, shared by concurrent first callers
+        if self._indexed is None or (self._indexed.done() and self._indexed.exception() is not None):
+            self._indexed = asyncio.ensure_future(self._collection.create_index(
+                [("tenant_id", 1), ("provider", 1)], unique=True, name="tenant_provider"))
+        await asyncio.shield(self._indexed)
+        return self._collection
+
+    async def get(self, provider: str, tenant_id: str = DEFAULT_TENANT) -> Optional[Dict[str, Any]]:
+        coll = await self._coll()
+        row = await coll.find_one({"tenant_id": tenant_id, "provider": provider}, {"_id": 0, "token": 1})
+        return row["token"] if row else None
+
+    async def upsert(self, provider: str, token_doc: Dict[str, Any], tenant_id: str = DEFAULT_TENANT) -> None:
+        coll = await self._coll()
+        await coll.update_one(
+            {"tenant_id": tenant_id, "provider": provider},
+            {"$set": {"token": token_doc, "updated_at": time.time()}},
+            upsert=True,
+        )
+
+    async def providers(self, tenant_id: str = DEFAULT_TENANT) -> List[str]:
+        coll = await self._coll()
+        cursor = coll.find({"tenant_id": tenant_id}, {"_id": 0, "provider": 1})
+        return sorted([row["provider"] async for row in cursor])
+
+    async def close(self) -> None:
+        from app.services.db.mongo import close_mongo_client
+        close_mongo_client()
@@ -1,8 +1,8 @@
+import os
 import urllib.parse
-import httpx
 
 SLACK_AUTHORIZE_URL = "https://slack.com/oauth/v2/authorize"
-SLACK_TOKEN_URL = "https://slack.com/api/oauth.v2.access"
+SLACK_TOKEN_URL = os.getenv("SLACK_API_BASE", "https://slack.com/api").rstrip("/") + "/oauth.v2.access"
 
 
 def build_slack_login_url(client_id: str, redirect_uri: str, state: str):
@@ -16,7 +16,9 @@ def build_slack_login_url(client_id: str, redirect_uri: str, state: str):
 
 
 async def exchange_slack_code(code: str, client_id: str, client_secret: str, redirect_uri: str):
-    async with httpx.AsyncClient() as client:
+    from app.services.http.client import shared_client  # httpx loads on first use
+
+    async with shared_client() as client:
         resp = await client.post(
             SLACK_TOKEN_URL,
             data={
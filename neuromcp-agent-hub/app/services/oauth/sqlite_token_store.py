@@ -0,0 +1,89 @@
+# app/services/oauth/sqlite_token_store.py
+"""
+SQLite token backend
+For several workers on one host: WAL mode lets readers run alongside the
+writer, and busy_timeout makes writers queue instead of failing. sqlite3
+is blocking, so every statement runs on a worker thread.
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.services.oauth.token_store import DEFAULT_TENANT, TokenStore
+from app.utils.json_codec import dumps, loads
+
+TOKEN_DB_PATH = Path(os.getenv("TOKEN_DB_PATH", ".tokens.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    tenant_id  TEXT NOT NULL,
+    provider   TEXT NOT NULL,
+    doc        TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (tenant_id, provider)
+)
+"""
+
+
+class SQLiteTokenStore(TokenStore):
+    kind = "sqlite"
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or TOKEN_DB_PATH)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()  # one connection, used from worker threads
+
+    def namespace(self) -> str:
+        return f"sqlite:{self.path}"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute(SCHEMA)
+            os.chmod(self.path, 0o600)
+            self._conn = conn
+        return self._conn
+
+    def _get_sync(self, provider: str, tenant_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT doc FROM tokens WHERE tenant_id = ? AND provider = ?", (tenant_id, provider)
+            ).fetchone()
+        return loads(row[0]) if row else None
+
+    def _upsert_sync(self, provider: str, token_doc: Dict[str, Any], tenant_id: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO tokens (tenant_id, provider, doc, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (tenant_id, provider) DO UPDATE SET doc = excluded.doc, updated_at = excluded.updated_at",
+                (tenant_id, provider, dumps(token_doc).decode(), time.time()),
+            )
+
+    def _providers_sync(self, tenant_id: str) -> List[str]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT provider FROM tokens WHERE tenant_id = ? ORDER BY provider", (tenant_id,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    async def get(self, provider: str, tenant_id: str = DEFAULT_TENANT) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._get_sync, provider, tenant_id)
+
+    async def upsert(self, provider: str, token_doc: Dict[str, Any], tenant_id: str = DEFAULT_TENANT) -> None:
+        await asyncio.to_thread(self._upsert_sync, provider, token_doc, tenant_id)
+
+    async def providers(self, tenant_id: str = DEFAULT_TENANT) -> List[str]:
+        return await asyncio.to_thread(self._providers_sync, tenant_id)
+
+    async def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
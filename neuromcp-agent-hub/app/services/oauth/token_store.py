@@ -1,31 +1,332 @@
 # app/services/oauth/token_store.py
-import os, json, asyncio
+"""
+OAuth token store
+`TokenStore` is the backend interface; TOKEN_STORE picks one:
+  file   - local JSON file (single host; the default for local dev)
+  sqlite - SQLite database in WAL mode (several workers on one host)
+  mongo  - MongoDB through the async motor driver (several hosts)
+Every backend sits behind one shared read-through cache, so a lookup is a
+dict hit until TOKEN_CACHE_TTL_S expires; writes go through the cache. The
+file backend is read straight through: its own mtime check is cheaper than
+the TTL and sees other processes' writes at once.
+"""
+import os, asyncio
+import time
+from abc import ABC, abstractmethod
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+from app.services.observability.tracing import span
+from app.utils.json_codec import dumps, read_json_file
+from app.utils.tenant import DEFAULT_TENANT
+
+TOKEN_STORE = os.getenv("TOKEN_STORE", "file").lower()
 TOKENS_FILE = Path(os.getenv("TOKENS_FILE", ".tokens.json"))
+TOKEN_CACHE_TTL_S = float(os.getenv("TOKEN_CACHE_TTL_S", "30"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "1024"))
+
+
+class TokenStore(ABC):
+    """Async token backend: one token document per (tenant, provider)"""
+
+    kind = "base"
+    # False = the backend validates its own in-memory copy, skip the TTL cache
+    cache_reads = True
+
+    def namespace(self) -> str:
+        """Identifies the underlying storage (cache entries are scoped to it)"""
+        return self.kind
+
+    @abstractmethod
+    async def get(self, provider: str, tenant_id: str = DEFAULT_TENANT) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def upsert(self, provider: str, token_doc: Dict[str, Any], tenant_id: str = DEFAULT_TENANT) -> None:
+        ...
+
+    @abstractmethod
+    async def providers(self, tenant_id: str = DEFAULT_TENANT) -> List[str]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+# ============================
+# File backend
+# ============================
+
+# One asyncio.Lock per event loop (a Lock is bound to the loop that first uses it)
+_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+
+
+def _write_lock() -> asyncio.Lock:
+    loop = asyncio.get_running_loop()
+    lock = _locks.get(loop)
+    if lock is None:
+        lock = _locks[loop] = asyncio.Lock()
+    return lock
+
+
+def _signature(path: Path) -> Optional[Tuple]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (str(path), st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Exclusive lock on a sidecar file, across processes"""
+    lock_path = path.with_name(path.name + ".lock")
+    with open(lock_path, "a+b") as fh:
+        try:
+            import fcntl
+        except ImportError:  # Windows
+            import msvcrt
+
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+class FileTokenStore(TokenStore):
+    """
+    JSON file: {provider: doc} for the default tenant, other tenants under
+    "_tenants". The parsed file is kept in memory and only re-read when its
+    signature (mtime, size, inode) changes, e.g. after another process wrote
+    it. Writes are read-modify-write under an asyncio lock (this process) and
+    an OS file lock (other processes), and land via temp file + os.replace so
+    readers never see a half-written file.
+    """
+
+    kind = "file"
+    cache_reads = False  # the signature check already is the cache validator
+    TENANTS_KEY = "_tenants"
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._cache: Dict[str, Any] = {}
+        self._cache_sig: Optional[Tuple] = None
+
+    @property
+    def path(self) -> Path:
+        # Module global by default so tests / tools can repoint TOKENS_FILE
+        return Path(self._path) if self._path is not None else TOKENS_FILE
+
+    def namespace(self) -> str:
+        return f"file:{self.path}"
+
+    def _read_sync(self) -> Dict[str, Any]:
+        """Cached contents; re-parsed only when the file changed on disk"""
+        path = self.path
+        sig = _signature(path)
+        if sig is None:
+            return {}
+        if sig != self._cache_sig:
+            self._cache, self._cache_sig = read_json_file(path), sig
+        return self._cache
+
+    def _section(self, data: Dict[str, Any], tenant_id: str) -> Dict[str, Any]:
+        if tenant_id == DEFAULT_TENANT:
+            return data
+        return data.get(self.TENANTS_KEY, {}).get(tenant_id, {})
+
+    def _update_sync(self, update: Callable[[Dict[str, Any]], None]) -> None:
+        path = self.path
+        with _file_lock(path):
+            # Re-read under the lock: another process may have written since our cache
+            data = dict(read_json_file(path)) if path.exists() else {}
+            update(data)
+
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    fh.write(dumps(data, indent=True))
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                os.replace(tmp, path)
+            except BaseException:
+                tmp.unlink(missing_ok=True)
+                raise
+            self._cache, self._cache_sig = data, _signature(path)
+
+    async def get(self, provider: str, tenant_id: str = DEFAULT_TENANT) -> Optional[Dict[str, Any]]:
+        # A stat() plus a dict lookup; the file is only parsed when it changed
+        token = self._section(self._read_sync(), tenant_id).get(provider)
+        return dict(token) if isinstance(token, dict) else token
+
+    async def upsert(self, provider: str, token_doc: Dict[str, Any], tenant_id: str = DEFAULT_TENANT) -> None:
+        def update(data: Dict[str, Any]) -> None:
+            if tenant_id == DEFAULT_TENANT:
+                data[provider] = token_doc
+            else:
+                tenants = data[self.TENANTS_KEY] = dict(data.get(self.TENANTS_KEY, {}))
+                tenants[tenant_id] = {**tenants.get(tenant_id, {}), provider: token_doc}
+
+        async with _write_lock():
+            await asyncio.to_thread(self._update_sync, update)
+
+    async def providers(self, tenant_id: str = DEFAULT_TENANT) -> List[str]:
+        section = self._section(self._read_sync(), tenant_id)
+        return sorted(p for p, doc in section.items() if p != self.TENANTS_KEY and doc)
+
+
+# ============================
+# Shared read-through cache
+# ============================
+
+class CachedTokenStore(TokenStore):
+    """
+    Read-through cache in front of any backend. Hits are served from memory
+    for ttl_s; concurrent misses for the same key share one backend read;
+    upserts write through. Misses (no token) are not cached, so a provider
+    connected by another worker shows up on the next lookup. Backends with
+    cache_reads = False are read straight through.
+    """
+
+    def __init__(self, backend: TokenStore, ttl_s: float = TOKEN_CACHE_TTL_S,
+                 max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.backend = backend
+        self.kind = backend.kind
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def namespace(self) -> str:
+        return self.backend.namespace()
+
+    def _key(self, provider: str, tenant_id: str) -> Tuple[str, str, str]:
+        return (self.backend.namespace(), tenant_id, provider)
+
+    def _put(self, key: Tuple[str, str, str], doc: Dict[str, Any]) -> None:
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            # Drop the entry closest to expiry
+            del self._entries[min(self._entries, key=lambda k: self._entries[k][0])]
+        self._entries[key] = (time.monotonic() + self.ttl_s, dict(doc))
+
+    async def get(self, provider: str, tenant_id: str = DEFAULT_TENANT,
+                  fresh: bool = False) -> Optional[Dict[str, Any]]:
+        """fresh=True skips a cached entry (the backend read refills it)"""
+        if not self.backend.cache_reads:
+            with span("token_store.get", provider=provider, store=self.backend.kind, cache="bypass"):
+                return await self.backend.get(provider, tenant_id)
+
+        key = self._key(provider, tenant_id)
+        entry = self._entries.get(key)
+        if not fresh and entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            with span("token_store.get", provider=provider, store=self.backend.kind, cache="hit"):
+                return dict(entry[1])
+
+        self.misses += 1
+        with span("token_store.get", provider=provider, store=self.backend.kind, cache="miss") as read:
+            inflight = self._inflight.get(key)
+            if inflight is None or inflight.get_loop() is not asyncio.get_running_loop():
+                inflight = self._inflight[key] = asyncio.ensure_future(self.backend.get(provider, tenant_id))
+                inflight.add_done_callback(lambda f, key=key: self._loaded(key, f))
+            else:
+                read.set(shared=True)  # joined another caller's backend read
+            doc = await asyncio.shield(inflight)
+        return dict(doc) if isinstance(doc, dict) else doc
+
+    def _loaded(self, key: Tuple[str, str, str], fut: asyncio.Future) -> None:
+        if self._inflight.get(key) is not fut:
+            return  # an upsert raced this read; its value is newer
+        del self._inflight[key]
+        if not fut.cancelled() and fut.exception() is None and isinstance(fut.result(), dict):
+            self._put(key, fut.result())
+
+    async def upsert(self, provider: str, token_doc: Dict[str, Any], tenant_id: str = DEFAULT_TENANT) -> None:
+        key = self._key(provider, tenant_id)
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+        with span("token_store.upsert", provider=provider, store=self.backend.kind):
+            await self.backend.upsert(provider, token_doc, tenant_id)
+        if self.backend.cache_reads:
+            self._put(key, token_doc)
+
+    async def providers(self, tenant_id: str = DEFAULT_TENANT) -> List[str]:
+        return await self.backend.providers(tenant_id)
+
+    def invalidate(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "ttl_s": self.ttl_s}
+
+    async def close(self) -> None:
+        self.invalidate()
+        await self.backend.close()
+
+
+# ============================
+# Store selection
+# ============================
+
+_store: Optional[CachedTokenStore] = None
+
+
+def create_token_store(kind: Optional[str] = None) -> TokenStore:
+    kind = (kind or TOKEN_STORE).lower()
+    if kind == "file":
+        return FileTokenStore()
+    if kind == "sqlite":
+        from app.services.oauth.sqlite_token_store import SQLiteTokenStore
+        return SQLiteTokenStore()
+    if kind == "mongo":
+        from app.services.db.mongo import mongo_disabled_reason
+        from app.services.oauth.mongo_token_store import MongoTokenStore
+
+        # Asked for explicitly: fail loudly instead of quietly using another store
+        reason = mongo_disabled_reason()
+        if reason:
+            raise RuntimeError(f"TOKEN_STORE=mongo, but {reason}; unset one of them")
+        return MongoTokenStore()
+    raise RuntimeError(f"Unknown TOKEN_STORE '{kind}' (use file, sqlite or mongo)")
+
+
+def get_token_store() -> CachedTokenStore:
+    global _store
+    if _store is None:
+        _store = CachedTokenStore(create_token_store())
+    return _store
+
+
+def reset_token_store(backend: Optional[TokenStore] = None) -> None:
+    """Swap the backend (tests) or drop the store so TOKEN_STORE is re-read"""
+    global _store
+    _store = CachedTokenStore(backend) if backend is not None else None
 
-def _read_tokens_sync() -> Dict[str, Any]:
-    if not TOKENS_FILE.exists():
-        return {}
-    return json.loads(TOKENS_FILE.read_text(encoding="utf-8"))
 
-def _write_tokens_sync(data: Dict[str, Any]) -> None:
-    TOKENS_FILE.write_text(json.dumps(data, indent=2), encoding="utf-8")
+async def close_token_store() -> None:
+    global _store
+    if _store is not None:
+        await _store.close()
+        _store = None
 
-async def get_token(provider: str) -> Optional[Dict[str, Any]]:
-    store_mode = os.getenv("TOKEN_STORE", "file").lower()  # default file
-    if store_mode != "file":
-        raise RuntimeError("TOKEN_STORE is not 'file'. Set TOKEN_STORE=file for local dev.")
 
-    data = await asyncio.to_thread(_read_tokens_sync)
-    return data.get(provider)
+async def get_token(provider: str, tenant_id: str = DEFAULT_TENANT, fresh: bool = False) -> Optional[Dict[str, Any]]:
+    return await get_token_store().get(provider, tenant_id, fresh=fresh)
 
-async def upsert_token(provider: str, token_doc: Dict[str, Any]) -> None:
-    store_mode = os.getenv("TOKEN_STORE", "file").lower()
-    if store_mode != "file":
-        raise RuntimeError("TOKEN_STORE is not 'file'. Set TOKEN_STORE=file for local dev.")
 
-    data = await asyncio.to_thread(_read_tokens_sync)
-    data[provider] = token_doc
-    await asyncio.to_thread(_write_tokens_sync, data)
+async def upsert_token(provider: str, token_doc: Dict[str, Any], tenant_id: str = DEFAULT_TENANT) -> None:
+    await get_token_store().upsert(provider, token_doc, tenant_id)
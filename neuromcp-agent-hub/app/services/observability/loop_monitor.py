@@ -0,0 +1,194 @@
+"""
+Event-loop lag monitor
+A task sleeps LOOP_MONITOR_INTERVAL_S at a time and measures how late it
+wakes up: that delay is what every other coroutine waits whenever something
+blocks the loop (sync HTTP, a sync LLM SDK, a big json.loads). Lag goes to
+the neuromcp_event_loop_lag_seconds histogram and to a sketch served by
+GET /loop; wake-ups later than LOOP_BLOCK_THRESHOLD_S count as blocks.
+
+With LOOP_MONITOR_DEBUG=true a watchdog thread also samples the loop
+thread's stack every LOOP_SAMPLE_INTERVAL_S while the loop is stuck, so each
+block comes with the code that caused it (the last LOOP_BLOCK_EVENTS kept).
+
+Config (env): LOOP_MONITOR_ENABLED, LOOP_MONITOR_INTERVAL_S,
+LOOP_BLOCK_THRESHOLD_S, LOOP_MONITOR_DEBUG, LOOP_SAMPLE_INTERVAL_S,
+LOOP_BLOCK_EVENTS
+"""
+from __future__ import annotations
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.services.observability.metrics import LOOP_BLOCKS, LOOP_LAG_SECONDS
+from app.utils.sketch import QuantileSketch
+
+LOOP_MONITOR_INTERVAL_S = float(os.getenv("LOOP_MONITOR_INTERVAL_S", "0.1"))
+LOOP_BLOCK_THRESHOLD_S = float(os.getenv("LOOP_BLOCK_THRESHOLD_S", "0.1"))
+LOOP_SAMPLE_INTERVAL_S = float(os.getenv("LOOP_SAMPLE_INTERVAL_S", "0.01"))
+LOOP_BLOCK_EVENTS = int(os.getenv("LOOP_BLOCK_EVENTS", "50"))
+STACK_DEPTH = 25
+
+
+def loop_monitor_enabled() -> bool:
+    return os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+
+
+def loop_debug_enabled() -> bool:
+    return os.getenv("LOOP_MONITOR_DEBUG", "false").lower() == "true"
+
+
+def _stack(frame: Any) -> Tuple[str, ...]:
+    """Outermost first, 'func (file:line)' per frame"""
+    cwd = os.getcwd() + os.sep
+    return tuple(f"{f.name} ({f.filename.removeprefix(cwd)}:{f.lineno})"
+                 for f in traceback.extract_stack(frame, limit=STACK_DEPTH))
+
+
+class LoopMonitor:
+    def __init__(
+        self,
+        interval_s: float = LOOP_MONITOR_INTERVAL_S,
+        threshold_s: float = LOOP_BLOCK_THRESHOLD_S,
+        debug: bool = False,
+        sample_interval_s: float = LOOP_SAMPLE_INTERVAL_S,
+        max_events: int = LOOP_BLOCK_EVENTS,
+    ):
+        self.interval_s = interval_s
+        self.threshold_s = threshold_s
+        self.debug = debug
+        self.sample_interval_s = sample_interval_s
+        self.lag_ms = QuantileSketch()
+        self.ticks = 0
+        self.blocks = 0
+        self.last_lag_ms = 0.0
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._task: Optional[asyncio.Task] = None
+        self._beat = time.monotonic()  # last time the monitor task ran
+        self._loop_thread: Optional[int] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ----------------------------
+    # Lag (runs on the loop)
+    # ----------------------------
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = loop.create_task(self._run())
+        if self.debug:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval_s
+            await asyncio.sleep(self.interval_s)
+            now = time.monotonic()
+            self._beat = now
+            self.record(max(0.0, now - expected))
+
+    def record(self, lag_s: float) -> None:
+        self.ticks += 1
+        self.last_lag_ms = round(lag_s * 1000, 3)
+        self.lag_ms.add(lag_s * 1000)
+        LOOP_LAG_SECONDS.observe(lag_s)
+        if lag_s >= self.threshold_s:
+            self.blocks += 1
+            LOOP_BLOCKS.inc()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            await asyncio.to_thread(self._watchdog.join, 1.0)
+            self._watchdog = None
+
+    # ----------------------------
+    # Blocking-call sampler (debug, own thread)
+    # ----------------------------
+
+    def _watch(self) -> None:
+        stacks: Counter = Counter()
+        blocked_since: Optional[float] = None
+        blocked_at = 0.0
+        while not self._stop.wait(self.sample_interval_s):
+            overdue = time.monotonic() - self._beat - self.interval_s
+            if overdue >= self.threshold_s:
+                if blocked_since is None:
+                    blocked_since, blocked_at = self._beat + self.interval_s, time.time() - overdue
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    stacks[_stack(frame)] += 1
+                del frame
+            elif blocked_since is not None:
+                self._close_event(blocked_since, blocked_at, stacks)
+                stacks, blocked_since = Counter(), None
+
+    def _close_event(self, blocked_since: float, blocked_at: float, stacks: Counter) -> None:
+        # The beat that ended the block is when the loop got control back
+        self.events.append({
+            "at": round(blocked_at, 3),
+            "duration_ms": round(max(self._beat - blocked_since, 0.0) * 1000, 1),
+            "samples": sum(stacks.values()),
+            "stacks": [{"count": n, "stack": list(stack)} for stack, n in stacks.most_common(5)],
+        })
+
+    # ----------------------------
+    # Report
+    # ----------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "interval_ms": self.interval_s * 1000,
+            "threshold_ms": self.threshold_s * 1000,
+            "debug": self.debug,
+            "ticks": self.ticks,
+            "blocks": self.blocks,
+            "last_lag_ms": self.last_lag_ms,
+            "lag_ms": self.lag_ms.summary(),
+            "block_events": list(self.events) if self.debug else None,
+        }
+
+    def culprits(self) -> List[str]:
+        """Innermost frame of every sampled block (most recent event first)"""
+        return [s["stack"][-1] for event in reversed(self.events) for s in event["stacks"] if s["stack"]]
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    return _monitor
+
+
+async def start_loop_monitor(monitor: Optional[LoopMonitor] = None) -> Optional[LoopMonitor]:
+    """Start on the running loop (lifespan); None when LOOP_MONITOR_ENABLED=false"""
+    global _monitor
+    if monitor is None and not loop_monitor_enabled():
+        return None
+    await stop_loop_monitor()
+    _monitor = monitor or LoopMonitor(debug=loop_debug_enabled())
+    _monitor.start()
+    return _monitor
+
+
+async def stop_loop_monitor() -> None:
+    global _monitor
+    if _monitor is not None:
+        await _monitor.stop()
+        _monitor = None
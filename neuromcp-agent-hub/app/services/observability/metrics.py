@@ -0,0 +1,256 @@
+"""
+Metrics registry (Prometheus text exposition)
+Counters, gauges and fixed-bucket histograms, rendered by GET /metrics.
+
+Recording is lock-free: every thread accumulates into its own shard (a
+plain dict reached through threading.local), so inc()/observe() is a dict
+lookup and a list increment with no contention between the event loop and
+the to_thread workers. A scrape sums the shards. Shards of finished threads
+are kept: their counts are part of the cumulative totals.
+
+Existing stats (retries, breakers, run scheduler, history writer) are
+exported through collectors evaluated at scrape time.
+
+Config (env): METRICS_ENABLED
+"""
+from __future__ import annotations
+import math
+import os
+import sys
+import threading
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a cached tool call (~1ms) to a slow LLM round trip
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+Sample = Tuple[Dict[str, str], float]
+Collector = Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]  # (name, type, help, samples)
+
+
+class Registry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, Tuple[str, ...]], Any]] = []
+        self._lock = threading.Lock()  # only taken when a thread makes its first shard
+        self.metrics: Dict[str, "_Metric"] = {}
+        self.collectors: List[Collector] = []
+
+    def shard(self) -> Dict[Tuple[str, Tuple[str, ...]], Any]:
+        try:
+            return self._local.values
+        except AttributeError:
+            values: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+            with self._lock:
+                self._shards.append(values)
+            self._local.values = values
+            return values
+
+    def register(self, metric: "_Metric") -> "_Metric":
+        self.metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Collector) -> None:
+        self.collectors.append(collector)
+
+    def merged(self) -> Dict[Tuple[str, Tuple[str, ...]], Any]:
+        """Sum of every thread's shard"""
+        with self._lock:
+            shards = list(self._shards)
+        out: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+        for shard in shards:
+            for key, value in list(shard.items()):  # list() copies under the GIL
+                if isinstance(value, list):
+                    acc = out.get(key)
+                    if acc is None:
+                        out[key] = list(value)
+                    else:
+                        for i, v in enumerate(value):
+                            acc[i] += v
+                else:
+                    out[key] = out.get(key, 0) + value
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            for shard in self._shards:
+                shard.clear()
+
+    def render(self) -> str:
+        merged = self.merged()
+        by_metric: Dict[str, List[Tuple[Tuple[str, ...], Any]]] = {}
+        for (name, labels), value in merged.items():
+            by_metric.setdefault(name, []).append((labels, value))
+
+        lines: List[str] = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, value in sorted(by_metric.get(name, ())):
+                lines.extend(metric.lines(dict(zip(metric.labelnames, labels)), value))
+        for collector in self.collectors:
+            try:
+                families = list(collector())
+            except Exception:  # a broken collector must not break the scrape
+                continue
+            for name, kind, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels)} {_num(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _num(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), registry: Optional[Registry] = None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._registry = registry or REGISTRY
+        self._registry.register(self)
+
+    def lines(self, labels: Dict[str, str], value: Any) -> List[str]:
+        return [f"{self.name}{_labels(labels)} {_num(value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        if not METRICS_ENABLED:
+            return
+        values = self._registry.shard()
+        key = (self.name, labels)
+        values[key] = values.get(key, 0) + amount
+
+
+class Gauge(Counter):
+    """Up/down value; inc()/dec() from any thread sum correctly across shards"""
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS, registry: Optional[Registry] = None):
+        super().__init__(name, help_text, labelnames, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+        values = self._registry.shard()
+        key = (self.name, labels)
+        cell = values.get(key)
+        if cell is None:
+            # One slot per bucket, one for +Inf, then the sum
+            cell = values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def lines(self, labels: Dict[str, str], value: Any) -> List[str]:
+        out, running = [], 0
+        for bound, n in zip(self.buckets + (math.inf,), value[:-1]):
+            running += n
+            le = "+Inf" if bound == math.inf else repr(float(bound))
+            out.append(f"{self.name}_bucket{_labels({**labels, 'le': le})} {running}")
+        out.append(f"{self.name}_sum{_labels(labels)} {_num(round(value[-1], 6))}")
+        out.append(f"{self.name}_count{_labels(labels)} {running}")
+        return out
+
+
+REGISTRY = Registry()
+
+# ----------------------------
+# Application metrics
+# ----------------------------
+
+NODE_SECONDS = Histogram("neuromcp_node_duration_seconds", "LangGraph node wall time", ("node",))
+TOOL_SECONDS = Histogram("neuromcp_tool_call_duration_seconds", "Tool call wall time", ("tool", "outcome"))
+LLM_SECONDS = Histogram("neuromcp_llm_call_duration_seconds", "LLM call wall time", ("purpose", "outcome"))
+FALLBACKS = Counter("neuromcp_fallbacks_total", "Degraded paths taken (LLM planner -> offline planner, ...)", ("component",))
+VALIDATION_ERRORS = Counter("neuromcp_validation_errors_total", "Rejected requests and plans", ("stage",))
+RATE_LIMIT_DECISIONS = Counter(
+    "neuromcp_rate_limit_decisions_total", "Rate limiter verdicts", ("scope", "decision"))
+RUNS = Counter("neuromcp_runs_total", "Finished /agent round trips", ("phase", "status"))
+RUNS_IN_FLIGHT = Gauge("neuromcp_runs_in_flight", "Round trips currently inside the graph")
+LOOP_LAG_SECONDS = Histogram(
+    "neuromcp_event_loop_lag_seconds", "How late the event loop ran the monitor's timer",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+LOOP_BLOCKS = Counter("neuromcp_event_loop_blocks_total", "Monitor wake-ups later than LOOP_BLOCK_THRESHOLD_S")
+
+
+# ----------------------------
+# Collectors for stats kept elsewhere (read at scrape time)
+# ----------------------------
+
+def _http_families():
+    retry = sys.modules.get("app.services.http.retry")
+    if retry is not None:
+        stats = retry.retry_stats()
+        yield "neuromcp_http_retry_events_total", "counter", "Provider HTTP requests / attempts / retries / gave_up", [
+            ({"endpoint": endpoint, "event": event}, n)
+            for endpoint, counts in stats.items() for event, n in sorted(counts.items())
+        ]
+    cb = sys.modules.get("app.services.http.circuit_breaker")
+    if cb is not None:
+        states = cb.breaker_states()
+        yield "neuromcp_circuit_open", "gauge", "1 while the breaker is open (0.5 half-open)", [
+            ({"breaker": name}, {cb.OPEN: 1, cb.HALF_OPEN: 0.5}.get(s["state"], 0)) for name, s in states.items()
+        ]
+        yield "neuromcp_circuit_trips_total", "counter", "Times the breaker opened", [
+            ({"breaker": name}, s["trips"]) for name, s in states.items()
+        ]
+
+
+def _run_families():
+    scheduler = getattr(sys.modules.get("app.services.run_scheduler"), "_scheduler", None)
+    if scheduler is not None:
+        stats = scheduler.stats()
+        yield "neuromcp_run_slots_active", "gauge", "Runs holding a scheduler slot", [({}, stats["active"])]
+        yield "neuromcp_run_slots_waiting", "gauge", "Runs queued for a slot", [
+            ({"tenant": t}, s["waiting"]) for t, s in stats["tenants"].items()
+        ]
+        yield "neuromcp_run_slot_rejections_total", "counter", "Runs refused a slot", [
+            ({"reason": "queue_full"}, stats["rejected"]), ({"reason": "deadline"}, stats["timed_out"]),
+        ]
+    writer = getattr(sys.modules.get("app.services.history.recorder"), "_writer", None)
+    if writer is not None:
+        stats = writer.stats()
+        yield "neuromcp_history_queue_depth", "gauge", "History records waiting for the writer", [({}, stats["queued"])]
+        yield "neuromcp_history_records_total", "counter", "History records by outcome", [
+            ({"outcome": k}, stats[k]) for k in ("written", "dropped", "errors")
+        ]
+
+
+REGISTRY.add_collector(_http_families)
+REGISTRY.add_collector(_run_families)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
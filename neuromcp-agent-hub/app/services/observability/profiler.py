@@ -0,0 +1,241 @@
+"""
+On-demand request profiler
+POST /agent/run?profile=1 (or X-Profile: 1) with X-Profile-Token: <PROFILE_TOKEN>
+runs that one request under a sampling profiler and returns the profile in
+the response, as collapsed stacks (flamegraph.pl / speedscope import) or a
+speedscope JSON document.
+
+A sampler thread reads sys._current_frames() every PROFILE_INTERVAL_S and
+keeps the stacks of the threads working for the profiled run: the event-loop
+thread for the whole run, worker threads while they are inside one of the
+run's spans (sync graph nodes run in LangGraph's workers, the summarizer in
+asyncio.to_thread). Samples where the loop sits idle in select() are
+counted, not kept. Other requests sharing the loop while it is profiled can
+show up in its stacks, hence the PROFILE_MAX_CONCURRENT cap (default 1).
+
+Config (env): PROFILE_TOKEN (unset = profiling disabled), PROFILE_INTERVAL_S,
+PROFILE_MAX_CONCURRENT, PROFILE_MAX_SAMPLES
+"""
+from __future__ import annotations
+import hmac
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+PROFILE_INTERVAL_S = float(os.getenv("PROFILE_INTERVAL_S", "0.002"))
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "1"))
+PROFILE_MAX_SAMPLES = int(os.getenv("PROFILE_MAX_SAMPLES", "50000"))
+PROFILE_FORMATS = ("collapsed", "speedscope")
+MAX_DEPTH = 128
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+Frame = Tuple[str, str, int]  # (function, file, first line)
+
+
+class ProfileDenied(Exception):
+    """Profiling is disabled or the token does not match"""
+
+
+class ProfileBusy(Exception):
+    """PROFILE_MAX_CONCURRENT requests are already being profiled"""
+
+
+def profile_token() -> Optional[str]:
+    return os.getenv("PROFILE_TOKEN") or None
+
+
+def authorize(token: Optional[str]) -> None:
+    expected = profile_token()
+    if expected is None:
+        raise ProfileDenied("Profiling is disabled (PROFILE_TOKEN is not set)")
+    if not token or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise ProfileDenied("Invalid profile token")
+
+
+_slots = threading.BoundedSemaphore(PROFILE_MAX_CONCURRENT)
+_active: ContextVar[Optional["Profile"]] = ContextVar("neuromcp_profile", default=None)
+_labels: Dict[Any, Frame] = {}  # code object -> frame label (shared, only grows with code size)
+_cwd = os.getcwd() + os.sep
+
+
+def _label(code: Any) -> Frame:
+    frame = _labels.get(code)
+    if frame is None:
+        frame = _labels[code] = (code.co_qualname, code.co_filename.removeprefix(_cwd), code.co_firstlineno)
+    return frame
+
+
+class Profile:
+    def __init__(self, name: str, interval_s: float = PROFILE_INTERVAL_S, max_samples: int = PROFILE_MAX_SAMPLES):
+        self.name = name
+        self.interval_s = interval_s
+        self.max_samples = max_samples
+        # (thread name, outermost..innermost frames) -> [samples, seconds]
+        self.stacks: Dict[Tuple[str, Tuple[Frame, ...]], List[float]] = {}
+        self.samples = 0
+        self.idle = 0
+        self.truncated = False
+        self.started = 0.0
+        self.duration_s = 0.0
+        self._threads: Dict[int, int] = {}  # thread id -> open regions
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    # ----------------------------
+    # Thread membership
+    # ----------------------------
+
+    def enter(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+
+    def exit(self) -> None:
+        ident = threading.get_ident()
+        with self._lock:
+            left = self._threads.get(ident, 1) - 1
+            if left:
+                self._threads[ident] = left
+            else:
+                self._threads.pop(ident, None)
+
+    # ----------------------------
+    # Sampling (own thread)
+    # ----------------------------
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.duration_s = time.perf_counter() - self.started
+
+    def _sample_loop(self) -> None:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval_s):
+            now = time.perf_counter()
+            weight, last = now - last, now  # GIL hand-offs stretch ticks past interval_s
+            with self._lock:
+                threads = list(self._threads)
+            frames, frame = sys._current_frames(), None
+            for ident in threads:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                if frame.f_code.co_filename.endswith("selectors.py"):
+                    self.idle += 1  # the loop is waiting for I/O or a worker
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    stack.append(_label(frame.f_code))
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                key = (names.get(ident, str(ident)), tuple(reversed(stack)))
+                cell = self.stacks.get(key)
+                if cell is None:
+                    cell = self.stacks[key] = [0, 0.0]
+                cell[0] += 1
+                cell[1] += weight
+                self.samples += 1
+            del frames, frame
+            if self.samples >= self.max_samples:
+                self.truncated = True
+                return
+
+    # ----------------------------
+    # Output
+    # ----------------------------
+
+    def collapsed(self) -> str:
+        """One 'thread;outer;...;inner count' line per distinct stack"""
+        lines = [
+            ";".join([thread] + [f"{fn} ({file}:{line})" for fn, file, line in stack]) + f" {int(cell[0])}"
+            for (thread, stack), cell in self.stacks.items()
+        ]
+        return "\n".join(sorted(lines))
+
+    def speedscope(self) -> Dict[str, Any]:
+        """speedscope file format: one sampled profile per thread, weights in seconds"""
+        index: Dict[Frame, int] = {}
+        frames: List[Dict[str, Any]] = []
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for (thread, stack), (_, seconds) in sorted(self.stacks.items()):
+            ids = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                ids.append(index[frame])
+            profile = profiles.setdefault(thread, {
+                "type": "sampled", "name": f"{self.name} [{thread}]", "unit": "seconds",
+                "startValue": 0, "endValue": round(self.duration_s, 6), "samples": [], "weights": [],
+            })
+            profile["samples"].append(ids)
+            profile["weights"].append(round(seconds, 6))
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": self.name,
+            "exporter": "neuromcp",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
+
+    def report(self, fmt: str = "collapsed") -> Dict[str, Any]:
+        return {
+            "format": fmt,
+            "interval_ms": self.interval_s * 1000,
+            "duration_ms": round(self.duration_s * 1000, 1),
+            "samples": self.samples,
+            "idle_samples": self.idle,
+            "truncated": self.truncated,
+            "data": self.speedscope() if fmt == "speedscope" else self.collapsed(),
+        }
+
+
+@contextmanager
+def profile_run(name: str, interval_s: Optional[float] = None) -> Iterator[Profile]:
+    """Profile the enclosed run (call on the event loop); ProfileBusy when all slots are taken"""
+    if not _slots.acquire(blocking=False):
+        raise ProfileBusy(f"{PROFILE_MAX_CONCURRENT} request(s) already being profiled")
+    profile = Profile(name, interval_s or PROFILE_INTERVAL_S)
+    token = _active.set(profile)
+    profile.enter()
+    profile.start()
+    try:
+        yield profile
+    finally:
+        profile.stop()
+        profile.exit()
+        _active.reset(token)
+        _slots.release()
+
+
+@contextmanager
+def _region(profile: Profile) -> Iterator[None]:
+    profile.enter()
+    try:
+        yield
+    finally:
+        profile.exit()
+
+
+_NOT_PROFILED = nullcontext()
+
+
+def profiled_region():
+    """Count the current thread in the active profile (tracing.span enters this)"""
+    profile = _active.get()
+    return _NOT_PROFILED if profile is None else _region(profile)
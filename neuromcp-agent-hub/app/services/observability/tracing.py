@@ -0,0 +1,411 @@
+"""
+Run tracing
+Spans for the API round trip, each graph node, tool steps, LLM attempts,
+outbound HTTP calls and token-store access. The trace id is the run's
+run_id (32 hex chars, a valid W3C trace id), so spans, the history row and
+the RunLog records of a run share one id; log records carry it as
+"trace_id" (plus "span_id" when the run is sampled). Outbound HTTP calls
+send a `traceparent` header.
+
+Sampling is decided once per run from the trace id (TRACE_SAMPLE_RATE), so
+a run's spans are kept or dropped together. An unsampled run pays one
+context-variable lookup per span. Finished traces go to a bounded queue
+that a background thread hands to the exporter:
+  none  tracing off (the default)
+  file  one OTLP/JSON span per line in TRACE_FILE; once it would grow past
+        TRACE_FILE_MAX_BYTES it is rotated to TRACE_FILE.1 (.1 -> .2, ...),
+        keeping TRACE_FILE_BACKUPS old files
+  otlp  OTLP/HTTP JSON POST to {TRACE_OTLP_ENDPOINT}/v1/traces (the mock
+        backend serves a collector stand-in there)
+
+Config (env): TRACE_EXPORTER, TRACE_SAMPLE_RATE, TRACE_FILE,
+TRACE_FILE_MAX_BYTES, TRACE_FILE_BACKUPS, TRACE_OTLP_ENDPOINT,
+TRACE_MAX_SPANS, TRACE_QUEUE_MAX, SERVICE_NAME
+"""
+from __future__ import annotations
+import hashlib
+import os
+import queue
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.services.observability.profiler import profiled_region
+from app.utils.json_codec import dumps
+from app.utils.run_log import set_trace_ids_source
+
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_FILE = Path(os.getenv("TRACE_FILE", ".traces.jsonl"))
+TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", str(50 * 1024 * 1024)))
+TRACE_FILE_BACKUPS = int(os.getenv("TRACE_FILE_BACKUPS", "3"))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://127.0.0.1:4318")
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "256"))  # per run
+TRACE_QUEUE_MAX = int(os.getenv("TRACE_QUEUE_MAX", "1000"))  # finished runs waiting for export
+SERVICE_NAME = os.getenv("SERVICE_NAME", "neuromcp-agent-hub")
+
+_HEX32 = re.compile(r"^[0-9a-f]{32}$")
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, attributes: Dict[str, Any]):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Stand-in yielded when the run is not sampled"""
+    span_id = None
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Trace:
+    __slots__ = ("trace_id", "sampled", "spans", "dropped")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.dropped = 0
+
+    def add(self, span: Span) -> None:
+        if len(self.spans) < TRACE_MAX_SPANS or span.parent_id is None:  # always keep the root
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+
+# (trace, innermost open span) of the running request
+_current: ContextVar[Optional[Tuple[Trace, Optional[Span]]]] = ContextVar("neuromcp_trace", default=None)
+
+
+def trace_id_for(run_id: str) -> str:
+    """run_id as a W3C trace id (uuid4 hex already is one)"""
+    run_id = (run_id or "").lower()
+    return run_id if _HEX32.match(run_id) else hashlib.sha256(run_id.encode()).hexdigest()[:32]
+
+
+def is_sampled(trace_id: str, rate: Optional[float] = None) -> bool:
+    """
+    Deterministic per trace: the last 60 bits against the rate (uuid4 fixes
+    the version and variant nibbles before them, so they are uniform)
+    """
+    rate = _config["sample_rate"] if rate is None else rate
+    if _config["exporter"] == "none" or rate <= 0:
+        return False
+    return rate >= 1 or int(trace_id[17:], 16) < rate * 16 ** 15
+
+
+def current_ids() -> Tuple[Optional[str], Optional[str]]:
+    """(trace_id, span_id) of the running request, span_id only when sampled"""
+    ctx = _current.get()
+    if ctx is None:
+        return None, None
+    trace, span = ctx
+    return trace.trace_id, span.span_id if span is not None else None
+
+
+set_trace_ids_source(current_ids)  # RunLog records made inside a run carry its ids
+
+
+def traceparent() -> Optional[str]:
+    """W3C traceparent header for an outbound call made inside a span"""
+    ctx = _current.get()
+    if ctx is None:
+        return None
+    trace, span = ctx
+    parent = span.span_id if span is not None else "0" * 16
+    return f"00-{trace.trace_id}-{parent}-{'01' if trace.sampled else '00'}"
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Child span of the current one; a no-op outside a sampled run
+
+    Also marks the thread as working for a profiled run (see profiler).
+    """
+    ctx = _current.get()
+    with profiled_region():
+        if ctx is None or not ctx[0].sampled:
+            yield NOOP_SPAN
+            return
+        trace, parent = ctx
+        current = Span(trace.trace_id, parent.span_id if parent is not None else None, name, attributes)
+        token = _current.set((trace, current))
+        try:
+            yield current
+        except BaseException as e:
+            current.error = f"{type(e).__name__}: {e}"[:300]
+            raise
+        finally:
+            current.end_ns = time.time_ns()
+            _current.reset(token)
+            trace.add(current)
+
+
+@contextmanager
+def start_trace(run_id: str, name: str, **attributes: Any) -> Iterator[Any]:
+    """Root span of one API round trip; exports the run's spans when it ends"""
+    trace = Trace(trace_id_for(run_id), False)
+    trace.sampled = is_sampled(trace.trace_id)
+    token = _current.set((trace, None))
+    try:
+        with span(name, run_id=run_id, **attributes) as root:
+            yield root
+    finally:
+        _current.reset(token)
+        if trace.sampled and trace.spans:
+            if trace.dropped:
+                trace.spans[-1].set(dropped_spans=trace.dropped)  # the root ends last
+            get_span_processor().submit(trace.spans)
+
+
+# ----------------------------
+# Export
+# ----------------------------
+
+def otlp_payload(spans: List[Span]) -> Dict[str, Any]:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": "neuromcp"}, "spans": [s.to_otlp() for s in spans]}],
+        }]
+    }
+
+
+class FileSpanExporter:
+    def __init__(self, path: Optional[Path] = None, max_bytes: int = TRACE_FILE_MAX_BYTES,
+                 backups: int = TRACE_FILE_BACKUPS):
+        self.path = Path(path or TRACE_FILE)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.rotations = 0
+
+    def _backup(self, n: int) -> Path:
+        return self.path.with_name(f"{self.path.name}.{n}")
+
+    def _rotate(self) -> None:
+        """TRACE_FILE -> .1 -> .2 ...; the oldest backup is dropped"""
+        if self.backups <= 0:
+            self.path.unlink(missing_ok=True)
+        else:
+            self._backup(self.backups).unlink(missing_ok=True)
+            for n in range(self.backups - 1, 0, -1):
+                if self._backup(n).exists():
+                    self._backup(n).replace(self._backup(n + 1))
+            self.path.replace(self._backup(1))
+        self.rotations += 1
+
+    def export(self, spans: List[Span]) -> None:
+        lines = b"".join(dumps({"service": SERVICE_NAME, **s.to_otlp()}) + b"\n" for s in spans)
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size and self.max_bytes and size + len(lines) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "ab") as f:
+            f.write(lines)
+
+
+class OTLPHttpSpanExporter:
+    def __init__(self, endpoint: Optional[str] = None, timeout_s: float = 5.0):
+        self.url = (endpoint or TRACE_OTLP_ENDPOINT).rstrip("/") + "/v1/traces"
+        self.timeout_s = timeout_s
+
+    def export(self, spans: List[Span]) -> None:
+        import httpx  # export thread only
+
+        response = httpx.post(
+            self.url, content=dumps(otlp_payload(spans)),
+            headers={"content-type": "application/json"}, timeout=self.timeout_s,
+        )
+        response.raise_for_status()
+
+
+class SpanProcessor:
+    """Bounded queue of finished runs, exported by a daemon thread"""
+
+    def __init__(self, exporter: Any, queue_max: int = TRACE_QUEUE_MAX):
+        self.exporter = exporter
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(maxsize=queue_max)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._done = threading.Condition()
+        self.submitted = 0
+        self.handled = 0
+        self.exported_spans = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+
+    def submit(self, spans: List[Span]) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.submitted += 1
+        return True
+
+    def _run(self) -> None:
+        while True:
+            spans = self._queue.get()
+            if spans is None:
+                return
+            batch = list(spans)
+            # Coalesce whatever else is already waiting into one export
+            while len(batch) < 2048:
+                try:
+                    more = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    self._queue.put(None)
+                    break
+                batch.extend(more)
+                with self._done:
+                    self.handled += 1
+            try:
+                self.exporter.export(batch)
+                self.exported_spans += len(batch)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+            with self._done:
+                self.handled += 1
+                self._done.notify_all()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        target = self.submitted
+        deadline = time.monotonic() + timeout
+        with self._done:
+            while self.handled < target:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._done.wait(left)
+        return True
+
+    def close(self, timeout: float = 5.0) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "exporter": type(self.exporter).__name__,
+            "sample_rate": _config["sample_rate"],
+            "queued": self._queue.qsize(),
+            "traces": self.submitted,
+            "spans": self.exported_spans,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+_config: Dict[str, Any] = {"exporter": TRACE_EXPORTER, "sample_rate": TRACE_SAMPLE_RATE}
+_processor: Optional[SpanProcessor] = None
+
+
+def _create_exporter(kind: str) -> Any:
+    if kind == "otlp":
+        return OTLPHttpSpanExporter()
+    return FileSpanExporter()
+
+
+def get_span_processor() -> SpanProcessor:
+    global _processor
+    if _processor is None:
+        _processor = SpanProcessor(_create_exporter(_config["exporter"]))
+    return _processor
+
+
+def configure_tracing(
+    exporter: Optional[Any] = None,
+    sample_rate: Optional[float] = None,
+    kind: Optional[str] = None,
+) -> None:
+    """Swap the exporter (object or kind: file/otlp/none) and/or the sample rate"""
+    global _processor
+    if sample_rate is not None:
+        _config["sample_rate"] = sample_rate
+    if kind is not None:
+        _config["exporter"] = kind.lower()
+    if exporter is not None or kind is not None:
+        if _processor is not None:
+            _processor.close()
+        _processor = SpanProcessor(exporter) if exporter is not None else None
+
+
+def reset_tracing() -> None:
+    """Back to the env configuration (tests)"""
+    global _processor
+    if _processor is not None:
+        _processor.close()
+    _processor = None
+    _config.update(exporter=TRACE_EXPORTER, sample_rate=TRACE_SAMPLE_RATE)
+
+
+def close_tracing() -> None:
+    global _processor
+    if _processor is not None:
+        _processor.flush()
+        _processor.close()
+        _processor = None
@@ -0,0 +1,161 @@
+"""
+Fair run scheduler
+Caps how many graph runs execute at once: MAX_CONCURRENT_RUNS for the
+process and TenantQuota.max_concurrent_runs per tenant. Runs over a cap
+queue (bounded per tenant by max_queued_runs, and by the run deadline).
+Free slots go round-robin across tenants with queued runs, so a tenant
+with a long queue gets one slot per turn like everybody else instead of
+starving the others.
+
+Config (env): MAX_CONCURRENT_RUNS (default 16); per-tenant caps see app.utils.tenant
+"""
+from __future__ import annotations
+import asyncio
+import os
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+from app.utils.deadline import DeadlineExceeded, remaining
+from app.utils.tenant import TenantQuota, quota_for
+
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", "16"))
+
+
+class RunQueueFull(RuntimeError):
+    """The tenant already has max_queued_runs waiting"""
+
+
+class FairRunScheduler:
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_RUNS,
+        quotas: Callable[[str], TenantQuota] = quota_for,
+    ):
+        self.max_concurrent = max_concurrent
+        self.quotas = quotas
+        self.active: Dict[str, int] = defaultdict(int)
+        self.total_active = 0
+        self._waiting: Dict[str, Deque[asyncio.Future]] = defaultdict(deque)
+        self._turns: Deque[str] = deque()  # tenants with queued runs, in round-robin order
+        self.granted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _has_room(self, tenant_id: str) -> bool:
+        return (
+            self.total_active < self.max_concurrent
+            and self.active.get(tenant_id, 0) < self.quotas(tenant_id).max_concurrent_runs
+        )
+
+    def _grant(self, tenant_id: str) -> None:
+        self.active[tenant_id] += 1
+        self.total_active += 1
+        self.granted += 1
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued runs, one tenant per turn"""
+        skipped = 0
+        while self._turns and self.total_active < self.max_concurrent and skipped < len(self._turns):
+            tenant_id = self._turns[0]
+            waiters = self._waiting[tenant_id]
+            while waiters and waiters[0].done():  # cancelled / timed out
+                waiters.popleft()
+            if not waiters:
+                self._turns.popleft()
+                del self._waiting[tenant_id]
+                continue
+            if not self._has_room(tenant_id):
+                self._turns.rotate(-1)  # at its own cap: next tenant's turn
+                skipped += 1
+                continue
+            self._grant(tenant_id)
+            waiters.popleft().set_result(None)
+            self._turns.rotate(-1)
+            skipped = 0
+
+    async def acquire(self, tenant_id: str, deadline_at: Optional[float] = None) -> None:
+        if not self._waiting.get(tenant_id) and self._has_room(tenant_id):
+            self._grant(tenant_id)
+            return
+
+        quota = self.quotas(tenant_id)
+        if len(self._waiting.get(tenant_id, ())) >= quota.max_queued_runs:
+            self.rejected += 1
+            raise RunQueueFull(
+                f"Too many runs in progress for your workspace ({quota.max_concurrent_runs} running, "
+                f"{quota.max_queued_runs} queued). Try again shortly."
+            )
+
+        fut = asyncio.get_running_loop().create_future()
+        self._waiting[tenant_id].append(fut)
+        if tenant_id not in self._turns:
+            self._turns.append(tenant_id)
+        self.queued += 1
+        self._dispatch()
+
+        left = remaining(deadline_at)
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), timeout=None if left is None else max(0.0, left))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if fut.done() and not fut.cancelled():
+                self.release(tenant_id)  # granted just as we gave up: pass it on
+            else:
+                fut.cancel()
+                waiters = self._waiting.get(tenant_id)
+                if waiters and fut in waiters:
+                    waiters.remove(fut)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise DeadlineExceeded("Run deadline exceeded while queued for a run slot") from None
+            raise
+
+    def release(self, tenant_id: str) -> None:
+        self.active[tenant_id] -= 1
+        self.total_active -= 1
+        if self.active[tenant_id] <= 0:
+            del self.active[tenant_id]
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tenant_id: str, deadline_at: Optional[float] = None) -> AsyncIterator[None]:
+        await self.acquire(tenant_id, deadline_at)
+        try:
+            yield
+        finally:
+            self.release(tenant_id)
+
+    def stats(self) -> Dict[str, Any]:
+        tenants = set(self.active) | {t for t, w in self._waiting.items() if w}
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": self.total_active,
+            "granted": self.granted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "tenants": {
+                t: {
+                    "active": self.active.get(t, 0),
+                    "waiting": sum(1 for f in self._waiting.get(t, ()) if not f.done()),
+                    "max_concurrent": self.quotas(t).max_concurrent_runs,
+                }
+                for t in sorted(tenants)
+            },
+        }
+
+
+_scheduler: Optional[FairRunScheduler] = None
+
+
+def get_run_scheduler() -> FairRunScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FairRunScheduler()
+    return _scheduler
+
+
+def reset_run_scheduler(scheduler: Optional[FairRunScheduler] = None) -> None:
+    global _scheduler
+    _scheduler = scheduler
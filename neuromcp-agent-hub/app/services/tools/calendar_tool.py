@@ -2,15 +2,18 @@
 Direct Google Calendar integration
 Bypasses MCP client to avoid circular dependency
 """
-import httpx
 import os
-from typing import Dict, Any
+import uuid
+from typing import Dict, Any, Optional
 from datetime import datetime
-from app.services.oauth.token_store import get_token, upsert_token
-from app.services.oauth.google_oauth import refresh_google_token
+from app.services.oauth.google_token_manager import GoogleNotConnected, get_google_token_manager
+from app.services.http.retry import request_with_retry
+from app.utils.tenant import DEFAULT_TENANT
 
 
-GOOGLE_CALENDAR_API = "https://www.googleapis.com/calendar/v3"
+# Override to point at a stand-in (e.g. python -m app.services.mock_backend.server)
+GOOGLE_CALENDAR_API = os.getenv("GOOGLE_CALENDAR_API", "https://www.googleapis.com/calendar/v3").rstrip("/")
+HTTP_TIMEOUT_S = 30.0  # per-call cap; the run deadline may cut it shorter
 
 
 async def create_calendar_event(
@@ -19,11 +22,14 @@ async def create_calendar_event(
     end_time: str,
     description: str = "",
     attendees: list = None,
-    timezone: str = "Asia/Kolkata"
+    timezone: str = "Asia/Kolkata",
+    deadline_at: Optional[float] = None,
+    tenant_id: str = DEFAULT_TENANT
 ) -> Dict[str, Any]:
     """
     Create a Google Calendar event using OAuth tokens
-    Auto-refreshes expired tokens automatically
+    Tokens come from the token manager (refreshed before expiry; one
+    shared refresh on a 401)
     
     Args:
         title: Event title
@@ -32,23 +38,20 @@ async def create_calendar_event(
         description: Event description
         attendees: List of email addresses
         timezone: Timezone for the event
+        deadline_at: Run deadline (epoch seconds) bounding every HTTP call
+        tenant_id: Tenant whose Google account to use
     
     Returns:
         Event details including event ID
     """
-    # Get Google OAuth token
-    token_data = await get_token("google")
-    if not token_data:
-        raise RuntimeError("Google Calendar not connected. Please authenticate first.")
+    # Current Google token from memory (refreshed ahead of expiry)
+    tokens = get_google_token_manager(tenant_id)
+    access_token = await tokens.get_access_token()
     
-    access_token = token_data.get("access_token")
-    refresh_token = token_data.get("refresh_token")
-    
-    if not access_token:
-        raise RuntimeError("No access token found for Google Calendar")
-    
-    # Build event payload
+    # Build event payload. The client-supplied id makes the insert idempotent,
+    # so it is safe to retry after a 5xx / timeout
     event = {
+        "id": uuid.uuid4().hex,
         "summary": title,
         "description": description or f"Event: {title}",
         "start": {
@@ -66,87 +69,92 @@ async def create_calendar_event(
         event["attendees"] = [{"email": email} for email in attendees]
     
     # Make API call to create event
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{GOOGLE_CALENDAR_API}/calendars/primary/events",
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            },
-            json=event,
-            timeout=30.0
-        )
-        
-        # Handle token expiration
-        if response.status_code == 401:
-            if not refresh_token:
-                raise RuntimeError("Access token expired and no refresh token available. Please re-authenticate with Google.")
+    response = await request_with_retry(
+        "google", "calendar.events.insert", "POST",
+        f"{GOOGLE_CALENDAR_API}/calendars/primary/events",
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        },
+        json=event,
+        deadline_at=deadline_at,
+        idempotent=True,
+        timeout_s=HTTP_TIMEOUT_S
+    )
+    
+    # Handle token expiration
+    if response.status_code == 401:
+        # Refresh once (shared with any concurrent caller that got the same 401)
+        try:
+            access_token = await tokens.refresh_after_401(access_token)
             
-            # Automatically refresh the token
-            try:
-                new_access_token = await refresh_google_token(
-                    refresh_token,
-                    os.getenv("GOOGLE_CLIENT_ID"),
-                    os.getenv("GOOGLE_CLIENT_SECRET")
-                )
-                
-                # Update stored token
-                await upsert_token("google", {
-                    "access_token": new_access_token,
-                    "refresh_token": refresh_token
-                })
-                
-                # Retry the request with new token
-                response = await client.post(
-                    f"{GOOGLE_CALENDAR_API}/calendars/primary/events",
-                    headers={
-                        "Authorization": f"Bearer {new_access_token}",
-                        "Content-Type": "application/json"
-                    },
-                    json=event,
-                    timeout=30.0
-                )
-            except Exception as e:
-                raise RuntimeError(f"Token refresh failed: {str(e)}. Please re-authenticate with Google.")
-        
-        if response.status_code != 200:
-            error_data = response.json() if response.text else {}
-            raise RuntimeError(f"Calendar API error: {response.status_code} - {error_data}")
-        
-        result = response.json()
-        
-        return {
-            "success": True,
-            "event_id": result.get("id"),
-            "html_link": result.get("htmlLink"),
-            "summary": result.get("summary"),
-            "start": result.get("start", {}).get("dateTime"),
-            "end": result.get("end", {}).get("dateTime"),
-            "created": result.get("created")
-        }
+            # Retry the request with new token
+            response = await request_with_retry(
+                "google", "calendar.events.insert", "POST",
+                f"{GOOGLE_CALENDAR_API}/calendars/primary/events",
+                headers={
+                    "Authorization": f"Bearer {access_token}",
+                    "Content-Type": "application/json"
+                },
+                json=event,
+                deadline_at=deadline_at,
+                idempotent=True,
+                timeout_s=HTTP_TIMEOUT_S
+            )
+        except GoogleNotConnected:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Token refresh failed: {str(e)}. Please re-authenticate with Google.")
+    
+    # 409 = an earlier attempt of this same insert already landed (the id is ours)
+    if response.status_code == 409:
+        response = await request_with_retry(
+            "google", "calendar.events.get", "GET",
+            f"{GOOGLE_CALENDAR_API}/calendars/primary/events/{event['id']}",
+            headers={"Authorization": f"Bearer {access_token}"},
+            deadline_at=deadline_at,
+            timeout_s=HTTP_TIMEOUT_S
+        )
+    
+    if response.status_code != 200:
+        error_data = response.json() if response.text else {}
+        raise RuntimeError(f"Calendar API error: {response.status_code} - {error_data}")
+    
+    result = response.json()
+    
+    return {
+        "success": True,
+        "event_id": result.get("id"),
+        "html_link": result.get("htmlLink"),
+        "summary": result.get("summary"),
+        "start": result.get("start", {}).get("dateTime"),
+        "end": result.get("end", {}).get("dateTime"),
+        "created": result.get("created")
+    }
 
 
 async def list_calendar_events(
     max_results: int = 10,
-    time_min: str = None
+    time_min: str = None,
+    deadline_at: Optional[float] = None,
+    tenant_id: str = DEFAULT_TENANT
 ) -> Dict[str, Any]:
     """
     List upcoming calendar events
-    Auto-refreshes expired tokens automatically
+    Tokens come from the token manager (refreshed before expiry; one
+    shared refresh on a 401)
     
     Args:
         max_results: Maximum number of events to return
         time_min: Minimum time for events (ISO format)
+        deadline_at: Run deadline (epoch seconds) bounding every HTTP call
+        tenant_id: Tenant whose Google account to use
     
     Returns:
         List of events
     """
-    token_data = await get_token("google")
-    if not token_data:
-        raise RuntimeError("Google Calendar not connected")
-    
-    access_token = token_data.get("access_token")
-    refresh_token = token_data.get("refresh_token")
+    tokens = get_google_token_manager(tenant_id)
+    access_token = await tokens.get_access_token()
     
     params = {
         "maxResults": max_results,
@@ -159,60 +167,52 @@ async def list_calendar_events(
     else:
         params["timeMin"] = datetime.utcnow().isoformat() + "Z"
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{GOOGLE_CALENDAR_API}/calendars/primary/events",
-            headers={"Authorization": f"Bearer {access_token}"},
-            params=params,
-            timeout=30.0
-        )
-        
-        # Handle token expiration
-        if response.status_code == 401:
-            if not refresh_token:
-                raise RuntimeError("Access token expired and no refresh token available. Please re-authenticate with Google.")
+    response = await request_with_retry(
+        "google", "calendar.events.list", "GET",
+        f"{GOOGLE_CALENDAR_API}/calendars/primary/events",
+        headers={"Authorization": f"Bearer {access_token}"},
+        params=params,
+        deadline_at=deadline_at,
+        timeout_s=HTTP_TIMEOUT_S
+    )
+    
+    # Handle token expiration
+    if response.status_code == 401:
+        # Refresh once (shared with any concurrent caller that got the same 401)
+        try:
+            access_token = await tokens.refresh_after_401(access_token)
             
-            # Automatically refresh the token
-            try:
-                new_access_token = await refresh_google_token(
-                    refresh_token,
-                    os.getenv("GOOGLE_CLIENT_ID"),
-                    os.getenv("GOOGLE_CLIENT_SECRET")
-                )
-                
-                # Update stored token
-                await upsert_token("google", {
-                    "access_token": new_access_token,
-                    "refresh_token": refresh_token
-                })
-                
-                # Retry the request with new token
-                response = await client.get(
-                    f"{GOOGLE_CALENDAR_API}/calendars/primary/events",
-                    headers={"Authorization": f"Bearer {new_access_token}"},
-                    params=params,
-                    timeout=30.0
-                )
-            except Exception as e:
-                raise RuntimeError(f"Token refresh failed: {str(e)}. Please re-authenticate with Google.")
-        
-        if response.status_code != 200:
-            raise RuntimeError(f"Failed to list events: {response.status_code}")
-        
-        result = response.json()
-        events = result.get("items", [])
-        
-        return {
-            "success": True,
-            "count": len(events),
-            "events": [
-                {
-                    "id": event.get("id"),
-                    "summary": event.get("summary"),
-                    "start": event.get("start", {}).get("dateTime"),
-                    "end": event.get("end", {}).get("dateTime"),
-                    "html_link": event.get("htmlLink")
-                }
-                for event in events
-            ]
-        }
\ No newline at end of file
+            # Retry the request with new token
+            response = await request_with_retry(
+                "google", "calendar.events.list", "GET",
+                f"{GOOGLE_CALENDAR_API}/calendars/primary/events",
+                headers={"Authorization": f"Bearer {access_token}"},
+                params=params,
+                deadline_at=deadline_at,
+                timeout_s=HTTP_TIMEOUT_S
+            )
+        except GoogleNotConnected:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Token refresh failed: {str(e)}. Please re-authenticate with Google.")
+    
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to list events: {response.status_code}")
+    
+    result = response.json()
+    events = result.get("items", [])
+    
+    return {
+        "success": True,
+        "count": len(events),
+        "events": [
+            {
+                "id": event.get("id"),
+                "summary": event.get("summary"),
+                "start": event.get("start", {}).get("dateTime"),
+                "end": event.get("end", {}).get("dateTime"),
+                "html_link": event.get("htmlLink")
+            }
+            for event in events
+        ]
+    }
\ No newline at end of file
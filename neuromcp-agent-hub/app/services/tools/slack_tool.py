@@ -2,15 +2,26 @@
 Direct Slack integration
 Bypasses MCP client to avoid circular dependency
 """
-import httpx
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Optional
 from app.services.oauth.token_store import get_token
+from app.services.http.retry import request_with_retry
+from app.services.http.slack_scheduler import get_slack_scheduler
+from app.services.observability.tracing import span
+from app.utils.tenant import DEFAULT_TENANT
+
+
+# Override to point at a stand-in (e.g. python -m app.services.mock_backend.server)
+SLACK_API_BASE = os.getenv("SLACK_API_BASE", "https://slack.com/api").rstrip("/")
+HTTP_TIMEOUT_S = 30.0  # per-call cap; the run deadline may cut it shorter
 
 
 async def post_slack_message(
     channel: str,
     text: str,
-    thread_ts: str = None
+    thread_ts: str = None,
+    deadline_at: Optional[float] = None,
+    tenant_id: str = DEFAULT_TENANT
 ) -> Dict[str, Any]:
     """
     Post a message to Slack using OAuth token
@@ -19,12 +30,14 @@ async def post_slack_message(
         channel: Channel name (with # or without) or channel ID
         text: Message text
         thread_ts: Optional thread timestamp to reply to
+        deadline_at: Run deadline (epoch seconds) bounding the HTTP call
+        tenant_id: Tenant whose Slack workspace token (and rate limits) to use
     
     Returns:
         Message details including timestamp
     """
     # Get Slack OAuth token
-    token_data = await get_token("slack")
+    token_data = await get_token("slack", tenant_id)
     if not token_data:
         raise RuntimeError("Slack not connected. Please authenticate first.")
     
@@ -51,60 +64,69 @@ async def post_slack_message(
         payload["thread_ts"] = thread_ts
     
     # Make API call to post message
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://slack.com/api/chat.postMessage",
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            },
-            json=payload,
-            timeout=30.0
-        )
-        
-        if response.status_code != 200:
-            raise RuntimeError(f"Slack API HTTP error: {response.status_code}")
-        
-        result = response.json()
-        
-        if not result.get("ok"):
-            error = result.get("error", "unknown_error")
-            
-            # Provide helpful error messages
-            if error == "channel_not_found":
-                raise RuntimeError(
-                    f"❌ Channel '{channel}' not found. Please specify a valid channel in your Slack workspace. "
-                    f"Example: 'send slack message like hi team to #random' (check your Slack sidebar for channel names)"
-                )
-            elif error == "not_in_channel":
-                raise RuntimeError(
-                    f"❌ Bot is not a member of '{channel}'. "
-                    f"Please invite the bot to the channel first, or use a different channel you're both in."
-                )
-            elif error == "invalid_auth":
-                raise RuntimeError("❌ Slack authentication expired. Please reconnect Slack OAuth.")
-            else:
-                raise RuntimeError(f"❌ Slack error: {error}")
+    response = await request_with_retry(
+        "slack", "chat.postMessage", "POST",
+        f"{SLACK_API_BASE}/chat.postMessage",
+        pacer=get_slack_scheduler().pacer("chat.postMessage", channel, tenant_id=tenant_id),
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        },
+        json=payload,
+        deadline_at=deadline_at,
+        timeout_s=HTTP_TIMEOUT_S
+    )
+    
+    if response.status_code != 200:
+        raise RuntimeError(f"Slack API HTTP error: {response.status_code}")
+    
+    result = response.json()
+    
+    if not result.get("ok"):
+        error = result.get("error", "unknown_error")
         
-        return {
-            "success": True,
-            "channel": result.get("channel"),
-            "ts": result.get("ts"),
-            "message": {
-                "text": text,
-                "timestamp": result.get("ts")
-            }
+        # Provide helpful error messages
+        if error == "channel_not_found":
+            raise RuntimeError(
+                f"❌ Channel '{channel}' not found. Please specify a valid channel in your Slack workspace. "
+                f"Example: 'send slack message like hi team to #random' (check your Slack sidebar for channel names)"
+            )
+        elif error == "not_in_channel":
+            raise RuntimeError(
+                f"❌ Bot is not a member of '{channel}'. "
+                f"Please invite the bot to the channel first, or use a different channel you're both in."
+            )
+        elif error == "invalid_auth":
+            raise RuntimeError("❌ Slack authentication expired. Please reconnect Slack OAuth.")
+        else:
+            raise RuntimeError(f"❌ Slack error: {error}")
+    
+    return {
+        "success": True,
+        "channel": result.get("channel"),
+        "ts": result.get("ts"),
+        "message": {
+            "text": text,
+            "timestamp": result.get("ts")
         }
+    }
 
 
-async def list_slack_channels() -> Dict[str, Any]:
+async def list_slack_channels(
+    deadline_at: Optional[float] = None,
+    tenant_id: str = DEFAULT_TENANT
+) -> Dict[str, Any]:
     """
     List Slack channels
     
+    Args:
+        deadline_at: Run deadline (epoch seconds) bounding the HTTP call
+        tenant_id: Tenant whose Slack workspace token to use
+    
     Returns:
         List of channels
     """
-    token_data = await get_token("slack")
+    token_data = await get_token("slack", tenant_id)
     if not token_data:
         raise RuntimeError("Slack not connected")
     
@@ -113,41 +135,45 @@ async def list_slack_channels() -> Dict[str, Any]:
     else:
         access_token = token_data.get("access_token") or token_data
     
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://slack.com/api/conversations.list",
-            headers={"Authorization": f"Bearer {access_token}"},
-            timeout=30.0
-        )
-        
-        if response.status_code != 200:
-            raise RuntimeError(f"Failed to list channels: {response.status_code}")
-        
-        result = response.json()
-        
-        if not result.get("ok"):
-            raise RuntimeError(f"Slack error: {result.get('error')}")
-        
-        channels = result.get("channels", [])
-        
-        return {
-            "success": True,
-            "count": len(channels),
-            "channels": [
-                {
-                    "id": ch.get("id"),
-                    "name": ch.get("name"),
-                    "is_private": ch.get("is_private"),
-                    "is_member": ch.get("is_member")
-                }
-                for ch in channels
-            ]
-        }
+    response = await request_with_retry(
+        "slack", "conversations.list", "GET",
+        f"{SLACK_API_BASE}/conversations.list",
+        pacer=get_slack_scheduler().pacer("conversations.list", tenant_id=tenant_id),
+        headers={"Authorization": f"Bearer {access_token}"},
+        deadline_at=deadline_at,
+        timeout_s=HTTP_TIMEOUT_S
+    )
+    
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to list channels: {response.status_code}")
+    
+    result = response.json()
+    
+    if not result.get("ok"):
+        raise RuntimeError(f"Slack error: {result.get('error')}")
+    
+    channels = result.get("channels", [])
+    
+    return {
+        "success": True,
+        "count": len(channels),
+        "channels": [
+            {
+                "id": ch.get("id"),
+                "name": ch.get("name"),
+                "is_private": ch.get("is_private"),
+                "is_member": ch.get("is_member")
+            }
+            for ch in channels
+        ]
+    }
 
 
 async def read_slack_messages(
     channel: str,
-    limit: int = 100
+    limit: int = 100,
+    deadline_at: Optional[float] = None,
+    tenant_id: str = DEFAULT_TENANT
 ) -> Dict[str, Any]:
     """
     Read messages from a Slack channel
@@ -155,11 +181,14 @@ async def read_slack_messages(
     Args:
         channel: Channel name (with # or without) or channel ID
         limit: Maximum number of messages to fetch (default 100)
+        deadline_at: Run deadline (epoch seconds) shared by the channel
+            lookup and the history call
+        tenant_id: Tenant whose Slack workspace token to use
     
     Returns:
         List of messages from the channel
     """
-    token_data = await get_token("slack")
+    token_data = await get_token("slack", tenant_id)
     if not token_data:
         raise RuntimeError("Slack not connected")
     
@@ -172,62 +201,66 @@ async def read_slack_messages(
     channel_id = channel
     if channel.startswith("#"):
         # Get channel ID from name
-        channels_result = await list_slack_channels()
-        matching_channels = [
-            ch for ch in channels_result.get("channels", [])
-            if f"#{ch['name']}" == channel
-        ]
-        if not matching_channels:
-            raise RuntimeError(f"Channel '{channel}' not found")
-        channel_id = matching_channels[0]["id"]
-    
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://slack.com/api/conversations.history",
-            headers={"Authorization": f"Bearer {access_token}"},
-            params={
-                "channel": channel_id,
-                "limit": limit
-            },
-            timeout=30.0
-        )
-        
-        if response.status_code != 200:
-            raise RuntimeError(f"Failed to read messages: {response.status_code}")
-        
-        result = response.json()
-        
-        if not result.get("ok"):
-            error = result.get("error", "unknown_error")
-            if error == "channel_not_found":
+        with span("slack.resolve_channel", channel=channel) as lookup:
+            channels_result = await list_slack_channels(deadline_at=deadline_at, tenant_id=tenant_id)
+            matching_channels = [
+                ch for ch in channels_result.get("channels", [])
+                if f"#{ch['name']}" == channel
+            ]
+            lookup.set(channels_scanned=len(channels_result.get("channels", [])))
+            if not matching_channels:
                 raise RuntimeError(f"Channel '{channel}' not found")
-            elif error == "not_in_channel":
-                raise RuntimeError(f"Bot is not a member of '{channel}'")
-            else:
-                raise RuntimeError(f"Slack error: {error}")
-        
-        messages = result.get("messages", [])
-        
-        # Filter out only system messages (joins, leaves, etc.)
-        # Keep bot messages as they are legitimate content
-        filtered_messages = [
-            {
-                "text": msg.get("text", ""),
-                "user": msg.get("user", "unknown"),
-                "timestamp": msg.get("ts", ""),
-                "type": msg.get("type", "message")
-            }
-            for msg in messages
-            if (
-                msg.get("type") == "message" and 
-                msg.get("text") and
-                not msg.get("subtype")  # Only exclude system messages (joins, leaves, etc.)
-            )
-        ]
-        
-        return {
-            "success": True,
-            "channel": channel,
-            "count": len(filtered_messages),  # Use filtered count, not raw count
-            "messages": filtered_messages
+            channel_id = matching_channels[0]["id"]
+    
+    response = await request_with_retry(
+        "slack", "conversations.history", "GET",
+        f"{SLACK_API_BASE}/conversations.history",
+        pacer=get_slack_scheduler().pacer("conversations.history", tenant_id=tenant_id),
+        headers={"Authorization": f"Bearer {access_token}"},
+        params={
+            "channel": channel_id,
+            "limit": limit
+        },
+        deadline_at=deadline_at,
+        timeout_s=HTTP_TIMEOUT_S
+    )
+    
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to read messages: {response.status_code}")
+    
+    result = response.json()
+    
+    if not result.get("ok"):
+        error = result.get("error", "unknown_error")
+        if error == "channel_not_found":
+            raise RuntimeError(f"Channel '{channel}' not found")
+        elif error == "not_in_channel":
+            raise RuntimeError(f"Bot is not a member of '{channel}'")
+        else:
+            raise RuntimeError(f"Slack error: {error}")
+    
+    messages = result.get("messages", [])
+    
+    # Filter out only system messages (joins, leaves, etc.)
+    # Keep bot messages as they are legitimate content
+    filtered_messages = [
+        {
+            "text": msg.get("text", ""),
+            "user": msg.get("user", "unknown"),
+            "timestamp": msg.get("ts", ""),
+            "type": msg.get("type", "message")
         }
+        for msg in messages
+        if (
+            msg.get("type") == "message" and 
+            msg.get("text") and
+            not msg.get("subtype")  # Only exclude system messages (joins, leaves, etc.)
+        )
+    ]
+    
+    return {
+        "success": True,
+        "channel": channel,
+        "count": len(filtered_messages),  # Use filtered count, not raw count
+        "messages": filtered_messages
+    }
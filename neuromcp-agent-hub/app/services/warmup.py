@@ -0,0 +1,191 @@
+"""
+Startup warm-up
+Pays the first-request costs (client creation, first token read, regex and
+schema compilation, TLS handshakes, LangGraph's first run) before the worker
+reports ready. Steps never raise: failures are recorded and the worker still
+becomes ready, just colder. CPU/import-heavy work runs in a thread so the
+loop keeps answering /healthz meanwhile.
+"""
+from __future__ import annotations
+import asyncio
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+# Hosts whose TLS handshake we pre-pay (kept alive in the shared HTTP pool)
+WARMUP_HOSTS = [
+    "https://slack.com/api/api.test",
+    "https://www.googleapis.com/calendar/v3",
+]  # Groq is warmed through ChatGroq's own pool (llm_clients step)
+WARMUP_HOST_TIMEOUT_S = 3.0
+
+_ready = False
+_report: Dict[str, Any] = {"started_at": None, "finished_at": None, "steps": {}}
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+
+
+def network_warmup_enabled() -> bool:
+    # false = offline/CI: use local stand-ins instead of real handshakes
+    return os.getenv("WARMUP_NETWORK", "true").lower() == "true"
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+def mark_ready() -> None:
+    global _ready
+    _ready = True
+
+
+def reset_warmup() -> None:
+    """Back to not-ready with an empty report (tests)"""
+    global _ready
+    _ready = False
+    _report.update(started_at=None, finished_at=None, steps={})
+
+
+def get_warmup_report() -> Dict[str, Any]:
+    return _report
+
+
+# ============================
+# Warm-up steps
+# ============================
+
+async def _warm_mongo() -> str:
+    from app.services.db.mongo import _mongo_enabled, get_mongo_client
+
+    if not (_mongo_enabled() and os.getenv("MONGO_URI")):
+        return "skipped (Mongo not configured)"
+    # Async driver: the ping opens the first pooled connection without a thread hop
+    await get_mongo_client().admin.command("ping")
+    return "client created, ping ok"
+
+
+async def _warm_token_store() -> str:
+    from app.services.oauth.token_store import get_token
+
+    found = [p for p in ("google", "slack") if await get_token(p)]
+    return f"read ok ({', '.join(found) or 'no providers connected'})"
+
+
+def _warm_regex_sync() -> str:
+    # Running the rule code once fills `re`'s compiled-pattern cache
+    from app.agents.planner.offline_planner import build_plan
+    from app.agents.validator.pre_validation import extract_emails_from_text
+    from app.agents.validator.validation_rules import (
+        validate_calendar_event_input,
+        validate_email,
+        validate_slack_message_input,
+    )
+
+    sample = "Schedule team sync on feb 5 at 6.30 pm with warm@example.com and post in #general"
+    plan = build_plan(sample, [])
+    for email in extract_emails_from_text(sample):
+        validate_email(email)
+    for step in plan["steps"]:
+        if step["tool"] == "calendar.create_event":
+            validate_calendar_event_input(step["input"])
+        elif step["tool"] == "slack.post_message":
+            validate_slack_message_input(step["input"])
+    return f"warmed with {len(plan['steps'])}-step sample plan"
+
+
+async def _warm_regex() -> str:
+    return await asyncio.to_thread(_warm_regex_sync)
+
+
+async def _warm_schemas() -> str:
+    from app.services.mcp.tool_catalog import get_catalog
+
+    # Builds the catalog (compiled validators, prompt JSON) off the loop
+    catalog = await get_catalog()
+    return f"{len(catalog.validators)} tool schemas compiled (catalog {catalog.version})"
+
+
+def _warm_llm_clients_sync() -> str:
+    # Import cost of the LLM stacks; client objects only when a key exists
+    import groq  # noqa: F401
+    import langchain_groq  # noqa: F401
+
+    if not os.getenv("GROQ_API_KEY"):
+        return "modules imported (no GROQ_API_KEY)"
+    from app.agents.planner.agent import get_groq_llm, warm_groq_connection
+
+    get_groq_llm()  # the shared client the planner uses
+    if not network_warmup_enabled():
+        return "modules imported, client constructed (WARMUP_NETWORK=false)"
+    try:
+        status = warm_groq_connection(WARMUP_HOST_TIMEOUT_S)
+    except Exception as e:
+        return f"modules imported, client constructed, connection failed ({type(e).__name__})"
+    return f"modules imported, client constructed, connection opened ({status})"
+
+
+async def _warm_llm_clients() -> str:
+    return await asyncio.to_thread(_warm_llm_clients_sync)
+
+
+async def _warm_tls() -> str:
+    from app.services.http.client import get_http_client
+
+    client = get_http_client()  # builds the pool + SSL context locally
+    if not network_warmup_enabled():
+        return "local only (WARMUP_NETWORK=false)"
+
+    async def _touch(url: str) -> str:
+        try:
+            await client.head(url, timeout=WARMUP_HOST_TIMEOUT_S)
+            return "ok"
+        except Exception as e:
+            return type(e).__name__
+
+    results = await asyncio.gather(*(_touch(u) for u in WARMUP_HOSTS))
+    return ", ".join(f"{u.split('/')[2]}={r}" for u, r in zip(WARMUP_HOSTS, results))
+
+
+async def _warm_graph() -> str:
+    from app.routes.agent_api import get_graph
+
+    # WARMUP status routes straight to END: compiles the graph and exercises
+    # LangGraph's first-run machinery without tools, LLMs or rate limits
+    graph = await asyncio.to_thread(get_graph)
+    await graph.ainvoke({"status": "WARMUP"})
+    return "compiled and first run done"
+
+
+WARMUP_STEPS: Dict[str, Callable[[], Awaitable[str]]] = {
+    "mongo": _warm_mongo,
+    "token_store": _warm_token_store,
+    "regex": _warm_regex,
+    "schemas": _warm_schemas,
+    "llm_clients": _warm_llm_clients,
+    "tls": _warm_tls,
+    "graph": _warm_graph,
+}
+
+
+async def warm_up() -> Dict[str, Any]:
+    """Run every warm-up step, then mark the worker ready"""
+    _report["started_at"] = time.time()
+
+    for name, step in WARMUP_STEPS.items():
+        started = time.perf_counter()
+        try:
+            detail = await step()
+            ok = True
+        except Exception as e:
+            detail, ok = f"{type(e).__name__}: {e}", False
+        _report["steps"][name] = {
+            "ok": ok,
+            "ms": round((time.perf_counter() - started) * 1000, 1),
+            "detail": detail,
+        }
+
+    _report["finished_at"] = time.time()
+    mark_ready()
+    return _report
@@ -0,0 +1,71 @@
+"""
+Response compression middleware
+Starlette's GZipMiddleware (size threshold, streaming, Vary merging,
+already-encoded and excluded content types), answering br instead when the
+optional `brotli` package is installed and the client accepts it.
+"""
+from __future__ import annotations
+import os
+from typing import Any, Dict
+
+import anyio.to_thread
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def _accepted_encodings(headers: Headers) -> set:
+    return {part.split(";")[0].strip() for part in headers.get("accept-encoding", "").lower().split(",")}
+
+
+class BrotliResponder(IdentityResponder):
+    """br counterpart of Starlette's GZipResponder (same header handling, one stream per response)"""
+
+    content_encoding = "br"
+
+    def __init__(self, app: Any, minimum_size: int, quality: int = BROTLI_QUALITY,
+                 thread_minimum_size: int = 128 * 1024, **kwargs: Any):
+        super().__init__(app, minimum_size, **kwargs)
+        self.quality = quality
+        self.thread_minimum_size = thread_minimum_size
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if len(body) >= self.thread_minimum_size:
+            # Large bodies are compressed off the event loop, like gzip's
+            return await anyio.to_thread.run_sync(self._compress_body, body, more_body)
+        return self._compress_body(body, more_body)
+
+    def _compress_body(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        chunk = self._compressor.process(body)
+        return chunk + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZipMiddleware that prefers br when brotli is installed and accepted"""
+
+    def __init__(self, app: Any, minimum_size: int = COMPRESS_MIN_BYTES, compresslevel: int = GZIP_LEVEL,
+                 **kwargs: Any):
+        super().__init__(app, minimum_size, compresslevel, **kwargs)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if brotli is not None and scope["type"] == "http" and "br" in _accepted_encodings(Headers(scope=scope)):
+            responder = BrotliResponder(
+                self.app,
+                self.minimum_size,
+                thread_minimum_size=self.thread_minimum_size,
+                exclude_content_types=self.exclude_content_types,
+            )
+            await responder(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,74 @@
+"""
+Per-run deadline helpers
+A run gets ONE absolute deadline when it enters the API; every node and
+every outbound call derives its timeout from whatever budget is left.
+"""
+from __future__ import annotations
+import os
+import time
+from typing import Any, Dict, Optional
+
+from app.utils.run_log import get_run_log
+
+# Total budget for one /agent/run (or /agent/approve) round trip
+DEFAULT_RUN_BUDGET_S = float(os.getenv("RUN_BUDGET_S", "90"))
+MAX_RUN_BUDGET_S = float(os.getenv("RUN_BUDGET_MAX_S", "300"))
+
+TIMEOUT_STATUS = "TIMEOUT"
+
+
+class DeadlineExceeded(RuntimeError):
+    """Raised when a call is attempted after the run deadline has passed"""
+
+
+def new_deadline(budget_s: Optional[float] = None) -> float:
+    """
+    Absolute deadline (epoch seconds) for a new run.
+    Wall-clock time is used on purpose: the state (and its deadline) travels
+    to the client and back through /agent/approve.
+    """
+    budget = budget_s if budget_s and budget_s > 0 else DEFAULT_RUN_BUDGET_S
+    return time.time() + min(budget, MAX_RUN_BUDGET_S)
+
+
+def remaining(deadline_at: Optional[float]) -> Optional[float]:
+    """Seconds left until the deadline (None = no deadline set)"""
+    if deadline_at is None:
+        return None
+    return deadline_at - time.time()
+
+
+def is_expired(deadline_at: Optional[float]) -> bool:
+    left = remaining(deadline_at)
+    return left is not None and left <= 0
+
+
+def timeout_for(deadline_at: Optional[float], cap_s: float) -> float:
+    """
+    Timeout for a single outbound call: the remaining run budget,
+    never more than the call's own cap.
+    """
+    left = remaining(deadline_at)
+    if left is None:
+        return cap_s
+    if left <= 0:
+        raise DeadlineExceeded("Run deadline exceeded")
+    return min(cap_s, left)
+
+
+def deadline_exceeded(state: Dict[str, Any], agent: str) -> bool:
+    """
+    Node guard: if the run is out of budget, mark the state as TIMEOUT
+    (keeping whatever partial results exist) and tell the node to bail out.
+    """
+    if state.get("status") == TIMEOUT_STATUS:
+        return True  # an earlier node already ran out of budget
+    if not is_expired(state.get("deadline_at")):
+        return False
+
+    state["status"] = TIMEOUT_STATUS
+    state["error"] = "Run deadline exceeded"
+    get_run_log(state).append(
+        {"level": "WARNING", "agent": agent, "msg": f"⏱️ Run deadline exceeded - skipping {agent}"}
+    )
+    return True
@@ -0,0 +1,88 @@
+"""
+Fast JSON serialization
+orjson when it is installed, stdlib json otherwise. Used for API responses
+(opt-in via FAST_JSON_RESPONSES=true) and for every JSON file the app writes.
+"""
+from __future__ import annotations
+import json
+import os
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Types neither encoder knows natively (RunLog, Pydantic models, sets)"""
+    if isinstance(obj, deque):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    return json.dumps(
+        obj,
+        default=_default,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+    ).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json_file(path: Path | str, obj: Any) -> None:
+    Path(path).write_bytes(dumps(obj, indent=True))
+
+
+def read_json_file(path: Path | str) -> Any:
+    return loads(Path(path).read_bytes())
+
+
+# ============================
+# API responses
+# ============================
+
+def fast_responses_enabled() -> bool:
+    return os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the fast encoder above"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def respond(content: Any, status_code: int = 200) -> Any:
+    """
+    Return `content` from an endpoint.
+    With FAST_JSON_RESPONSES=true the response is rendered directly by the
+    fast encoder (skipping FastAPI's jsonable_encoder pass); otherwise the
+    dict goes through FastAPI's default serialization as before.
+    """
+    if fast_responses_enabled():
+        return FastJSONResponse(content, status_code=status_code)
+    if status_code != 200:
+        return JSONResponse(content, status_code=status_code)
+    return content
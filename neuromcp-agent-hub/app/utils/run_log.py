@@ -0,0 +1,106 @@
+"""
+Structured run logs
+Every run keeps its log records in a bounded ring buffer. Records carry a
+level, the agent, a timestamp and an optional payload that stays a Python
+object until the response is serialized. Records made inside a run carry
+its trace id (the run_id) and, when the run is sampled, the open span id;
+those come from a source the tracing module registers
+(set_trace_ids_source), so this module does not depend on it.
+"""
+from __future__ import annotations
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+TraceIds = Callable[[], Tuple[Optional[str], Optional[str]]]
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+# Ring buffer size and minimum level recorded per run
+RUN_LOG_SIZE = int(os.getenv("RUN_LOG_SIZE", "200"))
+RUN_LOG_LEVEL = os.getenv("RUN_LOG_LEVEL", "INFO").upper()
+
+# Levels returned to API callers unless they ask for something else
+DEFAULT_RESPONSE_LEVELS = ("INFO", "WARNING", "ERROR")
+
+
+def _no_trace() -> Tuple[Optional[str], Optional[str]]:
+    return None, None
+
+
+_trace_ids: TraceIds = _no_trace
+
+
+def set_trace_ids_source(source: Optional[TraceIds]) -> None:
+    """(trace_id, span_id) of the running request for new records (None = no tracing)"""
+    global _trace_ids
+    _trace_ids = source or _no_trace
+
+
+class RunLog(deque):
+    """
+    Per-run ring buffer of log records.
+    Accepts the legacy {"agent": ..., "msg": ...} dicts (level defaults to INFO)
+    so nodes can keep calling logs.append(...); extend() and += go through
+    append() too, so every record is level-filtered and tagged.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[Dict[str, Any]] = (),
+        maxlen: Optional[int] = None,
+        min_level: Optional[str] = None,
+        trace_ids: Optional[TraceIds] = None,
+    ):
+        super().__init__((), maxlen or RUN_LOG_SIZE)
+        self.min_level = LEVELS.get((min_level or RUN_LOG_LEVEL).upper(), LEVELS["INFO"])
+        self.trace_ids = trace_ids  # None = the registered source
+        self.extend(records)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        level = str(record.get("level", "INFO")).upper()
+        if LEVELS.get(level, LEVELS["INFO"]) < self.min_level:
+            return  # below verbosity: never stored, never serialized
+
+        entry = {
+            "level": level,
+            "agent": record.get("agent", "system"),
+            "msg": record.get("msg", ""),
+            "ts": record.get("ts") or round(time.time(), 3),
+        }
+        trace_id, span_id = (self.trace_ids or _trace_ids)()
+        trace_id = record.get("trace_id") or trace_id
+        if trace_id:
+            entry["trace_id"] = trace_id
+            span_id = record.get("span_id") or span_id
+            if span_id:
+                entry["span_id"] = span_id
+        if record.get("data") is not None:
+            entry["data"] = record["data"]
+        super().append(entry)
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            self.append(record)
+
+    def __iadd__(self, records: Iterable[Dict[str, Any]]) -> "RunLog":
+        self.extend(records)
+        return self
+
+    def to_list(self, levels: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Records (oldest first) restricted to the requested levels"""
+        wanted = {lvl.upper() for lvl in (levels or DEFAULT_RESPONSE_LEVELS)}
+        return [r for r in self if r["level"] in wanted]
+
+
+def get_run_log(state: Dict[str, Any]) -> RunLog:
+    """
+    Return the run's RunLog, upgrading a plain list (e.g. a state that came
+    back from the client through /agent/approve) on first access.
+    """
+    logs = state.get("logs")
+    if not isinstance(logs, RunLog):
+        logs = RunLog(logs or [])
+        state["logs"] = logs
+    return logs
@@ -1,17 +1,25 @@
 import os
-from itsdangerous import URLSafeSerializer
 from dotenv import load_dotenv
 
 load_dotenv()
 
 SECRET = os.getenv("SESSION_SECRET")
 
-serializer = URLSafeSerializer(SECRET, salt="oauth-state")
+_serializer = None
+
+
+def get_serializer():
+    """Created on first OAuth login/callback instead of at import time"""
+    global _serializer
+    if _serializer is None:
+        from itsdangerous import URLSafeSerializer
+        _serializer = URLSafeSerializer(SECRET, salt="oauth-state")
+    return _serializer
 
 
 def sign_state(data: dict) -> str:
-    return serializer.dumps(data)
+    return get_serializer().dumps(data)
 
 
 def unsign_state(token: str) -> dict:
-    return serializer.loads(token)
+    return get_serializer().loads(token)
@@ -0,0 +1,105 @@
+"""
+Mergeable quantile sketch
+Log-bucketed (DDSketch-style): a value v lands in bucket ceil(log_gamma(v)),
+so every quantile is answered within ALPHA relative error whatever the
+distribution. Two sketches merge by adding bucket counts, which is what
+lets per-minute rollups be combined into hours, windows and tenants
+without keeping the raw samples.
+"""
+from __future__ import annotations
+import math
+from typing import Any, Dict, Iterable, Optional
+
+ALPHA = 0.01  # 1% relative error
+MIN_VALUE = 1e-3  # below this (ms) values count as zero
+MAX_BINS = 2048  # lowest buckets are folded together beyond this
+
+_GAMMA = (1 + ALPHA) / (1 - ALPHA)
+_LOG_GAMMA = math.log(_GAMMA)
+
+
+class QuantileSketch:
+    __slots__ = ("bins", "zeros", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.bins: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, n: int = 1) -> None:
+        value = float(value)
+        if value < MIN_VALUE:
+            self.zeros += n
+        else:
+            key = math.ceil(math.log(value) / _LOG_GAMMA)
+            self.bins[key] = self.bins.get(key, 0) + n
+            if len(self.bins) > MAX_BINS:
+                self._collapse()
+        self.count += n
+        self.total += value * n
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        for key, n in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + n
+        if len(self.bins) > MAX_BINS:
+            self._collapse()
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        folded = keys[: len(keys) - MAX_BINS + 1]
+        self.bins[folded[-1]] = sum(self.bins.pop(k) for k in folded[:-1]) + self.bins[folded[-1]]
+
+    def quantile(self, q: float) -> Optional[float]:
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return max(self.min, 0.0)
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                value = 2 * _GAMMA ** key / (_GAMMA + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self, quantiles: Iterable[float] = (0.5, 0.95, 0.99)) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"count": self.count}
+        if self.count:
+            for q in quantiles:
+                out[f"p{round(q * 100)}"] = round(self.quantile(q), 1)
+            out["mean"] = round(self.total / self.count, 1)
+            out["max"] = round(self.max, 1)
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "b": {str(k): n for k, n in self.bins.items()},
+            "z": self.zeros,
+            "n": self.count,
+            "s": self.total,
+            "lo": self.min if self.count else None,
+            "hi": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls()
+        sketch.bins = {int(k): n for k, n in data.get("b", {}).items()}
+        sketch.zeros = data.get("z", 0)
+        sketch.count = data.get("n", 0)
+        sketch.total = data.get("s", 0.0)
+        if sketch.count:
+            sketch.min, sketch.max = data["lo"], data["hi"]
+        return sketch
@@ -0,0 +1,86 @@
+"""
+Startup import profile
+Runs a cold `import <module>` in a fresh interpreter with `-X importtime`
+and prints where the time goes.
+
+Usage:
+    python -m app.utils.startup_profile                 # profiles app.main
+    python -m app.utils.startup_profile app.main --top 30
+"""
+from __future__ import annotations
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_importtime(module: str) -> Tuple[float, List[Tuple[str, int, int, int]]]:
+    """
+    Import `module` in a fresh interpreter.
+    Returns (wall_seconds, [(name, self_us, cumulative_us, depth), ...]).
+    """
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    started = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=os.getcwd())
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            self_us, cum_us, indent, name = m.groups()
+            rows.append((name, int(self_us), int(cum_us), len(indent) // 2))
+    return wall, rows
+
+
+def cold_import_seconds(module: str = "app.main") -> float:
+    """Cold import time of `module` measured inside a fresh interpreter"""
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; "
+        "print(time.perf_counter() - t)"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=os.getcwd())
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Print an import-time breakdown")
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--top", type=int, default=20, help="rows per table")
+    args = parser.parse_args()
+
+    wall, rows = run_importtime(args.module)
+    total_us = sum(r[1] for r in rows)
+
+    by_package: Dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+
+    print("=" * 60)
+    print(f"Startup profile: import {args.module}")
+    print("=" * 60)
+    print(f"Interpreter wall time : {wall * 1000:8.1f} ms")
+    print(f"Sum of import times   : {total_us / 1000:8.1f} ms  ({len(rows)} modules)")
+
+    print("\nTop packages by self time:")
+    for pkg, us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[: args.top]:
+        print(f"  {us / 1000:8.1f} ms  {us / max(total_us, 1) * 100:5.1f}%  {pkg}")
+
+    print("\nTop modules by cumulative time:")
+    for name, _, cum_us, depth in sorted(rows, key=lambda r: r[2], reverse=True)[: args.top]:
+        print(f"  {cum_us / 1000:8.1f} ms  {'  ' * min(depth, 6)}{name}")
+
+
+if __name__ == "__main__":
+    main()
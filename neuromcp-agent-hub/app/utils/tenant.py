@@ -0,0 +1,76 @@
+"""
+Tenant / user identity helpers
+A run carries `tenant_id` (the workspace whose tokens, quotas and
+concurrency slots it uses) and `user_id` (who asked, for per-user quotas)
+from the API through GraphState into the tools. Identity is asserted by
+the caller (an auth gateway in front of the fleet); the hub only checks
+that it is well formed.
+"""
+from __future__ import annotations
+import os
+import re
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Optional
+
+DEFAULT_TENANT = os.getenv("DEFAULT_TENANT_ID", "default")
+DEFAULT_USER = "anonymous"
+
+_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.@-]{0,63}$")
+
+
+def normalize_id(value: Optional[str], default: str, kind: str = "tenant_id") -> str:
+    """Blank -> default; anything that is not a short plain identifier is rejected"""
+    if value is None or not str(value).strip():
+        return default
+    value = str(value).strip()
+    if not _ID_RE.match(value):
+        raise ValueError(f"Invalid {kind} '{value[:80]}': use letters, digits, '_', '.', '@' or '-' (max 64)")
+    return value
+
+
+def tenant_of(state: Dict[str, Any]) -> str:
+    return state.get("tenant_id") or DEFAULT_TENANT
+
+
+def user_of(state: Dict[str, Any]) -> str:
+    return state.get("user_id") or DEFAULT_USER
+
+
+# ----------------------------
+# Quotas
+# ----------------------------
+
+
+@dataclass(frozen=True)
+class TenantQuota:
+    requests_per_hour: int = int(os.getenv("TENANT_REQUESTS_PER_HOUR", "100"))
+    # 0 = a single user may use the whole tenant quota
+    user_requests_per_hour: int = int(os.getenv("USER_REQUESTS_PER_HOUR", "0"))
+    max_concurrent_runs: int = int(os.getenv("TENANT_MAX_CONCURRENT_RUNS", "4"))
+    max_queued_runs: int = int(os.getenv("TENANT_MAX_QUEUED_RUNS", "20"))
+
+
+def _load_overrides() -> Dict[str, TenantQuota]:
+    # TENANT_QUOTAS='{"acme": {"requests_per_hour": 500, "max_concurrent_runs": 8}}'
+    raw = os.getenv("TENANT_QUOTAS", "").strip()
+    if not raw:
+        return {}
+    import json
+
+    return {tenant: replace(TenantQuota(), **fields) for tenant, fields in json.loads(raw).items()}
+
+
+_overrides: Optional[Dict[str, TenantQuota]] = None
+
+
+def quota_for(tenant_id: str) -> TenantQuota:
+    global _overrides
+    if _overrides is None:
+        _overrides = _load_overrides()
+    return _overrides.get(tenant_id) or TenantQuota()
+
+
+def set_tenant_quotas(overrides: Optional[Dict[str, TenantQuota]] = None) -> None:
+    """Replace the per-tenant overrides (None = re-read TENANT_QUOTAS)"""
+    global _overrides
+    _overrides = overrides
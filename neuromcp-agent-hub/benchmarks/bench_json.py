@@ -0,0 +1,96 @@
+"""
+Benchmark: default FastAPI JSON encoding vs the fast encoder
+Builds /agent/run-shaped responses with large Slack histories and compares
+encode time and response size (raw / gzip / br).
+
+Run:  python -m benchmarks.bench_json
+"""
+import gzip
+import random
+import string
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.utils import json_codec
+from app.utils.compression import BROTLI_QUALITY, GZIP_LEVEL, brotli
+
+SIZES = [100, 1000, 5000]
+REPEAT = 20
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+
+
+def build_response(message_count: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    messages = [
+        {
+            "text": " ".join(_word(rng) for _ in range(rng.randint(5, 40))),
+            "user": f"U{rng.randint(10**7, 10**8)}",
+            "timestamp": f"{1769900000 + i}.{rng.randint(0, 999999):06d}",
+            "type": "message",
+        }
+        for i in range(message_count)
+    ]
+    return {
+        "status": "DONE",
+        "plan": {
+            "goal": "read messages from #general and summarize",
+            "steps": [
+                {"id": "S1", "action": "Read Slack messages", "tool": "slack.read_messages",
+                 "input": {"channel": "#general", "limit": message_count}, "depends_on": [],
+                 "expected_output": "List of messages"},
+                {"id": "S2", "action": "Summarize messages with AI", "tool": "slack.summarize_messages",
+                 "input": {}, "depends_on": ["S1"], "expected_output": "Summary text"},
+            ],
+        },
+        "pending_approvals": [],
+        "execution_results": {
+            "S1": {"success": True, "channel": "#general", "count": message_count, "messages": messages},
+            "S2": {"success": True, "summary": "Team discussed the release.", "message_count": message_count},
+        },
+        "final_report": "✅ NeuroMCP Final Report",
+        "logs": [{"level": "INFO", "agent": "executor", "msg": f"step {i}", "ts": 1769900000.0 + i} for i in range(20)],
+        "error": None,
+    }
+
+
+def _time_ms(fn, repeat: int = REPEAT) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main() -> None:
+    encoder = "orjson" if json_codec.orjson is not None else "stdlib json (orjson not installed)"
+    print("=" * 72)
+    print(f"JSON response benchmark  (fast encoder: {encoder})")
+    print("=" * 72)
+    print(f"{'messages':>9} {'default ms':>11} {'fast ms':>9} {'speedup':>8} {'raw KB':>8} {'gzip KB':>8} {'br KB':>7}")
+
+    for n in SIZES:
+        payload = build_response(n)
+        default_ms = _time_ms(lambda: JSONResponse(jsonable_encoder(payload)).body)
+        fast_ms = _time_ms(lambda: json_codec.FastJSONResponse(payload).body)
+
+        raw = json_codec.dumps(payload)
+        gz = gzip.compress(raw, compresslevel=GZIP_LEVEL)
+        br = brotli.compress(raw, quality=BROTLI_QUALITY) if brotli is not None else None
+
+        print(
+            f"{n:>9} {default_ms:>11.2f} {fast_ms:>9.2f} {default_ms / fast_ms:>7.1f}x "
+            f"{len(raw) / 1024:>8.1f} {len(gz) / 1024:>8.1f} "
+            f"{(len(br) / 1024 if br else float('nan')):>7.1f}"
+        )
+
+    print("\nbr column is nan when the optional 'brotli' package is not installed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: MCP tool calls over HTTP (one request per call) vs the persistent
+stdio JSON-RPC transport. Fully offline: HTTP hits a local uvicorn running
+the app with MOCK_TOOLS=true, stdio talks to the local stand-in server.
+
+Run:  python -m benchmarks.bench_mcp_transport [--calls 500] [--concurrency 32]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from app.services.http.client import close_http_client, get_http_client
+from app.services.mcp.mcp_client import MCPClient
+from app.services.mcp.stdio_transport import close_stdio_transports
+
+TOOL = "slack.post_message"
+ARGS = {"channel": "#general", "text": "benchmark message"}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_http_server(port: int) -> subprocess.Popen:
+    env = dict(os.environ, MOCK_TOOLS="true", WARMUP_ENABLED="false", COMPRESS_RESPONSES="false")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def _wait_for_http(base_url: str, timeout_s: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            r = await get_http_client().get(f"{base_url}/healthz", timeout=1.0)
+            if r.status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("uvicorn did not come up")
+
+
+async def _sequential(client: MCPClient, calls: int) -> list:
+    latencies = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await client.call_tool(TOOL, ARGS)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def _concurrent(client: MCPClient, calls: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await client.call_tool(TOOL, ARGS)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return calls / (time.perf_counter() - started)
+
+
+def _pct(values: list, q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+async def run(calls: int, concurrency: int) -> None:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = _start_http_server(port)
+    try:
+        await _wait_for_http(base_url)
+        clients = {
+            "http": MCPClient(base_url=base_url, transport="http"),
+            "stdio": MCPClient(transport="stdio"),
+        }
+
+        print(f"{'transport':<10}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'calls/s':>12}")
+        print("-" * 52)
+        for name, client in clients.items():
+            await _sequential(client, 20)  # warm connections / process
+            latencies = await _sequential(client, calls)
+            throughput = await _concurrent(client, calls, concurrency)
+            print(
+                f"{name:<10}{_pct(latencies, 0.5):>10.2f}{_pct(latencies, 0.99):>10.2f}"
+                f"{statistics.mean(latencies) * 1000:>10.2f}{throughput:>12.0f}"
+            )
+        print(f"\n{calls} sequential calls for latency; {calls} calls at concurrency {concurrency} for throughput")
+    finally:
+        await close_http_client()
+        await close_stdio_transports()
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark MCP transports")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+Microbenchmarks for the CPU hot paths (planner parsing, validation, rate
+limiting, report formatting) over a fixed, seeded corpus, with stored
+baselines and a regression gate.
+
+Run:  python -m benchmarks.microbench              (compare with baselines)
+      python -m benchmarks.microbench --check      (exit 1 on regression)
+      python -m benchmarks.microbench --save       (record new baselines)
+"""
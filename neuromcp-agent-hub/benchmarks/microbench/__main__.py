@@ -0,0 +1,187 @@
+"""
+Microbenchmark runner and regression gate.
+
+Every case is warmed up, calibrated so one repeat takes at least --min-time,
+then timed --repeat times with the GC off (like timeit); the fastest repeat
+is the result, since noise only ever adds time. --check compares with
+baselines.json and exits 1 when a case is slower than its baseline by more
+than --threshold (default 25%); a case over the line is re-measured
+--confirm times first and only fails if it stays slow (--save keeps the
+best of the same number of rounds).
+
+Baselines are machine-specific: record them with --save on the machine that
+runs the gate (a hardware/Python mismatch is reported).
+
+Run:  python -m benchmarks.microbench [--check | --save] [-k FILTER]
+          [--threshold 0.25] [--repeat 7] [--min-time 0.1] [--confirm 2] [--baseline PATH]
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_FILE = Path(__file__).with_name("baselines.json")
+
+
+def machine() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(terse=True),
+        "machine": platform.machine(),
+        "cpus": str(os.cpu_count()),
+    }
+
+
+def _time(op: Callable[[], Any], loops: int) -> float:
+    started = time.perf_counter()
+    for _ in range(loops):
+        op()
+    return time.perf_counter() - started
+
+
+def measure(op: Callable[[], Any], repeat: int = 7, min_time: float = 0.1) -> Dict[str, Any]:
+    """Seconds per op: fastest and median repeat"""
+    op()  # warm-up: imports, caches, compiled regexes
+    loops = 1
+    while True:
+        elapsed = _time(op, loops)
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.2))
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        per_op = [_time(op, loops) / loops for _ in range(repeat)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {"best": min(per_op), "median": statistics.median(per_op), "loops": loops}
+
+
+def load_baselines(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        return {"machine": None, "cases": {}}
+    return json.loads(path.read_text())
+
+
+def save_baselines(path: Path, results: Dict[str, Dict[str, Any]], existing: Dict[str, Any]) -> None:
+    cases = dict(existing.get("cases") or {})  # a filtered run only replaces what it measured
+    cases.update({name: {"op_us": round(r["best"] * 1e6, 3), "items": r["items"]} for name, r in results.items()})
+    path.write_text(json.dumps({
+        "machine": machine(),
+        "saved_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "cases": dict(sorted(cases.items())),
+    }, indent=2) + "\n")
+
+
+def compare(results: Dict[str, Dict[str, Any]], baselines: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """One row per measured case; status ok / regressed / faster / new"""
+    rows = []
+    for name, r in results.items():
+        op_us = r["best"] * 1e6
+        base = (baselines.get("cases") or {}).get(name)
+        row = {"name": name, "op_us": op_us, "item_us": op_us / r["items"], "baseline_us": None, "change": None}
+        if base is None:
+            row["status"] = "new"
+        else:
+            row["baseline_us"] = base["op_us"]
+            row["change"] = op_us / base["op_us"] - 1
+            row["status"] = ("regressed" if row["change"] > threshold
+                             else "faster" if row["change"] < -threshold else "ok")
+        rows.append(row)
+    return rows
+
+
+def run_cases(names: Optional[List[str]], pattern: Optional[str], repeat: int, min_time: float,
+              out=None) -> Dict[str, Dict[str, Any]]:
+    os.environ.setdefault("MOCK_TOOLS", "true")
+    from benchmarks.microbench.cases import CASES
+
+    results = {}
+    for case in CASES:
+        if (pattern and pattern not in case.name) or (names is not None and case.name not in names):
+            continue
+        results[case.name] = {**measure(case.setup(), repeat, min_time), "items": case.items}
+        print(f"  measured {case.name}", file=out, flush=True)
+    return results
+
+
+def _regressed(rows: List[Dict[str, Any]]) -> List[str]:
+    return [row["name"] for row in rows if row["status"] == "regressed"]
+
+
+def _fmt_us(us: Optional[float]) -> str:
+    if us is None:
+        return "-"
+    return f"{us / 1000:.2f} ms" if us >= 1000 else f"{us:.1f} us"
+
+
+def print_table(rows: List[Dict[str, Any]], threshold: float, out=None) -> None:
+    print("=" * 100, file=out)
+    print(f"{'case':<48} {'per op':>11} {'per item':>10} {'baseline':>11} {'change':>8}  status", file=out)
+    print("-" * 100, file=out)
+    for row in rows:
+        change = "-" if row["change"] is None else f"{row['change'] * 100:+.1f}%"
+        print(f"{row['name']:<48} {_fmt_us(row['op_us']):>11} {_fmt_us(row['item_us']):>10} "
+              f"{_fmt_us(row['baseline_us']):>11} {change:>8}  {row['status']}", file=out)
+    print("=" * 100, file=out)
+    print(f"regression threshold: +{threshold * 100:.0f}%", file=out)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.microbench")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--check", action="store_true", help="exit 1 if a case regressed beyond --threshold")
+    mode.add_argument("--save", action="store_true", help="store the results as the new baselines")
+    parser.add_argument("-k", "--filter", default=None, help="only cases whose name contains FILTER")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds per repeat (calibrated)")
+    parser.add_argument("--confirm", type=int, default=2, help="re-measure a regressed case N times before failing")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE)
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines(args.baseline)
+    results = run_cases(None, args.filter, args.repeat, args.min_time)
+    if not results:
+        print(f"No case matches {args.filter!r}")
+        return 2
+
+    if args.save:
+        for _ in range(args.confirm):  # a baseline is the best of several rounds too
+            for name, again in run_cases(list(results), None, args.repeat, args.min_time).items():
+                results[name]["best"] = min(results[name]["best"], again["best"])
+        save_baselines(args.baseline, results, baselines)
+        print(f"Saved {len(results)} baseline(s) to {args.baseline}")
+        return 0
+
+    rows = compare(results, baselines, args.threshold)
+    for _ in range(args.confirm):
+        suspects = _regressed(rows)
+        if not suspects:
+            break
+        for name, again in run_cases(suspects, None, args.repeat, args.min_time).items():
+            if again["best"] < results[name]["best"]:
+                results[name] = again
+        rows = compare(results, baselines, args.threshold)
+
+    print_table(rows, args.threshold)
+    if baselines.get("machine") and baselines["machine"] != machine():
+        print(f"note: baselines were recorded on {baselines['machine']}, this is {machine()}")
+    regressed = _regressed(rows)
+    if regressed:
+        print(f"{len(regressed)} regression(s): {', '.join(regressed)}")
+    return 1 if args.check and regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Benchmark cases. Each setup builds its inputs once and returns the op to
+time; one op walks a whole corpus slice, so results are per op and stable
+regardless of which corpus items happen to be slow.
+"""
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, List
+
+from benchmarks.microbench import corpus
+
+TZ = "Asia/Kolkata"
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    items: int  # corpus items one op processes
+
+
+def _catalog():
+    from app.services.mcp.tool_catalog import get_catalog
+    return asyncio.run(get_catalog())
+
+
+def _reset_limiter() -> None:
+    from app.agents.validator.rate_limiter import _rate_limiter
+    _rate_limiter.__init__()  # keep hourly quotas / duplicate detection out of the measurement
+
+
+# ----------------------------
+# Offline planner
+# ----------------------------
+
+def _build_plan(texts_of: Callable[[], List[str]]):
+    def setup():
+        from app.agents.planner.offline_planner import build_plan
+        tools = _catalog().tools
+        texts = texts_of()
+
+        def op():
+            for text in texts:
+                build_plan(text, tools, tz=TZ)
+        return op
+    return setup
+
+
+def _parse_time_and_date():
+    from app.agents.planner.offline_planner import _parse_time_and_date as parse
+    texts = corpus.requests()
+
+    def op():
+        for text in texts:
+            parse(text, TZ)
+    return op
+
+
+def _extract_title():
+    from app.agents.planner.offline_planner import _extract_title as extract
+    texts = corpus.requests()
+
+    def op():
+        for text in texts:
+            extract(text)
+    return op
+
+
+# ----------------------------
+# Validation
+# ----------------------------
+
+def _validate_plans(plans_of: Callable[[], List[dict]]):
+    def setup():
+        from app.agents.validator.agent import validate_plan_neurosymbolic
+        catalog = _catalog()
+        plans = plans_of()
+
+        def op():
+            _reset_limiter()
+            for i, plan in enumerate(plans):
+                validate_plan_neurosymbolic(plan, catalog, TZ, tenant_id=f"t{i % 20}", user_id=f"u{i}")
+        return op
+    return setup
+
+
+def _planned():
+    from app.agents.planner.offline_planner import build_plan
+    tools = _catalog().tools
+    return [build_plan(text, tools, tz=TZ) for text in corpus.requests(100)]
+
+
+def _validate_user_request(texts_of: Callable[[], List[str]]):
+    def setup():
+        from app.agents.validator.pre_validation import validate_user_request
+        texts = texts_of()
+
+        def op():
+            _reset_limiter()
+            for i, text in enumerate(texts):
+                validate_user_request(text, f"t{i % 20}", f"u{i}")
+        return op
+    return setup
+
+
+# ----------------------------
+# Rate limiter
+# ----------------------------
+
+def _rate_limiter_fresh():
+    """A burst of distinct requests against an empty limiter"""
+    from app.agents.validator.rate_limiter import RateLimiter
+    texts = corpus.requests()
+    tools = ("overall", "slack.post_message", "calendar.create_event")
+
+    def op():
+        limiter = RateLimiter()
+        for i, text in enumerate(texts):
+            limiter.check_rate_limit(tools[i % 3], text, f"t{i % 20}", f"u{i % 50}")
+    return op
+
+
+def _rate_limiter_busy():
+    """Steady state: hundreds of tenants with live windows, repeated requests"""
+    from app.agents.validator.rate_limiter import RateLimiter
+    texts = corpus.requests()
+    limiter = RateLimiter()
+    for t in range(300):
+        for u in range(3):
+            limiter.check_rate_limit("overall", f"warm {t} {u}", f"tenant{t}", f"user{u}")
+
+    def op():
+        for i, text in enumerate(texts):
+            limiter.check_rate_limit("overall", text, f"tenant{i % 300}", f"user{i % 3}")
+    return op
+
+
+# ----------------------------
+# Report
+# ----------------------------
+
+def _format_slack_messages(n: int):
+    def setup():
+        from app.agents.report.agent_main import format_slack_messages
+        messages = corpus.slack_messages(n)
+        return lambda: format_slack_messages(messages)
+    return setup
+
+
+def _run_report():
+    from app.agents.report.agent_main import run_report
+    from app.utils.run_log import RunLog
+    states = corpus.report_states()
+
+    def op():
+        for state in states:
+            # run_report rewrites execution_results in place; hand it a copy
+            run_report({"plan": state["plan"], "execution_results": dict(state["execution_results"]),
+                        "logs": RunLog([])})
+    return op
+
+
+CASES = [
+    Case("offline_planner.build_plan", _build_plan(corpus.requests), 200),
+    Case("offline_planner.build_plan[large]", _build_plan(corpus.large_requests), 20),
+    Case("offline_planner._parse_time_and_date", _parse_time_and_date, 200),
+    Case("offline_planner._extract_title", _extract_title, 200),
+    Case("validator.validate_plan_neurosymbolic", _validate_plans(_planned), 100),
+    Case("validator.validate_plan_neurosymbolic[large]", _validate_plans(lambda: [corpus.large_plan(40)] * 5), 5),
+    Case("pre_validation.validate_user_request", _validate_user_request(corpus.requests), 200),
+    Case("pre_validation.validate_user_request[large]", _validate_user_request(corpus.large_requests), 20),
+    Case("RateLimiter.check_rate_limit[fresh]", _rate_limiter_fresh, 200),
+    Case("RateLimiter.check_rate_limit[busy]", _rate_limiter_busy, 200),
+    Case("report.format_slack_messages[50]", _format_slack_messages(50), 50),
+    Case("report.format_slack_messages[2000]", _format_slack_messages(2000), 2000),
+    Case("report.run_report", _run_report, 2),
+]
@@ -0,0 +1,130 @@
+"""
+Benchmark corpus: request strings, plans, Slack histories and report states
+shaped like real traffic, generated from a fixed seed so every run (and
+every machine) measures the same inputs.
+"""
+from __future__ import annotations
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+SEED = 20260130
+
+PEOPLE = ("alice", "bob", "chen", "divya", "emeka", "farah", "goran", "hana", "ivan", "jules")
+DOMAINS = ("example.com", "acme.io", "corp.example.org")
+CHANNELS = ("#general", "#random", "#eng", "#design", "#standup", "#incidents", "#sales-emea")
+TOPICS = ("project review", "design sync", "quarterly planning", "1:1", "incident retro",
+          "customer demo", "budget check-in", "hiring debrief", "launch readiness")
+MONTHS = ("jan", "february", "mar", "april", "may", "june", "jul", "aug", "sept", "oct", "nov", "december")
+WORDS = ("deploy", "latency", "dashboard", "customer", "rollout", "migration", "ticket", "review",
+         "blocker", "release", "metrics", "owner", "follow", "up", "please", "thanks", "today", "api")
+
+
+def _email(rng: random.Random) -> str:
+    return f"{rng.choice(PEOPLE)}{rng.randint(1, 99)}@{rng.choice(DOMAINS)}"
+
+
+def _when(rng: random.Random) -> str:
+    day = rng.choice((
+        "tomorrow", "today", f"{rng.choice(MONTHS)} {rng.randint(1, 28)}",
+        f"{rng.randint(1, 28)}th {rng.choice(MONTHS)}",
+    ))
+    clock = rng.choice((
+        f"at {rng.randint(1, 12)}", f"{rng.randint(1, 12)} pm", f"{rng.randint(1, 11)}:{rng.choice(('00', '15', '30', '45'))} am",
+        f"{rng.randint(1, 11)}:30 pm",
+    ))
+    return f"{day} {clock}"
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def requests(n: int = 200, seed: int = SEED) -> List[str]:
+    """Mixed calendar / Slack requests as users type them"""
+    rng = random.Random(seed)
+    out = []
+    for _ in range(n):
+        kind = rng.random()
+        topic, channel = rng.choice(TOPICS), rng.choice(CHANNELS)
+        if kind < 0.4:
+            attendees = " and ".join(_email(rng) for _ in range(rng.randint(0, 3)))
+            out.append(f"schedule a {topic} meeting {_when(rng)}" + (f" with {attendees}" if attendees else ""))
+        elif kind < 0.55:
+            out.append(f"book {topic} {_when(rng)} and notify {channel} on slack")
+        elif kind < 0.75:
+            out.append(f"send message like {_sentence(rng, rng.randint(3, 12))} in {channel}")
+        elif kind < 0.9:
+            out.append(f"read the last messages from {channel} and summarize them")
+        else:
+            out.append(f"post '{_sentence(rng, rng.randint(5, 30))}' to {channel}")
+    return out
+
+
+def large_requests(n: int = 20, seed: int = SEED) -> List[str]:
+    """Pasted agendas: a few KB of text with many attendees"""
+    rng = random.Random(seed + 1)
+    out = []
+    for _ in range(n):
+        attendees = ", ".join(_email(rng) for _ in range(rng.randint(10, 40)))
+        agenda = ". ".join(_sentence(rng, rng.randint(8, 20)) for _ in range(rng.randint(20, 60)))
+        out.append(f"schedule a {rng.choice(TOPICS)} meeting {_when(rng)} with {attendees}. Agenda: {agenda}")
+    return out
+
+
+def large_plan(steps: int = 40, seed: int = SEED) -> Dict[str, Any]:
+    """Long multi-step plan: events with attendees, posts depending on them"""
+    rng = random.Random(seed + 2)
+    start = datetime(2031, 3, 3, 9, 0)
+    plan: Dict[str, Any] = {"goal": "quarterly planning week", "steps": []}
+    for i in range(1, steps + 1):
+        if i % 2:
+            begin = start + timedelta(hours=3 * i)
+            plan["steps"].append({
+                "id": f"S{i}", "action": "Create meeting event", "tool": "calendar.create_event",
+                "input": {
+                    "title": rng.choice(TOPICS).title(),
+                    "start_time": begin.isoformat() + "+05:30",
+                    "end_time": (begin + timedelta(hours=1)).isoformat() + "+05:30",
+                    "timezone": "Asia/Kolkata",
+                    "attendees": [_email(rng) for _ in range(rng.randint(2, 12))],
+                },
+                "depends_on": [], "expected_output": "Event ID",
+            })
+        else:
+            plan["steps"].append({
+                "id": f"S{i}", "action": "Post meeting notification in Slack", "tool": "slack.post_message",
+                "input": {"channel": rng.choice(CHANNELS), "text": _sentence(rng, rng.randint(10, 60))},
+                "depends_on": [f"S{i - 1}"], "expected_output": "Message ID",
+            })
+    return plan
+
+
+def slack_messages(n: int, seed: int = SEED) -> List[Dict[str, Any]]:
+    """conversations.history as read_slack_messages returns it"""
+    rng = random.Random(seed + 3 + n)
+    base = 1_780_000_000
+    return [
+        {
+            "user": f"U{rng.randint(10000, 99999)}",
+            "text": _sentence(rng, rng.randint(3, 40)),
+            "timestamp": f"{base + i * 37}.{rng.randint(0, 999999):06d}",
+        }
+        for i in range(n)
+    ]
+
+
+def report_states(seed: int = SEED) -> List[Dict[str, Any]]:
+    """Executor output the report node formats: a Slack read and a multi-step run"""
+    plan = large_plan(40, seed)
+    step_results = {
+        s["id"]: {"status": "ok", "output": {"id": f"evt{i}"} if s["tool"] == "calendar.create_event" else {"ts": "1.2"}}
+        for i, s in enumerate(plan["steps"])
+    }
+    step_results["S7"] = {"status": "error", "error": "channel_not_found"}
+    read_plan = {"goal": "read #eng", "steps": [{"id": "S1", "action": "Read Slack messages",
+                                                 "tool": "slack.read_messages", "depends_on": []}]}
+    return [
+        {"plan": read_plan, "execution_results": {"S1": {"success": True, "messages": slack_messages(200, seed)}}},
+        {"plan": plan, "execution_results": step_results},
+    ]
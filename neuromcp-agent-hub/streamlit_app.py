@@ -1,6 +1,5 @@
 import streamlit as st
 import requests
-import json
 from datetime import datetime
 
 # Page config
@@ -13,6 +12,11 @@ st.set_page_config(
 
 API_BASE_URL = "http://localhost:8000"
 
+# Total budget for one agent run; the backend enforces it end to end,
+# the client only waits a little longer to receive the (partial) response
+RUN_BUDGET_S = 90
+CLIENT_TIMEOUT_S = RUN_BUDGET_S + 10
+
 # Premium Professional Theme
 st.markdown("""
 <style>
@@ -399,19 +403,34 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Sidebar status checks: every widget interaction reruns the script, so cache
+# them briefly instead of making two blocking round trips per rerun
+STATUS_TTL_S = 10
+
+
+@st.cache_data(ttl=STATUS_TTL_S, show_spinner=False)
+def fetch_auth_status():
+    try:
+        providers = requests.get(f"{API_BASE_URL}/auth/status", timeout=2).json()["providers"]
+        return providers["google"]["connected"], providers["slack"]["connected"]
+    except:
+        return False, False
+
+
+@st.cache_data(ttl=STATUS_TTL_S, show_spinner=False)
+def fetch_backend_online():
+    try:
+        return requests.get(f"{API_BASE_URL}/healthz", timeout=2).status_code == 200
+    except:
+        return False
+
+
 # Sidebar
 with st.sidebar:
     st.markdown('<div class="sidebar-title">🔐 Service Connections</div>', unsafe_allow_html=True)
     
-    # Check OAuth status
-    try:
-        with open(".tokens.json", "r") as f:
-            tokens = json.load(f)
-            google_connected = "google" in tokens
-            slack_connected = "slack" in tokens
-    except:
-        google_connected = False
-        slack_connected = False
+    # Check OAuth status (the API knows the configured token store)
+    google_connected, slack_connected = fetch_auth_status()
     
     # Google Calendar
     status_text = "Connected" if google_connected else "Not Connected"
@@ -460,11 +479,7 @@ with st.sidebar:
     st.markdown("<br>", unsafe_allow_html=True)
     
     # Backend status
-    try:
-        response = requests.get(f"{API_BASE_URL}/", timeout=2)
-        backend_online = response.status_code == 200
-    except:
-        backend_online = False
+    backend_online = fetch_backend_online()
     
     status_text = "Online" if backend_online else "Offline"
     status_class = "connected" if backend_online else "disconnected"
@@ -509,8 +524,8 @@ with tab1:
             try:
                 response = requests.post(
                     f"{API_BASE_URL}/agent/run",
-                    json={"user_request": user_request},
-                    timeout=120  # Increased to 120 seconds for validation + LLM processing
+                    json={"user_request": user_request, "timeout_s": RUN_BUDGET_S},
+                    timeout=CLIENT_TIMEOUT_S
                 )
                 
                 if response.status_code == 200:
@@ -532,6 +547,13 @@ with tab1:
                             <span>Execution Failed</span>
                         </div>
                         """, unsafe_allow_html=True)
+                    elif status == "TIMEOUT":
+                        st.markdown("""
+                        <div class="alert alert-error">
+                            <span class="alert-icon">⏱️</span>
+                            <span>Run deadline exceeded - showing partial results</span>
+                        </div>
+                        """, unsafe_allow_html=True)
                     
                     # Execution logs (cleaned)
                     if result.get("logs"):
@@ -644,5 +666,134 @@ with tab1:
 with tab2:
     st.markdown('<div class="results-box">', unsafe_allow_html=True)
     st.markdown('<div class="section-header">📊 Execution History</div>', unsafe_allow_html=True)
-    st.info("💡 Coming soon - View past executions and analytics")
+
+    # Performance analytics (served from precomputed rollups)
+    windows = {"Last hour": 3600, "Last 6 hours": 6 * 3600, "Last 24 hours": 86400, "Last 7 days": 7 * 86400}
+    window_label = st.selectbox("Window", list(windows), index=0)
+    try:
+        stats_response = requests.get(f"{API_BASE_URL}/agent/stats", params={"window_s": windows[window_label]}, timeout=5)
+        stats = stats_response.json() if stats_response.status_code == 200 else None
+    except Exception:
+        stats = None
+
+    if stats and stats.get("runs"):
+        def _pct(value):
+            return "—" if value is None else f"{value * 100:.1f}%"
+
+        mcol1, mcol2, mcol3, mcol4, mcol5 = st.columns(5)
+        mcol1.metric("Runs", stats["runs"])
+        mcol2.metric("p95 latency", f"{stats['run_ms'].get('p95', 0):.0f} ms")
+        mcol3.metric("Error rate", _pct(stats.get("error_rate")))
+        mcol4.metric("LLM fallback rate", _pct(stats.get("llm_fallback_rate")))
+        mcol5.metric("Rate-limited", stats["rate_limit_rejections"]["total"])
+
+        if stats.get("series"):
+            st.line_chart(
+                {
+                    "runs": [point["runs"] for point in stats["series"]],
+                    "errors": [point["errors"] for point in stats["series"]],
+                    "rate_limited": [point["rate_limited"] for point in stats["series"]],
+                }
+            )
+
+        qcol1, qcol2 = st.columns(2)
+        with qcol1:
+            st.markdown("**Graph nodes (ms)**")
+            st.dataframe(
+                [{"node": name, **summary} for name, summary in stats["nodes"].items()],
+                use_container_width=True, hide_index=True,
+            )
+        with qcol2:
+            st.markdown("**Tools (ms)**")
+            st.dataframe(
+                [{"tool": name, **summary} for name, summary in stats["tools"].items()],
+                use_container_width=True, hide_index=True,
+            )
+        if stats.get("validation_failures"):
+            st.markdown("**Validation failure reasons**")
+            st.dataframe(
+                [{"reason": reason, "count": count} for reason, count in stats["validation_failures"].items()],
+                use_container_width=True, hide_index=True,
+            )
+    elif stats is not None:
+        st.info("No runs in this window")
+
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # Keyset pagination: keep the cursors of the pages seen so far
+    if "history_cursors" not in st.session_state:
+        st.session_state.history_cursors = [None]
+
+    fcol1, fcol2, fcol3 = st.columns([2, 3, 3])
+    with fcol1:
+        status_filter = st.selectbox("Status", ["All", "DONE", "PENDING_APPROVAL", "ERROR", "FAILED", "TIMEOUT"])
+    with fcol2:
+        tool_filter = st.text_input("Tool", placeholder="e.g. calendar.create_event")
+    with fcol3:
+        user_filter = st.text_input("User", placeholder="user id")
+
+    filters = {
+        "status": None if status_filter == "All" else status_filter,
+        "tool": tool_filter or None,
+        "user_id": user_filter or None,
+    }
+    if st.session_state.get("history_filters") != filters:
+        st.session_state.history_filters = filters
+        st.session_state.history_cursors = [None]
+
+    params = {"limit": 25, **{k: v for k, v in filters.items() if v}}
+    cursor = st.session_state.history_cursors[-1]
+    if cursor:
+        params["cursor"] = cursor
+
+    try:
+        response = requests.get(f"{API_BASE_URL}/agent/history", params=params, timeout=5)
+        page = response.json() if response.status_code == 200 else {"items": [], "next_cursor": None}
+    except Exception as e:
+        page = {"items": [], "next_cursor": None}
+        st.error(f"Could not load history: {e}")
+
+    if page["items"]:
+        st.dataframe(
+            [
+                {
+                    "time": datetime.fromtimestamp(item["created_at"]).strftime("%Y-%m-%d %H:%M:%S"),
+                    "phase": item["phase"],
+                    "status": item["status"],
+                    "user": item["user_id"],
+                    "request": (item.get("request") or "")[:80],
+                    "tools": ", ".join(s["tool"] for s in item.get("steps") or []),
+                    "planner": item.get("planner"),
+                    "ms": item.get("duration_ms"),
+                    "run_id": item["run_id"],
+                }
+                for item in page["items"]
+            ],
+            use_container_width=True,
+            hide_index=True,
+        )
+    else:
+        st.info("No executions recorded yet")
+
+    pcol1, pcol2, _ = st.columns([2, 2, 6])
+    with pcol1:
+        if st.button("⬅️ Newer", disabled=len(st.session_state.history_cursors) == 1):
+            st.session_state.history_cursors.pop()
+            st.rerun()
+    with pcol2:
+        if st.button("Older ➡️", disabled=not page.get("next_cursor")):
+            st.session_state.history_cursors.append(page["next_cursor"])
+            st.rerun()
+
+    run_id = st.text_input("🔍 Run details", placeholder="run_id")
+    if run_id:
+        try:
+            detail = requests.get(f"{API_BASE_URL}/agent/history/{run_id.strip()}", timeout=5)
+            if detail.status_code == 200:
+                st.json(detail.json())
+            else:
+                st.warning("Run not found")
+        except Exception as e:
+            st.error(f"Could not load run: {e}")
+
     st.markdown('</div>', unsafe_allow_html=True)
@@ -1,10 +1,8 @@
 import asyncio, json
 from dotenv import load_dotenv
 load_dotenv()
-import json
-from fastapi.encoders import jsonable_encoder
-
 from app.langgraph.graph import build_graph
+from app.utils.json_codec import write_json_file
 
 graph = build_graph()
 
@@ -18,8 +16,7 @@ async def main():
     print("\nLOGS:", out.get("logs"))
 
     # ✅ save for step2
-    with open("run_state.json", "w", encoding="utf-8") as f:
-        json.dump(jsonable_encoder(out), f, indent=2)
+    write_json_file("run_state.json", out)
 
     print("\n✅ Saved: run_state.json")
 
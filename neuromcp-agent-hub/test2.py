@@ -3,13 +3,13 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app.langgraph.graph import build_graph
+from app.utils.json_codec import read_json_file
 
 graph = build_graph()
 
 async def main():
     # ✅ load state from test1
-    with open("run_state.json", "r", encoding="utf-8") as f:
-        state = json.load(f)
+    state = read_json_file("run_state.json")
 
     pending = state.get("pending_approvals") or []
     approved = [p["step_id"] for p in pending]  # approve all for demo
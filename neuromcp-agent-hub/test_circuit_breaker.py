@@ -0,0 +1,198 @@
+"""
+Test Circuit Breakers
+Breaker state machine (error-rate / slow-call trips, fast fail, half-open
+probing), and the real Slack tool against the HTTP stand-in: a degraded
+provider trips, later calls fail without touching the network, pre-validation
+and the validator report it, and a healthy probe closes it again.
+
+Run:  python test_circuit_breaker.py      (or: pytest test_circuit_breaker.py)
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.services.http import circuit_breaker as cb
+from app.services.http.client import close_http_client
+from app.services.http.slack_scheduler import SlackScheduler, reset_slack_scheduler
+from app.services.mock_backend.backend import get_backend, reset_backend
+from app.services.mock_backend.profile import load_profile, profile_from_dict
+from test_mock_backend import _serve_stand_in
+
+FAST = cb.BreakerConfig(window_s=10, min_calls=4, error_rate=0.5, slow_call_s=0.2,
+                        slow_rate=0.5, open_s=0.3, half_open_probes=1)
+
+
+def test_trips_on_error_rate_and_fails_fast():
+    breaker = cb.CircuitBreaker("slack", FAST)
+    for failed in (False, True, False):
+        breaker.before_call()
+        breaker.record(failed, 0.01)
+    assert breaker.state == cb.CLOSED  # below min_calls
+
+    breaker.before_call()
+    breaker.record(True, 0.01)
+    assert breaker.state == cb.OPEN and breaker.trips == 1
+
+    try:
+        breaker.before_call()
+        raise AssertionError("open breaker admitted a call")
+    except cb.CircuitOpenError as e:
+        assert "Slack is temporarily unavailable" in str(e)
+    assert breaker.rejected == 1
+
+
+def test_trips_on_slow_calls():
+    breaker = cb.CircuitBreaker("google:calendar.events.list", FAST)
+    for latency in (0.5, 0.01, 0.6, 0.01):
+        breaker.before_call()
+        breaker.record(False, latency)
+    assert breaker.state == cb.OPEN and breaker.snapshot()["last_failure"] == "slow call"
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = cb.CircuitBreaker("slack", FAST)
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record(True, 0.01)
+    time.sleep(FAST.open_s + 0.05)
+    assert breaker.state == cb.HALF_OPEN
+
+    probe = breaker.before_call()
+    assert probe is True
+    try:
+        breaker.before_call()  # only one probe at a time
+        raise AssertionError("second probe admitted")
+    except cb.CircuitOpenError:
+        pass
+    breaker.record(True, 0.01, probe=True)
+    assert breaker.state == cb.OPEN and breaker.trips == 2
+
+    time.sleep(FAST.open_s + 0.05)
+    breaker.record(False, 0.01, probe=breaker.before_call())
+    assert breaker.state == cb.CLOSED
+
+
+def test_degraded_slack_trips_and_is_reported_before_planning():
+    from app.agents.validator.agent import validate_plan_neurosymbolic
+    from app.agents.validator.pre_validation import validate_user_request
+    from app.main import app
+    from app.services.mcp.tool_catalog import get_catalog
+    from app.services.oauth import token_store
+    from app.services.tools import slack_tool
+
+    server, base = _serve_stand_in()
+    tmp = tempfile.TemporaryDirectory()
+    saved = (token_store.TOKENS_FILE, slack_tool.SLACK_API_BASE)
+    token_store.TOKENS_FILE = Path(tmp.name) / "tokens.json"
+    token_store.TOKENS_FILE.write_text(json.dumps({"slack": {"access_token": "xoxb-test"}}))
+    slack_tool.SLACK_API_BASE = f"{base}/api"
+    cb.reset_breakers(FAST)
+    reset_slack_scheduler(SlackScheduler(channel_rate_per_s=1000, channel_burst=10))
+    reset_backend(profile_from_dict({"default": {"error_rate": 1.0}}))
+
+    async def degraded():
+        errors = []
+        try:
+            for _ in range(6):
+                try:
+                    await slack_tool.post_slack_message("#general", "hi")
+                except Exception as e:
+                    errors.append(e)
+            started = time.perf_counter()
+            try:
+                await slack_tool.list_slack_channels()
+            except cb.CircuitOpenError as e:
+                errors.append(e)
+            return errors, time.perf_counter() - started
+        finally:
+            await close_http_client()
+
+    async def recovered():
+        try:
+            return await slack_tool.post_slack_message("#general", "back")
+        finally:
+            await close_http_client()
+
+    try:
+        errors, fast_fail_s = asyncio.run(degraded())
+        assert isinstance(errors[-1], cb.CircuitOpenError) and fast_fail_s < 0.05
+        assert sum(get_backend().calls["chat.postMessage"].values()) == 4  # the rest never hit the network
+        assert "conversations.list" not in get_backend().calls
+
+        ok, msg, _ = validate_user_request("post hi to #general on slack")
+        assert not ok and "Slack is temporarily unavailable" in msg
+        assert validate_user_request("list my calendar events")[0]
+
+        plan = {"steps": [{"id": "S1", "tool": "slack.list_channels", "input": {}}]}
+        result, _, _ = validate_plan_neurosymbolic(plan, asyncio.run(get_catalog()))
+        assert not result.valid and any("temporarily unavailable" in e for e in result.errors)
+
+        states = TestClient(app).get("/breakers").json()["breakers"]
+        assert states["slack"]["state"] == "OPEN" and states["slack:chat.postMessage"]["trips"] == 1
+
+        time.sleep(FAST.open_s + 0.05)
+        reset_backend(load_profile("instant"))
+        assert asyncio.run(recovered())["success"]
+        assert cb.get_breaker("slack").state == cb.CLOSED
+        ok, msg, _ = validate_user_request("post back to #general on slack")
+        assert ok, msg
+    finally:
+        token_store.TOKENS_FILE, slack_tool.SLACK_API_BASE = saved
+        cb.reset_breakers()
+        reset_slack_scheduler()
+        reset_backend(load_profile("instant"))
+        server.should_exit = True
+        tmp.cleanup()
+
+
+def test_open_provider_is_refused_before_rate_limits():
+    from app.agents.validator.pre_validation import detect_providers, validate_user_request
+    from app.agents.validator.rate_limiter import _rate_limiter
+
+    assert detect_providers("summarize #general events") == ["slack"]
+    assert detect_providers("list my calendar events") == ["google"]
+    assert detect_providers("what happened at the event after the schedule change") == []
+    assert detect_providers("email me at ops#2 or issue#12") == []
+
+    cb.reset_breakers(cb.BreakerConfig(open_s=60))
+    _rate_limiter.__init__()
+    text = f"summarize #general events {time.time_ns()}"
+    try:
+        breaker = cb.get_breaker("slack")
+        breaker._state, breaker._opened_at = cb.OPEN, time.monotonic()
+        ok, msg, _ = validate_user_request(text, "breaker-tenant", "u1")
+        assert not ok and "Slack is temporarily unavailable" in msg
+        assert not _rate_limiter.tenant_requests and not _rate_limiter.recent_requests  # no quota, no duplicate hash
+
+        cb.reset_breakers()
+        ok, msg, _ = validate_user_request(text, "breaker-tenant", "u1")
+        assert ok, msg  # the same request goes through once Slack is back
+    finally:
+        cb.reset_breakers()
+        _rate_limiter.__init__()
+
+
+if __name__ == "__main__":
+    print("Testing Circuit Breakers\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_trips_on_error_rate_and_fails_fast,
+        test_trips_on_slow_calls,
+        test_half_open_probe_closes_or_reopens,
+        test_degraded_slack_trips_and_is_reported_before_planning,
+        test_open_provider_is_refused_before_rate_limits,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,86 @@
+"""
+Test Response Compression
+Large responses are gzip-encoded (br when the optional brotli package is
+installed), small ones and clients without Accept-Encoding get the plain
+body, and an endpoint's own Vary header is merged, not duplicated.
+
+Run:  python test_compression.py      (or: pytest test_compression.py)
+"""
+import gzip
+import sys
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from app.utils import compression
+from app.utils.compression import COMPRESS_MIN_BYTES, CompressionMiddleware
+
+BIG = {"messages": [{"text": f"message number {i}", "user": "U123"} for i in range(200)]}
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware)
+
+
+@app.get("/big")
+async def big(response: Response):
+    response.headers["Vary"] = "Origin"
+    return BIG
+
+
+@app.get("/small")
+async def small():
+    return {"ok": True}
+
+
+def _get(path, encoding):
+    # The raw body, as sent (the test client would otherwise decode it)
+    client = TestClient(app)
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+def test_large_response_is_gzipped_and_vary_merged():
+    response, body = _get("/big", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) == len(body) < COMPRESS_MIN_BYTES * 10
+    assert gzip.decompress(body).startswith(b'{"messages":')
+    vary = response.headers.get_list("vary")
+    assert len(vary) == 1 and vary[0] == "Origin, Accept-Encoding"
+
+
+def test_small_or_unaccepted_responses_pass_through():
+    response, body = _get("/small", "gzip, br")
+    assert "content-encoding" not in response.headers and body == b'{"ok":true}'
+
+    response, body = _get("/big", "identity")
+    assert "content-encoding" not in response.headers and body.startswith(b'{"messages":')
+    assert response.headers.get_list("vary") == ["Origin, Accept-Encoding"]
+
+
+def test_br_is_preferred_when_brotli_is_installed():
+    response, body = _get("/big", "gzip, br")
+    if compression.brotli is None:
+        assert response.headers["content-encoding"] == "gzip"  # optional dependency missing
+        return
+    assert response.headers["content-encoding"] == "br"
+    assert compression.brotli.decompress(body).startswith(b'{"messages":')
+    assert response.headers.get_list("vary") == ["Origin, Accept-Encoding"]
+
+
+if __name__ == "__main__":
+    print("Testing Response Compression\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_large_response_is_gzipped_and_vary_merged,
+        test_small_or_unaccepted_responses_pass_through,
+        test_br_is_preferred_when_brotli_is_installed,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,262 @@
+"""
+Test Google Token Manager
+Expiry-aware access tokens against the HTTP stand-in: expired tokens are
+refreshed once for any number of concurrent callers, tokens close to expiry
+are refreshed in the background, a 401 stampede collapses into one refresh,
+the background loop refreshes before expiry (for every tenant's manager),
+and the login callback stores the exchanged token with its expiry.
+
+Run:  python test_google_token_manager.py      (or: pytest test_google_token_manager.py)
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.http import circuit_breaker as cb
+from app.services.mock_backend.backend import get_backend, reset_backend
+from app.services.mock_backend.profile import load_profile, profile_from_dict
+from app.services.oauth.google_token_manager import GoogleTokenManager, reset_google_token_manager
+from test_mcp_federation import _run
+from test_mock_backend import _serve_stand_in
+
+SLOW_TOKEN_ENDPOINT = {"endpoints": {"oauth.token": {"latency_ms": {"dist": "fixed", "ms": 200}}}}
+
+
+class StandIn:
+    """Stand-in server + temp token file wired into the Google modules"""
+
+    def __init__(self, google_doc):
+        from app.services.oauth import google_oauth, token_store
+        from app.services.tools import calendar_tool
+
+        self.modules = (google_oauth, token_store, calendar_tool)
+        self.saved = (google_oauth.GOOGLE_TOKEN_URL, token_store.TOKENS_FILE, calendar_tool.GOOGLE_CALENDAR_API)
+        self.server, base = _serve_stand_in()
+        self.tmp = tempfile.TemporaryDirectory()
+        google_oauth.GOOGLE_TOKEN_URL = f"{base}/token"
+        token_store.TOKENS_FILE = Path(self.tmp.name) / "tokens.json"
+        token_store.TOKENS_FILE.write_text(json.dumps({"google": google_doc}))
+        calendar_tool.GOOGLE_CALENDAR_API = f"{base}/calendar/v3"
+        reset_backend(profile_from_dict(SLOW_TOKEN_ENDPOINT))
+        cb.reset_breakers()
+        reset_google_token_manager()
+
+    def stored(self):
+        return json.loads(self.modules[1].TOKENS_FILE.read_text())["google"]
+
+    def close(self):
+        google_oauth, token_store, calendar_tool = self.modules
+        google_oauth.GOOGLE_TOKEN_URL, token_store.TOKENS_FILE, calendar_tool.GOOGLE_CALENDAR_API = self.saved
+        reset_google_token_manager()
+        reset_backend(load_profile("instant"))
+        self.server.should_exit = True
+        self.tmp.cleanup()
+
+
+async def _gather(coros):
+    return await asyncio.gather(*coros)
+
+
+def _refresh_calls():
+    return sum(get_backend().calls["oauth.token"].values())
+
+
+def test_expired_token_refreshes_once_for_concurrent_callers():
+    env = StandIn({"access_token": "old", "refresh_token": "r", "expires_at": time.time() - 10})
+    manager = GoogleTokenManager()
+    try:
+        tokens = _run(_gather(manager.get_access_token() for _ in range(20)))
+        assert len(set(tokens)) == 1 and tokens[0].startswith("mock-access-")
+        assert _refresh_calls() == 1 and manager.refreshes == 1
+        stored = env.stored()
+        assert stored["access_token"] == tokens[0] and stored["refresh_token"] == "r"
+        assert 3500 < stored["expires_at"] - time.time() <= 3600
+    finally:
+        env.close()
+
+
+def test_expiring_token_is_refreshed_in_the_background():
+    env = StandIn({"access_token": "still-valid", "refresh_token": "r", "expires_at": time.time() + 60})
+    manager = GoogleTokenManager(margin_s=300)
+
+    async def run():
+        started = time.perf_counter()
+        first = await manager.get_access_token()
+        served_in = time.perf_counter() - started
+        await asyncio.sleep(0.35)  # the 200 ms refresh finishes meanwhile
+        return first, served_in, await manager.get_access_token()
+
+    try:
+        first, served_in, later = _run(run())
+        assert first == "still-valid" and served_in < 0.05  # no wait on the refresh
+        assert later.startswith("mock-access-") and _refresh_calls() == 1
+    finally:
+        env.close()
+
+
+def test_401_stampede_collapses_into_one_refresh():
+    from app.services.tools import calendar_tool
+
+    # Legacy token without expiry: only a 401 reveals it is stale
+    env = StandIn({"access_token": "expired", "refresh_token": "r"})
+    try:
+        results = _run(_gather(calendar_tool.list_calendar_events() for _ in range(10)))
+        assert all(r["success"] for r in results)
+        assert _refresh_calls() == 1
+        assert get_backend().calls["calendar.events.list"][200] == 20  # 10 rejected + 10 retried
+    finally:
+        env.close()
+
+
+def test_background_loop_refreshes_before_expiry():
+    env = StandIn({"access_token": "soon", "refresh_token": "r", "expires_at": time.time() + 10.5})
+    manager = GoogleTokenManager(margin_s=10)
+
+    async def run():
+        manager.start_background_refresh()
+        try:
+            await asyncio.sleep(0.1)
+            before = manager._doc["access_token"]
+            await asyncio.sleep(1.4)
+            return before, manager._doc["access_token"]
+        finally:
+            await manager.stop()
+
+    try:
+        before, after = _run(run())
+        assert before == "soon" and after.startswith("mock-access-")
+        assert manager.status()["expires_in_s"] > 3000 and manager.status()["last_error"] is None
+    finally:
+        env.close()
+
+
+def test_token_refreshed_by_another_worker_is_adopted():
+    env = StandIn({"access_token": "old", "refresh_token": "r", "expires_at": time.time() + 3600})
+    manager = GoogleTokenManager()
+    try:
+        assert _run(manager.get_access_token()) == "old"
+        # Another worker refreshes and writes the store; our copy is now stale
+        peer = {"access_token": "from-peer", "refresh_token": "r", "expires_at": time.time() + 3600}
+        env.modules[1].TOKENS_FILE.write_text(json.dumps({"google": peer}))
+        assert _run(manager.refresh_after_401("old")) == "from-peer"
+        manager._doc["expires_at"] = time.time() - 1  # memory says expired, the store disagrees
+        env.modules[1].TOKENS_FILE.write_text(json.dumps({"google": {**peer, "access_token": "newer"}}))
+        assert _run(manager.get_access_token()) == "newer"
+        assert _refresh_calls() == 0 and manager.refreshes == 0
+    finally:
+        env.close()
+
+
+def test_revoked_grant_drops_the_cached_token():
+    from app.services.oauth import google_oauth
+    from app.services.oauth.google_oauth import TokenRefreshError
+
+    env = StandIn({"access_token": "old", "refresh_token": "revoked", "expires_at": time.time() - 10})
+    manager = GoogleTokenManager()
+    saved = google_oauth.refresh_google_token
+
+    async def revoked(*args):
+        raise TokenRefreshError("invalid_grant", "Token has been expired or revoked.")
+
+    google_oauth.refresh_google_token = revoked
+    try:
+        try:
+            _run(manager.get_access_token())
+            assert False, "refresh should fail"
+        except TokenRefreshError:
+            pass
+        assert manager._doc is None and "revoked" in manager.status()["last_error"]
+        # The user logs in again (possibly through another worker)
+        login = {"access_token": "relogged", "refresh_token": "r2", "expires_at": time.time() + 3600}
+        env.modules[1].TOKENS_FILE.write_text(json.dumps({"google": login}))
+        assert _run(manager.get_access_token()) == "relogged"
+    finally:
+        google_oauth.refresh_google_token = saved
+        env.close()
+
+
+def test_login_callback_stores_the_exchanged_token():
+    import os
+
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.services.oauth.google_token_manager import get_google_token_manager
+    from app.utils import session
+
+    env = StandIn({"access_token": "unused"})
+    saved = (session.SECRET, session._serializer, os.environ.get("APP_BASE_URL"))
+    session.SECRET, session._serializer = "test-secret", None
+    os.environ["APP_BASE_URL"] = "http://testserver"
+    try:
+        state = session.sign_state({"provider": "google", "tenant_id": "default"})
+        response = TestClient(app).get("/auth/google/callback", params={"code": "c0de", "state": state})
+        assert response.status_code == 200, response.text
+        stored = env.stored()
+        assert stored["access_token"].startswith("mock-access-") and stored["refresh_token"] == ""
+        assert 3500 < stored["expires_at"] - time.time() <= 3600  # expires_in from the token endpoint
+        assert get_google_token_manager().status()["expires_in_s"] > 3500
+    finally:
+        session.SECRET, session._serializer, base_url = saved
+        if base_url is None:
+            os.environ.pop("APP_BASE_URL", None)
+        else:
+            os.environ["APP_BASE_URL"] = base_url
+        env.close()
+
+
+def test_every_tenants_manager_refreshes_in_the_background():
+    from app.services.oauth import google_token_manager as gtm
+
+    env = StandIn({"access_token": "default-token", "refresh_token": "r", "expires_at": time.time() + 3600})
+    tokens = json.loads(env.modules[1].TOKENS_FILE.read_text())
+    tokens["_tenants"] = {"acme": {"google": {"access_token": "acme-soon", "refresh_token": "r",
+                                              "expires_at": time.time() + 10}}}
+    env.modules[1].TOKENS_FILE.write_text(json.dumps(tokens))
+
+    async def run():
+        gtm.start_google_token_managers()
+        try:
+            default = gtm.get_google_token_manager()
+            # First used from a worker thread (as sync tool code would)
+            acme = await asyncio.to_thread(gtm.get_google_token_manager, "acme")
+            await asyncio.sleep(0.6)  # acme's token is inside the refresh margin
+            running = [m._task is not None and not m._task.done() for m in (default, acme)]
+            return running, acme.refreshes, acme._doc["access_token"]
+        finally:
+            await gtm.stop_google_token_managers()
+
+    try:
+        running, refreshes, token = _run(run())
+        assert running == [True, True] and refreshes == 1 and token.startswith("mock-access-")
+        assert gtm._refresh_loop_owner is None
+        assert gtm.get_google_token_manager("later")._task is None  # stopped: no new loops
+    finally:
+        env.close()
+
+
+if __name__ == "__main__":
+    print("Testing Google Token Manager\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_expired_token_refreshes_once_for_concurrent_callers,
+        test_expiring_token_is_refreshed_in_the_background,
+        test_401_stampede_collapses_into_one_refresh,
+        test_background_loop_refreshes_before_expiry,
+        test_every_tenants_manager_refreshes_in_the_background,
+        test_token_refreshed_by_another_worker_is_adopted,
+        test_revoked_grant_drops_the_cached_token,
+        test_login_callback_stores_the_exchanged_token,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
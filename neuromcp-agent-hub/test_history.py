@@ -0,0 +1,259 @@
+"""
+Test Run History
+Background writer batching, keyset pagination with filters, per-run phases,
+retention/compaction, drop-on-full, and /agent/run recording end to end.
+
+Run:  python test_history.py      (or: pytest test_history.py)
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.history.recorder import HistoryWriter, build_record, reset_history_writer
+from app.services.history.store import HistoryStore
+
+DAY = 86400
+
+
+def _record(i, created_at, status="DONE", tool="calendar.list_events", user="alice", run_id=None):
+    return {
+        "run_id": run_id or f"run-{i}",
+        "phase": "run",
+        "created_at": created_at,
+        "tenant_id": "default",
+        "user_id": user,
+        "status": status,
+        "request": f"request {i}",
+        "steps": [{"step_id": "s1", "tool": tool, "ms": 1.0, "ok": True}],
+        "plan": {"steps": [{"id": "s1", "tool": tool}]},
+        "results": {"s1": {"success": True}},
+    }
+
+
+def _store():
+    tmp = tempfile.TemporaryDirectory()
+    return tmp, HistoryStore(Path(tmp.name) / "history.db")
+
+
+def test_writer_batches_in_background():
+    tmp, store = _store()
+    writer = HistoryWriter(store, batch=50)
+    try:
+        started = time.perf_counter()
+        for i in range(120):
+            assert writer.submit(_record(i, time.time()))
+        assert time.perf_counter() - started < 0.5  # submit never waits on disk
+        assert writer.flush(5)
+        stats = writer.stats()
+        assert stats["written"] == 120 and stats["dropped"] == 0 and stats["errors"] == 0
+        assert store.count() == 120
+    finally:
+        writer.close()
+        tmp.cleanup()
+
+
+def test_full_queue_drops_instead_of_blocking():
+    tmp, store = _store()
+    writer = HistoryWriter(store, queue_max=2)
+    writer._ensure_started = lambda: None  # no consumer: the queue stays full
+    try:
+        assert [writer.submit(_record(i, time.time())) for i in range(4)] == [True, True, False, False]
+        assert writer.stats()["dropped"] == 2
+    finally:
+        store.close()
+        tmp.cleanup()
+
+
+def test_failed_writes_are_retried_then_dropped_not_counted_as_written():
+    from app.services.history import recorder
+
+    tmp, store = _store()
+    real = store.write_batch
+    failures = {"left": 1}
+
+    def flaky(batch, deltas):
+        if failures["left"]:
+            failures["left"] -= 1
+            raise OSError("disk I/O error")
+        return real(batch, deltas)
+
+    store.write_batch = flaky
+    saved, recorder.RETRY_BACKOFF_S = recorder.RETRY_BACKOFF_S, 0.01
+    writer = HistoryWriter(store, batch=50, write_retries=1)
+    try:
+        for i in range(10):
+            writer.submit(_record(i, time.time()))
+        assert writer.flush(5)
+        stats = writer.stats()
+        assert stats["written"] == 10 and stats["dropped"] == 0 and stats["errors"] == 1  # retry succeeded
+        assert store.count() == 10
+
+        failures["left"] = 2  # the retry fails too: the batch is lost and says so
+        for i in range(10, 15):
+            writer.submit(_record(i, time.time()))
+        assert writer.flush(5)
+        stats = writer.stats()
+        assert stats["written"] == 10 and stats["dropped"] == 5 and stats["errors"] == 3
+        assert "disk I/O error" in stats["last_error"] and store.count() == 10
+    finally:
+        recorder.RETRY_BACKOFF_S = saved
+        writer.close()
+        tmp.cleanup()
+
+
+def test_runs_and_rollups_commit_together():
+    from app.services.history.rollups import rollup_records
+
+    tmp, store = _store()
+    try:
+        batch = [_record(i, time.time()) for i in range(3)]
+        deltas = rollup_records(batch)
+        resolution = next(iter(deltas))[0]
+        broken = {key: None for key in deltas}  # the rollup merge fails half way
+        try:
+            store.write_batch(batch, broken)
+            assert False, "write_batch should fail"
+        except AttributeError:
+            pass
+        assert store.count() == 0 and store.rollup_rows(resolution, 0, time.time() + DAY) == []
+        store.write_batch(batch, deltas)
+        assert store.count() == 3 and store.rollup_rows(resolution, 0, time.time() + DAY)
+    finally:
+        store.close()
+        tmp.cleanup()
+
+
+def test_keyset_pagination_and_filters():
+    tmp, store = _store()
+    now = time.time()
+    try:
+        store.append(
+            _record(i, now - (100 - i) * 60,
+                    status="ERROR" if i % 5 == 0 else "DONE",
+                    tool="slack.post_message" if i % 2 else "calendar.list_events",
+                    user="bob" if i % 3 == 0 else "alice")
+            for i in range(100)
+        )
+        # Walk every page: newest first, no gaps or repeats
+        seen, cursor = [], None
+        while True:
+            page = store.page(limit=30, cursor=cursor)
+            seen += [item["run_id"] for item in page["items"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == [f"run-{i}" for i in reversed(range(100))]
+
+        errors = store.page(limit=200, status="ERROR")["items"]
+        assert len(errors) == 20 and all(item["status"] == "ERROR" for item in errors)
+        slack = store.page(limit=200, tool="slack.post_message")["items"]
+        assert len(slack) == 50 and all(item["steps"][0]["tool"] == "slack.post_message" for item in slack)
+        bob = store.page(limit=200, tenant_id="default", user_id="bob")["items"]
+        assert len(bob) == 34
+        window = store.page(limit=200, since=now - 30 * 60 - 1, until=now - 10 * 60 + 1)["items"]
+        assert [item["run_id"] for item in window] == [f"run-{i}" for i in range(90, 69, -1)]
+
+        # Summaries stay small; the full payload is per run
+        assert "plan" not in errors[0]
+        assert store.page(limit=5, status="NOPE") == {"items": [], "next_cursor": None}
+    finally:
+        store.close()
+        tmp.cleanup()
+
+
+def test_phases_of_one_run():
+    tmp, store = _store()
+    try:
+        state = {"run_id": "abc", "user_request": "post hi", "status": "PENDING_APPROVAL",
+                 "planner_mode": "offline", "plan": {"steps": []}}
+        store.append([build_record(state, "run", time.time())])
+        state.update(status="DONE", step_timings=[{"step_id": "s1", "tool": "slack.post_message", "ms": 3.0, "ok": True}])
+        store.append([build_record(state, "approve", time.time())])
+
+        phases = store.get_run("abc")
+        assert [p["phase"] for p in phases] == ["run", "approve"]
+        assert phases[0]["planner"] == "offline" and phases[0]["tenant_id"] == "default"
+        assert phases[1]["cost"] == {"llm_planner_calls": 0, "tool_calls": 1}
+        assert store.page(tool="slack.post_message")["items"][0]["phase"] == "approve"
+        assert store.get_run("missing") == []
+    finally:
+        store.close()
+        tmp.cleanup()
+
+
+def test_retention_and_compaction():
+    tmp, store = _store()
+    now = time.time()
+    try:
+        store.append(_record(i, now - age * DAY) for i, age in enumerate((40, 35, 10, 8, 1)))
+        assert store.compact(now=now, retention_days=30, compact_after_days=7) == {"deleted": 2, "compacted": 2}
+        runs = {item["run_id"]: store.get_run(item["run_id"])[0] for item in store.page()["items"]}
+        assert sorted(runs) == ["run-2", "run-3", "run-4"]
+        assert runs["run-2"]["plan"] is None and runs["run-2"]["compacted"] == 1
+        assert runs["run-4"]["plan"] is not None and runs["run-4"]["compacted"] == 0
+        # The tool index follows deletions
+        assert len(store.page(tool="calendar.list_events")["items"]) == 3
+        assert store.compact(now=now, retention_days=30, compact_after_days=7) == {"deleted": 0, "compacted": 0}
+    finally:
+        store.close()
+        tmp.cleanup()
+
+
+def test_agent_run_is_recorded():
+    from app.routes.agent_api import RunRequest, run_agent, run_history, run_history_detail
+
+    tmp, store = _store()
+    writer = HistoryWriter(store)
+    reset_history_writer(writer)
+    os.environ["MOCK_TOOLS"] = "true"
+    try:
+        result = asyncio.run(run_agent(RunRequest(
+            user_request=f"list my calendar events (history {time.time_ns()})", user_id="carol")))
+        assert result["status"] == "DONE", result.get("error")
+        rejected = asyncio.run(run_agent(RunRequest(user_request="")))
+        assert rejected["status"] == "ERROR"
+        assert writer.flush(5)
+
+        page = asyncio.run(run_history(user_id="carol"))
+        assert [item["run_id"] for item in page["items"]] == [result["run_id"]]
+        item = page["items"][0]
+        assert item["steps"] and item["duration_ms"] > 0 and item["planner"] in ("offline", "llm", "fallback")
+
+        detail = asyncio.run(run_history_detail(result["run_id"]))
+        assert detail["phases"][0]["timings"]["planner"] >= 0
+        assert detail["phases"][0]["results"]
+
+        failed = asyncio.run(run_history(status="ERROR"))["items"]
+        assert failed and store.get_run(failed[0]["run_id"])[0]["validation"]["stage"] == "pre_validation"
+    finally:
+        os.environ.pop("MOCK_TOOLS", None)
+        reset_history_writer()
+        writer.close()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    print("Testing Run History\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_writer_batches_in_background,
+        test_full_queue_drops_instead_of_blocking,
+        test_failed_writes_are_retried_then_dropped_not_counted_as_written,
+        test_runs_and_rollups_commit_together,
+        test_keyset_pagination_and_filters,
+        test_phases_of_one_run,
+        test_retention_and_compaction,
+        test_agent_run_is_recorded,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,56 @@
+"""
+Test Cold-Start Import Budget
+Fails when a cold `import app.main` gets slower than IMPORT_BUDGET_S, or when
+heavy dependencies sneak back into the import graph.
+
+Run:  python test_import_budget.py      (or: pytest test_import_budget.py)
+Profile a failure with:  python -m app.utils.startup_profile
+"""
+import os
+import subprocess
+import sys
+
+from app.utils.startup_profile import cold_import_seconds
+
+IMPORT_BUDGET_S = float(os.getenv("IMPORT_BUDGET_S", "1.0"))
+
+# Must only be loaded on first use, never by importing the app
+LAZY_MODULES = ["langgraph", "langchain_groq", "langchain_core", "groq", "jsonschema", "httpx", "requests"]
+
+
+def test_cold_import_within_budget():
+    # best of 3 so one noisy run doesn't fail the gate
+    best = min(cold_import_seconds("app.main") for _ in range(3))
+    print(f"  cold import app.main: {best * 1000:.0f} ms (budget {IMPORT_BUDGET_S * 1000:.0f} ms)")
+    assert best <= IMPORT_BUDGET_S, (
+        f"Cold import took {best:.2f}s (budget {IMPORT_BUDGET_S:.2f}s). "
+        f"Run `python -m app.utils.startup_profile` to see what got heavier."
+    )
+
+
+def test_heavy_modules_stay_lazy():
+    code = (
+        "import sys, app.main; "
+        f"print('LOADED:' + ','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    line = next(l for l in proc.stdout.splitlines() if l.startswith("LOADED:"))
+    loaded = [m for m in line[len("LOADED:"):].split(",") if m]
+    print(f"  eagerly loaded heavy modules: {loaded or 'none'}")
+    assert not loaded, f"Imported at startup (should be lazy): {loaded}"
+
+
+if __name__ == "__main__":
+    print("Testing Cold-Start Import Budget\n")
+    print("=" * 60)
+    failed = False
+    for test in (test_cold_import_within_budget, test_heavy_modules_stay_lazy):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
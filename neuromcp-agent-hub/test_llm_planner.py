@@ -18,7 +18,7 @@ if sys.platform == "win32":
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.agents.planner.agent import create_plan_with_groq
-from app.agents.tool_discovery.agent import discover_tools
+from app.services.mcp.tool_catalog import get_catalog
 
 load_dotenv()
 
@@ -30,8 +30,8 @@ async def test_message_extraction():
     print("=" * 60)
     
     # Get available tools
-    tools = await discover_tools()
-    print(f"✅ Discovered {len(tools)} tools\n")
+    catalog = await get_catalog()
+    print(f"✅ Discovered {len(catalog.tools)} tools\n")
     
     # Test cases
     test_cases = [
@@ -75,7 +75,7 @@ async def test_message_extraction():
                 continue
             
             # Generate plan
-            plan = create_plan_with_groq(test['request'], tools, retries=2)
+            plan = create_plan_with_groq(test['request'], catalog, retries=2)
             
             # Convert to dict if Pydantic model
             if hasattr(plan, 'model_dump'):
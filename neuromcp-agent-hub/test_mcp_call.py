@@ -0,0 +1,137 @@
+"""
+Test MCP Call Dispatch
+Exercises /mcp/mcp/call and /mcp/mcp/call_batch against a stub tool
+registered for the test: lazy handler loading, args/arguments aliases,
+input validation, error statuses and in-order concurrent batches.
+
+Run:  python test_mcp_call.py      (or: pytest test_mcp_call.py)
+"""
+import asyncio
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.mcp import tool_handlers
+from app.services.mcp.tool_registry import TOOL_REGISTRY, ToolSpec, register_tool
+
+STUB_DELAY_S = 0.2
+
+
+async def stub_echo(text: str, delay_s: float = 0.0, fail: bool = False, deadline_at=None):
+    await asyncio.sleep(delay_s)
+    if fail:
+        raise RuntimeError("stub failure")
+    return {"ok": True, "text": text}
+
+
+ECHO = ToolSpec(
+    name="test.echo",
+    description="Echo text back (test stub)",
+    handler="test_mcp_call:stub_echo",
+    input_schema={
+        "type": "object",
+        "properties": {
+            "text": {"type": "string"},
+            "delay_s": {"type": "number"},
+            "fail": {"type": "boolean"},
+        },
+        "required": ["text"],
+        "additionalProperties": False,
+    },
+)
+
+
+@contextmanager
+def _stub_tool():
+    """test.echo registered and MOCK_TOOLS=false for one test; both restored after"""
+    saved_spec, saved_mock = TOOL_REGISTRY.get(ECHO.name), os.environ.get("MOCK_TOOLS")
+    register_tool(ECHO)
+    os.environ["MOCK_TOOLS"] = "false"
+    try:
+        yield TestClient(app)
+    finally:
+        tool_handlers._HANDLERS.pop(ECHO.name, None)
+        if saved_spec is None:
+            TOOL_REGISTRY.pop(ECHO.name, None)
+        else:
+            TOOL_REGISTRY[ECHO.name] = saved_spec
+        if saved_mock is None:
+            os.environ.pop("MOCK_TOOLS", None)
+        else:
+            os.environ["MOCK_TOOLS"] = saved_mock
+
+
+def test_single_call_accepts_args_and_arguments():
+    mock_tools = os.environ.get("MOCK_TOOLS")
+    with _stub_tool() as client:
+        tool_handlers._HANDLERS.pop("test.echo", None)
+        for key in ("args", "arguments"):
+            r = client.post("/mcp/mcp/call", json={"name": "test.echo", key: {"text": key}})
+            assert r.status_code == 200, r.text
+            assert r.json() == {"ok": True, "text": key}
+        assert "test.echo" in tool_handlers._HANDLERS, "handler should be cached after first call"
+    assert "test.echo" not in TOOL_REGISTRY and "test.echo" not in tool_handlers._HANDLERS
+    assert os.environ.get("MOCK_TOOLS") == mock_tools
+
+
+def test_error_statuses():
+    with _stub_tool() as client:
+        r = client.post("/mcp/mcp/call", json={"name": "nope.tool", "args": {}})
+        assert r.status_code == 404, r.text
+
+        r = client.post("/mcp/mcp/call", json={"name": "test.echo", "args": {"text": 1}})
+        assert r.status_code == 422, r.text
+
+        r = client.post("/mcp/mcp/call", json={"name": "test.echo", "args": {"text": "x", "fail": True}})
+        assert r.status_code == 500 and "stub failure" in r.text, r.text
+
+
+def test_batch_runs_concurrently_in_order():
+    calls = [{"name": "test.echo", "arguments": {"text": str(i), "delay_s": STUB_DELAY_S}} for i in range(10)]
+    calls.insert(3, {"name": "nope.tool", "args": {}})
+
+    with _stub_tool() as client:
+        started = time.perf_counter()
+        r = client.post("/mcp/mcp/call_batch", json={"calls": calls})
+        elapsed = time.perf_counter() - started
+    print(f"  11 calls x {STUB_DELAY_S * 1000:.0f} ms in {elapsed * 1000:.0f} ms")
+
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert body["succeeded"] == 10 and body["failed"] == 1
+    assert body["results"][3]["status_code"] == 404
+    texts = [res["result"]["text"] for res in body["results"] if res["ok"]]
+    assert texts == [str(i) for i in range(10)], "results must keep request order"
+    assert elapsed < STUB_DELAY_S * 4, f"batch looks sequential ({elapsed:.2f}s)"
+
+
+def test_tool_listing_hides_handler_paths():
+    r = TestClient(app).get("/mcp/mcp/tools")
+    assert r.status_code == 200
+    tools = {t["name"]: t for t in r.json()["tools"]}
+    assert "slack.post_message" in tools and "calendar.create_event" in tools
+    assert all("handler" not in t for t in tools.values())
+
+
+if __name__ == "__main__":
+    print("Testing MCP Call Dispatch\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_single_call_accepts_args_and_arguments,
+        test_error_statuses,
+        test_batch_runs_concurrently_in_order,
+        test_tool_listing_hides_handler_paths,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
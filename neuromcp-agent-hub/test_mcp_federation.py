@@ -0,0 +1,285 @@
+"""
+Test MCP Server Federation
+Spins up local stub MCP servers with different latencies and failure modes
+(fast, slow, erroring, dead port) and checks that discovery fans out
+concurrently, respects per-server timeouts and serves stale tools while a
+background refresh revalidates.
+
+Run:  python test_mcp_federation.py      (or: pytest test_mcp_federation.py)
+"""
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.services.http.client import close_http_client
+from app.services.mcp import tool_catalog
+from app.services.mcp.federation import MCPFederation, MCPServerConfig, load_server_configs
+
+PREFIX = "/mcp/mcp"
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # clients hanging up on the slow stub is the point of the test
+
+
+class StubServer:
+    """Minimal MCP endpoint: GET {prefix}/tools, POST {prefix}/call"""
+
+    def __init__(self, tools, latency_s=0.0, status=200, call_latency_s=None):
+        self.tools = tools
+        self.latency_s = latency_s
+        self.call_latency_s = latency_s if call_latency_s is None else call_latency_s
+        self.status = status
+        self.calls = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, body, latency_s):
+                time.sleep(latency_s)
+                data = json.dumps(body).encode()
+                self.send_response(stub.status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply({"tools": stub.tools}, stub.latency_s)
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.calls.append(payload)
+                self._reply({"ok": True, "echo": payload}, stub.call_latency_s)
+
+        self.httpd = _QuietServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _run(coro):
+    """asyncio.run + close the loop's pooled HTTP client"""
+    async def main():
+        try:
+            return await coro
+        finally:
+            await close_http_client()
+    return asyncio.run(main())
+
+
+def _dead_url() -> str:
+    # Bind then release a port so nothing is listening on it
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{s.getsockname()[1]}"
+
+
+def _tool(name):
+    return {"name": name, "description": f"{name} tool", "inputSchema": {"type": "object", "properties": {}}}
+
+
+def test_fan_out_respects_per_server_timeouts():
+    fast = StubServer([_tool("echo")], latency_s=0.01)
+    slow = StubServer([_tool("sleepy")], latency_s=2.0)
+    broken = StubServer([_tool("never")], status=500)
+    try:
+        federation = MCPFederation([
+            MCPServerConfig("fast", fast.url, PREFIX, timeout_s=1.0),
+            MCPServerConfig("slow", slow.url, PREFIX, timeout_s=0.3),
+            MCPServerConfig("broken", broken.url, PREFIX, timeout_s=1.0),
+            MCPServerConfig("dead", _dead_url(), PREFIX, timeout_s=1.0),
+        ])
+
+        async def run():
+            started = time.perf_counter()
+            tools = await federation.list_tools()
+            first = time.perf_counter() - started
+
+            started = time.perf_counter()
+            await federation.list_tools()  # failed servers are not retried in-line
+            second = time.perf_counter() - started
+            await federation.stop()
+            return tools, first, second
+
+        tools, first, second = _run(run())
+        print(f"  first discovery: {first * 1000:.0f} ms, second: {second * 1000:.0f} ms")
+
+        assert [t["name"] for t in tools] == ["fast/echo"], tools
+        assert "input_schema" in tools[0] and "inputSchema" not in tools[0]
+        assert first < 1.0, f"slow server held up discovery ({first:.2f}s)"
+        assert second < 0.1, f"failed servers retried in-line ({second:.2f}s)"
+
+        status = federation.status()
+        assert status["fast"]["tools"] == 1 and status["fast"]["last_error"] is None
+        for name in ("slow", "broken", "dead"):
+            assert status[name]["last_error"], f"{name} should report its error"
+    finally:
+        for stub in (fast, slow, broken):
+            stub.close()
+
+
+def test_stale_while_revalidate():
+    stub = StubServer([_tool("v1")])
+    try:
+        federation = MCPFederation([MCPServerConfig("svc", stub.url, PREFIX, timeout_s=1.0, ttl_s=0.2)])
+
+        async def run():
+            first = await federation.list_tools()
+            stub.tools = [_tool("v2")]
+            await asyncio.sleep(0.25)  # past the TTL
+
+            tool_catalog._checked_at = time.monotonic()
+            stale = await federation.list_tools()  # served from cache, refresh scheduled
+            await federation.servers["svc"].refresh_task
+            fresh = await federation.list_tools()
+            await federation.stop()
+            return first, stale, fresh
+
+        first, stale, fresh = _run(run())
+        assert [t["name"] for t in first] == ["svc/v1"]
+        assert [t["name"] for t in stale] == ["svc/v1"], "stale list should be served immediately"
+        assert [t["name"] for t in fresh] == ["svc/v2"], "background refresh should pick up the change"
+        assert tool_catalog._checked_at == 0.0, "a changed tool list should invalidate the catalog"
+    finally:
+        stub.close()
+
+
+def test_stale_tools_survive_server_failure():
+    stub = StubServer([_tool("keep")])
+    try:
+        federation = MCPFederation([MCPServerConfig("svc", stub.url, PREFIX, timeout_s=1.0, ttl_s=0.1)])
+
+        async def run():
+            await federation.list_tools()
+            stub.status = 500
+            await asyncio.sleep(0.15)
+            tools = await federation.list_tools()
+            await federation.servers["svc"].refresh_task
+            tools_after = await federation.list_tools()
+            await federation.stop()
+            return tools, tools_after
+
+        tools, tools_after = _run(run())
+        assert [t["name"] for t in tools] == ["svc/keep"]
+        assert [t["name"] for t in tools_after] == ["svc/keep"], "failed refresh must not drop cached tools"
+        assert federation.status()["svc"]["failures"] >= 1
+    finally:
+        stub.close()
+
+
+def test_background_refresh_loop():
+    stub = StubServer([_tool("a")])
+    try:
+        federation = MCPFederation([MCPServerConfig("svc", stub.url, PREFIX, timeout_s=1.0, ttl_s=10)])
+
+        async def run():
+            federation.start_background_refresh(interval_s=0.05)
+            await asyncio.sleep(0.1)
+            stub.tools = [_tool("b")]
+            await asyncio.sleep(0.2)
+            tools = await federation.list_tools()  # fresh: no request made here
+            await federation.stop()
+            return tools
+
+        assert [t["name"] for t in _run(run())] == ["svc/b"]
+    finally:
+        stub.close()
+
+
+def test_calls_route_to_owning_server():
+    one = StubServer([_tool("echo")])
+    two = StubServer([_tool("echo")])
+    try:
+        federation = MCPFederation([
+            MCPServerConfig("one", one.url, PREFIX),
+            MCPServerConfig("two", two.url, PREFIX),
+        ])
+        out = _run(federation.call_tool("two/echo", {"x": 1}))
+        assert out["ok"] is True
+        assert one.calls == []
+        assert two.calls == [{"name": "echo", "arguments": {"x": 1}}]
+    finally:
+        one.close()
+        two.close()
+
+
+def test_slow_calls_outlive_the_discovery_timeout():
+    from app.utils.deadline import new_deadline
+
+    # Discovery gives up after 2s (the default timeout_s); a tool call may
+    # take as long as the run has left
+    stub = StubServer([_tool("report")], call_latency_s=2.5)
+    try:
+        federation = MCPFederation([MCPServerConfig("svc", stub.url, PREFIX)])
+        started = time.monotonic()
+        out = _run(federation.call_tool("svc/report", {}, deadline_at=new_deadline(10)))
+        assert out["ok"] is True and time.monotonic() - started >= 2.5
+
+        # ...but never longer than call_timeout_s or the run deadline
+        for config, deadline in ((MCPServerConfig("svc", stub.url, PREFIX, call_timeout_s=0.5), None),
+                                 (MCPServerConfig("svc", stub.url, PREFIX), new_deadline(0.5))):
+            started = time.monotonic()
+            try:
+                _run(MCPFederation([config]).call_tool("svc/report", {}, deadline_at=deadline))
+                assert False, "expected a timeout"
+            except AssertionError:
+                raise
+            except Exception:
+                assert time.monotonic() - started < 1.5
+    finally:
+        stub.close()
+
+
+def test_server_configs_from_env():
+    old = os.environ.get("MCP_SERVERS")
+    os.environ["MCP_SERVERS"] = json.dumps([
+        {"name": "jira", "url": "http://jira:9000", "timeout_s": 1.5, "call_timeout_s": 60},
+        {"name": "wiki", "url": "http://wiki:9000", "prefix": "/mcp", "ttl_s": 30},
+    ])
+    try:
+        configs = load_server_configs()
+        assert [c.name for c in configs] == ["jira", "wiki"]
+        assert configs[0].timeout_s == 1.5 and configs[0].call_timeout_s == 60
+        assert configs[1].call_timeout_s == 30.0 and configs[1].prefix == "/mcp" and configs[1].ttl_s == 30
+    finally:
+        if old is None:
+            os.environ.pop("MCP_SERVERS")
+        else:
+            os.environ["MCP_SERVERS"] = old
+
+
+if __name__ == "__main__":
+    print("Testing MCP Server Federation\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_fan_out_respects_per_server_timeouts,
+        test_stale_while_revalidate,
+        test_stale_tools_survive_server_failure,
+        test_background_refresh_loop,
+        test_calls_route_to_owning_server,
+        test_slow_calls_outlive_the_discovery_timeout,
+        test_server_configs_from_env,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,170 @@
+"""
+Test Persistent MCP Transport (JSON-RPC over stdio)
+Runs against the local stand-in server (app.services.mcp.stdio_server):
+handshake + tools/list, pipelined concurrent calls, error mapping,
+reconnect after the server dies, and the HTTP fallback (only for servers
+that have an HTTP url).
+
+Run:  python test_mcp_stdio.py      (or: pytest test_mcp_stdio.py)
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+
+from app.services.mcp.mcp_client import MCPClient
+from app.services.mcp.stdio_transport import (
+    RPCError,
+    StdioTransport,
+    TransportClosed,
+    TransportUnavailable,
+    close_stdio_transports,
+)
+
+LATENCY_MS = 100
+STANDIN = [sys.executable, "-m", "app.services.mcp.stdio_server", "--latency-ms", str(LATENCY_MS)]
+
+
+def test_handshake_and_tools_list():
+    async def run():
+        client = MCPClient(transport="stdio", command=STANDIN)
+        try:
+            return (await client.list_tools())["tools"]
+        finally:
+            await close_stdio_transports()
+
+    names = {t["name"] for t in asyncio.run(run())}
+    assert {"slack.post_message", "calendar.create_event", "slack.read_messages"} <= names, names
+
+
+def test_pipelined_calls_share_one_process():
+    async def run():
+        transport = StdioTransport(STANDIN)
+        try:
+            await transport.request("ping", {})
+            started = time.perf_counter()
+            results = await asyncio.gather(*(
+                transport.call_tool("slack.post_message", {"channel": "#general", "text": str(i)})
+                for i in range(50)
+            ))
+            return results, time.perf_counter() - started, transport.restarts
+        finally:
+            await transport.close()
+
+    results, elapsed, restarts = asyncio.run(run())
+    print(f"  50 calls x {LATENCY_MS} ms in {elapsed * 1000:.0f} ms over one process")
+    assert [r["input"]["text"] for r in results] == [str(i) for i in range(50)]
+    assert elapsed < LATENCY_MS / 1000 * 5, f"calls were not multiplexed ({elapsed:.2f}s)"
+    assert restarts == 0
+
+
+def test_errors_are_mapped():
+    async def run():
+        transport = StdioTransport(STANDIN)
+        try:
+            try:
+                await transport.call_tool("no.such_tool", {})
+            except RPCError as e:
+                unknown = e
+            try:
+                await transport.request("no/such_method", {})
+            except RPCError as e:
+                missing = e
+            return unknown, missing
+        finally:
+            await transport.close()
+
+    unknown, missing = asyncio.run(run())
+    assert unknown.code == -32602 and "Unknown tool" in str(unknown)
+    assert missing.code == -32601
+
+
+def test_reconnects_after_server_dies():
+    async def run():
+        transport = StdioTransport(STANDIN)
+        try:
+            await transport.request("ping", {})
+            in_flight = asyncio.create_task(transport.call_tool("slack.list_channels", {}))
+            await asyncio.sleep(0.02)
+            transport._proc.kill()
+            try:
+                await in_flight
+                lost = None
+            except TransportClosed as e:
+                lost = e
+            result = await transport.call_tool("slack.list_channels", {})
+            return lost, result, transport.restarts
+        finally:
+            await transport.close()
+
+    lost, result, restarts = asyncio.run(run())
+    assert lost is not None, "in-flight call should fail when the server dies"
+    assert result["ok"] is True and restarts == 1
+
+
+def test_falls_back_to_http_when_server_cannot_start():
+    async def run():
+        client = MCPClient(
+            base_url="http://127.0.0.1:9",  # nothing listens here
+            transport="stdio",
+            command=["/nonexistent/mcp-server"],
+            timeout_s=1.0,
+        )
+        try:
+            await client.call_tool("slack.post_message", {"channel": "#x", "text": "y"})
+        except httpx.HTTPError as e:
+            return e  # reached the HTTP path
+        except TransportUnavailable as e:
+            return e
+        finally:
+            await close_stdio_transports()
+
+    outcome = asyncio.run(run())
+    assert isinstance(outcome, httpx.HTTPError), f"expected HTTP fallback, got {outcome!r}"
+
+
+def test_stdio_only_federated_server_fails_instead_of_calling_the_hub():
+    from app.services.mcp.federation import MCPFederation, MCPServerConfig
+
+    async def run():
+        federation = MCPFederation([MCPServerConfig(
+            name="fs", transport="stdio", command=("/nonexistent/mcp-server",), timeout_s=1.0)])
+        try:
+            tools = await federation.list_tools()
+            try:
+                await federation.call_tool("fs/read_file", {"path": "/tmp/x"})
+            except TransportUnavailable as e:
+                return tools, federation.status()["fs"], e
+            except httpx.HTTPError as e:
+                return tools, federation.status()["fs"], e  # went to MCP_BASE_URL (the hub)
+            return tools, federation.status()["fs"], None
+        finally:
+            await close_stdio_transports()
+
+    tools, status, outcome = asyncio.run(run())
+    assert tools == [] and status["failures"] == 1
+    assert status["last_error"].startswith("TransportUnavailable"), status
+    assert isinstance(outcome, TransportUnavailable), f"expected the call to fail, got {outcome!r}"
+
+
+if __name__ == "__main__":
+    print("Testing Persistent MCP Transport\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_handshake_and_tools_list,
+        test_pipelined_calls_share_one_process,
+        test_errors_are_mapped,
+        test_reconnects_after_server_dies,
+        test_falls_back_to_http_when_server_cannot_start,
+        test_stdio_only_federated_server_fails_instead_of_calling_the_hub,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,125 @@
+"""
+Test Metrics Registry
+Prometheus text format, per-thread shards summed at scrape time, the
+disabled switch, collectors, and /metrics after a real (mock-tool) run.
+
+Run:  python test_metrics.py      (or: pytest test_metrics.py)
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+from app.services.observability import metrics
+from app.services.observability.metrics import Counter, Gauge, Histogram, Registry
+
+
+def test_text_format():
+    registry = Registry()
+    hist = Histogram("demo_seconds", "Demo latency", ("node",), buckets=(0.1, 1.0), registry=registry)
+    counter = Counter("demo_total", "Demo events", ("kind",), registry=registry)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value, "planner")
+    counter.inc('say "hi"\n')
+    counter.inc('say "hi"\n', amount=2)
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text and "# HELP demo_total Demo events" in text
+    assert 'demo_seconds_bucket{node="planner",le="0.1"} 2' in text  # le is inclusive
+    assert 'demo_seconds_bucket{node="planner",le="1.0"} 3' in text
+    assert 'demo_seconds_bucket{node="planner",le="+Inf"} 4' in text
+    assert 'demo_seconds_count{node="planner"} 4' in text
+    assert 'demo_seconds_sum{node="planner"} 3.65' in text
+    assert 'demo_total{kind="say \\"hi\\"\\n"} 3' in text
+
+
+def test_threads_accumulate_without_locks():
+    registry = Registry()
+    counter = Counter("work_total", "Work", registry=registry)
+    gauge = Gauge("busy", "Busy workers", registry=registry)
+
+    def work():
+        gauge.inc()
+        for _ in range(10000):
+            counter.inc()
+        gauge.dec()
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(registry._shards) == 8  # one shard per thread, no shared cell
+    text = registry.render()
+    assert "work_total 80000" in text and "busy 0" in text
+
+
+def test_disabled_records_nothing():
+    registry = Registry()
+    counter = Counter("off_total", "Off", registry=registry)
+    saved = metrics.METRICS_ENABLED
+    metrics.METRICS_ENABLED = False
+    try:
+        counter.inc()
+    finally:
+        metrics.METRICS_ENABLED = saved
+    assert registry.merged() == {}
+
+
+def test_collectors_and_broken_collectors():
+    registry = Registry()
+    registry.add_collector(lambda: [("queue_depth", "gauge", "Depth", [({"q": "a"}, 3)])])
+
+    def broken():
+        raise RuntimeError("boom")
+
+    registry.add_collector(broken)
+    assert 'queue_depth{q="a"} 3' in registry.render()
+
+
+def test_metrics_endpoint_after_a_run():
+    from app.routes.agent_api import RunRequest, run_agent
+    from app.routes.health import metrics as metrics_endpoint
+
+    os.environ["MOCK_TOOLS"] = "true"
+    try:
+        result = asyncio.run(run_agent(RunRequest(user_request=f"list my calendar events (metrics {time.time_ns()})")))
+        assert result["status"] == "DONE", result.get("error")
+        asyncio.run(run_agent(RunRequest(user_request="")))
+    finally:
+        os.environ.pop("MOCK_TOOLS", None)
+
+    response = asyncio.run(metrics_endpoint())
+    assert response.media_type.startswith("text/plain; version=0.0.4")
+    text = response.body.decode()
+    for node in ("tool_discovery", "planner", "validator", "executor", "report"):
+        assert f'neuromcp_node_duration_seconds_count{{node="{node}"}}' in text, node
+    tools = [step["tool"] for step in result["plan"]["steps"]]
+    assert f'neuromcp_tool_call_duration_seconds_count{{tool="{tools[0]}",outcome="ok"}}' in text
+    assert 'neuromcp_rate_limit_decisions_total{scope="overall",decision="allowed"}' in text
+    assert 'neuromcp_validation_errors_total{stage="pre_validation"}' in text
+    assert 'neuromcp_runs_total{phase="run",status="DONE"}' in text
+    assert "neuromcp_runs_in_flight 0" in text
+    assert "neuromcp_run_slots_active 0" in text
+
+
+if __name__ == "__main__":
+    print("Testing Metrics Registry\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_text_format,
+        test_threads_accumulate_without_locks,
+        test_disabled_records_nothing,
+        test_collectors_and_broken_collectors,
+        test_metrics_endpoint_after_a_run,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,97 @@
+"""
+Test Microbenchmark Suite
+The corpus is deterministic, every case runs, and the CLI gate: --save
+writes baselines, --check exits 1 only when a case is slower than its
+baseline by more than the threshold.
+
+Run:  python test_microbench.py      (or: pytest test_microbench.py)
+"""
+import io
+import json
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from benchmarks.microbench import corpus
+from benchmarks.microbench.__main__ import BASELINE_FILE, compare, main
+from benchmarks.microbench.cases import CASES
+
+FAST_CASE = "report.format_slack_messages[50]"
+QUICK = ["--repeat", "1", "--min-time", "0.001", "--confirm", "0"]
+
+
+def _main(*argv):
+    out = io.StringIO()
+    with redirect_stdout(out):
+        code = main(list(argv) + QUICK)
+    return code, out.getvalue()
+
+
+def test_corpus_is_deterministic():
+    assert corpus.requests() == corpus.requests() and len(set(corpus.requests())) > 150
+    assert corpus.large_plan() == corpus.large_plan()
+    assert min(len(text) for text in corpus.large_requests()) > 1000
+    assert corpus.slack_messages(50) == corpus.slack_messages(50)
+
+
+def test_every_case_runs_and_has_a_baseline():
+    baselines = json.loads(BASELINE_FILE.read_text())
+    assert set(baselines["cases"]) == {case.name for case in CASES}
+    for case in CASES:
+        case.setup()()
+
+
+def test_compare_statuses():
+    results = {"a": {"best": 1.3e-3, "items": 10}, "b": {"best": 1.1e-3, "items": 10},
+               "c": {"best": 0.5e-3, "items": 10}, "d": {"best": 1e-3, "items": 10}}
+    baselines = {"cases": {"a": {"op_us": 1000}, "b": {"op_us": 1000}, "c": {"op_us": 1000}}}
+    rows = {row["name"]: row for row in compare(results, baselines, 0.25)}
+    assert [rows[n]["status"] for n in "abcd"] == ["regressed", "ok", "faster", "new"]
+    assert round(rows["a"]["change"], 2) == 0.30 and rows["a"]["item_us"] == 130
+
+
+def test_cli_gate():
+    tmp = tempfile.TemporaryDirectory()
+    path = Path(tmp.name) / "baselines.json"
+    try:
+        code, out = _main("--save", "-k", FAST_CASE, "--baseline", str(path))
+        assert code == 0 and FAST_CASE in json.loads(path.read_text())["cases"]
+
+        saved = json.loads(path.read_text())
+        saved["cases"][FAST_CASE]["op_us"] = 1e9  # a baseline nobody can miss
+        path.write_text(json.dumps(saved))
+        code, out = _main("--check", "-k", FAST_CASE, "--baseline", str(path))
+        assert code == 0 and "faster" in out
+
+        saved["cases"][FAST_CASE]["op_us"] = 0.001  # the case now looks far slower than recorded
+        path.write_text(json.dumps(saved))
+        code, out = _main("--check", "-k", FAST_CASE, "--baseline", str(path))
+        assert code == 1 and "1 regression(s)" in out
+        code, _ = _main("-k", FAST_CASE, "--baseline", str(path))
+        assert code == 0  # without --check the table is informational
+
+        code, out = _main("-k", "no-such-case", "--baseline", str(path))
+        assert code == 2
+    finally:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    print("Testing Microbenchmark Suite\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_corpus_is_deterministic,
+        test_every_case_runs_and_has_a_baseline,
+        test_compare_statuses,
+        test_cli_gate,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
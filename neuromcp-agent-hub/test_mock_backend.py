@@ -0,0 +1,189 @@
+"""
+Test Mock Tool Backend
+Profiles (latency distributions, error / 429 rates), the in-process mock
+tools behind MOCK_TOOLS=true, and the HTTP stand-in for Slack / Google
+driven by the real tool modules.
+
+Run:  python test_mock_backend.py      (or: pytest test_mock_backend.py)
+"""
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from fastapi.testclient import TestClient
+
+from app.services.http.client import close_http_client
+from app.services.mock_backend import server as mock_server
+from app.services.oauth.google_token_manager import reset_google_token_manager
+from app.services.mock_backend.backend import get_backend, reset_backend
+from app.services.mock_backend.profile import LatencySpec, load_profile, profile_from_dict
+
+
+def test_profiles_and_distributions():
+    assert load_profile("instant").default.error_rate == 0
+    assert load_profile("realistic").for_endpoint("llm.summarize").latency.dist == "lognormal"
+
+    inline = load_profile(json.dumps({"history_length": 7, "default": {"latency_ms": {"dist": "fixed", "ms": 5}}}))
+    assert inline.history_length == 7 and inline.default.latency.sample_s(random.Random()) == 0.005
+
+    rng = random.Random(1)
+    uniform = [LatencySpec(dist="uniform", min=10, max=20).sample_s(rng) for _ in range(500)]
+    assert 0.010 <= min(uniform) and max(uniform) <= 0.020
+    capped = [LatencySpec(dist="exponential", mean=100, cap_ms=150).sample_s(rng) for _ in range(500)]
+    assert max(capped) <= 0.150
+
+
+def test_fault_rates_match_profile():
+    profile = profile_from_dict({"seed": 3, "default": {"error_rate": 0.1, "rate_limit_rate": 0.2, "retry_after_s": 4}})
+    rng = random.Random(profile.seed)
+    outcomes = [profile.decide("chat.postMessage", rng) for _ in range(5000)]
+    rate_limited = [o for o in outcomes if o.status == 429]
+    errors = [o for o in outcomes if o.status == 503]
+    assert abs(len(rate_limited) / 5000 - 0.2) < 0.03 and abs(len(errors) / 5000 - 0.1) < 0.03
+    assert all(o.retry_after_s == 4 for o in rate_limited)
+
+
+def test_mock_tools_cover_every_registered_tool():
+    from app.agents.executor.agent_main import run_executor
+
+    os.environ["MOCK_TOOLS"] = "true"
+    reset_backend(profile_from_dict({"seed": 1, "history_length": 30}))
+    try:
+        state = {
+            "plan": {"steps": [
+                {"id": "S1", "tool": "slack.post_message", "input": {"channel": "#general", "text": "hi"}},
+                {"id": "S2", "tool": "slack.read_messages", "input": {"channel": "#general", "limit": 20}},
+                {"id": "S3", "tool": "slack.summarize_messages", "input": {}},
+                {"id": "S4", "tool": "slack.list_channels", "input": {}},
+                {"id": "S5", "tool": "calendar.create_event", "input": {
+                    "title": "Sync", "start_time": "2030-01-01T10:00:00+00:00", "end_time": "2030-01-01T10:30:00+00:00"}},
+                {"id": "S6", "tool": "calendar.list_events", "input": {"max_results": 50}},
+            ]},
+            "logs": [],
+        }
+        state = asyncio.run(run_executor(state))
+        assert state["status"] == "DONE", state.get("error")
+        results = state["execution_results"]
+        assert results["S2"]["count"] == 20 and results["S2"]["messages"][0]["text"] == "hi"
+        assert results["S3"]["message_count"] == 20
+        assert any(e["id"] == results["S5"]["event_id"] for e in results["S6"]["events"])
+        assert all(r.get("mock") for r in results.values())
+    finally:
+        os.environ["MOCK_TOOLS"] = "false"
+
+
+def test_mcp_call_surfaces_429_with_retry_after():
+    from app.main import app
+
+    os.environ["MOCK_TOOLS"] = "true"
+    reset_backend(profile_from_dict({"default": {"rate_limit_rate": 1.0, "retry_after_s": 2.5}}))
+    try:
+        r = TestClient(app).post("/mcp/mcp/call", json={"name": "calendar.list_events", "arguments": {}})
+        assert r.status_code == 429, r.text
+        assert r.headers["retry-after"] == "3"
+    finally:
+        os.environ["MOCK_TOOLS"] = "false"
+        reset_backend(load_profile("instant"))
+
+
+def test_latency_is_injected_in_process():
+    reset_backend(profile_from_dict({"default": {"latency_ms": {"dist": "fixed", "ms": 150}}}))
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(get_backend().hit("conversations.list") for _ in range(20)))
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(run())
+    assert 0.15 <= elapsed < 0.5, f"expected ~150 ms concurrent latency, got {elapsed:.3f}s"
+    reset_backend(load_profile("instant"))
+
+
+def _serve_stand_in():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(mock_server.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.02)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def test_http_stand_in_drives_real_tool_modules():
+    from app.services.oauth import token_store
+    from app.services.tools import calendar_tool, slack_tool
+
+    server, base = _serve_stand_in()
+    tmp = tempfile.TemporaryDirectory()
+    saved = (token_store.TOKENS_FILE, slack_tool.SLACK_API_BASE, calendar_tool.GOOGLE_CALENDAR_API)
+    token_store.TOKENS_FILE = Path(tmp.name) / "tokens.json"
+    token_store.TOKENS_FILE.write_text(json.dumps({
+        "slack": {"access_token": "xoxb-test"},
+        "google": {"access_token": "ya29-test", "refresh_token": "r"},
+    }))
+    slack_tool.SLACK_API_BASE = f"{base}/api"
+    calendar_tool.GOOGLE_CALENDAR_API = f"{base}/calendar/v3"
+    reset_google_token_manager()  # drop a token cached from another test's file
+    reset_backend(profile_from_dict({"seed": 5, "history_length": 40}))
+
+    async def run():
+        try:
+            posted = await slack_tool.post_slack_message("#general", "hello from the stand-in")
+            history = await slack_tool.read_slack_messages("#general", limit=10)
+            event = await calendar_tool.create_calendar_event(
+                "Standup", "2030-01-01T09:00:00+00:00", "2030-01-01T09:15:00+00:00")
+
+            reset_backend(profile_from_dict({"default": {"rate_limit_rate": 1.0, "retry_after_s": 7}}))
+            async with httpx.AsyncClient() as client:
+                throttled = await client.post(f"{base}/api/chat.postMessage",
+                                              headers={"Authorization": "Bearer x"}, json={"channel": "#general"})
+            return posted, history, event, throttled
+        finally:
+            await close_http_client()
+
+    try:
+        posted, history, event, throttled = asyncio.run(run())
+        assert posted["success"] and posted["channel"].startswith("C")
+        assert history["count"] == 10 and history["messages"][0]["text"] == "hello from the stand-in"
+        assert len(event["event_id"]) == 32  # client-supplied id (idempotent insert)
+        assert throttled.status_code == 429 and throttled.headers["retry-after"] == "7"
+        assert throttled.json() == {"ok": False, "error": "ratelimited"}
+    finally:
+        token_store.TOKENS_FILE, slack_tool.SLACK_API_BASE, calendar_tool.GOOGLE_CALENDAR_API = saved
+        reset_google_token_manager()
+        reset_backend(load_profile("instant"))
+        server.should_exit = True
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    print("Testing Mock Tool Backend\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_profiles_and_distributions,
+        test_fault_rates_match_profile,
+        test_mock_tools_cover_every_registered_tool,
+        test_mcp_call_surfaces_429_with_retry_after,
+        test_latency_is_injected_in_process,
+        test_http_stand_in_drives_real_tool_modules,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,148 @@
+"""
+Test Planner Deadline Handling
+A run budget that runs out during LLM planning ends the run as TIMEOUT
+(not as an offline-planner fallback), a plain LLM failure still falls back,
+and a missing GROQ_API_KEY is detected without building a client.
+
+Run:  python test_planner_deadline.py      (or: pytest test_planner_deadline.py)
+"""
+import asyncio
+import os
+import sys
+import time
+
+from app.agents.planner import agent
+from app.agents.planner.agent_main import run_planner
+from app.services.observability.metrics import REGISTRY
+from app.utils.deadline import TIMEOUT_STATUS
+from app.utils.run_log import RunLog
+
+
+class _FakeLLM:
+    """Stands in for ChatGroq: waits `delay_s`, then replies or raises"""
+
+    def __init__(self, delay_s, reply="not json", error=None):
+        self.delay_s, self.reply, self.error, self.calls = delay_s, reply, error, 0
+
+    def invoke(self, messages, timeout=None):
+        self.calls += 1
+        self.timeout = timeout
+        time.sleep(self.delay_s)
+        if self.error is not None:
+            raise self.error
+        return type("Reply", (), {"content": self.reply})()
+
+
+class _Groq:
+    """GROQ_API_KEY set (or not) and get_groq_llm patched to hand out `llm`"""
+
+    def __init__(self, llm=None, key="test-key"):
+        self.llm, self.key = llm, key
+
+    def __enter__(self):
+        self.saved = (agent.get_groq_llm, os.environ.get("GROQ_API_KEY"), os.environ.get("OFFLINE_PLANNER"))
+        agent.get_groq_llm = self._client
+        os.environ.pop("OFFLINE_PLANNER", None)
+        if self.key:
+            os.environ["GROQ_API_KEY"] = self.key
+        else:
+            os.environ.pop("GROQ_API_KEY", None)
+        return self.llm
+
+    def _client(self):
+        assert self.llm is not None, "no ChatGroq client should be built"
+        return self.llm
+
+    def __exit__(self, *exc):
+        agent.get_groq_llm, key, offline = self.saved
+        for name, value in (("GROQ_API_KEY", key), ("OFFLINE_PLANNER", offline)):
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def _state(budget_s=None):
+    from app.services.mcp.tool_catalog import get_catalog
+
+    asyncio.run(get_catalog())  # what tool_discovery does before the planner runs
+    return {
+        "user_request": "list my calendar events",
+        "logs": RunLog([]),
+        "deadline_at": None if budget_s is None else time.time() + budget_s,
+    }
+
+
+def _fallbacks():
+    return REGISTRY.merged().get(("neuromcp_fallbacks_total", ("planner",)), 0)
+
+
+def test_deadline_between_attempts_is_a_timeout():
+    before = _fallbacks()
+    with _Groq(_FakeLLM(0.2)) as llm:  # every reply is unusable and takes longer than the budget
+        state = run_planner(_state(budget_s=0.15))
+    assert llm.calls == 1  # no second attempt once the budget is gone
+    assert 0 < llm.timeout <= 0.15  # the call itself was capped by what was left
+    assert state["status"] == TIMEOUT_STATUS and state["error"] == "Run deadline exceeded"
+    assert "plan" not in state and "planner_mode" not in state
+    assert _fallbacks() == before
+    assert any("Run deadline exceeded - skipping planner" in log["msg"] for log in state["logs"])
+
+
+def test_llm_call_cut_short_by_the_deadline_is_a_timeout():
+    before = _fallbacks()
+    with _Groq(_FakeLLM(0.2, error=TimeoutError("Request timed out."))):
+        state = run_planner(_state(budget_s=0.1))
+    assert state["status"] == TIMEOUT_STATUS and "plan" not in state
+    assert _fallbacks() == before
+
+
+def test_llm_failure_within_budget_still_falls_back():
+    before = _fallbacks()
+    with _Groq(_FakeLLM(0, error=RuntimeError("model overloaded"))):
+        state = run_planner(_state(budget_s=30))
+    assert state.get("status") != TIMEOUT_STATUS
+    assert state["planner_mode"] == "fallback" and state["plan"]["steps"]
+    assert _fallbacks() == before + 1
+
+
+def test_missing_key_is_detected_without_building_a_client():
+    with _Groq(llm=None, key=None):
+        state = run_planner(_state())
+    assert state["planner_mode"] == "fallback"
+    assert any("GROQ_API_KEY missing" in log["msg"] for log in state["logs"])
+
+
+def test_run_reports_timeout_status():
+    from app.routes.agent_api import RunRequest, run_agent
+
+    os.environ["MOCK_TOOLS"] = "true"
+    try:
+        with _Groq(_FakeLLM(0.3)):
+            body = asyncio.run(run_agent(RunRequest(
+                user_request=f"list my calendar events (deadline {time.time_ns()})", timeout_s=0.2)))
+    finally:
+        os.environ.pop("MOCK_TOOLS", None)
+    assert body["status"] == TIMEOUT_STATUS, body.get("error")
+    assert not body.get("execution_results")
+
+
+if __name__ == "__main__":
+    print("Testing Planner Deadline Handling\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_deadline_between_attempts_is_a_timeout,
+        test_llm_call_cut_short_by_the_deadline_is_a_timeout,
+        test_llm_failure_within_budget_still_falls_back,
+        test_missing_key_is_detected_without_building_a_client,
+        test_run_reports_timeout_status,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,148 @@
+"""
+Test On-Demand Profiling
+Token check, the concurrency cap, collapsed and speedscope output over a
+real (mock-tool) run whose sync nodes run in worker threads, idle loop
+samples, and the X-Profile header path over HTTP.
+
+Run:  python test_profiler.py      (or: pytest test_profiler.py)
+"""
+import asyncio
+import os
+import sys
+import time
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes.agent_api import RunRequest, run_agent
+from app.services.observability import profiler
+from app.services.observability.profiler import profile_run
+
+TOKEN = "profile-secret"
+
+
+def _request(tag):
+    return RunRequest(user_request=f"list my calendar events ({tag} {time.time_ns()})")
+
+
+def _slow_llm(*args, **kwargs):
+    time.sleep(0.1)  # a Groq round trip that then fails -> offline planner
+    raise RuntimeError("model overloaded")
+
+
+class _Env:
+    """MOCK_TOOLS, PROFILE_TOKEN, a fine sampling interval and a slow LLM planner"""
+
+    def __enter__(self):
+        from app.agents.planner import agent_main
+        self.agent_main, self.saved = agent_main, (agent_main.create_plan_with_groq, profiler.PROFILE_INTERVAL_S)
+        agent_main.create_plan_with_groq = _slow_llm
+        profiler.PROFILE_INTERVAL_S = 0.001
+        os.environ.update(MOCK_TOOLS="true", PROFILE_TOKEN=TOKEN)
+
+    def __exit__(self, *exc):
+        self.agent_main.create_plan_with_groq, profiler.PROFILE_INTERVAL_S = self.saved
+        os.environ.pop("MOCK_TOOLS", None)
+        os.environ.pop("PROFILE_TOKEN", None)
+
+
+def _status(coro):
+    try:
+        asyncio.run(coro)
+    except HTTPException as e:
+        return e.status_code
+    return 200
+
+
+def test_profiling_needs_the_token():
+    assert _status(run_agent(_request("denied"), profile=True, x_profile_token=TOKEN)) == 403  # not configured
+    with _Env():
+        assert _status(run_agent(_request("denied"), profile=True)) == 403
+        assert _status(run_agent(_request("denied"), profile=True, x_profile_token="guess")) == 403
+        assert _status(run_agent(_request("denied"), profile=True, x_profile_token=TOKEN,
+                                 profile_format="pprof")) == 400
+
+
+def test_concurrent_profiles_are_capped():
+    with _Env():
+        with profile_run("someone else"):
+            assert _status(run_agent(_request("busy"), profile=True, x_profile_token=TOKEN)) == 429
+        assert _status(run_agent(_request("free"), profile=True, x_profile_token=TOKEN)) == 200
+
+
+def test_collapsed_profile_covers_graph_nodes():
+    with _Env():
+        body = asyncio.run(run_agent(_request("collapsed"), profile=True, x_profile_token=TOKEN))
+    assert body["status"] == "DONE", body.get("error")
+    report = body["profile"]
+    assert report["format"] == "collapsed" and report["samples"] > 20 and not report["truncated"]
+    lines = report["data"].splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    # The planner node ran in a LangGraph worker thread and was still sampled
+    planner = [line for line in lines if "run_planner (app/agents/planner/agent_main.py:" in line]
+    assert planner and any("_slow_llm (test_profiler.py:" in line for line in planner)
+    assert not any(line.startswith("MainThread;") for line in planner)
+    # Profiling is opt-in: a plain run carries no profile
+    with _Env():
+        plain = asyncio.run(run_agent(_request("plain")))
+    assert "profile" not in plain
+
+
+def test_speedscope_document():
+    with _Env():
+        body = asyncio.run(run_agent(
+            _request("speedscope"), profile=True, profile_format="speedscope", x_profile_token=TOKEN))
+    doc = body["profile"]["data"]
+    assert doc["$schema"] == profiler.SPEEDSCOPE_SCHEMA and doc["profiles"]
+    frames = doc["shared"]["frames"]
+    assert any(f["name"] == "run_planner" for f in frames)
+    for prof in doc["profiles"]:
+        assert prof["type"] == "sampled" and prof["unit"] == "seconds"
+        assert len(prof["samples"]) == len(prof["weights"])
+        assert all(0 <= i < len(frames) for stack in prof["samples"] for i in stack)
+    total = sum(w for prof in doc["profiles"] for w in prof["weights"])
+    assert 0.05 < total  # at least the slow planner call
+
+
+def test_idle_loop_is_not_sampled():
+    async def run():
+        with profile_run("idle", interval_s=0.001) as prof:
+            await asyncio.sleep(0.1)
+        return prof
+
+    prof = asyncio.run(run())
+    assert prof.idle > 20 and prof.samples == 0 and prof.collapsed() == ""
+
+
+def test_header_opt_in_over_http():
+    client = TestClient(app)
+    with _Env():
+        response = client.post("/agent/run", json={"user_request": f"list my calendar events (http {time.time_ns()})"},
+                               headers={"X-Profile": "1", "X-Profile-Token": TOKEN})
+        assert response.status_code == 200 and response.json()["profile"]["samples"] > 0
+        denied = client.post("/agent/run", json={"user_request": "list my calendar events"},
+                             headers={"X-Profile": "1", "X-Profile-Token": "guess"})
+        assert denied.status_code == 403
+
+
+if __name__ == "__main__":
+    print("Testing On-Demand Profiling\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_profiling_needs_the_token,
+        test_concurrent_profiles_are_capped,
+        test_collapsed_profile_covers_graph_nodes,
+        test_speedscope_document,
+        test_idle_loop_is_not_sampled,
+        test_header_opt_in_over_http,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -12,23 +12,23 @@ print("=" * 60)
 print("\nTest 1: Normal Usage")
 print("-" * 60)
 for i in range(3):
-    allowed, error = check_rate_limit("slack.post_message", f"test message {i}")
+    allowed, error, _ = check_rate_limit("slack.post_message", f"test message {i}")
     print(f"  Request {i+1}: {'[PASS]' if allowed else f'[BLOCKED] {error}'}")
 
 # Test 2: Duplicate request (should block)
 print("\nTest 2: Duplicate Detection (30 second cooldown)")
 print("-" * 60)
-allowed1, _ = check_rate_limit("calendar.create_event", "same request")
+allowed1, _, _ = check_rate_limit("calendar.create_event", "same request")
 print(f"  First request: [PASS]" if allowed1 else "[FAIL]")
 
-allowed2, error2 = check_rate_limit("calendar.create_event", "same request")
+allowed2, error2, _ = check_rate_limit("calendar.create_event", "same request")
 print(f"  Duplicate (immediate): {'[PASS] (should be blocked)' if allowed2 else f'[PASS - BLOCKED] {error2}'}")
 
 #Test 3: Exceed per-tool rate limit
 print("\nTest 3: Exceed Tool Rate Limit (5 calendar events per hour)")
 print("-" * 60)
 for i in range(7):
-    allowed, error = check_rate_limit("calendar.create_event", f"meeting {i}")
+    allowed, error, _ = check_rate_limit("calendar.create_event", f"meeting {i}")
     status = "[PASS]" if allowed else f"[BLOCKED] {error}"
     print(f"  Calendar event {i+1}: {status}")
 
@@ -0,0 +1,188 @@
+"""
+Test Retry Policy
+Backoff / Retry-After parsing, which responses and errors are retried for
+reads vs writes, Slack's `ratelimited` body, the run deadline capping
+waits, and the idempotent Calendar insert (client event id + 409).
+
+Run:  python test_retry.py      (or: pytest test_retry.py)
+"""
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+from app.services.http import circuit_breaker as cb
+from app.services.http import retry
+from app.services.oauth.google_token_manager import reset_google_token_manager
+from app.services.mock_backend.backend import get_backend, reset_backend
+from app.services.mock_backend.profile import load_profile
+from test_mcp_federation import _QuietServer, _dead_url, _run
+from test_mock_backend import _serve_stand_in
+
+POLICY = retry.RetryPolicy(max_attempts=3, base_s=0.01, max_backoff_s=0.05, max_wait_s=5, min_attempt_s=0.2)
+
+
+class ScriptedServer:
+    """Replies with the scripted (status, headers, body) tuples in order, then 200 {"ok": true}"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.hits = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self):
+                stub.hits += 1
+                status, headers, body = stub.script.pop(0) if stub.script else (200, {}, {"ok": True})
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                for k, v in {"Content-Type": "application/json", **headers}.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply()
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                self._reply()
+
+        self.httpd = _QuietServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _call(url, method="GET", provider="google", **kwargs):
+    cb.reset_breakers()
+    retry.reset_retry_stats()
+    return _run(retry.request_with_retry(provider, "test", method, url, policy=POLICY, **kwargs))
+
+
+def test_backoff_and_retry_after_parsing():
+    rng = random.Random(0)
+    waits = [POLICY.backoff_s(n, rng) for n in range(1, 8) for _ in range(50)]
+    assert 0 <= min(waits) and max(waits) <= POLICY.max_backoff_s
+    assert retry.parse_retry_after("7") == 7.0
+    assert 8 <= retry.parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+    assert retry.parse_retry_after("soon") is None and retry.parse_retry_after(None) is None
+
+
+def test_reads_retry_5xx_until_success():
+    server = ScriptedServer([(503, {}, {}), (502, {}, {})])
+    try:
+        response = _call(server.url)
+        assert response.status_code == 200 and server.hits == 3
+        stats = retry.retry_stats()["google:test"]
+        assert stats["attempts"] == 3 and stats["retries"] == 2 and "gave_up" not in stats
+    finally:
+        server.close()
+
+
+def test_writes_only_retry_when_safe():
+    server = ScriptedServer([(503, {}, {})])
+    try:
+        assert _call(server.url, "POST").status_code == 503 and server.hits == 1  # may have landed
+
+        server.script = [(429, {"Retry-After": "1"}, {})]
+        started = time.perf_counter()
+        response = _call(server.url, "POST")
+        assert response.status_code == 200 and 1.0 <= time.perf_counter() - started < 2.0
+        assert retry.retry_stats()["google:test"]["retry_after_waits"] == 1
+    finally:
+        server.close()
+
+    try:
+        _call(_dead_url(), "POST")  # never reached a server: retried, then raised
+        raise AssertionError("expected ConnectError")
+    except Exception as e:
+        assert type(e).__name__ == "ConnectError", repr(e)
+    assert retry.retry_stats()["google:test"]["attempts"] == POLICY.max_attempts
+
+
+def test_slack_ratelimited_body_is_retried():
+    server = ScriptedServer([(200, {}, {"ok": False, "error": "ratelimited"})])
+    try:
+        response = _call(server.url, "POST", provider="slack")
+        assert response.json() == {"ok": True} and server.hits == 2
+    finally:
+        server.close()
+
+
+def test_deadline_caps_retry_waits():
+    server = ScriptedServer([(503, {"Retry-After": "3"}, {})])
+    try:
+        started = time.perf_counter()
+        response = _call(server.url, deadline_at=time.time() + 1.0)
+        assert response.status_code == 503 and time.perf_counter() - started < 0.5
+        assert retry.retry_stats()["google:test"]["gave_up"] == 1
+    finally:
+        server.close()
+
+
+def test_calendar_insert_is_idempotent():
+    from app.services.oauth import token_store
+    from app.services.tools import calendar_tool
+
+    server, base = _serve_stand_in()
+    tmp = tempfile.TemporaryDirectory()
+    saved = (token_store.TOKENS_FILE, calendar_tool.GOOGLE_CALENDAR_API, calendar_tool.uuid)
+    token_store.TOKENS_FILE = Path(tmp.name) / "tokens.json"
+    token_store.TOKENS_FILE.write_text(json.dumps({"google": {"access_token": "ya29-test", "refresh_token": "r"}}))
+    calendar_tool.GOOGLE_CALENDAR_API = f"{base}/calendar/v3"
+    reset_google_token_manager()  # drop a token cached from another test's file
+    reset_backend(load_profile("instant"))
+    cb.reset_breakers()
+
+    # An earlier attempt of this insert already landed: the retry gets a 409
+    fixed = uuid.UUID("0123456789abcdef0123456789abcdef")
+    get_backend().calendar_insert({"id": fixed.hex, "summary": "Standup",
+                                   "start": {"dateTime": "2030-01-01T09:00:00+00:00"}})
+    calendar_tool.uuid = type("U", (), {"uuid4": staticmethod(lambda: fixed)})
+    try:
+        event = _run(calendar_tool.create_calendar_event(
+            "Standup", "2030-01-01T09:00:00+00:00", "2030-01-01T09:15:00+00:00"))
+        assert event["success"] and event["event_id"] == fixed.hex
+        assert sum(1 for e in get_backend().events if e["id"] == fixed.hex) == 1
+    finally:
+        token_store.TOKENS_FILE, calendar_tool.GOOGLE_CALENDAR_API, calendar_tool.uuid = saved
+        reset_google_token_manager()
+        server.should_exit = True
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    print("Testing Retry Policy\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_backoff_and_retry_after_parsing,
+        test_reads_retry_5xx_until_success,
+        test_writes_only_retry_when_safe,
+        test_slack_ratelimited_body_is_retried,
+        test_deadline_caps_retry_waits,
+        test_calendar_insert_is_idempotent,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,192 @@
+"""
+Test Analytics Rollups
+Quantile sketch accuracy and merging, per-minute/per-hour buckets filled by
+the history writer, window stats read from buckets only, failure reason
+grouping, and the /agent/stats endpoint.
+
+Run:  python test_rollups.py      (or: pytest test_rollups.py)
+"""
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.history.recorder import HistoryWriter, reset_history_writer
+from app.services.history.rollups import HOUR, MINUTE, failure_reason, rollup_records, window_stats
+from app.services.history.store import HistoryStore
+from app.utils.sketch import ALPHA, QuantileSketch
+
+
+def _exact(values, q):
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_sketch_quantiles_within_relative_error():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(4, 1.2) for _ in range(20000)]  # long-tailed, like latencies
+    sketch = QuantileSketch()
+    for v in values:
+        sketch.add(v)
+    for q in (0.5, 0.95, 0.99):
+        exact = _exact(values, q)
+        assert abs(sketch.quantile(q) - exact) <= 2 * ALPHA * exact, (q, sketch.quantile(q), exact)
+    assert sketch.summary()["count"] == 20000
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_merged_sketches_equal_one_big_sketch():
+    rng = random.Random(1)
+    parts = [[rng.expovariate(1 / 50) for _ in range(1000)] for _ in range(5)]
+    whole, merged = QuantileSketch(), QuantileSketch()
+    for part in parts:
+        piece = QuantileSketch()
+        for v in part:
+            whole.add(v)
+            piece.add(v)
+        # Round-trips through the stored form
+        merged.merge(QuantileSketch.from_dict(piece.to_dict()))
+    for q in (0.5, 0.95, 0.99):
+        assert merged.quantile(q) == whole.quantile(q)
+    assert merged.count == whole.count and merged.max == whole.max
+
+
+def test_failure_reasons_are_grouped():
+    a = failure_reason("start_time: Datetime cannot be in the past: '2024-01-01T10:00:00+05:30'")
+    b = failure_reason("start_time: Datetime cannot be in the past: '2025-03-09T09:00:00+05:30'")
+    assert a == b and "2024" not in a
+
+
+def test_rate_limit_rejections_use_the_limiters_reason_code():
+    from app.agents.validator.rate_limiter import DUPLICATE, TOOL_QUOTA, RateLimiter
+
+    limiter = RateLimiter()
+    assert limiter.check_rate_limit("overall", "same text", "t1").allowed
+    refused = limiter.check_rate_limit("overall", "same text", "t1")
+    assert not refused.allowed and refused.reason == DUPLICATE and "Duplicate" in refused.error
+
+    # The module-level check labels its metric with the same code
+    from app.agents.validator.rate_limiter import check_rate_limit
+    from app.services.observability.metrics import render_metrics
+
+    text = f"metrics {time.time_ns()}"
+    check_rate_limit("overall", text, "t-codes")
+    assert check_rate_limit("overall", text, "t-codes").reason == DUPLICATE
+    assert 'neuromcp_rate_limit_decisions_total{scope="overall",decision="duplicate"}' in render_metrics()
+
+    # Counted by code, never by matching the (user-facing, changeable) message
+    rollup = rollup_records([_record(1, time.time(), status="ERROR", validation={
+        "valid": False,
+        "errors": ["S1: Limit reached, come back later", "S2: input schema mismatch"],
+        "rate_limited": [{"reason": TOOL_QUOTA, "error": "S1: Limit reached, come back later"}],
+    })])
+    data = next(iter(rollup.values())).to_dict()
+    assert data["rate_limited"] == {TOOL_QUOTA: 1}
+    assert list(data["validation_failures"]) == ["S…: input schema mismatch"]
+
+
+def _record(i, created_at, tenant="default", status="DONE", planner="llm", validation=None):
+    return {
+        "run_id": f"r{i}", "phase": "run", "created_at": created_at, "tenant_id": tenant, "user_id": "u",
+        "status": status, "planner": planner, "duration_ms": 100 + i,
+        "timings": {"planner": 50 + i, "validator": 5},
+        "steps": [{"step_id": "s1", "tool": "slack.post_message", "ms": 20 + i, "ok": status != "FAILED"}],
+        "validation": validation,
+    }
+
+
+def test_writer_maintains_minute_and_hour_buckets():
+    tmp = tempfile.TemporaryDirectory()
+    store = HistoryStore(Path(tmp.name) / "history.db")
+    writer = HistoryWriter(store, batch=7)
+    now = time.time()
+    try:
+        for i in range(40):
+            writer.submit(_record(i, now - i * 30, planner="fallback" if i % 4 == 0 else "llm"))
+        writer.submit(_record(99, now, status="ERROR", planner=None, validation={
+            "valid": False, "errors": ["Too many requests. Limit for your workspace: 100 per hour. Try again in 5 minutes."],
+            "rate_limited": [{"reason": "tenant_quota",
+                              "error": "Too many requests. Limit for your workspace: 100 per hour. Try again in 5 minutes."}]}))
+        writer.submit(_record(98, now, tenant="acme", status="FAILED"))
+        assert writer.flush(5)
+
+        minute_rows = store.rollup_rows(MINUTE, now - HOUR, now)
+        assert sum(data["runs"] for _, _, data in minute_rows) == 42
+        assert len({bucket for bucket, _, _ in minute_rows}) >= 20  # 40 runs over 20 minutes
+
+        stats = window_stats(store, window_s=HOUR, now=now)
+        assert stats["resolution_s"] == MINUTE and stats["runs"] == 42
+        assert stats["llm_fallback_rate"] == round(10 / 41, 4)
+        assert stats["nodes"]["planner"]["count"] == 42 and stats["nodes"]["planner"]["p50"] > 50
+        assert stats["tools"]["slack.post_message"]["errors"] == 1
+        assert stats["rate_limit_rejections"] == {"total": 1, "tenant_quota": 1}
+        assert sum(point["runs"] for point in stats["series"]) == 42
+
+        # A day-long window reads hour buckets; a tenant filter reads only its rows
+        assert window_stats(store, window_s=86400, now=now)["resolution_s"] == HOUR
+        acme = window_stats(store, window_s=HOUR, tenant_id="acme", now=now)
+        assert acme["runs"] == 1 and acme["error_rate"] == 1.0
+    finally:
+        writer.close()
+        tmp.cleanup()
+
+
+def test_stats_never_scan_raw_runs():
+    tmp = tempfile.TemporaryDirectory()
+    store = HistoryStore(Path(tmp.name) / "history.db")
+    now = time.time()
+    try:
+        store.merge_rollups(rollup_records([_record(i, now) for i in range(5)]))
+        store.merge_rollups(rollup_records([_record(i, now) for i in range(5, 8)]))  # merged in place
+        assert store.count() == 0  # no raw runs at all
+        assert window_stats(store, window_s=600, now=now)["runs"] == 8
+        # Old minute buckets expire; hour buckets outlive them
+        store.compact(now=now + 3 * 86400)
+        assert store.rollup_rows(MINUTE, 0, now + 86400) == []
+        assert len(store.rollup_rows(HOUR, 0, now + 86400)) == 1
+    finally:
+        store.close()
+        tmp.cleanup()
+
+
+def test_stats_endpoint():
+    from app.routes.agent_api import run_stats
+
+    tmp = tempfile.TemporaryDirectory()
+    writer = HistoryWriter(HistoryStore(Path(tmp.name) / "history.db"))
+    reset_history_writer(writer)
+    try:
+        writer.submit(_record(1, time.time()))
+        assert writer.flush(5)
+        stats = asyncio.run(run_stats(window_s=600))
+        assert stats["runs"] == 1 and stats["tools"]["slack.post_message"]["count"] == 1
+        assert "overall_requests_last_hour" in stats["rate_limits"]
+    finally:
+        reset_history_writer()
+        writer.close()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    print("Testing Analytics Rollups\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_sketch_quantiles_within_relative_error,
+        test_merged_sketches_equal_one_big_sketch,
+        test_failure_reasons_are_grouped,
+        test_rate_limit_rejections_use_the_limiters_reason_code,
+        test_writer_maintains_minute_and_hour_buckets,
+        test_stats_never_scan_raw_runs,
+        test_stats_endpoint,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,101 @@
+"""
+Test Structured Run Logs
+Level filtering (on record and on output), ring-buffer bounds, extend/+=
+going through the same path as append, injected trace ids, and a plain
+list coming back from a client being upgraded.
+
+Run:  python test_run_log.py      (or: pytest test_run_log.py)
+"""
+import json
+import sys
+
+from app.utils import run_log
+from app.utils.json_codec import dumps
+from app.utils.run_log import RunLog, get_run_log
+
+
+def _ids(trace_id, span_id=None):
+    return lambda: (trace_id, span_id)
+
+
+def test_records_below_min_level_are_never_stored():
+    logs = RunLog(min_level="INFO", trace_ids=_ids(None))
+    logs.append({"level": "DEBUG", "agent": "planner", "msg": "payload", "data": {"big": True}})
+    logs.append({"agent": "planner", "msg": "legacy record"})  # no level -> INFO
+    logs.append({"level": "warning", "agent": "executor", "msg": "slow"})
+    logs.append({"level": "LOUD", "msg": "unknown level counts as INFO"})
+    assert [r["level"] for r in logs] == ["INFO", "WARNING", "LOUD"]
+    assert logs[0] == {"level": "INFO", "agent": "planner", "msg": "legacy record", "ts": logs[0]["ts"]}
+    assert RunLog([{"msg": "x"}], min_level="ERROR") == RunLog([], min_level="ERROR")
+
+    verbose = RunLog([{"level": "DEBUG", "msg": "kept", "data": [1]}], min_level="DEBUG")
+    assert len(verbose) == 1 and verbose[0]["data"] == [1]
+    assert verbose.to_list() == []  # DEBUG is recorded but not returned by default
+    assert verbose.to_list(["debug"]) == list(verbose)
+
+
+def test_ring_buffer_keeps_only_the_newest_records():
+    logs = RunLog(maxlen=3, trace_ids=_ids(None))
+    for i in range(10):
+        logs.append({"msg": f"m{i}"})
+    assert [r["msg"] for r in logs] == ["m7", "m8", "m9"] and logs.maxlen == 3
+    assert RunLog().maxlen == run_log.RUN_LOG_SIZE
+
+    seeded = RunLog(({"msg": f"s{i}"} for i in range(5)), maxlen=2)
+    assert [r["msg"] for r in seeded] == ["s3", "s4"]
+
+
+def test_extend_and_iadd_filter_and_tag_like_append():
+    logs = RunLog(maxlen=3, min_level="INFO", trace_ids=_ids("t" * 32, "s" * 16))
+    logs.extend([{"level": "DEBUG", "msg": "dropped"}, {"msg": "a"}])
+    logs += [{"msg": "b"}, {"level": "DEBUG", "msg": "dropped"}, {"msg": "c"}, {"msg": "d"}]
+    assert isinstance(logs, RunLog)
+    assert [r["msg"] for r in logs] == ["b", "c", "d"]
+    assert all(r["trace_id"] == "t" * 32 and r["span_id"] == "s" * 16 and r["level"] == "INFO" for r in logs)
+
+
+def test_trace_ids_come_from_the_injected_source():
+    saved = run_log._trace_ids
+    try:
+        run_log.set_trace_ids_source(_ids("a" * 32))
+        record = RunLog([{"msg": "in a run"}])[0]
+        assert record["trace_id"] == "a" * 32 and "span_id" not in record  # unsampled: trace id only
+
+        # A record that already carries ids (e.g. sent back by a client) keeps them
+        kept = RunLog([{"msg": "old", "trace_id": "b" * 32, "span_id": "c" * 16}])[0]
+        assert (kept["trace_id"], kept["span_id"]) == ("b" * 32, "c" * 16)
+
+        run_log.set_trace_ids_source(None)
+        assert "trace_id" not in RunLog([{"msg": "no tracing"}])[0]
+    finally:
+        run_log.set_trace_ids_source(saved)
+
+
+def test_plain_list_from_the_client_is_upgraded_once():
+    state = {"logs": [{"agent": "validator", "msg": "waiting"}, {"level": "DEBUG", "msg": "dropped"}]}
+    logs = get_run_log(state)
+    assert isinstance(logs, RunLog) and state["logs"] is logs and get_run_log(state) is logs
+    assert [r["msg"] for r in logs] == ["waiting"]
+    assert get_run_log({}) == RunLog([])
+    assert json.loads(dumps({"logs": logs}))["logs"][0]["msg"] == "waiting"
+
+
+if __name__ == "__main__":
+    print("Testing Structured Run Logs\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_records_below_min_level_are_never_stored,
+        test_ring_buffer_keeps_only_the_newest_records,
+        test_extend_and_iadd_filter_and_tag_like_append,
+        test_trace_ids_come_from_the_injected_source,
+        test_plain_list_from_the_client_is_upgraded_once,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,200 @@
+"""
+Test Slack Outbound Scheduler
+Token-bucket pacing per method and per channel, FIFO queueing with queue
+metrics, deadline-aware admission, Retry-After pauses, and real
+post_slack_message calls against a stub that enforces a per-channel limit:
+a burst is smoothed to the ceiling with no `ratelimited` replies.
+
+Run:  python test_slack_scheduler.py      (or: pytest test_slack_scheduler.py)
+"""
+import asyncio
+import json
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+
+from app.services.http import circuit_breaker as cb
+from app.services.http.slack_scheduler import SlackPacer, SlackScheduler, TokenBucket, reset_slack_scheduler
+from app.utils.deadline import DeadlineExceeded
+from test_mcp_federation import _QuietServer, _run
+
+FAST_TIERS = {1: (60, 1), 2: (1200, 3), 3: (3000, 5), 4: (6000, 10)}
+
+
+def test_bucket_paces_fifo_and_reports_queue():
+    bucket = TokenBucket("method:test", rate_per_s=20, burst=1)
+    finished = []
+
+    async def one(i):
+        await SlackPacer([bucket], "test").acquire()
+        finished.append((i, time.perf_counter()))
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(10)))
+        return started
+
+    started = _run(run())
+    assert [i for i, _ in finished] == list(range(10))  # arrival order
+    assert 0.42 <= finished[-1][1] - started < 0.6      # 9 waits of 50 ms
+    snap = bucket.snapshot()
+    assert snap["acquired"] == 10 and snap["max_queued"] == 9 and snap["queued"] == 0
+    assert 0.4 <= snap["max_wait_s"] < 0.5
+
+
+def test_channels_are_paced_independently():
+    scheduler = SlackScheduler(tier_limits=FAST_TIERS, channel_rate_per_s=20, headroom=1.0)
+
+    async def run():
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            scheduler.acquire("chat.postMessage", channel) for channel in ("#a", "#b") for _ in range(5)
+        ))
+        return time.perf_counter() - started
+
+    elapsed = _run(run())
+    assert 0.18 <= elapsed < 0.3, elapsed  # 4 waits per channel, in parallel
+    stats = scheduler.stats()
+    assert stats["channel:a"]["acquired"] == 5 and stats["channel:b"]["acquired"] == 5
+    assert stats["method:chat.postMessage"]["acquired"] == 10
+    assert scheduler.pacer("conversations.history").buckets[0].rate == 3000 / 60
+    assert SlackScheduler().pacer("chat.postMessage", "#x").buckets[1].rate == 0.95  # 1/s with headroom
+
+
+def test_queue_wait_beyond_deadline_is_rejected():
+    scheduler = SlackScheduler(channel_rate_per_s=2, headroom=1.0)
+
+    async def run():
+        await scheduler.acquire("chat.postMessage", "#general")
+        await scheduler.acquire("chat.postMessage", "#general", deadline_at=time.time() + 0.2)
+
+    try:
+        _run(run())
+        raise AssertionError("expected DeadlineExceeded")
+    except DeadlineExceeded as e:
+        assert "queue wait" in str(e)
+    # the rejected call gave its reservation back
+    assert scheduler.stats()["channel:general"]["tokens"] > -0.5
+
+
+def test_retry_after_pauses_the_method():
+    scheduler = SlackScheduler(tier_limits=FAST_TIERS, headroom=1.0)
+
+    async def run():
+        pacer = scheduler.pacer("conversations.list")
+        await pacer.acquire()
+        pacer.pause(0.3)
+        started = time.perf_counter()
+        await pacer.acquire()
+        return time.perf_counter() - started
+
+    assert 0.28 <= _run(run()) < 0.45
+    assert scheduler.stats()["method:conversations.list"]["pauses"] == 1
+
+
+class RateLimitedSlack:
+    """chat.postMessage stub enforcing `rate_per_s` per channel (burst 2), else 429 ratelimited"""
+
+    def __init__(self, rate_per_s):
+        self.rate = rate_per_s
+        self.buckets = {}
+        self.posted = 0
+        self.throttled = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                now = time.monotonic()
+                with stub.lock:
+                    tokens, updated = stub.buckets.get(body["channel"], (2.0, now))
+                    tokens = min(2.0, tokens + (now - updated) * stub.rate)
+                    allowed = tokens >= 1
+                    stub.buckets[body["channel"]] = (tokens - 1 if allowed else tokens, now)
+                    if allowed:
+                        stub.posted += 1
+                    else:
+                        stub.throttled += 1
+                status, reply = (200, {"ok": True, "channel": "C1", "ts": str(now)}) if allowed \
+                    else (429, {"ok": False, "error": "ratelimited"})
+                data = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                if not allowed:
+                    self.send_header("Retry-After", "1")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.httpd = _QuietServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def test_burst_is_smoothed_to_the_ceiling_without_throttling():
+    from app.services.oauth import token_store
+    from app.services.tools import slack_tool
+
+    rate = 10.0  # stands in for Slack's 1/s per channel
+    stub = RateLimitedSlack(rate)
+    tmp = tempfile.TemporaryDirectory()
+    saved = (token_store.TOKENS_FILE, slack_tool.SLACK_API_BASE)
+    token_store.TOKENS_FILE = Path(tmp.name) / "tokens.json"
+    token_store.TOKENS_FILE.write_text(json.dumps({"slack": {"access_token": "xoxb-test"}}))
+    slack_tool.SLACK_API_BASE = stub.url
+    cb.reset_breakers()
+    scheduler = SlackScheduler(tier_limits=FAST_TIERS, channel_rate_per_s=rate)
+    reset_slack_scheduler(scheduler)
+
+    async def burst(n):
+        # Open the pooled connection first: at 1/s a cold TLS handshake is noise,
+        # at the test's 10/s it would bunch the first arrivals
+        await slack_tool.post_slack_message("#warmup", "hi")
+        started = time.perf_counter()
+        await asyncio.gather(*(slack_tool.post_slack_message("#general", f"msg {i}") for i in range(n)))
+        return time.perf_counter() - started
+
+    try:
+        n = 20
+        elapsed = _run(burst(n))
+        assert stub.throttled == 0 and stub.posted == n + 1
+        ceiling = (n - 1) / rate
+        assert ceiling <= elapsed < ceiling * 1.15, f"{elapsed:.2f}s vs ideal {ceiling:.2f}s"  # 95% headroom
+        assert scheduler.stats()["channel:general"]["max_queued"] >= n - 5  # smoothed, not rejected
+    finally:
+        token_store.TOKENS_FILE, slack_tool.SLACK_API_BASE = saved
+        reset_slack_scheduler()
+        stub.close()
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    print("Testing Slack Outbound Scheduler\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_bucket_paces_fifo_and_reports_queue,
+        test_channels_are_paced_independently,
+        test_queue_wait_beyond_deadline_is_rejected,
+        test_retry_after_pauses_the_method,
+        test_burst_is_smoothed_to_the_ceiling_without_throttling,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,156 @@
+"""
+Test Slack Summarizer Deadlines
+A summary the run budget cuts short (before or during the Groq call) raises
+DeadlineExceeded so the executor ends the run as TIMEOUT; a plain Groq
+failure within budget still falls back to the "Found N messages" text.
+
+Run:  python test_summarizer.py      (or: pytest test_summarizer.py)
+"""
+import asyncio
+import os
+import sys
+import time
+
+import groq
+
+from app.agents.executor.agent_main import run_executor
+from app.services.ai.summarizer import summarize_slack_messages
+from app.services.mcp import tool_handlers
+from app.services.mcp.tool_registry import TOOL_REGISTRY, ToolSpec, register_tool
+from app.services.observability.metrics import REGISTRY
+from app.utils.deadline import TIMEOUT_STATUS, DeadlineExceeded
+
+MESSAGES = [{"text": "release is on friday"}, {"text": "tests are green"}]
+
+# Handlers are imported by module path; make a direct run resolve to this module
+sys.modules.setdefault("test_summarizer", sys.modules[__name__])
+
+
+async def stub_read(deadline_at=None):
+    return {"success": True, "messages": MESSAGES}
+
+
+READ = ToolSpec(
+    name="test.read_messages",
+    description="Hand out fixed messages (test stub)",
+    handler="test_summarizer:stub_read",
+    read_only=True,
+)
+
+
+class _FakeGroq:
+    """Stands in for groq.Groq: every completion waits `delay_s`, then raises `error`"""
+
+    delay_s, error = 0.0, None
+
+    def __init__(self, api_key=None, timeout=None):
+        self.chat = self.completions = self
+        self.timeout = timeout
+
+    def create(self, **kwargs):
+        time.sleep(min(self.delay_s, self.timeout))
+        raise self.error
+
+
+class _Groq:
+    """GROQ_API_KEY set, groq.Groq replaced by _FakeGroq(delay_s, error)"""
+
+    def __init__(self, delay_s, error):
+        self.delay_s, self.error = delay_s, error
+
+    def __enter__(self):
+        self.saved = (groq.Groq, os.environ.get("GROQ_API_KEY"))
+        groq.Groq = type("Groq", (_FakeGroq,), {"delay_s": self.delay_s, "error": self.error})
+        os.environ["GROQ_API_KEY"] = "test-key"
+
+    def __exit__(self, *exc):
+        groq.Groq, key = self.saved
+        if key is None:
+            os.environ.pop("GROQ_API_KEY", None)
+        else:
+            os.environ["GROQ_API_KEY"] = key
+
+
+def _fallbacks():
+    return REGISTRY.merged().get(("neuromcp_fallbacks_total", ("summarizer",)), 0)
+
+
+def test_expired_budget_raises_instead_of_a_fallback_summary():
+    before = _fallbacks()
+    with _Groq(0, RuntimeError("should not be called")):
+        try:
+            summarize_slack_messages(MESSAGES, deadline_at=time.time() - 1)
+        except DeadlineExceeded:
+            pass
+        else:
+            raise AssertionError("an expired run budget should raise DeadlineExceeded")
+    assert _fallbacks() == before
+
+
+def test_call_cut_short_by_the_deadline_raises():
+    before = _fallbacks()
+    with _Groq(1.0, groq.APITimeoutError(request=None)):
+        try:
+            summarize_slack_messages(MESSAGES, deadline_at=time.time() + 0.1)
+        except DeadlineExceeded:
+            pass
+        else:
+            raise AssertionError("a call cut short by the deadline should raise DeadlineExceeded")
+    assert _fallbacks() == before
+
+
+def test_failure_within_budget_still_falls_back():
+    before = _fallbacks()
+    with _Groq(0, RuntimeError("model overloaded")):
+        summary = summarize_slack_messages(MESSAGES, deadline_at=time.time() + 30)
+    assert summary == "Found 2 messages. Error summarizing: model overloaded"
+    assert _fallbacks() == before + 1
+
+
+def test_executor_reports_timeout_when_the_summary_runs_out_of_budget():
+    saved_spec, saved_mock = TOOL_REGISTRY.get(READ.name), os.environ.get("MOCK_TOOLS")
+    register_tool(READ)
+    os.environ["MOCK_TOOLS"] = "false"
+    state = {
+        "plan": {"steps": [
+            {"id": "S1", "tool": READ.name, "input": {}},
+            {"id": "S2", "tool": "slack.summarize_messages", "input": {}},
+        ]},
+        "logs": [],
+        "deadline_at": time.time() + 0.2,
+    }
+    try:
+        with _Groq(1.0, groq.APITimeoutError(request=None)):
+            state = asyncio.run(run_executor(state))
+    finally:
+        tool_handlers._HANDLERS.pop(READ.name, None)
+        if saved_spec is None:
+            TOOL_REGISTRY.pop(READ.name, None)
+        else:
+            register_tool(saved_spec)
+        if saved_mock is None:
+            os.environ.pop("MOCK_TOOLS", None)
+        else:
+            os.environ["MOCK_TOOLS"] = saved_mock
+    assert state["status"] == TIMEOUT_STATUS and state["error"] == "Run deadline exceeded at S2"
+    assert state["execution_results"]["S1"]["messages"] == MESSAGES and "S2" not in state["execution_results"]
+
+
+if __name__ == "__main__":
+    print("Testing Slack Summarizer Deadlines\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_expired_budget_raises_instead_of_a_fallback_summary,
+        test_call_cut_short_by_the_deadline_raises,
+        test_failure_within_budget_still_falls_back,
+        test_executor_reports_timeout_when_the_summary_runs_out_of_budget,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
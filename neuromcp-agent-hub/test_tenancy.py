@@ -0,0 +1,271 @@
+"""
+Test Multi-Tenant Isolation
+Tenant-scoped quotas and duplicate detection, per-user quotas, tenant
+tokens reaching the tools, tenant-prefixed Slack buckets, and the fair run
+scheduler (per-tenant caps, round-robin between tenants, bounded queues),
+and approvals staying with the run's tenant.
+
+Run:  python test_tenancy.py      (or: pytest test_tenancy.py)
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.agents.validator.rate_limiter import RateLimiter
+from app.services.run_scheduler import FairRunScheduler, RunQueueFull
+from app.utils.deadline import DeadlineExceeded
+from app.utils.tenant import TenantQuota, normalize_id, set_tenant_quotas
+
+QUOTAS = {
+    "noisy": TenantQuota(requests_per_hour=3, user_requests_per_hour=0, max_concurrent_runs=2, max_queued_runs=20),
+    "team": TenantQuota(requests_per_hour=10, user_requests_per_hour=2, max_concurrent_runs=2, max_queued_runs=2),
+}
+
+
+def test_quotas_are_per_tenant_and_per_user():
+    set_tenant_quotas(QUOTAS)
+    limiter = RateLimiter()
+    try:
+        noisy = [limiter.check_rate_limit("overall", f"req {i}", "noisy")[0] for i in range(5)]
+        assert noisy == [True, True, True, False, False]
+        # Another tenant is untouched by the noisy one
+        assert limiter.check_rate_limit("overall", "req 0", "quiet")[0]
+
+        # Per-user share inside a tenant
+        team = [limiter.check_rate_limit("overall", f"q {i}", "team", "alice")[0] for i in range(3)]
+        assert team == [True, True, False]
+        allowed, error, _ = limiter.check_rate_limit("overall", "q 9", "team", "alice")
+        assert not allowed and "from you" in error
+        assert limiter.check_rate_limit("overall", "q 0", "team", "bob")[0]
+
+        stats = limiter.get_stats()
+        assert stats["tenants"] == {"noisy": 3, "quiet": 1, "team": 3}
+        assert limiter.get_stats("team")["overall_requests_last_hour"] == 3
+    finally:
+        set_tenant_quotas()
+
+
+def test_duplicate_detection_does_not_cross_tenants():
+    limiter = RateLimiter()
+    assert limiter.check_rate_limit("slack.post_message", "post hi to #general", "a")[0]
+    assert limiter.check_rate_limit("slack.post_message", "post hi to #general", "b")[0]
+    allowed, error, _ = limiter.check_rate_limit("slack.post_message", "post hi to #general", "a")
+    assert not allowed and "Duplicate" in error
+
+
+def test_windows_are_trimmed_when_touched_and_idle_keys_swept():
+    from collections import deque
+
+    limiter = RateLimiter()
+    now = time.time()
+    limiter.check_rate_limit("overall", "first", "busy")  # runs the first sweep
+    hour_ago = now - 3700
+    limiter.tenant_requests["busy"].appendleft(hour_ago)
+    limiter.tenant_requests["idle"] = deque([hour_ago])
+    limiter.recent_requests["stale"] = now - 60
+
+    # Only the windows this check touches are trimmed
+    assert limiter.check_rate_limit("overall", "second", "busy")[0]
+    assert hour_ago not in limiter.tenant_requests["busy"] and len(limiter.tenant_requests["busy"]) == 2
+    assert "idle" in limiter.tenant_requests and "stale" in limiter.recent_requests
+
+    # The periodic sweep drops idle keys and expired duplicate hashes
+    limiter._next_sweep = 0
+    assert limiter.check_rate_limit("overall", "third", "busy")[0]
+    assert "idle" not in limiter.tenant_requests and "stale" not in limiter.recent_requests
+    assert limiter._next_sweep > now
+
+
+def test_identity_is_validated():
+    assert normalize_id(None, "default") == "default" and normalize_id(" acme ", "default") == "acme"
+    for bad in ("../etc", "a b", "x" * 65, "tenant/1"):
+        try:
+            normalize_id(bad, "default")
+            raise AssertionError(f"accepted {bad!r}")
+        except ValueError:
+            pass
+
+
+def test_tools_use_the_tenants_tokens():
+    from app.services.http import circuit_breaker as cb
+    from app.services.mock_backend.backend import reset_backend
+    from app.services.mock_backend.profile import load_profile
+    from app.services.oauth import token_store
+    from app.services.oauth.google_token_manager import GoogleNotConnected, reset_google_token_manager
+    from app.services.tools import calendar_tool
+    from test_mcp_federation import _run
+    from test_mock_backend import _serve_stand_in
+
+    server, base = _serve_stand_in()
+    tmp = tempfile.TemporaryDirectory()
+    saved = (token_store.TOKENS_FILE, calendar_tool.GOOGLE_CALENDAR_API)
+    token_store.TOKENS_FILE = Path(tmp.name) / "tokens.json"
+    token_store.TOKENS_FILE.write_text(json.dumps(
+        {"_tenants": {"acme": {"google": {"access_token": "acme-token", "refresh_token": "r"}}}}))
+    calendar_tool.GOOGLE_CALENDAR_API = f"{base}/calendar/v3"
+    reset_backend(load_profile("instant"))
+    reset_google_token_manager()
+    cb.reset_breakers()
+    try:
+        assert _run(calendar_tool.list_calendar_events(tenant_id="acme"))["success"]
+        try:
+            _run(calendar_tool.list_calendar_events())  # default tenant never connected Google
+            raise AssertionError("expected GoogleNotConnected")
+        except GoogleNotConnected:
+            pass
+    finally:
+        token_store.TOKENS_FILE, calendar_tool.GOOGLE_CALENDAR_API = saved
+        reset_google_token_manager()
+        server.should_exit = True
+        tmp.cleanup()
+
+
+def test_slack_buckets_are_per_workspace():
+    from app.services.http.slack_scheduler import SlackScheduler
+
+    scheduler = SlackScheduler()
+    scheduler.pacer("chat.postMessage", "#general")
+    scheduler.pacer("chat.postMessage", "#general", tenant_id="acme")
+    assert set(scheduler.stats()) == {
+        "method:chat.postMessage", "channel:general", "acme/method:chat.postMessage", "acme/channel:general"}
+
+
+def _scheduler(max_concurrent=2):
+    return FairRunScheduler(max_concurrent=max_concurrent, quotas=lambda t: QUOTAS.get(t, TenantQuota(max_concurrent_runs=2)))
+
+
+def test_fair_scheduling_between_tenants():
+    scheduler = _scheduler(max_concurrent=2)
+    order = []
+
+    async def run(tenant, i):
+        async with scheduler.slot(tenant):
+            order.append(tenant)
+            await asyncio.sleep(0.02)
+
+    async def main():
+        noisy = [asyncio.create_task(run("noisy", i)) for i in range(10)]
+        await asyncio.sleep(0)  # the noisy burst is queued first
+        quiet = [asyncio.create_task(run("quiet", i)) for i in range(3)]
+        await asyncio.gather(*noisy, *quiet)
+
+    asyncio.run(main())
+    # Without fairness the quiet runs would wait for all 10 noisy ones
+    last_quiet = max(i for i, t in enumerate(order) if t == "quiet")
+    assert last_quiet <= 7, order
+    assert scheduler.total_active == 0 and scheduler.stats()["tenants"] == {}
+
+
+def test_tenant_cap_queue_limit_and_deadline():
+    scheduler = _scheduler(max_concurrent=10)
+
+    async def main():
+        release = asyncio.Event()
+        peak = 0
+
+        async def run():
+            nonlocal peak
+            async with scheduler.slot("team"):
+                peak = max(peak, scheduler.active["team"])
+                await release.wait()
+
+        running = [asyncio.create_task(run()) for _ in range(4)]  # 2 run, 2 queue
+        await asyncio.sleep(0.01)
+        try:
+            await scheduler.acquire("team")
+            raise AssertionError("expected RunQueueFull")
+        except RunQueueFull:
+            pass
+        # Other tenants still get slots while "team" is capped
+        async with scheduler.slot("other"):
+            pass
+        release.set()
+        await asyncio.gather(*running)
+        assert peak == 2
+
+        # A run that cannot get a slot before its deadline gives up
+        async with scheduler.slot("team"), scheduler.slot("team"):
+            started = time.perf_counter()
+            try:
+                await scheduler.acquire("team", deadline_at=time.time() + 0.1)
+                raise AssertionError("expected DeadlineExceeded")
+            except DeadlineExceeded:
+                assert time.perf_counter() - started < 0.5
+
+    asyncio.run(main())
+    stats = scheduler.stats()
+    assert stats["rejected"] == 1 and stats["timed_out"] == 1 and stats["active"] == 0
+
+
+def test_agent_run_carries_identity():
+    from app.routes.agent_api import RunRequest, run_agent
+
+    os.environ["MOCK_TOOLS"] = "true"
+    try:
+        bad = asyncio.run(run_agent(RunRequest(user_request="list my calendar events", tenant_id="no spaces")))
+        assert bad["status"] == "ERROR" and "Invalid tenant_id" in bad["error"]
+
+        result = asyncio.run(run_agent(RunRequest(
+            user_request=f"list my calendar events (run {time.time_ns()})", tenant_id="acme", user_id="alice")))
+        assert result["status"] == "DONE", result.get("error")
+        from app.agents.validator.rate_limiter import get_rate_limit_stats
+        assert get_rate_limit_stats("acme")["overall_requests_last_hour"] >= 1
+    finally:
+        os.environ.pop("MOCK_TOOLS", None)
+
+
+def test_approval_cannot_move_a_run_to_another_tenant():
+    from fastapi import HTTPException
+
+    from app.routes.agent_api import ApproveRequest, approve_agent
+
+    state = {"run_id": "e" * 32, "tenant_id": "acme", "user_id": "alice", "logs": [],
+             "status": "READY_TO_EXECUTE", "user_request": "list my calendar events",
+             "plan": {"steps": [{"id": "S1", "tool": "calendar.list_events", "input": {}}]}}
+    for other in ("noisy", "NOT valid"):
+        try:
+            body = asyncio.run(approve_agent(ApproveRequest(
+                state=dict(state), approved_step_ids=["S1"], tenant_id=other)))
+        except HTTPException as e:
+            assert e.status_code == 403 and "acme" in e.detail
+        else:
+            assert other == "NOT valid" and body["status"] == "ERROR", body
+
+    os.environ["MOCK_TOOLS"] = "true"
+    try:
+        same = dict(state)
+        body = asyncio.run(approve_agent(ApproveRequest(state=same, approved_step_ids=["S1"], tenant_id=" acme ")))
+        assert body["status"] == "DONE", body.get("error")
+        assert same["tenant_id"] == "acme"
+    finally:
+        os.environ.pop("MOCK_TOOLS", None)
+
+
+if __name__ == "__main__":
+    print("Testing Multi-Tenant Isolation\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_quotas_are_per_tenant_and_per_user,
+        test_duplicate_detection_does_not_cross_tenants,
+        test_windows_are_trimmed_when_touched_and_idle_keys_swept,
+        test_identity_is_validated,
+        test_tools_use_the_tenants_tokens,
+        test_slack_buckets_are_per_workspace,
+        test_fair_scheduling_between_tenants,
+        test_tenant_cap_queue_limit_and_deadline,
+        test_agent_run_carries_identity,
+        test_approval_cannot_move_a_run_to_another_tenant,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
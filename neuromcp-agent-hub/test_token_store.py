@@ -0,0 +1,328 @@
+"""
+Test Token Store
+File backend: cached lookups (no re-read until the file changes on disk),
+atomic temp-file + rename writes, and read-modify-write safety under
+concurrent upserts from coroutines and from several processes. Shared
+read-through cache, SQLite backend, Mongo backend against an in-process
+fake collection (and a clear error when Mongo is switched off or motor is
+missing), and GET /auth/status.
+
+Run:  python test_token_store.py      (or: pytest test_token_store.py)
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from app.services.oauth import token_store
+
+HERE = Path(__file__).resolve().parent
+
+
+class TempTokens:
+    def __init__(self, content=None):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.saved = token_store.TOKENS_FILE
+        token_store.TOKENS_FILE = Path(self.tmp.name) / "tokens.json"
+        if content is not None:
+            token_store.TOKENS_FILE.write_text(json.dumps(content))
+
+    def close(self):
+        token_store.TOKENS_FILE = self.saved
+        self.tmp.cleanup()
+
+
+def test_file_backend_rereads_only_when_the_file_changes():
+    env = TempTokens({"slack": {"access_token": "a"}})
+    store = token_store.FileTokenStore()
+    reads = []
+    real_read = token_store.read_json_file
+    token_store.read_json_file = lambda path: reads.append(path) or real_read(path)
+    try:
+        async def run():
+            return [await store.get("slack") for _ in range(50)]
+
+        tokens = asyncio.run(run())
+        assert all(t == {"access_token": "a"} for t in tokens) and len(reads) == 1
+
+        # Callers get copies: mutating one does not poison the cache
+        tokens[0]["access_token"] = "mutated"
+        assert asyncio.run(store.get("slack"))["access_token"] == "a"
+
+        # Another process rewrites the file -> next lookup sees it
+        token_store.TOKENS_FILE.write_text(json.dumps({"slack": {"access_token": "rotated"}}))
+        assert asyncio.run(store.get("slack"))["access_token"] == "rotated"
+        assert len(reads) == 2
+        assert asyncio.run(store.get("google")) is None
+    finally:
+        token_store.read_json_file = real_read
+        env.close()
+
+
+def test_concurrent_upserts_keep_every_write():
+    env = TempTokens()
+    try:
+        async def run():
+            await asyncio.gather(*(token_store.upsert_token(f"p{i}", {"access_token": str(i)}) for i in range(40)))
+
+        asyncio.run(run())
+        data = json.loads(token_store.TOKENS_FILE.read_text())
+        assert sorted(data) == sorted(f"p{i}" for i in range(40))
+        assert not [p for p in token_store.TOKENS_FILE.parent.iterdir() if p.suffix == ".tmp"]
+        if os.name == "posix":
+            assert token_store.TOKENS_FILE.stat().st_mode & 0o077 == 0  # secrets: owner-only
+    finally:
+        env.close()
+
+
+WRITER = """
+import asyncio, sys
+from app.services.oauth.token_store import upsert_token
+async def main(worker):
+    for i in range(25):
+        await upsert_token(f"w{worker}-{i}", {"access_token": f"{worker}:{i}"})
+asyncio.run(main(sys.argv[1]))
+"""
+
+
+def test_writers_in_several_processes_do_not_lose_updates():
+    env = TempTokens({"slack": {"access_token": "keep-me"}})
+    try:
+        environ = {**os.environ, "TOKENS_FILE": str(token_store.TOKENS_FILE)}
+        procs = [
+            subprocess.Popen([sys.executable, "-c", WRITER, str(w)], cwd=HERE, env=environ)
+            for w in range(4)
+        ]
+        assert all(p.wait(timeout=60) == 0 for p in procs)
+        data = json.loads(token_store.TOKENS_FILE.read_text())
+        assert len(data) == 4 * 25 + 1 and data["slack"]["access_token"] == "keep-me"
+        # and this process's cache picks up the other processes' writes
+        assert asyncio.run(token_store.get_token("w3-24")) == {"access_token": "3:24"}
+    finally:
+        env.close()
+
+
+class CountingStore(token_store.TokenStore):
+    kind = "counting"
+
+    def __init__(self):
+        self.docs, self.reads = {}, 0
+
+    async def get(self, provider, tenant_id=token_store.DEFAULT_TENANT):
+        self.reads += 1
+        await asyncio.sleep(0.01)
+        return self.docs.get((tenant_id, provider))
+
+    async def upsert(self, provider, token_doc, tenant_id=token_store.DEFAULT_TENANT):
+        self.docs[(tenant_id, provider)] = token_doc
+
+    async def providers(self, tenant_id=token_store.DEFAULT_TENANT):
+        return sorted(p for t, p in self.docs if t == tenant_id)
+
+
+def test_read_through_cache_shares_misses_and_writes_through():
+    backend = CountingStore()
+    backend.docs[("default", "slack")] = {"access_token": "a"}
+    cache = token_store.CachedTokenStore(backend, ttl_s=0.2)
+
+    async def run():
+        first = await asyncio.gather(*(cache.get("slack") for _ in range(20)))
+        assert all(d == {"access_token": "a"} for d in first) and backend.reads == 1
+        assert await cache.get("slack") == {"access_token": "a"} and backend.reads == 1
+
+        await cache.upsert("slack", {"access_token": "b"})
+        assert await cache.get("slack") == {"access_token": "b"} and backend.reads == 1
+
+        # Tenants are separate keys; unknown tokens are not cached
+        assert await cache.get("slack", "acme") is None and await cache.get("slack", "acme") is None
+        assert backend.reads == 3
+
+        backend.docs[("default", "slack")] = {"access_token": "c"}  # written by another worker
+        await asyncio.sleep(0.25)
+        assert await cache.get("slack") == {"access_token": "c"}
+
+    asyncio.run(run())
+    assert cache.stats()["hits"] >= 2
+
+
+def test_shared_store_reads_the_file_backend_straight_through():
+    env = TempTokens({"slack": {"access_token": "a"}})
+    token_store.reset_token_store(token_store.FileTokenStore())
+    try:
+        assert asyncio.run(token_store.get_token("slack"))["access_token"] == "a"
+        # Another process rewrites the file: no TTL to wait out
+        token_store.TOKENS_FILE.write_text(json.dumps({"slack": {"access_token": "rotated"}}))
+        assert asyncio.run(token_store.get_token("slack"))["access_token"] == "rotated"
+        asyncio.run(token_store.upsert_token("slack", {"access_token": "mine"}))
+        assert asyncio.run(token_store.get_token("slack"))["access_token"] == "mine"
+        assert token_store.get_token_store().stats()["entries"] == 0
+    finally:
+        token_store.reset_token_store()
+        env.close()
+
+    try:
+        token_store.TokenStore()
+        assert False, "TokenStore is abstract"
+    except TypeError:
+        pass
+
+
+def test_sqlite_backend():
+    from app.services.oauth.sqlite_token_store import SQLiteTokenStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SQLiteTokenStore(Path(tmp) / "tokens.db")
+
+        async def run():
+            await asyncio.gather(*(store.upsert(f"p{i}", {"access_token": str(i)}) for i in range(20)))
+            await store.upsert("slack", {"access_token": "acme"}, tenant_id="acme")
+            await store.upsert("p3", {"access_token": "again"})
+            try:
+                return (await store.get("p3"), await store.get("slack"), await store.get("slack", "acme"),
+                        await store.providers(), await store.providers("acme"))
+            finally:
+                await store.close()
+
+        p3, default_slack, acme_slack, providers, acme = asyncio.run(run())
+        assert p3 == {"access_token": "again"} and default_slack is None
+        assert acme_slack == {"access_token": "acme"} and acme == ["slack"] and len(providers) == 20
+
+
+class FakeMongoCollection:
+    """In-process stand-in for a motor collection (the calls MongoTokenStore makes)"""
+
+    def __init__(self):
+        self.rows, self.indexes, self.calls = [], [], 0
+
+    def _match(self, row, query):
+        return all(row.get(k) == v for k, v in query.items())
+
+    async def create_index(self, keys, unique=False, name=None):
+        await asyncio.sleep(0.01)
+        self.indexes.append((tuple(keys), unique, name))
+        return name
+
+    async def find_one(self, query, projection=None):
+        self.calls += 1
+        await asyncio.sleep(0)
+        row = next((r for r in self.rows if self._match(r, query)), None)
+        return None if row is None else {k: v for k, v in row.items() if projection is None or projection.get(k)}
+
+    async def update_one(self, query, update, upsert=False):
+        self.calls += 1
+        row = next((r for r in self.rows if self._match(r, query)), None)
+        if row is None and upsert:
+            row = dict(query)
+            self.rows.append(row)
+        row.update(update["$set"])
+
+    def find(self, query, projection=None):
+        rows = [r for r in self.rows if self._match(r, query)]
+
+        async def cursor():
+            for r in rows:
+                yield {k: v for k, v in r.items() if projection is None or projection.get(k)}
+
+        return cursor()
+
+
+def test_mongo_backend_with_fake_collection():
+    from app.services.oauth.mongo_token_store import MongoTokenStore
+
+    coll = FakeMongoCollection()
+    cache = token_store.CachedTokenStore(MongoTokenStore(collection=coll))
+
+    async def run():
+        await asyncio.gather(cache.upsert("google", {"access_token": "g"}), cache.upsert("slack", {"access_token": "s"}))
+        await cache.upsert("slack", {"access_token": "s2"})
+        await cache.upsert("slack", {"access_token": "t"}, tenant_id="acme")
+        cache.invalidate()
+        reads = await asyncio.gather(*(cache.get("slack") for _ in range(10)))
+        return reads, await cache.providers(), await cache.get("google", "acme")
+
+    reads, providers, missing = asyncio.run(run())
+    assert coll.indexes == [((("tenant_id", 1), ("provider", 1)), True, "tenant_provider")]
+    assert all(r == {"access_token": "s2"} for r in reads) and missing is None
+    assert providers == ["google", "slack"] and len(coll.rows) == 3
+    assert coll.calls == 4 + 1 + 1  # 4 upserts, one shared read, one miss
+
+
+def test_mongo_store_fails_loudly_when_mongo_is_off_or_motor_missing():
+    import importlib.util
+
+    from app.services.db import mongo
+
+    names = ("MOCK_TOOLS", "USE_MONGO_TOKENS", "MONGO_URI")
+    saved = {name: os.environ.get(name) for name in names}
+    try:
+        for name, value, reason in (("MOCK_TOOLS", "true", "MOCK_TOOLS=true"),
+                                    ("USE_MONGO_TOKENS", "false", "USE_MONGO_TOKENS=false")):
+            for other in names:
+                os.environ.pop(other, None)
+            os.environ[name] = value
+            try:
+                token_store.create_token_store("mongo")
+                raise AssertionError(f"{name}={value} should not quietly disable an explicit TOKEN_STORE=mongo")
+            except RuntimeError as e:
+                assert str(e).startswith("TOKEN_STORE=mongo, but") and reason in str(e), e
+
+        for name in names:
+            os.environ.pop(name, None)
+        assert isinstance(token_store.create_token_store("mongo"), token_store.TokenStore)
+        if importlib.util.find_spec("motor") is None:
+            os.environ["MONGO_URI"] = "mongodb://127.0.0.1:1"
+            try:
+                mongo.get_mongo_client()
+                raise AssertionError("expected a clear error without motor")
+            except RuntimeError as e:
+                assert "pip install motor" in str(e)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def test_auth_status_reports_connections_without_tokens():
+    from app.routes.auth_status import auth_status
+
+    env = TempTokens({"google": {"access_token": "secret-g", "expires_at": 4102444800}})
+    token_store.reset_token_store(token_store.FileTokenStore())
+    try:
+        status = asyncio.run(auth_status())
+        assert status["store"] == "file"
+        assert status["providers"]["google"]["connected"] and status["providers"]["google"]["expires_in_s"] > 0
+        assert status["providers"]["slack"] == {"connected": False}
+        assert "secret-g" not in json.dumps(status)
+    finally:
+        token_store.reset_token_store()
+        env.close()
+
+
+if __name__ == "__main__":
+    print("Testing Token Store\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_file_backend_rereads_only_when_the_file_changes,
+        test_concurrent_upserts_keep_every_write,
+        test_writers_in_several_processes_do_not_lose_updates,
+        test_read_through_cache_shares_misses_and_writes_through,
+        test_shared_store_reads_the_file_backend_straight_through,
+        test_sqlite_backend,
+        test_mongo_backend_with_fake_collection,
+        test_mongo_store_fails_loudly_when_mongo_is_off_or_motor_missing,
+        test_auth_status_reports_connections_without_tokens,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,162 @@
+"""
+Test Versioned Tool Catalog
+Versions are content hashes, sources are re-read after the TTL but artifacts
+are only rebuilt when the content changed, at most MAX_VERSIONS versions are
+kept, and a run still resolves the version it was planned against after the
+catalog moved on.
+
+Run:  python test_tool_catalog.py      (or: pytest test_tool_catalog.py)
+"""
+import asyncio
+import sys
+import time
+
+from app.services.mcp import tool_catalog
+from app.services.mcp.tool_catalog import content_version, get_catalog, invalidate_catalog, resolve_catalog
+
+
+def _tools(*names, approval=()):
+    return [{
+        "name": name,
+        "description": f"{name} (test)",
+        "input_schema": {"type": "object", "properties": {"text": {"type": "string"}}, "required": ["text"]},
+        "requires_approval": name in approval,
+    } for name in names]
+
+
+class _Loader:
+    """Hands out whatever `tools` currently is and counts the reads"""
+
+    def __init__(self, tools):
+        self.tools, self.reads = tools, 0
+
+    async def __call__(self):
+        self.reads += 1
+        return self.tools
+
+
+class _FreshCache:
+    """Empty process-wide catalog cache for one test; the real one is put back after"""
+
+    def __init__(self, ttl_s=300.0):
+        self.ttl_s = ttl_s
+
+    def __enter__(self):
+        self.saved = (tool_catalog._versions.copy(), tool_catalog._current,
+                      tool_catalog._checked_at, tool_catalog.CATALOG_TTL_S)
+        tool_catalog._versions.clear()
+        tool_catalog._current = None
+        tool_catalog.CATALOG_TTL_S = self.ttl_s
+        return self
+
+    def __exit__(self, *exc):
+        versions, tool_catalog._current, tool_catalog._checked_at, tool_catalog.CATALOG_TTL_S = self.saved
+        tool_catalog._versions.clear()
+        tool_catalog._versions.update(versions)
+
+
+def test_version_is_a_content_hash():
+    a, b = _tools("t.one", "t.two"), _tools("t.one", "t.two")
+    assert content_version(a) == content_version(b) and len(content_version(a)) == 12
+    assert content_version(a) != content_version(_tools("t.one", "t.two", "t.three"))
+    b[0]["description"] = "changed"
+    assert content_version(a) != content_version(b)  # any field counts, not just names
+
+    catalog = tool_catalog.build_catalog(_tools("t.one", "t.gate", approval=("t.gate",)))
+    assert catalog.names == {"t.one", "t.gate"} and catalog.requires_approval == {"t.one": False, "t.gate": True}
+    assert catalog.validator("t.one").is_valid({"text": "hi"}) and not catalog.validator("t.one").is_valid({})
+    assert catalog.validator("t.unknown") is None
+
+
+def test_sources_reread_after_ttl_but_rebuilt_only_on_change():
+    with _FreshCache(ttl_s=0.05):
+        loader = _Loader(_tools("t.one"))
+        first = asyncio.run(get_catalog(loader=loader))
+        assert asyncio.run(get_catalog(loader=loader)) is first and loader.reads == 1  # within the TTL
+
+        time.sleep(0.06)
+        assert asyncio.run(get_catalog(loader=loader)) is first  # re-read, same content: same artifacts
+        assert loader.reads == 2
+
+        loader.tools = _tools("t.one", "t.two")
+        time.sleep(0.06)
+        second = asyncio.run(get_catalog(loader=loader))
+        assert second.version != first.version and second.names == {"t.one", "t.two"}
+
+        loader.tools = _tools("t.one", "t.two", "t.three")
+        assert asyncio.run(get_catalog(loader=loader)) is second  # TTL not up yet
+        invalidate_catalog()
+        assert asyncio.run(get_catalog(loader=loader)).names == {"t.one", "t.two", "t.three"}
+        assert loader.reads == 4
+
+
+def test_old_versions_are_evicted_beyond_max_versions():
+    with _FreshCache():
+        loader = _Loader(None)
+        versions = []
+        for i in range(tool_catalog.MAX_VERSIONS + 3):
+            loader.tools = _tools(*(f"t.tool{n}" for n in range(i + 1)))
+            versions.append(asyncio.run(get_catalog(force_refresh=True, loader=loader)).version)
+
+        assert list(tool_catalog._versions) == versions[-tool_catalog.MAX_VERSIONS:]
+        # An evicted version falls back to the current catalog
+        assert resolve_catalog(versions[0]).version == versions[-1]
+
+        # Going back to a kept version reuses its artifacts and marks it recent
+        kept = tool_catalog._versions[versions[-tool_catalog.MAX_VERSIONS]]
+        loader.tools = kept.tools
+        assert asyncio.run(get_catalog(force_refresh=True, loader=loader)) is kept
+        assert list(tool_catalog._versions)[-1] == kept.version
+
+
+def test_run_resolves_the_version_it_was_planned_against():
+    from app.agents.validator.agent_main import run_validator
+
+    with _FreshCache():
+        loader = _Loader(_tools("t.one"))
+        planned = asyncio.run(get_catalog(loader=loader))  # what tool_discovery stored in the run state
+
+        loader.tools = _tools("t.two")  # the catalog moves on mid-run
+        current = asyncio.run(get_catalog(force_refresh=True, loader=loader))
+        assert current.version != planned.version
+
+        assert resolve_catalog(planned.version) is planned
+        assert resolve_catalog(None) is current and resolve_catalog("0" * 12) is current
+
+        # The validator checks the plan against the run's version, not the newest
+        plan = {"steps": [{"id": "s1", "tool": "t.one", "input": {"text": "hi"}}]}
+        state = run_validator({"plan": plan, "logs": [], "tool_catalog_version": planned.version})
+        assert not any("t.one" in error for error in state["validation"]["errors"]), state["validation"]
+        state = run_validator({"plan": plan, "logs": [], "tool_catalog_version": current.version})
+        assert any("t.one" in error for error in state["validation"]["errors"]), state["validation"]
+
+
+def test_unloaded_catalog_is_an_error():
+    with _FreshCache():
+        try:
+            resolve_catalog("anything")
+        except RuntimeError as e:
+            assert "not loaded" in str(e)
+        else:
+            raise AssertionError("resolve_catalog should fail before tool_discovery ran")
+
+
+if __name__ == "__main__":
+    print("Testing Versioned Tool Catalog\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_version_is_a_content_hash,
+        test_sources_reread_after_ttl_but_rebuilt_only_on_change,
+        test_old_versions_are_evicted_beyond_max_versions,
+        test_run_resolves_the_version_it_was_planned_against,
+        test_unloaded_catalog_is_an_error,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
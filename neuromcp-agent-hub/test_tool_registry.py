@@ -0,0 +1,112 @@
+"""
+Test Unified Tool Registry
+One registration makes a tool discoverable, validated and executable:
+checks discovery output, executor dispatch (defaults, argument mapping,
+earlier-step results, log templates) and registry-driven rate limits.
+
+Run:  python test_tool_registry.py      (or: pytest test_tool_registry.py)
+"""
+import asyncio
+import sys
+
+from app.agents.executor.agent_main import run_executor
+from app.agents.tool_discovery.agent import discover_tools
+from app.agents.validator.rate_limiter import RateLimiter
+from app.services.mcp.tool_registry import TOOL_REGISTRY, ToolSpec, register_tool
+
+CALLS = []
+
+# Handlers are imported by module path; make a direct run resolve to this module
+sys.modules.setdefault("test_tool_registry", sys.modules[__name__])
+
+
+async def stub_greet(who: str, punctuation: str = "!", deadline_at=None):
+    CALLS.append({"who": who, "punctuation": punctuation})
+    return {"greeting": f"hello {who}{punctuation}"}
+
+
+async def stub_count(results=None, deadline_at=None):
+    return {"count": len(results or {})}
+
+
+register_tool(ToolSpec(
+    name="test.greet",
+    description="Greet someone (test stub)",
+    handler="test_tool_registry:stub_greet",
+    input_schema={"type": "object", "properties": {"name": {"type": "string"}, "punct": {"type": "string"}}},
+    arg_map={"name": "who", "punct": "punctuation"},
+    defaults={"name": "world"},
+    rate_limit=(2, 3600),
+    log_start="Greeting {name}",
+    log_done="✅ Said: {greeting}",
+))
+
+register_tool(ToolSpec(
+    name="test.count_previous",
+    description="Count earlier step results (test stub)",
+    handler="test_tool_registry:stub_count",
+    read_only=True,
+    uses_results=True,
+    log_done="✅ {count} earlier results",
+))
+
+
+def test_builtin_tools_are_registered_once():
+    names = list(TOOL_REGISTRY)
+    assert len(names) == len(set(names))
+    for name in ("calendar.create_event", "calendar.list_events", "slack.post_message",
+                 "slack.read_messages", "slack.summarize_messages", "slack.list_channels"):
+        assert name in TOOL_REGISTRY, name
+        assert ":" in TOOL_REGISTRY[name].handler
+
+
+def test_discovery_lists_registry_entries():
+    tools = {t["name"]: t for t in asyncio.run(discover_tools())}
+    greet = tools["test.greet"]
+    assert greet["risk"] == "low" and greet["read_only"] is False and "handler" not in greet
+    assert tools["slack.read_messages"]["read_only"] is True
+
+
+def test_executor_dispatches_through_registry():
+    CALLS.clear()
+    state = {
+        "plan": {"steps": [
+            {"id": "S1", "tool": "test.greet", "input": {"punct": "?", "ignored": 1}},
+            {"id": "S2", "tool": "test.count_previous", "input": {}},
+        ]},
+        "logs": [],
+    }
+    state = asyncio.run(run_executor(state))
+
+    assert state["status"] == "DONE", state.get("error")
+    assert CALLS == [{"who": "world", "punctuation": "?"}], CALLS
+    assert state["execution_results"]["S1"] == {"greeting": "hello world?"}
+    assert state["execution_results"]["S2"] == {"count": 1}
+    msgs = [log["msg"] for log in state["logs"]]
+    assert "✅ Said: hello world?" in msgs and "✅ 1 earlier results" in msgs, msgs
+
+
+def test_rate_limit_comes_from_registry():
+    limiter = RateLimiter()
+    outcomes = [limiter.check_rate_limit("test.greet")[0] for _ in range(3)]
+    assert outcomes == [True, True, False], outcomes
+
+
+if __name__ == "__main__":
+    print("Testing Unified Tool Registry\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_builtin_tools_are_registered_once,
+        test_discovery_lists_registry_entries,
+        test_executor_dispatches_through_registry,
+        test_rate_limit_comes_from_registry,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,250 @@
+"""
+Test Run Tracing
+Deterministic sampling, span nesting and error status, trace ids in run
+logs, a full mock-tool run, HTTP/token-store/channel-lookup spans with
+traceparent propagation, and both exporters (JSONL file, OTLP stand-in).
+
+Run:  python test_tracing.py      (or: pytest test_tracing.py)
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from app.services.observability import tracing
+from app.services.observability.tracing import (
+    FileSpanExporter, OTLPHttpSpanExporter, configure_tracing, get_span_processor, is_sampled,
+    reset_tracing, span, start_trace,
+)
+from app.utils.run_log import RunLog
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+def _collect(sample_rate=1.0):
+    exporter = ListExporter()
+    configure_tracing(exporter=exporter, sample_rate=sample_rate, kind="file")
+    return exporter
+
+
+def test_sampling_is_deterministic_per_trace():
+    _collect()  # an exporter is configured (tracing is off by default)
+    try:
+        ids = [uuid.uuid4().hex for _ in range(20000)]
+        picked = [i for i in ids if is_sampled(i, 0.1)]
+        assert 1600 < len(picked) < 2400
+        assert all(is_sampled(i, 0.1) for i in picked)  # same answer every time
+        assert not any(is_sampled(i, 0.0) for i in ids[:100]) and all(is_sampled(i, 1.0) for i in ids[:100])
+    finally:
+        reset_tracing()
+
+
+def test_span_tree_and_errors():
+    exporter = _collect()
+    try:
+        with start_trace("a" * 32, "agent.run") as root:
+            with span("node.planner"):
+                with span("llm.planner", attempt=1):
+                    pass
+            try:
+                with span("tool", tool="slack.post_message"):
+                    raise RuntimeError("channel_not_found")
+            except RuntimeError:
+                pass
+            root.set(status="ERROR")
+        assert get_span_processor().flush(5)
+
+        by_name = {s.name: s for s in exporter.spans}
+        assert set(by_name) == {"agent.run", "node.planner", "llm.planner", "tool"}
+        assert {s.trace_id for s in exporter.spans} == {"a" * 32}
+        assert by_name["llm.planner"].parent_id == by_name["node.planner"].span_id
+        assert by_name["node.planner"].parent_id == by_name["agent.run"].span_id
+        assert by_name["agent.run"].parent_id is None
+        assert by_name["tool"].error == "RuntimeError: channel_not_found"
+        otlp = by_name["tool"].to_otlp()
+        assert otlp["status"]["code"] == 2 and {"key": "tool", "value": {"stringValue": "slack.post_message"}} in otlp["attributes"]
+        assert int(otlp["endTimeUnixNano"]) >= int(otlp["startTimeUnixNano"])
+    finally:
+        reset_tracing()
+
+
+def test_unsampled_runs_still_tag_logs():
+    exporter = _collect(sample_rate=0.0)
+    try:
+        with start_trace("b" * 32, "agent.run") as root:
+            with span("node.planner") as inner:
+                assert inner is tracing.NOOP_SPAN
+                logs = RunLog([{"agent": "planner", "msg": "hi"}])
+            root.set(status="DONE")
+        assert logs[0]["trace_id"] == "b" * 32 and "span_id" not in logs[0]
+        assert get_span_processor().stats()["traces"] == 0 and exporter.spans == []
+        # Outside any run nothing is added
+        assert "trace_id" not in RunLog([{"msg": "x"}])[0]
+    finally:
+        reset_tracing()
+
+
+def test_agent_run_is_traced():
+    from app.routes.agent_api import RunRequest, run_agent
+
+    exporter = _collect()
+    os.environ["MOCK_TOOLS"] = "true"
+    try:
+        result = asyncio.run(run_agent(RunRequest(
+            user_request=f"list my calendar events (trace {time.time_ns()})", log_levels=["INFO", "DEBUG"])))
+        assert result["status"] == "DONE", result.get("error")
+        assert get_span_processor().flush(5)
+
+        spans = [s for s in exporter.spans if s.trace_id == result["run_id"]]
+        names = {s.name for s in spans}
+        for name in ("agent.run", "pre_validation", "node.tool_discovery", "node.planner",
+                     "node.validator", "node.executor", "node.report", "tool"):
+            assert name in names, name
+        ids = {s.span_id for s in spans}
+        assert all(s.parent_id in ids for s in spans if s.name != "agent.run")
+        # Log records point at the run and at spans of it
+        assert all(r["trace_id"] == result["run_id"] for r in result["logs"])
+        assert {r["span_id"] for r in result["logs"] if "span_id" in r} <= ids
+    finally:
+        os.environ.pop("MOCK_TOOLS", None)
+        reset_tracing()
+
+
+def test_outbound_calls_are_spanned_and_exported_to_collector():
+    import httpx
+
+    from app.services.http import circuit_breaker as cb
+    from app.services.mock_backend.backend import reset_backend
+    from app.services.mock_backend.profile import load_profile
+    from app.services.oauth import token_store
+    from app.services.tools import slack_tool
+    from test_mock_backend import _serve_stand_in
+
+    server, base = _serve_stand_in()
+    tmp = tempfile.TemporaryDirectory()
+    saved = (token_store.TOKENS_FILE, slack_tool.SLACK_API_BASE)
+    token_store.TOKENS_FILE = Path(tmp.name) / "tokens.json"
+    token_store.TOKENS_FILE.write_text(json.dumps({"slack": {"access_token": "xoxb-test"}}))
+    token_store.reset_token_store()
+    slack_tool.SLACK_API_BASE = f"{base}/api"
+    reset_backend(load_profile("instant"))
+    cb.reset_breakers()
+    configure_tracing(exporter=OTLPHttpSpanExporter(base), sample_rate=1.0, kind="otlp")
+    trace_id = uuid.uuid4().hex
+    try:
+        async def run():
+            try:
+                with start_trace(trace_id, "agent.run"):
+                    return await slack_tool.read_slack_messages("#general", limit=5)
+            finally:
+                from app.services.http.client import close_http_client
+                await close_http_client()
+
+        assert asyncio.run(run())["success"]
+        assert get_span_processor().flush(5) and get_span_processor().stats()["errors"] == 0
+
+        collected = httpx.get(f"{base}/_mock/traces", params={"trace_id": trace_id}).json()["spans"]
+        names = [s["name"] for s in collected]
+        assert "slack.resolve_channel" in names and "token_store.get" in names
+        assert "http slack:conversations.list" in names and "http slack:conversations.history" in names
+        assert all(s["service"] == tracing.SERVICE_NAME for s in collected)
+        lookup = next(s for s in collected if s["name"] == "slack.resolve_channel")
+        listing = next(s for s in collected if s["name"] == "http slack:conversations.list")
+        assert listing["parentSpanId"] == lookup["spanId"]  # the lookup's cost is its HTTP call
+        assert any(a["key"] == "status_code" for a in listing["attributes"])
+    finally:
+        token_store.TOKENS_FILE, slack_tool.SLACK_API_BASE = saved
+        token_store.reset_token_store()
+        reset_tracing()
+        server.should_exit = True
+        tmp.cleanup()
+
+
+def test_traceparent_header():
+    configure_tracing(sample_rate=1.0, kind="file")
+    try:
+        assert tracing.traceparent() is None
+        with start_trace("c" * 32, "agent.run"):
+            with span("http slack:chat.postMessage") as outbound:
+                assert tracing.traceparent() == f"00-{'c' * 32}-{outbound.span_id}-01"
+    finally:
+        reset_tracing()
+
+
+def test_file_exporter_writes_jsonl():
+    tmp = tempfile.TemporaryDirectory()
+    path = Path(tmp.name) / "traces.jsonl"
+    configure_tracing(exporter=FileSpanExporter(path), sample_rate=1.0, kind="file")
+    try:
+        for i in range(3):
+            with start_trace(f"{i:032x}", "agent.run"):
+                with span("node.planner"):
+                    pass
+        assert get_span_processor().flush(5)
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(lines) == 6 and {line["traceId"] for line in lines} == {f"{i:032x}" for i in range(3)}
+    finally:
+        reset_tracing()
+        tmp.cleanup()
+
+
+def test_file_exporter_rotates_by_size():
+    tmp = tempfile.TemporaryDirectory()
+    path = Path(tmp.name) / "traces.jsonl"
+    exporter = FileSpanExporter(path, max_bytes=2000, backups=2)
+    configure_tracing(exporter=exporter, sample_rate=1.0, kind="file")
+    try:
+        for i in range(40):
+            with start_trace(f"{i:032x}", "agent.run"):
+                pass
+            assert get_span_processor().flush(5)
+        files = sorted(p.name for p in Path(tmp.name).iterdir())
+        assert files == ["traces.jsonl", "traces.jsonl.1", "traces.jsonl.2"]  # older backups dropped
+        assert exporter.rotations > 2 and all(p.stat().st_size <= 2000 for p in Path(tmp.name).iterdir())
+        newest = [json.loads(line)["traceId"] for line in path.read_text().splitlines()]
+        assert newest[-1] == f"{39:032x}"
+    finally:
+        reset_tracing()
+        tmp.cleanup()
+
+
+def test_tracing_is_off_by_default():
+    assert tracing.TRACE_EXPORTER == (os.getenv("TRACE_EXPORTER") or "none").lower()
+    if not os.getenv("TRACE_EXPORTER"):
+        reset_tracing()
+        assert not is_sampled("0" * 32, rate=1.0)  # nothing is sampled, nothing is written
+
+
+if __name__ == "__main__":
+    print("Testing Run Tracing\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_sampling_is_deterministic_per_trace,
+        test_span_tree_and_errors,
+        test_unsampled_runs_still_tag_logs,
+        test_agent_run_is_traced,
+        test_outbound_calls_are_spanned_and_exported_to_collector,
+        test_traceparent_header,
+        test_file_exporter_writes_jsonl,
+        test_file_exporter_rotates_by_size,
+        test_tracing_is_off_by_default,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)
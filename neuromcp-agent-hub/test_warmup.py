@@ -0,0 +1,103 @@
+"""
+Test Startup Warm-up
+/readyz answers 503 until warm-up has run and 200 after it, and the planner's
+ChatGroq client is built once and warmed through its own connection pool
+(the pool the planner's LLM calls then reuse).
+
+Run:  python test_warmup.py      (or: pytest test_warmup.py)
+"""
+import asyncio
+import os
+import sys
+from contextlib import contextmanager
+
+from fastapi.testclient import TestClient
+
+from app.agents.planner import agent
+from app.main import app
+from app.services import warmup
+
+
+@contextmanager
+def _env(**values):
+    saved = {name: os.environ.get(name) for name in values}
+    for name, value in values.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def test_readyz_is_503_until_warm_up_finishes():
+    client = TestClient(app)  # no lifespan: warm-up only runs when the test says so
+    with _env(WARMUP_NETWORK="false", GROQ_API_KEY=None):
+        warmup.reset_warmup()
+        try:
+            response = client.get("/readyz")
+            assert response.status_code == 503
+            assert response.json() == {"ready": False, "warmup": {"started_at": None, "finished_at": None, "steps": {}}}
+            assert client.get("/healthz").status_code == 200  # alive while not ready
+
+            asyncio.run(warmup.warm_up())
+            response = client.get("/readyz")
+            assert response.status_code == 200 and response.json()["ready"] is True
+            steps = response.json()["warmup"]["steps"]
+            assert set(steps) == set(warmup.WARMUP_STEPS)
+            assert steps["llm_clients"]["detail"] == "modules imported (no GROQ_API_KEY)"
+        finally:
+            warmup.mark_ready()
+
+
+def test_groq_client_is_shared_and_warmed_through_its_own_pool():
+    from test_mock_backend import _serve_stand_in
+
+    server, base = _serve_stand_in()
+    agent.reset_groq_llm()
+    try:
+        with _env(GROQ_API_KEY="test-key", GROQ_API_BASE=base, WARMUP_NETWORK="true"):
+            llm = agent.get_groq_llm()
+            assert agent.get_groq_llm() is llm  # one client (one pool) for every run
+
+            detail = warmup._warm_llm_clients_sync()
+            assert detail.startswith("modules imported, client constructed, connection opened"), detail
+            pool = agent._groq_http._transport._pool
+            assert len(pool.connections) == 1
+
+            # The planner's call goes out on the connection warm-up opened
+            try:
+                llm.invoke("hi", timeout=2)
+            except Exception:
+                pass  # the stand-in has no chat endpoint; only the connection matters
+            assert len(pool.connections) == 1
+
+            os.environ["GROQ_API_KEY"] = "rotated-key"
+            assert agent.get_groq_llm() is not llm  # a new key builds a new client
+    finally:
+        agent.reset_groq_llm()
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    print("Testing Startup Warm-up\n")
+    print("=" * 60)
+    failed = False
+    for test in (
+        test_readyz_is_503_until_warm_up_finishes,
+        test_groq_client_is_shared_and_warmed_through_its_own_pool,
+    ):
+        try:
+            test()
+            print(f"[PASS] {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"[FAIL] {test.__name__}: {e}")
+    print("=" * 60)
+    sys.exit(1 if failed else 0)